@@ -10,7 +10,12 @@ from backend.infrastructure.plugins.bluetooth import BluetoothPlugin
 from backend.infrastructure.plugins.radio import RadioPlugin
 from backend.infrastructure.services.systemd_manager import SystemdServiceManager
 from backend.infrastructure.services.audio_routing_service import AudioRoutingService
+from backend.infrastructure.services.snapcast_rpc_client import SnapcastRpcClient
 from backend.infrastructure.services.snapcast_service import SnapcastService
+from backend.infrastructure.services.snapcast_telemetry import SnapcastTelemetryCollector
+from backend.infrastructure.services.latency_calibration_service import LatencyCalibrationService
+from backend.infrastructure.services.satellite_dependency_update_service import SatelliteDependencyUpdateService
+from backend.infrastructure.services.artifact_cache import ArtifactCache
 from backend.infrastructure.services.snapcast_websocket_service import SnapcastWebSocketService
 from backend.infrastructure.services.equalizer_service import EqualizerService
 from backend.infrastructure.services.volume_service import VolumeService
@@ -29,7 +34,9 @@ class Container(containers.DeclarativeContainer):
     
     # Services centraux
     systemd_manager = providers.Singleton(SystemdServiceManager)
-    snapcast_service = providers.Singleton(SnapcastService)
+    snapcast_rpc_client = providers.Singleton(SnapcastRpcClient, host="localhost", port=1780)
+    snapcast_service = providers.Singleton(SnapcastService, rpc_client=snapcast_rpc_client)
+    snapcast_telemetry = providers.Singleton(SnapcastTelemetryCollector, snapcast_service=snapcast_service)
     settings_service = providers.Singleton(SettingsService)
     hardware_service = providers.Singleton(HardwareService)
     equalizer_service = providers.Singleton(
@@ -63,10 +70,25 @@ class Container(containers.DeclarativeContainer):
         SnapcastWebSocketService,
         state_machine=audio_state_machine,
         routing_service=audio_routing_service,
-        host="localhost",
-        port=1780
+        rpc_client=snapcast_rpc_client
     )
     
+    # Calibration de latence des clients Snapcast
+    latency_calibration_service = providers.Singleton(
+        LatencyCalibrationService,
+        snapcast_service=snapcast_service,
+        state_machine=audio_state_machine
+    )
+    
+    # Satellites milo-sat (découverte parallèle + cache rafraîchi en arrière-plan)
+    satellite_service = providers.Singleton(
+        SatelliteDependencyUpdateService,
+        snapcast_service=snapcast_service
+    )
+    
+    # Cache d'artefacts (paquets snapcast servis aux satellites en LAN)
+    artifact_cache = providers.Singleton(ArtifactCache)
+    
     # Service Volume avec SettingsService injecté
     volume_service = providers.Singleton(
         VolumeService,
@@ -193,6 +215,8 @@ class Container(containers.DeclarativeContainer):
         rotary_controller = container.rotary_controller()
         screen_controller = container.screen_controller()
         snapcast_websocket_service = container.snapcast_websocket_service()
+        snapcast_telemetry = container.snapcast_telemetry()
+        satellite_service = container.satellite_service()
 
         # ============================================================
         # ÉTAPE 2: Résolution des dépendances circulaires (ORDRE CRITIQUE)
@@ -248,7 +272,9 @@ class Container(containers.DeclarativeContainer):
                 ("volume_service", volume_service.initialize()),
                 ("rotary_controller", rotary_controller.initialize()),
                 ("screen_controller", screen_controller.initialize()),
-                ("snapcast_websocket_service", snapcast_websocket_service.initialize())
+                ("snapcast_websocket_service", snapcast_websocket_service.initialize()),
+                ("snapcast_telemetry", snapcast_telemetry.initialize()),
+                ("satellite_service", satellite_service.initialize())
             ]
 
             # Exécuter toutes les initialisations en parallèle avec gather
@@ -0,0 +1,291 @@
+# backend/infrastructure/hardware/mixer_backend.py
+"""
+Backends mixer ALSA persistants - Un handle ouvert une fois au lieu d'un fork amixer par pas
+"""
+import math
+import os
+import re
+import shutil
+import subprocess
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional, List, Sequence, Tuple
+
+try:
+    import alsaaudio
+except ImportError:  # pyalsaaudio absent (poste de dev, CI)
+    alsaaudio = None
+
+# Constantes reprises de alsa-utils (volume_mapping.c) pour rester identique à "amixer -M"
+MAX_LINEAR_DB_SCALE = 24
+DB_GAIN_MUTE = -9999999
+
+
+def normalized_to_db(normalized: float, min_db: int, max_db: int) -> int:
+    """Volume mappé (0.0-1.0) → centièmes de dB, même courbe que amixer -M"""
+    normalized = max(0.0, min(1.0, normalized))
+
+    if max_db - min_db <= MAX_LINEAR_DB_SCALE * 100:
+        return round(normalized * (max_db - min_db)) + min_db
+
+    if min_db != DB_GAIN_MUTE:
+        min_norm = math.pow(10, (min_db - max_db) / 6000.0)
+        normalized = normalized * (1 - min_norm) + min_norm
+
+    if normalized <= 0:
+        return min_db
+
+    return max(min_db, round(6000.0 * math.log10(normalized)) + max_db)
+
+
+def db_to_normalized(value_db: int, min_db: int, max_db: int) -> float:
+    """Centièmes de dB → volume mappé (0.0-1.0), même courbe que amixer -M"""
+    if max_db <= min_db:
+        return 0.0
+
+    if max_db - min_db <= MAX_LINEAR_DB_SCALE * 100:
+        return (value_db - min_db) / (max_db - min_db)
+
+    normalized = math.pow(10, (value_db - max_db) / 6000.0)
+    if min_db != DB_GAIN_MUTE:
+        min_norm = math.pow(10, (min_db - max_db) / 6000.0)
+        normalized = (normalized - min_norm) / (1 - min_norm)
+
+    return max(0.0, min(1.0, normalized))
+
+
+class MixerBackend(ABC):
+    """Interface des backends mixer - Volumes en % mappé (équivalent amixer -M)"""
+
+    name = "abstract"
+
+    @abstractmethod
+    def get_volume(self) -> Optional[int]:
+        """Lit le volume courant (0-100), None si indisponible"""
+
+    @abstractmethod
+    def set_volume(self, volume: int) -> bool:
+        """Écrit le volume (0-100)"""
+
+    def open_watch_handle(self) -> Optional['MixerBackend']:
+        """Handle dédié à la surveillance des événements (thread séparé), None si non supporté"""
+        return None
+
+    def polldescriptors(self) -> List[Tuple[int, int]]:
+        """Descripteurs (fd, eventmask) à surveiller pour les changements du contrôle"""
+        return []
+
+    def handle_events(self) -> None:
+        """Consomme les événements en attente sur les descripteurs"""
+
+    def close(self) -> None:
+        """Libère le handle"""
+
+
+class AlsaAudioMixerBackend(MixerBackend):
+    """Handle pyalsaaudio persistant - Un ioctl par pas, aucun processus"""
+
+    name = "alsaaudio"
+
+    def __init__(self, control: str = "Digital", cardindex: int = -1):
+        if alsaaudio is None:
+            raise RuntimeError("pyalsaaudio not installed")
+
+        self.control = control
+        self.cardindex = cardindex
+        self.logger = logging.getLogger(__name__)
+        self._mixer = alsaaudio.Mixer(control, cardindex=cardindex)
+        self._db_range = self._read_db_range()
+
+    def _read_db_range(self) -> Optional[tuple]:
+        """Plage dB du contrôle, None si le contrôle n'a pas d'info dB (mapping linéaire)"""
+        try:
+            min_db, max_db = self._mixer.getrange(units=alsaaudio.VOLUME_UNITS_DB)
+            return (int(min_db), int(max_db)) if max_db > min_db else None
+        except Exception:
+            return None
+
+    def get_volume(self) -> Optional[int]:
+        try:
+            if self._db_range:
+                values = self._mixer.getvolume(units=alsaaudio.VOLUME_UNITS_DB)
+                return round(db_to_normalized(values[0], *self._db_range) * 100)
+
+            values = self._mixer.getvolume(units=alsaaudio.VOLUME_UNITS_PERCENTAGE)
+            return int(values[0])
+        except Exception as e:
+            self.logger.error(f"alsaaudio get_volume failed: {e}")
+            return None
+
+    def set_volume(self, volume: int) -> bool:
+        try:
+            volume = max(0, min(100, int(volume)))
+            if self._db_range:
+                value_db = normalized_to_db(volume / 100.0, *self._db_range)
+                self._mixer.setvolume(value_db, units=alsaaudio.VOLUME_UNITS_DB)
+            else:
+                self._mixer.setvolume(volume, units=alsaaudio.VOLUME_UNITS_PERCENTAGE)
+            return True
+        except Exception as e:
+            self.logger.error(f"alsaaudio set_volume failed: {e}")
+            return False
+
+    def open_watch_handle(self) -> Optional[MixerBackend]:
+        # snd_mixer n'est pas thread-safe : le watcher ouvre son propre handle
+        return AlsaAudioMixerBackend(self.control, self.cardindex)
+
+    def polldescriptors(self) -> List[Tuple[int, int]]:
+        return self._mixer.polldescriptors()
+
+    def handle_events(self) -> None:
+        self._mixer.handleevents()
+
+    def close(self) -> None:
+        try:
+            self._mixer.close()
+        except Exception:
+            pass
+
+
+class AmixerSessionBackend(MixerBackend):
+    """Session "amixer -s" persistante - Les commandes passent par stdin, un seul processus"""
+
+    name = "amixer-session"
+
+    def __init__(self, control: str = "Digital", command: Optional[Sequence[str]] = None):
+        self.control = control
+        self.command: List[str] = list(command) if command else ["amixer", "-q", "-M", "-s"]
+        self.logger = logging.getLogger(__name__)
+        self._proc: Optional[subprocess.Popen] = None
+        self._last_volume: Optional[int] = None
+        self._start()
+
+    def _start(self) -> None:
+        """(Re)lance le processus de session"""
+        self._proc = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+
+    def _read_initial_volume(self) -> Optional[int]:
+        """Lecture ponctuelle au démarrage (la session stdin est en écriture seule)"""
+        try:
+            result = subprocess.run(
+                ["amixer", "-M", "get", self.control],
+                capture_output=True, text=True, timeout=2
+            )
+            match = re.search(r'\[(\d+)%\]', result.stdout)
+            return int(match.group(1)) if match else None
+        except Exception:
+            return None
+
+    def get_volume(self) -> Optional[int]:
+        if self._last_volume is None:
+            self._last_volume = self._read_initial_volume()
+        return self._last_volume
+
+    def set_volume(self, volume: int) -> bool:
+        volume = max(0, min(100, int(volume)))
+        line = f"sset '{self.control}' {volume}%\n"
+
+        for attempt in range(2):
+            try:
+                if self._proc is None or self._proc.poll() is not None:
+                    self._start()
+                self._proc.stdin.write(line)
+                self._proc.stdin.flush()
+                self._last_volume = volume
+                return True
+            except (BrokenPipeError, OSError) as e:
+                self.logger.warning(f"amixer session write failed (attempt {attempt + 1}): {e}")
+                self._proc = None
+        return False
+
+    def close(self) -> None:
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=1)
+        except Exception:
+            self._proc.kill()
+        finally:
+            self._proc = None
+
+
+class FakeMixerBackend(MixerBackend):
+    """Backend en mémoire pour les tests - Garde l'historique des écritures"""
+
+    name = "fake"
+
+    def __init__(self, volume: int = 0, fail_writes: bool = False):
+        self.volume = volume
+        self.fail_writes = fail_writes
+        self.history: List[int] = []
+        self.closed = False
+        self._event_pipe: Optional[Tuple[int, int]] = None
+
+    def simulate_external_change(self, volume: int) -> None:
+        """Simule un changement externe (alsamixer, autre processus) avec notification"""
+        self.volume = max(0, min(100, int(volume)))
+        if self._event_pipe:
+            os.write(self._event_pipe[1], b"x")
+
+    def open_watch_handle(self) -> Optional[MixerBackend]:
+        if self._event_pipe is None:
+            self._event_pipe = os.pipe()
+        return self
+
+    def polldescriptors(self) -> List[Tuple[int, int]]:
+        return [(self._event_pipe[0], 1)] if self._event_pipe else []  # POLLIN
+
+    def handle_events(self) -> None:
+        if self._event_pipe:
+            os.read(self._event_pipe[0], 1024)
+
+    def get_volume(self) -> Optional[int]:
+        return self.volume
+
+    def set_volume(self, volume: int) -> bool:
+        if self.fail_writes:
+            return False
+        self.volume = max(0, min(100, int(volume)))
+        self.history.append(self.volume)
+        return True
+
+    def close(self) -> None:
+        self.closed = True
+        if self._event_pipe:
+            for fd in self._event_pipe:
+                os.close(fd)
+            self._event_pipe = None
+
+
+def create_mixer_backend(control: str = "Digital") -> Optional[MixerBackend]:
+    """Ouvre le meilleur backend disponible : pyalsaaudio, puis session amixer"""
+    logger = logging.getLogger(__name__)
+
+    if alsaaudio is not None:
+        try:
+            backend = AlsaAudioMixerBackend(control)
+            logger.info(f"Mixer backend: alsaaudio ({control})")
+            return backend
+        except Exception as e:
+            logger.warning(f"alsaaudio mixer '{control}' unavailable: {e}")
+
+    if shutil.which("amixer"):
+        try:
+            backend = AmixerSessionBackend(control)
+            if backend.get_volume() is None:
+                backend.close()
+                logger.error(f"amixer control '{control}' not found")
+                return None
+            logger.info(f"Mixer backend: amixer session ({control})")
+            return backend
+        except Exception as e:
+            logger.error(f"amixer session unavailable: {e}")
+
+    return None
@@ -0,0 +1,91 @@
+# backend/infrastructure/hardware/mixer_watcher.py
+"""
+Surveillance événementielle du mixer ALSA - Poll sur le périphérique de contrôle, sans relecture amixer
+"""
+import asyncio
+import logging
+import select
+import threading
+from typing import Callable, Optional
+from backend.infrastructure.hardware.mixer_backend import MixerBackend
+
+
+class MixerWatcher:
+    """Thread d'écoute des événements de contrôle ALSA (alsamixer, autres processus, nos écritures)"""
+
+    POLL_TIMEOUT_MS = 500  # Permet de vérifier régulièrement la demande d'arrêt
+
+    def __init__(self, backend: MixerBackend, on_change: Callable[[int], None]):
+        self.backend = backend
+        self.on_change = on_change
+        self.logger = logging.getLogger(__name__)
+        self._handle: Optional[MixerBackend] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = False
+        self._last_volume: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self) -> bool:
+        """Démarre le thread de surveillance (à appeler depuis la boucle asyncio)"""
+        if self._running:
+            return True
+
+        try:
+            self._handle = self.backend.open_watch_handle()
+        except Exception as e:
+            self.logger.warning(f"Cannot open mixer watch handle: {e}")
+            self._handle = None
+
+        if self._handle is None or not self._handle.polldescriptors():
+            self.logger.info(f"Mixer backend '{self.backend.name}' does not support change events")
+            self._release_handle()
+            return False
+
+        self._loop = asyncio.get_running_loop()
+        self._last_volume = self._handle.get_volume()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="milo-mixer-watcher", daemon=True)
+        self._thread.start()
+        self.logger.info("Mixer watcher started")
+        return True
+
+    def _run(self) -> None:
+        """Boucle bloquante : poll → handle_events → lecture du handle local (aucun processus)"""
+        poller = select.poll()
+        for fd, eventmask in self._handle.polldescriptors():
+            poller.register(fd, eventmask)
+
+        while self._running:
+            try:
+                if not poller.poll(self.POLL_TIMEOUT_MS) or not self._running:
+                    continue
+
+                self._handle.handle_events()
+                volume = self._handle.get_volume()
+
+                if volume is None or volume == self._last_volume:
+                    continue
+
+                self._last_volume = volume
+                self._loop.call_soon_threadsafe(self.on_change, volume)
+            except Exception as e:
+                if self._running:
+                    self.logger.error(f"Error in mixer watcher: {e}")
+                    self._running = False
+
+    def stop(self) -> None:
+        """Arrête le thread et ferme le handle dédié"""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=(self.POLL_TIMEOUT_MS / 1000) + 0.5)
+            self._thread = None
+        self._release_handle()
+
+    def _release_handle(self) -> None:
+        if self._handle is not None and self._handle is not self.backend:
+            self._handle.close()
+        self._handle = None
@@ -145,9 +145,9 @@ class RotaryVolumeController:
             current_time = monotonic()
             
             if current_time - self._last_button_press >= self.DEBOUNCE_TIME:
-                self.logger.debug("Button pressed - could implement mute/unmute")
-                # Action libre - pourrait être mute/unmute via VolumeService
                 self._last_button_press = current_time
+                self.logger.debug("Button pressed - toggling soft mute")
+                await self.volume_service.toggle_mute()
                 await asyncio.sleep(0.2)  # Éviter les rebonds
     
     def cleanup(self):
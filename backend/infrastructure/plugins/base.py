@@ -4,7 +4,7 @@ Classe de base optimisée pour les plugins - Version nettoyée sans EventBus
 """
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from backend.application.interfaces.audio_source import AudioSourcePlugin
 from backend.domain.audio_state import PluginState, AudioSource
@@ -12,6 +12,10 @@ from backend.infrastructure.services.systemd_manager import SystemdServiceManage
 
 class UnifiedAudioPlugin(AudioSourcePlugin, ABC):
     """Classe de base pour plugins audio - Version nettoyée"""
+
+    # Veille chaude : daemon laissé démarré sans lecture ni sortie audio ouverte (voir StandbyManager).
+    # Seulement pour les daemons qui ne jouent rien tant que le backend ne le demande pas.
+    SUPPORTS_STANDBY = False
     
     def __init__(self, name: str, state_machine=None):
         self.name = name
@@ -19,6 +23,7 @@ class UnifiedAudioPlugin(AudioSourcePlugin, ABC):
         self.state_machine = state_machine
         self.service_manager = SystemdServiceManager()
         self._initialized = False
+        self.in_standby = False
     
     def _get_audio_source(self) -> AudioSource:
         """Retourne l'enum AudioSource correspondant à ce plugin"""
@@ -124,6 +129,7 @@ class UnifiedAudioPlugin(AudioSourcePlugin, ABC):
             
         try:
             success = await self._do_start()
+            self.in_standby = False
             
             if success:
                 await self.notify_state_change(PluginState.READY)
@@ -141,6 +147,30 @@ class UnifiedAudioPlugin(AudioSourcePlugin, ABC):
         """Implémentation spécifique du démarrage"""
         pass
     
+    async def enter_standby(self) -> bool:
+        """Met le plugin en veille chaude : le daemon reste démarré, le prochain start() évite le démarrage à froid"""
+        if not self.SUPPORTS_STANDBY:
+            return False
+        try:
+            if not await self._do_standby():
+                return False
+        except Exception as e:
+            self.logger.error(f"Erreur mise en veille {self.name}: {e}")
+            return False
+
+        self.in_standby = True
+        await self.notify_state_change(PluginState.INACTIVE)
+        return True
+
+    async def _do_standby(self) -> bool:
+        """Implémentation spécifique de la veille chaude (arrêt de la lecture, service conservé)"""
+        return False
+
+    def standby_services(self) -> List[str]:
+        """Services systemd laissés démarrés en veille (mesure mémoire / CPU)"""
+        service = getattr(self, "service_name", None)
+        return [service] if service else []
+
     async def restart(self) -> bool:
         """Redémarre le service systemd - Version de base"""
         try:
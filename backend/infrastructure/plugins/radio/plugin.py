@@ -20,13 +20,16 @@ class RadioPlugin(UnifiedAudioPlugin):
     - Contrôle un service systemd externe (milo-radio.service avec mpv)
     - Gère les métadonnées (station actuelle, titre du stream)
     - Support multiroom et equalizer via routing service
+    - Veille chaude : mpv reste en idle (aucune sortie audio ouverte) quand la source est quittée
 
     États:
-        INACTIVE → service arrêté
+        INACTIVE → service arrêté (ou en veille chaude)
         READY → service démarré (mpv en idle)
         CONNECTED → station en cours de lecture
     """
 
+    SUPPORTS_STANDBY = True
+
     def __init__(self, config: Dict[str, Any], state_machine=None, settings_service=None):
         super().__init__("radio", state_machine)
 
@@ -90,12 +93,14 @@ class RadioPlugin(UnifiedAudioPlugin):
     async def _do_start(self) -> bool:
         """Démarrage du service Radio"""
         try:
-            # Démarrer le service systemd (mpv)
+            # Démarrer le service systemd (mpv) ; déjà actif en sortie de veille chaude
+            warm = self.in_standby
             if not await self.control_service(self.service_name, "start"):
                 return False
 
             # Attendre que le service soit prêt
-            await asyncio.sleep(1)
+            if not warm:
+                await asyncio.sleep(1)
 
             # Vérifier que le service est actif
             is_active = await self.service_manager.is_active(self.service_name)
@@ -181,6 +186,28 @@ class RadioPlugin(UnifiedAudioPlugin):
             self.logger.error(f"Erreur redémarrage Radio: {e}")
             return False
 
+    async def _do_standby(self) -> bool:
+        """Veille chaude : lecture arrêtée et IPC fermé, mpv reste démarré en idle"""
+        self._stopping = True
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+
+        # mpv sans fichier ferme sa sortie audio : le périphérique ALSA est libéré pour la source suivante
+        if self._is_playing:
+            await self.mpv.stop()
+        await self.mpv.disconnect()
+
+        self.current_station = None
+        self._is_playing = False
+        self._is_buffering = False
+        self._metadata = {}
+        self.logger.info("Plugin Radio en veille chaude")
+        return True
+
     async def stop(self) -> bool:
         """Arrête le plugin Radio"""
         try:
@@ -0,0 +1,249 @@
+# backend/infrastructure/services/artifact_cache.py
+"""
+Cache d'artefacts du nœud principal - Blobs adressés par sha256, téléchargements WAN reprenables
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import aiofiles
+import aiohttp
+
+SNAPCAST_RELEASES_URL = "https://github.com/badaix/snapcast/releases/download"
+
+# Assets snapcast servis en pull-through aux satellites (pas de proxy ouvert)
+SNAPCAST_ASSET_REGEX = re.compile(r"^snap(client|server)_\d+\.\d+\.\d+-\d+_[a-z0-9]+_[a-z]+\.deb$")
+DIGEST_REGEX = re.compile(r"^[0-9a-f]{64}$")
+# Asset de release GitHub : checksum amont lu dans l'API (champ digest) ou un fichier SHA256SUMS de la release
+GITHUB_ASSET_REGEX = re.compile(r"^/(?P<repo>[^/]+/[^/]+)/releases/download/(?P<tag>[^/]+)/(?P<name>[^/]+)$")
+SHA256SUMS_NAMES = ("SHA256SUMS", "SHA256SUMS.txt", "sha256sums.txt", "checksums.txt")
+# Versions d'un même paquet : snapclient_0.32.0-1_arm64_bookworm.deb -> snapclient + -1_arm64_bookworm.deb
+VERSIONED_NAME_REGEX = re.compile(r"^(?P<package>.+?)_\d+(\.\d+)+(?P<variant>.*)$")
+
+
+class ArtifactCache:
+    """Blobs stockés sous blobs/sha256/<digest>, index nom -> digest, un seul téléchargement par nom"""
+
+    CHUNK_SIZE = 65536
+    DOWNLOAD_TIMEOUT = 600
+    MAX_ATTEMPTS = 3  # Reprises depuis l'octet déjà reçu
+    KEEP_VERSIONS = 3  # Versions gardées par paquet (actuelle, précédente pour rollback, cible)
+
+    def __init__(self, root: str = "/var/lib/milo/artifacts",
+                 github_url: str = "https://github.com", github_api_url: str = "https://api.github.com"):
+        self.root = Path(root)
+        self.github_url = github_url
+        self.github_api_url = github_api_url
+        self.github_token = os.environ.get('GITHUB_TOKEN')
+        self.blobs_dir = self.root / "blobs" / "sha256"
+        self.partial_dir = self.root / "partial"
+        self.index_file = self.root / "index.json"
+        self.logger = logging.getLogger(__name__)
+
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._fetches: Dict[str, asyncio.Task] = {}
+
+    # === INDEX ===
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        if self._index is None:
+            try:
+                self._index = json.loads(self.index_file.read_text())
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp_file = self.index_file.with_suffix(".tmp")
+        temp_file.write_text(json.dumps(self._index, indent=2))
+        temp_file.replace(self.index_file)
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / digest
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Entrée du cache pour un nom d'artefact (None si absent ou blob supprimé)"""
+        entry = self._load_index().get(name)
+        if entry and self.blob_path(entry["sha256"]).exists():
+            return {**entry, "name": name, "path": self.blob_path(entry["sha256"])}
+        return None
+
+    def get_blob(self, digest: str) -> Optional[Path]:
+        """Chemin d'un blob par son sha256"""
+        if not DIGEST_REGEX.match(digest):
+            return None
+        path = self.blob_path(digest)
+        return path if path.exists() else None
+
+    # === TÉLÉCHARGEMENT ===
+
+    async def fetch(self, url: str, name: str, sha256: Optional[str] = None) -> Dict[str, Any]:
+        """Retourne l'artefact depuis le cache, ou le télécharge une seule fois (appels concurrents partagés)"""
+        entry = self.get(name)
+        if entry and (not sha256 or entry["sha256"] == sha256.lower()):
+            self._index[name]["used_at"] = time.time()  # Ordre d'éviction
+            self._save_index()
+            return entry
+
+        task = self._fetches.get(name)
+        if task is None:
+            task = asyncio.create_task(self._download(url, name, sha256))
+            self._fetches[name] = task
+            task.add_done_callback(lambda _: self._fetches.pop(name, None))
+        return await asyncio.shield(task)
+
+    async def _download(self, url: str, name: str, sha256: Optional[str]) -> Dict[str, Any]:
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        partial = self.partial_dir / f"{name}.part"
+
+        timeout = aiohttp.ClientTimeout(total=self.DOWNLOAD_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            # Le blob est servi à toute la flotte comme fiable : vérifié contre le checksum publié en amont
+            upstream = await self.upstream_sha256(session, url)
+            if sha256 and upstream and sha256.lower() != upstream:
+                raise RuntimeError(f"Checksum for {name} does not match upstream")
+            sha256 = sha256 or upstream
+            if not sha256:
+                self.logger.warning(f"⚠️ No upstream checksum published for {name}, caching unverified")
+
+            for attempt in range(1, self.MAX_ATTEMPTS + 1):
+                try:
+                    await download_resumable(session, url, partial, self.CHUNK_SIZE)
+                    break
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt == self.MAX_ATTEMPTS:
+                        raise RuntimeError(f"Download failed for {name}: {e}") from e
+                    self.logger.warning(f"Download of {name} interrupted ({e}), resuming ({attempt}/{self.MAX_ATTEMPTS})")
+
+        digest = await file_sha256(partial, self.CHUNK_SIZE)
+        if sha256 and digest != sha256.lower():
+            partial.unlink(missing_ok=True)
+            raise RuntimeError(f"Checksum mismatch for {name}")
+
+        size = partial.stat().st_size
+        partial.replace(self.blob_path(digest))
+
+        now = time.time()
+        self._load_index()[name] = {"sha256": digest, "size": size, "url": url, "verified": bool(sha256),
+                                    "fetched_at": now, "used_at": now}
+        self._evict_old_versions(name)
+        self._save_index()
+        self.logger.info(f"📦 Cached {name} ({size} bytes, sha256 {digest[:12]})")
+        return self.get(name)
+
+    # === CHECKSUMS AMONT ===
+
+    async def upstream_sha256(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """sha256 publié pour un asset de release GitHub (digest de l'API, sinon SHA256SUMS), None s'il n'y en a pas"""
+        if not url.startswith(f"{self.github_url}/"):
+            return None
+        match = GITHUB_ASSET_REGEX.match(url[len(self.github_url):])
+        if not match:
+            return None
+
+        api_url = f"{self.github_api_url}/repos/{match['repo']}/releases/tags/{match['tag']}"
+        async with session.get(api_url, headers=self._github_headers()) as response:
+            if response.status != 200:
+                # Impossible de vérifier : rien n'est mis en cache plutôt qu'un blob non contrôlé
+                raise RuntimeError(f"Cannot read checksums of release {match['tag']} (HTTP {response.status})")
+            assets = {asset["name"]: asset for asset in (await response.json()).get("assets", [])}
+
+        digest = (assets.get(match["name"]) or {}).get("digest") or ""
+        if digest.startswith("sha256:"):
+            return digest[len("sha256:"):].lower()
+
+        for sums_name in SHA256SUMS_NAMES:
+            if sums_name in assets:
+                async with session.get(assets[sums_name]["browser_download_url"]) as response:
+                    if response.status != 200:
+                        raise RuntimeError(f"Cannot download {sums_name} (HTTP {response.status})")
+                    return parse_sha256sums(await response.text()).get(match["name"])
+        return None
+
+    def _github_headers(self) -> Dict[str, str]:
+        headers = {"Accept": "application/vnd.github.v3+json", "User-Agent": "Milo-Audio-System"}
+        if self.github_token:
+            headers["Authorization"] = f"token {self.github_token}"
+        return headers
+
+    # === ÉVICTION ===
+
+    def _evict_old_versions(self, name: str) -> List[str]:
+        """Ne garde que les KEEP_VERSIONS versions les plus récemment utilisées du paquet de name"""
+        match = VERSIONED_NAME_REGEX.match(name)
+        if not match:
+            return []
+        index = self._load_index()
+        versions = [
+            other for other in index
+            if (m := VERSIONED_NAME_REGEX.match(other)) and (m["package"], m["variant"]) == (match["package"], match["variant"])
+        ]
+        versions.sort(key=lambda other: index[other].get("used_at", index[other].get("fetched_at", 0)), reverse=True)
+
+        evicted = [other for other in versions[self.KEEP_VERSIONS:] if other != name]
+        for other in evicted:
+            digest = index.pop(other)["sha256"]
+            # Blob partagé avec une autre entrée (même contenu) : conservé
+            if not any(entry["sha256"] == digest for entry in index.values()):
+                self.blob_path(digest).unlink(missing_ok=True)
+            self.logger.info(f"🗑️ Evicted cached artifact {other}")
+        return evicted
+
+    async def export(self, name: str, destination: Path) -> Path:
+        """Copie (lien physique si possible) d'un artefact hors du cache, sous son nom d'origine"""
+        entry = self.get(name)
+        if entry is None:
+            raise FileNotFoundError(name)
+        destination = Path(destination)
+        try:
+            os.link(entry["path"], destination)
+        except OSError:
+            await asyncio.to_thread(shutil.copyfile, entry["path"], destination)
+        return destination
+
+
+async def download_resumable(session: aiohttp.ClientSession, url: str, partial: Path, chunk_size: int = 65536) -> None:
+    """Télécharge dans partial en reprenant depuis sa taille actuelle (Range), sinon depuis le début"""
+    offset = partial.stat().st_size if partial.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    async with session.get(url, headers=headers) as response:
+        if response.status == 416 and offset:
+            # Fichier partiel déjà complet (ou invalide) : on repart de zéro
+            partial.unlink(missing_ok=True)
+            return await download_resumable(session, url, partial, chunk_size)
+        if response.status not in (200, 206):
+            raise RuntimeError(f"HTTP {response.status} for {url}")
+
+        # 200 : le serveur ignore Range, le fichier est renvoyé en entier
+        mode = 'ab' if response.status == 206 else 'wb'
+        async with aiofiles.open(partial, mode) as f:
+            async for chunk in response.content.iter_chunked(chunk_size):
+                await f.write(chunk)
+
+
+def parse_sha256sums(text: str) -> Dict[str, str]:
+    """Fichier au format sha256sum ("<digest>  <nom>" ou "<digest> *<nom>") -> {nom: digest}"""
+    sums = {}
+    for line in text.splitlines():
+        parts = line.strip().split(None, 1)
+        if len(parts) == 2 and DIGEST_REGEX.match(parts[0].lower()):
+            sums[parts[1].lstrip("*").strip()] = parts[0].lower()
+    return sums
+
+
+async def file_sha256(path: Path, chunk_size: int = 65536) -> str:
+    """sha256 hexadécimal d'un fichier lu par blocs"""
+    digest = hashlib.sha256()
+    async with aiofiles.open(path, 'rb') as f:
+        while chunk := await f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
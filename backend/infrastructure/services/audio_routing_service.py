@@ -62,30 +62,26 @@ class AudioRoutingService:
     # === Propriétés d'accès à l'état unifié (state_machine.system_state) ===
 
     async def _get_multiroom_enabled(self) -> bool:
-        """Accède à l'état multiroom de manière thread-safe"""
+        """Accède à l'état multiroom (lecture sans await, cohérente avec la machine à états)"""
         if not self.state_machine:
             return False
-        async with self.state_machine._state_lock:
-            return self.state_machine.system_state.multiroom_enabled
+        return self.state_machine.system_state.multiroom_enabled
 
     async def _set_multiroom_state(self, value: bool) -> None:
-        """Modifie l'état multiroom de manière thread-safe (méthode interne)"""
+        """Modifie l'état multiroom (méthode interne)"""
         if self.state_machine:
-            async with self.state_machine._state_lock:
-                self.state_machine.system_state.multiroom_enabled = value
+            self.state_machine.system_state.multiroom_enabled = value
 
     async def _get_equalizer_enabled(self) -> bool:
-        """Accède à l'état equalizer de manière thread-safe"""
+        """Accède à l'état equalizer (lecture sans await, cohérente avec la machine à états)"""
         if not self.state_machine:
             return False
-        async with self.state_machine._state_lock:
-            return self.state_machine.system_state.equalizer_enabled
+        return self.state_machine.system_state.equalizer_enabled
 
     async def _set_equalizer_state(self, value: bool) -> None:
-        """Modifie l'état equalizer de manière thread-safe (méthode interne)"""
+        """Modifie l'état equalizer (méthode interne)"""
         if self.state_machine:
-            async with self.state_machine._state_lock:
-                self.state_machine.system_state.equalizer_enabled = value
+            self.state_machine.system_state.equalizer_enabled = value
 
     # Propriétés synchrones pour compatibilité (lecture seulement, peut être légèrement désynchronisée)
     @property
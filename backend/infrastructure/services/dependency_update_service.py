@@ -12,13 +12,15 @@ import os
 from pathlib import Path
 from typing import Dict, Any, Optional, Callable, Awaitable
 from backend.infrastructure.services.dependency_version_service import DependencyVersionService
+from backend.infrastructure.services.artifact_cache import ArtifactCache, SNAPCAST_RELEASES_URL
 
 class DependencyUpdateService(DependencyVersionService):
     """Service de mise à jour des dépendances - Extends DependencyVersionService"""
     
-    def __init__(self):
+    def __init__(self, artifact_cache: Optional[ArtifactCache] = None):
         super().__init__()
         self.update_logger = logging.getLogger(f"{__name__}.update")
+        self.artifact_cache = artifact_cache or ArtifactCache()
         
         # Configuration spécifique aux mises à jour (snapserver et snapclient séparés)
         self.update_config = {
@@ -312,21 +314,13 @@ class DependencyUpdateService(DependencyVersionService):
             else:
                 return {"success": False, "error": f"Unknown component: {component_key}"}
 
-            # URL de téléchargement
-            url = f"https://github.com/badaix/snapcast/releases/download/v{version}/{package_name}"
+            # Téléchargement via le cache d'artefacts (réutilisé par les satellites)
+            url = f"{SNAPCAST_RELEASES_URL}/v{version}/{package_name}"
 
-            self.update_logger.info(f"Downloading {package_name} from GitHub (Debian {debian_codename})...")
-            
-            # Télécharger
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        return {"success": False, "error": f"Download failed: HTTP {response.status}"}
-                    
-                    deb_path = Path(temp_dir) / package_name
-                    async with aiofiles.open(deb_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            await f.write(chunk)
+            self.update_logger.info(f"Fetching {package_name} (Debian {debian_codename})...")
+            await self.artifact_cache.fetch(url, package_name)
+
+            deb_path = await self.artifact_cache.export(package_name, Path(temp_dir) / package_name)
             
             return {
                 "success": True,
@@ -341,39 +335,18 @@ class DependencyUpdateService(DependencyVersionService):
         """Télécharge les packages .deb snapcast"""
         try:
             temp_dir = tempfile.mkdtemp()
+            paths = {}
             
-            # URLs des packages
-            base_url = f"https://github.com/badaix/snapcast/releases/download/v{version}"
-            server_url = f"{base_url}/snapserver_{version}-1_arm64_bookworm.deb"
-            client_url = f"{base_url}/snapclient_{version}-1_arm64_bookworm.deb"
-            
-            server_path = Path(temp_dir) / f"snapserver_{version}.deb"
-            client_path = Path(temp_dir) / f"snapclient_{version}.deb"
-            
-            # Télécharger les deux packages
-            async with aiohttp.ClientSession() as session:
-                # Server
-                async with session.get(server_url) as response:
-                    if response.status != 200:
-                        return {"success": False, "error": f"Server download failed: HTTP {response.status}"}
-                    
-                    async with aiofiles.open(server_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            await f.write(chunk)
-                
-                # Client
-                async with session.get(client_url) as response:
-                    if response.status != 200:
-                        return {"success": False, "error": f"Client download failed: HTTP {response.status}"}
-                    
-                    async with aiofiles.open(client_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            await f.write(chunk)
+            # Les deux packages passent par le cache d'artefacts
+            for component in ("snapserver", "snapclient"):
+                package_name = f"{component}_{version}-1_arm64_bookworm.deb"
+                await self.artifact_cache.fetch(f"{SNAPCAST_RELEASES_URL}/v{version}/{package_name}", package_name)
+                paths[component] = await self.artifact_cache.export(package_name, Path(temp_dir) / f"{component}_{version}.deb")
             
             return {
                 "success": True,
-                "server_deb": str(server_path),
-                "client_deb": str(client_path),
+                "server_deb": str(paths["snapserver"]),
+                "client_deb": str(paths["snapclient"]),
                 "temp_dir": temp_dir
             }
             
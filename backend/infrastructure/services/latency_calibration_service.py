@@ -0,0 +1,296 @@
+# backend/infrastructure/services/latency_calibration_service.py
+"""
+Calibration automatique de la latence des clients Snapcast - Chirps dans le stream Multiroom, mesure par milo-sat
+"""
+import asyncio
+import base64
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import aiohttp
+import numpy as np
+from backend.domain.audio_state import AudioSource
+
+SAMPLE_RATE = 48000
+
+
+def generate_calibration_pattern(sample_rate: int = SAMPLE_RATE, chirps: int = 3, chirp_ms: int = 100,
+                                 spacing_ms: int = 400, f0: float = 1000.0, f1: float = 6000.0) -> np.ndarray:
+    """Suite de chirps linéaires fenêtrés (mono float32, amplitude 1)"""
+    t = np.arange(int(sample_rate * chirp_ms / 1000)) / sample_rate
+    duration = t[-1] if len(t) else 0
+    chirp = np.sin(2 * np.pi * (f0 * t + (f1 - f0) / (2 * duration) * t ** 2)) * np.hanning(len(t))
+
+    pattern = np.zeros(int(sample_rate * spacing_ms / 1000) * (chirps - 1) + len(chirp), dtype=np.float32)
+    step = int(sample_rate * spacing_ms / 1000)
+    for i in range(chirps):
+        pattern[i * step:i * step + len(chirp)] = chirp
+    return pattern
+
+
+def pattern_to_pcm(pattern: np.ndarray, channels: int = 2, gain: float = 0.5) -> bytes:
+    """Motif float → PCM S16_LE entrelacé (format du stream Multiroom 48000:16:2)"""
+    samples = np.clip(pattern * gain * 32767, -32768, 32767).astype("<i2")
+    return np.repeat(samples, channels).tobytes()
+
+
+def find_pattern_onset(recording: np.ndarray, pattern: np.ndarray) -> Tuple[int, float]:
+    """Position (échantillons) du motif dans l'enregistrement par intercorrélation FFT, et confiance pic/médiane"""
+    if len(recording) < len(pattern):
+        return 0, 0.0
+    size = 1 << int(np.ceil(np.log2(len(recording) + len(pattern))))
+    correlation = np.fft.irfft(np.fft.rfft(recording, size) * np.conj(np.fft.rfft(pattern, size)), size)
+    correlation = np.abs(correlation[:len(recording) - len(pattern) + 1])
+
+    onset = int(np.argmax(correlation))
+    floor = float(np.median(correlation)) or 1e-12
+    return onset, float(correlation[onset]) / floor
+
+
+def compute_latency_offsets(delays_ms: Dict[str, float], current: Dict[str, int],
+                            max_latency: int = 1000) -> Dict[str, int]:
+    """Latence Snapcast par client pour aligner tous les clients sur le plus précoce
+
+    Un délai mesuré inclut la latence actuelle (le client joue déjà plus tôt d'autant) :
+    chaque client en retard sur le plus précoce reçoit ce retard en latence supplémentaire.
+    """
+    if not delays_ms:
+        return {}
+    earliest = min(delays_ms.values())
+    return {
+        client_id: int(max(0, min(max_latency, round(current.get(client_id, 0) + delay - earliest))))
+        for client_id, delay in delays_ms.items()
+    }
+
+
+class LatencyCalibrationService:
+    """Mesure le retard de sortie de chaque satellite et applique les latences Snapcast optimales"""
+
+    SATELLITE_API_PORT = 8001
+    PLAYBACK_DEVICE = "plughw:1,0,3"  # Loopback lu par le stream Multiroom (substream Radio)
+    CAPTURE_LEAD_S = 0.5  # Capture démarrée avant la diffusion
+    CAPTURE_TAIL_S = 1.5  # Marge après le motif (buffer Snapcast + sortie + acoustique)
+    SCHEDULE_DELAY_S = 1.0  # Délai laissé aux satellites pour préparer la capture
+    MIN_CONFIDENCE = 8.0
+    CLOCK_PROBES = 3  # Échanges pour estimer le décalage d'horloge d'un satellite (le plus court retenu)
+    MAX_CLOCK_UNCERTAINTY_MS = 10.0  # Demi-aller-retour au-delà duquel l'horodatage d'une capture n'est pas fiable
+
+    def __init__(self, snapcast_service, state_machine=None,
+                 player: Optional[Callable[[bytes, float], Awaitable[None]]] = None,
+                 agent_url: Optional[Callable[[Dict[str, Any]], str]] = None):
+        self.snapcast_service = snapcast_service
+        self.state_machine = state_machine
+        self.logger = logging.getLogger(__name__)
+
+        # Points d'extension : lecture du motif et adresse de l'agent (remplacés par des faux en simulation)
+        self._player = player or self._play_with_aplay
+        self._agent_url = agent_url or (lambda client: f"http://{client['ip']}:{self.SATELLITE_API_PORT}")
+
+        self.pattern = generate_calibration_pattern()
+        self._lock = asyncio.Lock()
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def calibrate(self, apply: bool = True) -> Dict[str, Any]:
+        """Lance une calibration complète (une seule à la fois)"""
+        if self._lock.locked():
+            return {"success": False, "error": "Calibration already in progress"}
+
+        async with self._lock:
+            try:
+                result = await self._run(apply)
+            except Exception as e:
+                self.logger.error(f"Latency calibration failed: {e}")
+                result = {"success": False, "error": str(e)}
+
+            self.last_result = result
+            await self._broadcast("latency_calibrated", result)
+            return result
+
+    async def _run(self, apply: bool) -> Dict[str, Any]:
+        # Le substream Radio n'est lu par le stream Multiroom que si aucune autre source ne joue
+        system_state = getattr(self.state_machine, 'system_state', None)
+        if system_state and system_state.active_source != AudioSource.NONE:
+            return {"success": False, "error": "Stop the active source before calibrating"}
+
+        clients = [c for c in await self.snapcast_service.get_detailed_clients() if c.get("ip")]
+        if not clients:
+            return {"success": False, "error": "No Snapcast clients connected"}
+
+        pattern_s = len(self.pattern) / SAMPLE_RATE
+        start_at = time.time() + self.SCHEDULE_DELAY_S
+        play_at = start_at + self.CAPTURE_LEAD_S
+        request = {
+            "start_at": start_at,
+            "duration_ms": int((self.CAPTURE_LEAD_S + pattern_s + self.CAPTURE_TAIL_S) * 1000),
+            "sample_rate": SAMPLE_RATE
+        }
+        self.logger.info(f"🎯 Latency calibration: {len(clients)} clients, chirps at {play_at:.3f}")
+
+        buffer_ms = (await self.snapcast_service.get_stream_settings()).get("buffer_ms", 0)
+
+        timeout = aiohttp.ClientTimeout(total=self.SCHEDULE_DELAY_S + request["duration_ms"] / 1000 + 5)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            responses = await asyncio.gather(
+                *[self._capture(session, client, request) for client in clients],
+                self._player(pattern_to_pcm(self.pattern), play_at)
+            )
+
+        measurements = {
+            client["id"]: self._measure(response, play_at, client.get("latency", 0), buffer_ms)
+            for client, response in zip(clients, responses[:-1])
+        }
+        reference, pipeline_ms = self._align_reference(measurements)
+
+        results, skipped, delays = {}, {}, {}
+        for client in clients:
+            latency = client.get("latency", 0)
+            measurement = measurements[client["id"]]
+            if "delay_ms" in measurement:
+                delays[client["id"]] = measurement["delay_ms"]
+                results[client["id"]] = {"name": client["name"], "latency_before": latency, **measurement}
+            else:
+                skipped[client["id"]] = {"name": client["name"], **measurement}
+
+        offsets = compute_latency_offsets(delays, {cid: r["latency_before"] for cid, r in results.items()})
+        for client_id, latency in offsets.items():
+            results[client_id]["latency_after"] = latency
+
+        if apply:
+            changed = [cid for cid, latency in offsets.items() if latency != results[cid]["latency_before"]]
+            applied = await asyncio.gather(*[self.snapcast_service.set_client_latency(cid, offsets[cid]) for cid in changed])
+            for client_id, ok in zip(changed, applied):
+                results[client_id]["applied"] = ok
+
+        self.logger.info(f"✅ Latency calibration done ({reference}): {offsets} (skipped: {list(skipped)})")
+        return {
+            "success": bool(results), "applied": apply, "reference": reference, "pipeline_ms": pipeline_ms,
+            "clients": results, "skipped": skipped, "timestamp": time.time()
+        }
+
+    def _align_reference(self, measurements: Dict[str, Dict[str, Any]]) -> Tuple[str, Optional[float]]:
+        """Une seule référence par calibration (jamais de mélange capture / retard déclaré)
+
+        Une capture mesure toute la chaîne (aplay, loopback, snapserver, codec, entrée micro) ;
+        un retard déclaré seulement buffer Snapcast + sortie ALSA. L'écart de chaîne est mesuré
+        sur les clients qui fournissent les deux, puis ajouté aux retards déclarés. Sans cet
+        écart, les clients sans micro ne peuvent pas être alignés sur les captures : ignorés.
+        """
+        captured = [m for m in measurements.values() if m.get("mode") == "capture"]
+        if not captured:
+            return "reported", None
+
+        gaps = [m["delay_ms"] - m["reported_delay_ms"] for m in captured if m.get("reported_delay_ms") is not None]
+        pipeline_ms = round(float(np.median(gaps)), 2) if gaps else None
+
+        for client_id, measurement in measurements.items():
+            if measurement.get("mode") != "reported":
+                continue
+            if pipeline_ms is None:
+                measurements[client_id] = {"error": "no pipeline offset to align with captures",
+                                           "output_delay_ms": measurement["output_delay_ms"]}
+            else:
+                measurement.update(mode="reported+pipeline", delay_ms=round(measurement["delay_ms"] + pipeline_ms, 2),
+                                   pipeline_ms=pipeline_ms)
+        return "capture", pipeline_ms
+
+    async def _capture(self, session: aiohttp.ClientSession, client: Dict[str, Any],
+                       request: Dict[str, Any]) -> Dict[str, Any]:
+        """Demande à l'agent milo-sat du client une capture horodatée (ou son retard de sortie)"""
+        url = self._agent_url(client)
+        try:
+            clock = await self._probe_clock(session, url)
+            async with session.post(f"{url}/calibration/capture", json=request) as response:
+                if response.status != 200:
+                    return {"error": f"HTTP {response.status}"}
+                return {**await response.json(), "clock": clock}
+        except Exception as e:
+            self.logger.debug(f"Calibration agent unreachable for {client['id']}: {e}")
+            return {"error": "agent unreachable"}
+
+    async def _probe_clock(self, session: aiohttp.ClientSession, url: str) -> Optional[Tuple[float, float]]:
+        """Décalage de l'horloge du satellite (s) et incertitude (demi-aller-retour), None si l'agent ne l'expose pas"""
+        best = None
+        for _ in range(self.CLOCK_PROBES):
+            sent = time.time()
+            async with session.get(f"{url}/calibration/clock") as response:
+                if response.status != 200:
+                    return None  # Agent antérieur à la sonde d'horloge
+                remote = float((await response.json())["time"])
+            received = time.time()
+            sample = (remote - (sent + received) / 2, (received - sent) / 2)
+            if best is None or sample[1] < best[1]:
+                best = sample
+        return best
+
+    def _measure(self, response: Dict[str, Any], play_at: float, latency: int, buffer_ms: int) -> Dict[str, Any]:
+        """Retard effectif (ms) depuis une capture, ou retard de sortie déclaré sans micro"""
+        if "error" in response:
+            return {"error": response["error"]}
+
+        if response.get("pcm"):
+            rate = response.get("sample_rate", SAMPLE_RATE)
+            recording = np.frombuffer(base64.b64decode(response["pcm"]), dtype="<i2").astype(np.float32) / 32768
+            pattern = self.pattern if rate == SAMPLE_RATE else generate_calibration_pattern(rate)
+            onset, confidence = find_pattern_onset(recording, pattern)
+            if confidence < self.MIN_CONFIDENCE:
+                return {"error": "pattern not detected", "confidence": round(confidence, 1)}
+
+            # started_at est lu sur l'horloge du satellite, play_at sur celle de Milo
+            clock_offset = self._clock_offset(response.get("clock"))
+            if clock_offset is None:
+                return {"error": "clock offset too uncertain", "confidence": round(confidence, 1)}
+            heard_at = response["started_at"] - clock_offset + onset / rate
+            measurement = {
+                "mode": "capture",
+                "delay_ms": round((heard_at - play_at) * 1000, 2),
+                "confidence": round(confidence, 1),
+                "clock_offset_ms": round(clock_offset * 1000, 2)
+            }
+            if response.get("output_delay_ms") is not None:
+                measurement["reported_delay_ms"] = self._reported_delay(response["output_delay_ms"], latency, buffer_ms)
+            return measurement
+
+        if response.get("output_delay_ms") is not None:
+            # Buffer Snapcast + sortie ALSA seulement : recalé sur les captures par _align_reference
+            delay = self._reported_delay(response["output_delay_ms"], latency, buffer_ms)
+            return {"mode": "reported", "delay_ms": delay, "output_delay_ms": response["output_delay_ms"]}
+
+        return {"error": "no capture device and no output delay"}
+
+    @staticmethod
+    def _reported_delay(output_delay_ms: float, latency: int, buffer_ms: int) -> float:
+        """Retard déclaré : buffer Snapcast + sortie, avance de la latence actuelle déduite"""
+        return round(buffer_ms + float(output_delay_ms) - latency, 2)
+
+    def _clock_offset(self, clock: Optional[Tuple[float, float]]) -> Optional[float]:
+        """Correction d'horloge (s) à appliquer à une capture, None si la sonde est trop imprécise"""
+        if clock is None:
+            # Agent sans sonde : horloges supposées synchronisées (NTP / systemd-timesyncd sur Milo et milo-sat)
+            self.logger.warning("Satellite clock not probed, assuming NTP-synchronized clocks")
+            return 0.0
+        offset, uncertainty = clock
+        if uncertainty * 1000 > self.MAX_CLOCK_UNCERTAINTY_MS:
+            return None
+        # Un écart inférieur à l'incertitude de la sonde n'est pas significatif
+        return offset if abs(offset) > uncertainty else 0.0
+
+    async def _play_with_aplay(self, pcm: bytes, play_at: float) -> None:
+        """Écrit le motif dans le loopback du stream Multiroom à l'instant prévu"""
+        await asyncio.sleep(max(0.0, play_at - time.time()))
+        proc = await asyncio.create_subprocess_exec(
+            "aplay", "-q", "-D", self.PLAYBACK_DEVICE, "-t", "raw", "-f", "S16_LE", "-r", str(SAMPLE_RATE), "-c", "2", "-",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await proc.communicate(pcm)
+        if proc.returncode != 0:
+            raise RuntimeError(f"aplay failed: {stderr.decode().strip()}")
+
+    async def _broadcast(self, event_type: str, data: Dict[str, Any]) -> None:
+        if self.state_machine:
+            await self.state_machine.broadcast_event("snapcast", event_type, {**data, "source": "latency_calibration"})
@@ -0,0 +1,118 @@
+# backend/infrastructure/services/multiroom_volume_state.py
+"""
+États volume multiroom - Volumes display par client en tableau contigu (NumPy), opérations par lot
+"""
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Sequence
+import numpy as np
+
+
+def alsa_to_display_array(alsa: np.ndarray, alsa_min: int, alsa_max: int) -> np.ndarray:
+    """ALSA → Display (0-100%), équivalent vectorisé de _alsa_to_display"""
+    return np.rint((alsa - alsa_min) / (alsa_max - alsa_min) * 100.0)
+
+
+def display_to_alsa_array(display: np.ndarray, alsa_min: int, alsa_max: int) -> np.ndarray:
+    """Display précis → ALSA borné, équivalent vectorisé de _display_to_alsa_precise + clamp"""
+    alsa = np.rint(display / 100.0 * (alsa_max - alsa_min)) + alsa_min
+    return np.clip(alsa, alsa_min, alsa_max).astype(np.int64)
+
+
+def round_half_up_array(values: np.ndarray) -> np.ndarray:
+    """Arrondi mathématique standard (comme _round_half_up)"""
+    return np.floor(values + 0.5).astype(np.int64)
+
+
+class MultiroomVolumeState(MutableMapping):
+    """
+    Volumes display précis des clients Snapcast.
+
+    Se manipule comme un dict client_id → volume (compatibilité avec le code existant),
+    mais les valeurs vivent dans un tableau float64 contigu : un ajustement de N clients
+    est une seule opération vectorisée (delta, clamp 0-100, mapping ALSA).
+    """
+
+    INITIAL_CAPACITY = 16
+
+    def __init__(self, initial: Dict[str, float] = None):
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._display = np.zeros(self.INITIAL_CAPACITY, dtype=np.float64)
+        # Positions du dernier lot demandé (la liste des clients change rarement)
+        self._positions_key = None
+        self._positions = None
+        if initial:
+            self.update(initial)
+
+    # === MAPPING ===
+
+    def __getitem__(self, client_id: str) -> float:
+        return float(self._display[self._index[client_id]])
+
+    def __setitem__(self, client_id: str, display_volume: float) -> None:
+        position = self._index.get(client_id)
+        if position is None:
+            position = self._append(client_id)
+        self._display[position] = display_volume
+
+    def __delitem__(self, client_id: str) -> None:
+        # Swap avec le dernier élément pour garder le tableau compact
+        position = self._index.pop(client_id)
+        last = len(self._ids) - 1
+        if position != last:
+            moved = self._ids[last]
+            self._ids[position] = moved
+            self._index[moved] = position
+            self._display[position] = self._display[last]
+        self._ids.pop()
+        self._positions_key = None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._ids))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __repr__(self) -> str:
+        return f"MultiroomVolumeState({dict(self.items())})"
+
+    def _append(self, client_id: str) -> int:
+        position = len(self._ids)
+        if position >= self._display.shape[0]:
+            grown = np.zeros(self._display.shape[0] * 2, dtype=np.float64)
+            grown[:position] = self._display[:position]
+            self._display = grown
+        self._ids.append(client_id)
+        self._index[client_id] = position
+        self._positions_key = None
+        return position
+
+    # === OPÉRATIONS PAR LOT ===
+
+    def indices(self, client_ids: Sequence[str], fallback: np.ndarray) -> np.ndarray:
+        """Positions des clients dans le tableau ; les inconnus sont ajoutés avec leur valeur fallback"""
+        key = tuple(client_ids)
+        if key == self._positions_key:
+            return self._positions
+
+        positions = np.empty(len(client_ids), dtype=np.intp)
+        for i, client_id in enumerate(client_ids):
+            position = self._index.get(client_id)
+            if position is None:
+                position = self._append(client_id)
+                self._display[position] = fallback[i]
+            positions[i] = position
+
+        self._positions_key = key
+        self._positions = positions
+        return positions
+
+    def values_at(self, positions: np.ndarray) -> np.ndarray:
+        """Copie des volumes display aux positions données"""
+        return self._display[positions]
+
+    def apply_delta(self, positions: np.ndarray, delta: float) -> np.ndarray:
+        """Applique un delta uniforme avec clamp 0-100 et retourne les nouveaux volumes"""
+        updated = np.clip(self._display[positions] + delta, 0.0, 100.0)
+        self._display[positions] = updated
+        return updated
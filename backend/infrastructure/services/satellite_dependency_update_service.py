@@ -6,11 +6,18 @@ import asyncio
 import aiohttp
 import logging
 import os
+import time
 from typing import Dict, Any, List, Optional
 
 class SatelliteDependencyUpdateService:
     """Service pour gérer les satellites et leurs mises à jour"""
     
+    PROBE_TIMEOUT = 1.5  # Secondes par satellite (un satellite hors ligne ne bloque plus la page)
+    REFRESH_INTERVAL = 20  # Rafraîchissement en arrière-plan, inférieur au TTL du cache
+    GITHUB_CACHE_TIMEOUT = 3600  # 1 heure
+    UPDATE_MAX_WAIT = 180  # 3 minutes max
+    UPDATE_CHECK_INTERVAL = 5  # Vérifier toutes les 5 secondes
+    
     def __init__(self, snapcast_service):
         self.snapcast_service = snapcast_service
         self.logger = logging.getLogger(__name__)
@@ -22,9 +29,61 @@ class SatelliteDependencyUpdateService:
             self.logger.info("GitHub token detected for satellite updates")
         
         # Cache pour les satellites détectés
-        self._satellites_cache = {}
+        self._satellites_cache: List[Dict[str, Any]] = []
         self._cache_timeout = 30  # 30 secondes
         self._last_cache_time = 0
+        self._discovery_task: Optional[asyncio.Task] = None  # Découverte en cours partagée
+        
+        # Cache de la dernière version snapclient sur GitHub
+        self._latest_version: Optional[str] = None
+        self._latest_version_time = 0
+        
+        # Session HTTP partagée (pool de connexions) et rafraîchissement en arrière-plan
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+    
+    async def initialize(self) -> bool:
+        """Démarre le rafraîchissement en arrière-plan de la liste des satellites"""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+        return True
+    
+    async def close(self) -> None:
+        """Arrête le rafraîchissement et ferme la session HTTP"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Session partagée créée à la demande"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
+            )
+        return self._session
+    
+    def _satellite_url(self, ip: str, path: str) -> str:
+        return f"http://{ip}:{self.satellite_api_port}{path}"
+    
+    async def _refresh_loop(self) -> None:
+        """Garde la liste des satellites chaude tant que le multiroom est actif"""
+        while True:
+            try:
+                model = getattr(self.snapcast_service, "model", None)
+                if model is None or model.live:
+                    await self.discover_satellites(force=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.debug(f"Satellite refresh failed: {e}")
+            await asyncio.sleep(self.REFRESH_INTERVAL)
     
     def _get_github_headers(self) -> Dict[str, str]:
         """Retourne les headers pour les requêtes GitHub (avec token si disponible)"""
@@ -38,38 +97,54 @@ class SatelliteDependencyUpdateService:
         
         return headers
     
-    async def discover_satellites(self) -> List[Dict[str, Any]]:
-        """Découvre les satellites actifs sur le réseau"""
+    def invalidate_cache(self) -> None:
+        """Force la prochaine découverte (après une mise à jour de satellite)"""
+        self._last_cache_time = 0
+    
+    async def discover_satellites(self, force: bool = False) -> List[Dict[str, Any]]:
+        """Découvre les satellites actifs sur le réseau (cache de _cache_timeout secondes)"""
+        if not force and time.monotonic() - self._last_cache_time < self._cache_timeout:
+            return [dict(s) for s in self._satellites_cache]
+        
+        # Une seule découverte à la fois : les appels concurrents attendent la même
+        if self._discovery_task is None or self._discovery_task.done():
+            self._discovery_task = asyncio.create_task(self._discover())
+        satellites = await asyncio.shield(self._discovery_task)
+        return [dict(s) for s in satellites]
+    
+    async def _discover(self) -> List[Dict[str, Any]]:
+        """Interroge en parallèle l'API de chaque client Snapcast milo-sat-*"""
         try:
             # Récupérer les clients Snapcast
             clients = await self.snapcast_service.get_clients()
             
-            satellites = []
+            # Filtrer uniquement les clients avec hostname milo-sat-* et une IP
+            candidates = [
+                c for c in clients
+                if c.get("host", "").startswith("milo-sat-") and c.get("ip")
+            ]
             
-            for client in clients:
-                # Filtrer uniquement les clients avec hostname milo-sat-*
-                hostname = client.get("host", "")
-                if not hostname.startswith("milo-sat-"):
-                    continue
-                
-                ip = client.get("ip", "")
-                if not ip:
-                    continue
-                
-                # Tester si l'API satellite répond
-                satellite_info = await self._check_satellite_api(hostname, ip)
-                
-                if satellite_info["online"]:
-                    satellites.append({
-                        "hostname": hostname,
-                        "display_name": client.get("name", hostname),
-                        "ip": ip,
-                        "snapclient_version": satellite_info.get("version"),
-                        "online": True,
-                        "uptime": satellite_info.get("uptime"),
-                        "snapclient_running": satellite_info.get("running", False)
-                    })
+            # Tester toutes les API satellites en parallèle
+            infos = await asyncio.gather(*[
+                self._check_satellite_api(c["host"], c["ip"]) for c in candidates
+            ])
+            
+            satellites = [
+                {
+                    "hostname": client["host"],
+                    "display_name": client.get("name", client["host"]),
+                    "ip": client["ip"],
+                    "snapclient_version": info.get("version"),
+                    "online": True,
+                    "uptime": info.get("uptime"),
+                    "snapclient_running": info.get("running", False),
+                    "debian_codename": info.get("debian_codename")
+                }
+                for client, info in zip(candidates, infos) if info["online"]
+            ]
             
+            self._satellites_cache = satellites
+            self._last_cache_time = time.monotonic()
             self.logger.info(f"Discovered {len(satellites)} satellites")
             return satellites
             
@@ -80,20 +155,18 @@ class SatelliteDependencyUpdateService:
     async def _check_satellite_api(self, hostname: str, ip: str) -> Dict[str, Any]:
         """Vérifie si l'API d'un satellite répond et récupère ses infos"""
         try:
-            url = f"http://{ip}:{self.satellite_api_port}/status"
-            
-            timeout = aiohttp.ClientTimeout(total=3)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        return {
-                            "online": True,
-                            "version": data.get("snapclient", {}).get("version"),
-                            "running": data.get("snapclient", {}).get("running", False),
-                            "uptime": data.get("uptime")
-                        }
+            timeout = aiohttp.ClientTimeout(total=self.PROBE_TIMEOUT)
+            async with self._get_session().get(self._satellite_url(ip, "/status"), timeout=timeout) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    
+                    return {
+                        "online": True,
+                        "version": data.get("snapclient", {}).get("version"),
+                        "running": data.get("snapclient", {}).get("running", False),
+                        "uptime": data.get("uptime"),
+                        "debian_codename": data.get("debian_codename")
+                    }
             
             return {"online": False}
             
@@ -136,58 +209,61 @@ class SatelliteDependencyUpdateService:
     async def update_satellite(
         self, 
         hostname: str, 
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        target: Optional[Dict[str, Any]] = None,
+        ip: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Lance la mise à jour d'un satellite"""
+        """Lance la mise à jour d'un satellite (target : version, deb_url et sha256 imposés par Milo)"""
         try:
-            # Récupérer l'IP du satellite
-            satellites = await self.discover_satellites()
-            satellite = next((s for s in satellites if s["hostname"] == hostname), None)
-            
-            if not satellite:
-                return {
-                    "success": False,
-                    "error": f"Satellite {hostname} not found or offline"
-                }
+            # Récupérer l'IP du satellite (sauf si connue : un client redémarré peut manquer à Snapcast)
+            if ip is None:
+                satellites = await self.discover_satellites()
+                satellite = next((s for s in satellites if s["hostname"] == hostname), None)
+                
+                if not satellite:
+                    return {
+                        "success": False,
+                        "error": f"Satellite {hostname} not found or offline"
+                    }
+                
+                ip = satellite["ip"]
             
-            ip = satellite["ip"]
-            url = f"http://{ip}:{self.satellite_api_port}/update"
+            url = self._satellite_url(ip, "/update")
             
             if progress_callback:
                 await progress_callback(f"Starting update for {hostname}", 0)
             
             # Lancer la mise à jour via l'API du satellite
             timeout = aiohttp.ClientTimeout(total=300)  # 5 minutes timeout
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        if data.get("success"):
-                            if progress_callback:
-                                await progress_callback(
-                                    f"Update initiated on {hostname}", 
-                                    10
-                                )
-                            
-                            # Attendre que la mise à jour se termine
-                            update_result = await self._wait_for_update_completion(
-                                hostname, 
-                                ip, 
-                                progress_callback
-                            )
-                            
-                            return update_result
-                        else:
-                            return {
-                                "success": False,
-                                "error": data.get("message", "Update failed")
-                            }
-                    else:
-                        return {
-                            "success": False,
-                            "error": f"HTTP {response.status}"
-                        }
+            async with self._get_session().post(url, json=target, timeout=timeout) as response:
+                if response.status != 200:
+                    return {
+                        "success": False,
+                        "error": f"HTTP {response.status}"
+                    }
+                data = await response.json()
+            
+            if not data.get("success"):
+                return {
+                    "success": False,
+                    "error": data.get("message", "Update failed")
+                }
+            
+            if progress_callback:
+                await progress_callback(
+                    f"Update initiated on {hostname}", 
+                    10
+                )
+            
+            # Attendre que la mise à jour se termine (version changée : cache invalidé)
+            update_result = await self._wait_for_update_completion(
+                hostname, 
+                ip, 
+                progress_callback
+            )
+            self.invalidate_cache()
+            
+            return update_result
             
         except Exception as e:
             self.logger.error(f"Error updating satellite {hostname}: {e}")
@@ -203,8 +279,8 @@ class SatelliteDependencyUpdateService:
         progress_callback: Optional[callable] = None
     ) -> Dict[str, Any]:
         """Attend la fin de la mise à jour sur le satellite"""
-        max_wait_time = 180  # 3 minutes max
-        check_interval = 5   # Vérifier toutes les 5 secondes
+        max_wait_time = self.UPDATE_MAX_WAIT
+        check_interval = self.UPDATE_CHECK_INTERVAL
         elapsed = 0
         
         while elapsed < max_wait_time:
@@ -221,35 +297,46 @@ class SatelliteDependencyUpdateService:
             
             # Vérifier le statut de la mise à jour
             try:
-                url = f"http://{ip}:{self.satellite_api_port}/update/status"
+                url = self._satellite_url(ip, "/update/status")
                 timeout = aiohttp.ClientTimeout(total=3)
+                session = self._get_session()
                 
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    async with session.get(url) as response:
-                        if response.status == 200:
-                            data = await response.json()
+                async with session.get(url, timeout=timeout) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        
+                        # Résultat pas encore publié : la mise à jour n'a pas démarré
+                        if "last_result" in data and data["last_result"] is None:
+                            continue
+                        
+                        if not data.get("update_in_progress", False):
+                            last_result = data.get("last_result") or {}
+                            if last_result.get("success") is False:
+                                return {
+                                    "success": False,
+                                    "error": last_result.get("error", f"Update failed on {hostname}")
+                                }
                             
-                            if not data.get("update_in_progress", False):
-                                # Mise à jour terminée, vérifier la nouvelle version
-                                status_url = f"http://{ip}:{self.satellite_api_port}/status"
-                                
-                                async with session.get(status_url) as status_response:
-                                    if status_response.status == 200:
-                                        status_data = await status_response.json()
-                                        new_version = status_data.get("snapclient", {}).get("version")
-                                        
-                                        if progress_callback:
-                                            await progress_callback(
-                                                f"Update completed on {hostname}",
-                                                100
-                                            )
-                                        
-                                        return {
-                                            "success": True,
-                                            "message": f"Satellite {hostname} updated successfully",
-                                            "new_version": new_version
-                                        }
-            
+                            # Mise à jour terminée, vérifier la nouvelle version
+                            status_url = self._satellite_url(ip, "/status")
+                            
+                            async with session.get(status_url, timeout=timeout) as status_response:
+                                if status_response.status == 200:
+                                    status_data = await status_response.json()
+                                    new_version = status_data.get("snapclient", {}).get("version")
+                                    
+                                    if progress_callback:
+                                        await progress_callback(
+                                            f"Update completed on {hostname}",
+                                            100
+                                        )
+                                    
+                                    return {
+                                        "success": True,
+                                        "message": f"Satellite {hostname} updated successfully",
+                                        "new_version": new_version
+                                    }
+        
             except Exception as e:
                 self.logger.debug(f"Waiting for update on {hostname}: {e}")
                 continue
@@ -261,24 +348,28 @@ class SatelliteDependencyUpdateService:
         }
     
     async def _get_latest_snapclient_version(self) -> Optional[str]:
-        """Récupère la dernière version de snapclient depuis GitHub avec token"""
+        """Récupère la dernière version de snapclient depuis GitHub avec token (cache 1 h)"""
+        if self._latest_version and time.monotonic() - self._latest_version_time < self.GITHUB_CACHE_TIMEOUT:
+            return self._latest_version
+        
         try:
             url = "https://api.github.com/repos/badaix/snapcast/releases/latest"
             headers = self._get_github_headers()
             
             timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        tag_name = data.get("tag_name", "")
-                        
-                        # Extraire le numéro de version (v0.31.0 -> 0.31.0)
-                        return tag_name.lstrip('v')
-                    elif response.status == 403:
-                        self.logger.warning("GitHub API rate limit - snapclient version unavailable")
+            async with self._get_session().get(url, headers=headers, timeout=timeout) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    tag_name = data.get("tag_name", "")
+                    
+                    # Extraire le numéro de version (v0.31.0 -> 0.31.0)
+                    self._latest_version = tag_name.lstrip('v')
+                    self._latest_version_time = time.monotonic()
+                    return self._latest_version
+                elif response.status == 403:
+                    self.logger.warning("GitHub API rate limit - snapclient version unavailable")
             
-            return None
+            return self._latest_version
             
         except Exception as e:
             self.logger.error(f"Error getting latest snapclient version: {e}")
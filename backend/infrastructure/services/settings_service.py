@@ -27,7 +27,8 @@ class SettingsService:
                 "restore_last_volume": False,
                 "startup_volume": 24,
                 "mobile_volume_steps": 5,
-                "rotary_volume_steps": 2
+                "rotary_volume_steps": 2,
+                "ramp_duration_ms": 200
             },
             "screen": {
                 "timeout_enabled": True,
@@ -156,6 +157,7 @@ class SettingsService:
         vol['startup_volume'] = max(vol['alsa_min'], min(vol['alsa_max'], int(vol_input.get('startup_volume', 37))))
         vol['mobile_volume_steps'] = max(1, min(10, int(vol_input.get('mobile_volume_steps', 5))))
         vol['rotary_volume_steps'] = max(1, min(10, int(vol_input.get('rotary_volume_steps', 2))))
+        vol['ramp_duration_ms'] = max(0, min(2000, int(vol_input.get('ramp_duration_ms', 200))))
         validated['volume'] = vol
         
         # Screen - MODIFIÉ : Accepter 0 pour timeout_seconds (désactivé)
@@ -292,7 +294,8 @@ class SettingsService:
             "startup_volume": volume_settings.get("startup_volume", 37),
             "restore_last_volume": volume_settings.get("restore_last_volume", False),
             "mobile_volume_steps": volume_settings.get("mobile_volume_steps", 5),
-            "rotary_volume_steps": volume_settings.get("rotary_volume_steps", 2)
+            "rotary_volume_steps": volume_settings.get("rotary_volume_steps", 2),
+            "ramp_duration_ms": volume_settings.get("ramp_duration_ms", 200)
         }
 
     async def get_volume_config_async(self) -> Dict[str, Any]:
@@ -304,5 +307,6 @@ class SettingsService:
             "startup_volume": volume_settings.get("startup_volume", 37),
             "restore_last_volume": volume_settings.get("restore_last_volume", False),
             "mobile_volume_steps": volume_settings.get("mobile_volume_steps", 5),
-            "rotary_volume_steps": volume_settings.get("rotary_volume_steps", 2)
+            "rotary_volume_steps": volume_settings.get("rotary_volume_steps", 2),
+            "ramp_duration_ms": volume_settings.get("ramp_duration_ms", 200)
         }
\ No newline at end of file
@@ -0,0 +1,342 @@
+# backend/infrastructure/services/snapcast_rpc_client.py
+"""
+Client JSON-RPC Snapcast unifié - Commandes sur la WebSocket de contrôle persistante, HTTP en secours
+"""
+import asyncio
+import json
+import logging
+import aiohttp
+from typing import Dict, Any, Optional, Callable, Awaitable, List, Tuple
+
+NotificationHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+RpcCall = Tuple[str, Optional[Dict[str, Any]]]
+
+
+class SnapcastRpcError(Exception):
+    """Réponse d'erreur JSON-RPC de snapserver"""
+
+
+class SnapcastRpcClient:
+    """
+    Une seule connexion WebSocket vers snapserver pour les commandes ET les notifications.
+
+    Chaque requête porte un id, sa réponse résout le future correspondant. Les notifications
+    sont traitées dans l'ordre par une task dédiée, jamais dans la boucle de lecture : un
+    handler peut donc lui-même envoyer des commandes sans bloquer les réponses. Tant que la
+    socket est indisponible (démarrage, reconnexion, multiroom désactivé), les commandes
+    passent par HTTP sur une session keep-alive.
+    """
+
+    REQUEST_TIMEOUT = 3.0
+    RECONNECT_DELAY = 5
+    MAX_RECONNECT_DELAY = 30
+
+    def __init__(self, host: str = "localhost", port: int = 1780):
+        self.ws_url = f"ws://{host}:{port}/jsonrpc"
+        self.http_url = f"http://{host}:{port}/jsonrpc"
+        self.logger = logging.getLogger(__name__)
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._websocket: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._request_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+
+        self._should_connect = False
+        self._connection_task: Optional[asyncio.Task] = None
+        self._notifications: asyncio.Queue = asyncio.Queue()
+        self._dispatch_task: Optional[asyncio.Task] = None
+
+        # Branchés par SnapcastWebSocketService
+        self._notification_handler: Optional[NotificationHandler] = None
+        self._on_connected: Optional[Callable[[], Awaitable[None]]] = None
+        self._on_disconnected: Optional[Callable[[], None]] = None
+
+        # Métriques
+        self._ws_calls = 0
+        self._http_calls = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._websocket is not None and not self._websocket.closed
+
+    def set_notification_handler(self, handler: NotificationHandler) -> None:
+        self._notification_handler = handler
+
+    def set_connection_handlers(self, on_connected: Callable[[], Awaitable[None]],
+                                on_disconnected: Callable[[], None]) -> None:
+        self._on_connected = on_connected
+        self._on_disconnected = on_disconnected
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Session partagée WebSocket + HTTP, recréée si fermée"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    def _next_id(self) -> int:
+        self._request_id += 1
+        return self._request_id
+
+    # === CYCLE DE VIE ===
+
+    async def start(self) -> None:
+        """Ouvre la connexion persistante (reconnexion automatique jusqu'à stop)"""
+        self._should_connect = True
+        if self._connection_task is None or self._connection_task.done():
+            self._connection_task = asyncio.create_task(self._connection_loop())
+        if self._dispatch_task is None or self._dispatch_task.done():
+            self._dispatch_task = asyncio.create_task(self._dispatch_notifications())
+
+    async def stop(self) -> None:
+        """Ferme la connexion persistante, les commandes repassent en HTTP"""
+        self._should_connect = False
+
+        for task in (self._connection_task, self._dispatch_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._connection_task = None
+        self._dispatch_task = None
+
+        if self._websocket:
+            await self._websocket.close()
+            self._websocket = None
+        self._fail_pending(ConnectionError("Snapcast control connection stopped"))
+
+    async def close(self) -> None:
+        """Arrêt complet (connexion + session)"""
+        await self.stop()
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _connection_loop(self) -> None:
+        """Boucle de connexion avec backoff"""
+        delay = self.RECONNECT_DELAY
+
+        while self._should_connect:
+            try:
+                if await self._connect_and_listen():
+                    delay = self.RECONNECT_DELAY
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Snapcast control connection error: {e}")
+
+            if self._should_connect:
+                self.logger.info(f"Reconnecting to Snapcast control socket in {delay} seconds...")
+                await asyncio.sleep(delay)
+                delay = min(delay * 1.5, self.MAX_RECONNECT_DELAY)
+
+    async def _connect_and_listen(self) -> bool:
+        """Connexion + lecture jusqu'à fermeture, retourne True si la connexion a abouti"""
+        try:
+            self.logger.info(f"Connecting to Snapcast control socket: {self.ws_url}")
+            async with asyncio.timeout(5):
+                self._websocket = await self._get_session().ws_connect(self.ws_url, heartbeat=30)
+        except (aiohttp.ClientConnectorError, asyncio.TimeoutError):
+            self.logger.warning("Cannot connect to Snapcast server - server may not be running")
+            return False
+
+        self.logger.info("Connected to Snapcast control socket")
+        connected_task = asyncio.create_task(self._on_connected()) if self._on_connected else None
+
+        try:
+            async for msg in self._websocket:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    self._handle_message(msg.data)
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    self.logger.error(f"Snapcast control socket error: {self._websocket.exception()}")
+                    break
+        finally:
+            self._websocket = None
+            self._fail_pending(ConnectionError("Snapcast control connection lost"))
+            if connected_task and not connected_task.done():
+                connected_task.cancel()
+            if self._on_disconnected:
+                self._on_disconnected()
+            self.logger.info("Snapcast control socket closed")
+
+        return True
+
+    # === RÉCEPTION ===
+
+    def _handle_message(self, raw: str) -> None:
+        """Réponse → future en attente, notification → file ordonnée"""
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Invalid JSON received: {e}")
+            return
+
+        if isinstance(data, list):
+            # Réponse à une requête batch : chaque élément résout son propre future
+            for response in data:
+                if isinstance(response, dict) and response.get("id") is not None:
+                    self._resolve(response)
+        elif "id" in data and data["id"] is not None:
+            self._resolve(data)
+        elif "method" in data:
+            self._notifications.put_nowait(data)
+
+    def _resolve(self, response: Dict[str, Any]) -> None:
+        future = self._pending.pop(response["id"], None)
+        if future is None or future.done():
+            return
+        if "error" in response:
+            future.set_exception(SnapcastRpcError(response["error"]))
+        else:
+            future.set_result(response.get("result", {}))
+
+    async def _dispatch_notifications(self) -> None:
+        """Traite les notifications une par une, dans l'ordre de réception"""
+        while True:
+            notification = await self._notifications.get()
+            if not self._notification_handler:
+                continue
+            try:
+                await self._notification_handler(notification)
+            except Exception as e:
+                self.logger.error(f"Error handling Snapcast notification: {e}")
+
+    def _fail_pending(self, error: Exception) -> None:
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    # === ENVOI ===
+
+    async def call(self, method: str, params: Optional[Dict[str, Any]] = None,
+                   timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Envoie une commande et retourne son résultat ({} en cas d'échec)"""
+        timeout = timeout if timeout is not None else self.REQUEST_TIMEOUT
+        request: Dict[str, Any] = {"id": self._next_id(), "jsonrpc": "2.0", "method": method}
+        if params:
+            request["params"] = params
+
+        if self.connected:
+            try:
+                return await self._call_ws(request, timeout)
+            except SnapcastRpcError as e:
+                self.logger.error(f"Snapcast RPC error on {method}: {e}")
+                return {}
+            except (ConnectionError, asyncio.TimeoutError, aiohttp.ClientError) as e:
+                self.logger.warning(f"Snapcast socket call {method} failed ({e!r}), falling back to HTTP")
+                request["id"] = self._next_id()
+
+        return await self._call_http(request, timeout)
+
+    async def call_batch(self, calls: List[RpcCall], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Envoie plusieurs commandes en un seul tableau JSON-RPC 2.0, résultats dans l'ordre des appels"""
+        if not calls:
+            return []
+        timeout = timeout if timeout is not None else self.REQUEST_TIMEOUT
+
+        if self.connected:
+            try:
+                return await self._call_batch_ws(self._build_batch(calls), timeout)
+            except (ConnectionError, asyncio.TimeoutError, aiohttp.ClientError) as e:
+                self.logger.warning(f"Snapcast socket batch failed ({e!r}), falling back to HTTP")
+
+        return await self._call_batch_http(self._build_batch(calls), timeout)
+
+    def _build_batch(self, calls: List[RpcCall]) -> List[Dict[str, Any]]:
+        batch = []
+        for method, params in calls:
+            request: Dict[str, Any] = {"id": self._next_id(), "jsonrpc": "2.0", "method": method}
+            if params:
+                request["params"] = params
+            batch.append(request)
+        return batch
+
+    def _batch_results(self, batch: List[Dict[str, Any]], outcomes: List[Any]) -> List[Dict[str, Any]]:
+        """Erreurs individuelles → {} (même convention que call)"""
+        results = []
+        for request, outcome in zip(batch, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.error(f"Snapcast RPC error on {request['method']}: {outcome}")
+                results.append({})
+            else:
+                results.append(outcome)
+        return results
+
+    async def _call_batch_ws(self, batch: List[Dict[str, Any]], timeout: float) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in batch]
+        for request, future in zip(batch, futures):
+            self._pending[request["id"]] = future
+        try:
+            await self._websocket.send_str(json.dumps(batch))
+            self._ws_calls += 1
+            async with asyncio.timeout(timeout):
+                outcomes = await asyncio.gather(*futures, return_exceptions=True)
+        finally:
+            for request in batch:
+                self._pending.pop(request["id"], None)
+
+        # Connexion perdue en cours de route : tout le batch repasse en HTTP
+        if any(isinstance(o, ConnectionError) for o in outcomes):
+            raise ConnectionError("Snapcast control connection lost during batch")
+        return self._batch_results(batch, outcomes)
+
+    async def _call_batch_http(self, batch: List[Dict[str, Any]], timeout: float) -> List[Dict[str, Any]]:
+        try:
+            async with self._get_session().post(
+                self.http_url, json=batch, timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                self._http_calls += 1
+                if response.status != 200:
+                    return [{} for _ in batch]
+                data = await response.json()
+        except Exception as e:
+            self.logger.error(f"Snapcast batch request failed: {e}")
+            return [{} for _ in batch]
+
+        by_id = {r.get("id"): r for r in data if isinstance(r, dict)} if isinstance(data, list) else {}
+        outcomes = []
+        for request in batch:
+            response = by_id.get(request["id"], {})
+            if "error" in response:
+                outcomes.append(SnapcastRpcError(response["error"]))
+            else:
+                outcomes.append(response.get("result", {}))
+        return self._batch_results(batch, outcomes)
+
+    async def _call_ws(self, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request["id"]] = future
+        try:
+            await self._websocket.send_str(json.dumps(request))
+            self._ws_calls += 1
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request["id"], None)
+
+    async def _call_http(self, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        try:
+            async with self._get_session().post(
+                self.http_url, json=request, timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                self._http_calls += 1
+                if response.status != 200:
+                    return {}
+                data = await response.json()
+                if "error" in data:
+                    self.logger.error(f"Snapcast RPC error on {request['method']}: {data['error']}")
+                return data.get("result", {})
+        except Exception as e:
+            self.logger.error(f"Snapcast request failed: {e}")
+            return {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Transport utilisé par les commandes"""
+        return {
+            "connected": self.connected,
+            "ws_calls": self._ws_calls,
+            "http_calls": self._http_calls,
+            "pending": len(self._pending)
+        }
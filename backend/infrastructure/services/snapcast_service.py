@@ -1,63 +1,116 @@
 # backend/infrastructure/services/snapcast_service.py
 """
-Service Snapcast SIMPLIFIÉ - Uniquement commandes REST (WebSocket service gère les notifications)
+Service Snapcast SIMPLIFIÉ - Commandes JSON-RPC sur le WebSocket persistant (repli HTTP) + modèle d'état alimenté par les notifications
 """
-import aiohttp
 import asyncio
 import aiofiles
 import logging
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Iterator, Optional
 from pathlib import Path
+from backend.infrastructure.services.snapcast_rpc_client import SnapcastRpcClient
+from backend.infrastructure.services.snapcast_state_model import SnapcastStateModel, SnapcastChange
 
 class SnapcastService:
-    """Service Snapcast simplifié - Commandes REST uniquement"""
+    """Service Snapcast simplifié - Commandes REST, état lu dans le modèle Snapcast en mémoire"""
     
-    def __init__(self, host: str = "localhost", port: int = 1780):
-        self.base_url = f"http://{host}:{port}/jsonrpc"
+    EXCLUDED_NAMES = ('snapweb client', 'snapweb')
+    CLIENT_FIELDS = ("id", "name", "volume", "muted", "host", "ip")
+    
+    def __init__(self, host: str = "localhost", port: int = 1780,
+                 rpc_client: Optional[SnapcastRpcClient] = None):
         self.logger = logging.getLogger(__name__)
-        self._request_id = 0
         self.snapserver_conf = Path("/etc/snapserver.conf")
+        
+        # Client RPC partagé avec SnapcastWebSocketService (WebSocket persistante, HTTP en secours)
+        self.rpc = rpc_client if rpc_client is not None else SnapcastRpcClient(host, port)
+        
+        # Modèle normalisé (serveur, groupes, clients, streams) : Server.GetStatus + notifications
+        self.model = SnapcastStateModel()
+        self._change_listeners: List[Callable[[List[SnapcastChange]], None]] = []
+    
+    async def close(self) -> None:
+        """Ferme la connexion et la session du client RPC"""
+        await self.rpc.close()
     
     async def _request(self, method: str, params: dict = None) -> dict:
         """Requête JSON-RPC simplifiée vers Snapcast"""
-        self._request_id += 1
-        request = {"id": self._request_id, "jsonrpc": "2.0", "method": method}
-        if params:
-            request["params"] = params
-        
         try:
-            timeout = aiohttp.ClientTimeout(total=3)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(self.base_url, json=request) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get("result", {})
-            return {}
+            result = await self.rpc.call(method, params)
+            if method == "Server.GetStatus" and result:
+                self.model.load_status(result)
+            return result
         except Exception as e:
             self.logger.error(f"Snapcast request failed: {e}")
             return {}
     
+    # === MODÈLE D'ÉTAT ===
+    
+    def set_mirror_live(self, live: bool) -> None:
+        """Indique si les notifications Snapcast alimentent le modèle (appelé par le service WebSocket)"""
+        self.model.live = live
+    
+    def add_change_listener(self, listener: Callable[[List[SnapcastChange]], None]) -> None:
+        """Abonne un observateur aux changements issus des notifications (télémétrie)"""
+        self._change_listeners.append(listener)
+    
+    def apply_notification(self, method: str, params: Dict[str, Any]) -> List[SnapcastChange]:
+        """Met à jour le modèle depuis une notification Snapcast et retourne les changements"""
+        try:
+            changes = self.model.apply_notification(method, params)
+        except Exception as e:
+            self.logger.error(f"Error applying {method} to state model: {e}")
+            return []
+        
+        for listener in self._change_listeners if changes else ():
+            try:
+                listener(changes)
+            except Exception as e:
+                self.logger.error(f"Snapcast change listener failed: {e}")
+        return changes
+    
+    def _mirror_volume(self, client_id: Optional[str], volume: Dict[str, Any]) -> None:
+        """Écrit dans le modèle le volume/mute confirmé par une commande"""
+        if volume:
+            self.model.apply_notification("Client.OnVolumeChanged", {"id": client_id, "volume": volume})
+    
+    def _mirror(self, method: str, params: Dict[str, Any]) -> None:
+        """Écrit dans le modèle le résultat d'une commande (snapserver ne notifie pas la session émettrice)"""
+        self.apply_notification(method, params)
+    
+    async def _ensure_model(self) -> bool:
+        """Modèle utilisable : à jour via les notifications, sinon rechargé par un Server.GetStatus"""
+        if self.model.live and self.model.loaded:
+            return True
+        return bool(await self._request("Server.GetStatus"))
+    
+    async def _get_client_volume(self, client_id: str) -> Optional[Dict[str, Any]]:
+        """État volume/mute d'un client : modèle si à jour, sinon un Server.GetStatus (qui le rafraîchit)"""
+        client = self.model.clients.get(client_id) if self.model.live else None
+        if client is None:
+            await self._request("Server.GetStatus")
+            client = self.model.clients.get(client_id)
+        if client is None:
+            return None
+        return client.get("config", {}).get("volume")
+    
     async def set_all_groups_to_multiroom(self) -> bool:
         """Bascule tous les groupes sur le stream Multiroom"""
         try:
-            # Récupérer le statut du serveur
-            status = await self._request("Server.GetStatus")
-            if not status:
+            # Groupes lus dans le modèle (Server.GetStatus seulement s'il n'est pas à jour)
+            if not await self._ensure_model():
                 return False
-                
-            # Extraire les groupes
-            groups = status.get("server", {}).get("groups", [])
-            
-            # Basculer chaque groupe sur "Multiroom"
-            for group in groups:
-                group_id = group.get("id")
-                if group_id:
-                    await self._request("Group.SetStream", {
-                        "id": group_id,
-                        "stream_id": "Multiroom"
-                    })
             
+            # Basculer tous les groupes sur "Multiroom" en une seule requête batch
+            group_ids = list(self.model.groups)
+            results = await self.rpc.call_batch([
+                ("Group.SetStream", {"id": group_id, "stream_id": "Multiroom"})
+                for group_id in group_ids
+            ])
+            
+            for group_id, result in zip(group_ids, results):
+                if result:
+                    self._mirror("Group.OnStreamChanged", {"id": group_id, "stream_id": result.get("stream_id", "Multiroom")})
             return True
             
         except Exception as e:
@@ -67,22 +120,11 @@ class SnapcastService:
     async def set_client_group_to_multiroom(self, client_id: str) -> bool:
         """Bascule le groupe d'un client sur le stream Multiroom"""
         try:
-            # Récupérer le statut pour trouver le groupe du client
-            status = await self._request("Server.GetStatus")
-            if not status:
+            # Groupe du client lu dans le modèle
+            if not await self._ensure_model():
                 return False
             
-            groups = status.get("server", {}).get("groups", [])
-            
-            # Trouver le groupe du client
-            client_group_id = None
-            for group in groups:
-                for client in group.get("clients", []):
-                    if client.get("id") == client_id:
-                        client_group_id = group.get("id")
-                        break
-                if client_group_id:
-                    break
+            client_group_id = self.model.group_of(client_id)
             
             if not client_group_id:
                 self.logger.warning(f"Client {client_id} not found in any group")
@@ -93,6 +135,8 @@ class SnapcastService:
                 "id": client_group_id,
                 "stream_id": "Multiroom"
             })
+            if result:
+                self._mirror("Group.OnStreamChanged", {"id": client_group_id, "stream_id": result.get("stream_id", "Multiroom")})
             
             self.logger.info(f"Client {client_id} group switched to Multiroom: {bool(result)}")
             return bool(result)
@@ -101,45 +145,63 @@ class SnapcastService:
             self.logger.error(f"Error setting client group to multiroom: {e}")
             return False
     
-    # === COMMANDES CLIENT (REST uniquement) ===
+    # === COMMANDES CLIENT (WebSocket, repli HTTP) ===
     
     async def set_volume(self, client_id: str, volume: int) -> bool:
-        """Change le volume d'un client"""
+        """Change le volume d'un client (mute conservé, lu dans le miroir)"""
         try:
-            # Récupérer l'état mute actuel
-            clients = await self.get_clients()
-            current_muted = False
-            for client in clients:
-                if client["id"] == client_id:
-                    current_muted = client["muted"]
-                    break
-            
-            result = await self._request("Client.SetVolume", {
-                "id": client_id,
-                "volume": {"percent": max(0, min(100, volume)), "muted": current_muted}
-            })
+            current = await self._get_client_volume(client_id) or {}
+            requested = {"percent": max(0, min(100, volume)), "muted": current.get("muted", False)}
+            
+            result = await self._request("Client.SetVolume", {"id": client_id, "volume": requested})
+            if result:
+                self._mirror_volume(client_id, result.get("volume", requested))
             return bool(result)
             
         except Exception as e:
             self.logger.error(f"Error setting volume: {e}")
             return False
     
+    async def set_volumes(self, volumes: Dict[str, int], muted: Optional[bool] = None) -> bool:
+        """Change le volume de plusieurs clients en une requête batch (mute conservé si muted=None)"""
+        if not volumes:
+            return True
+        try:
+            # Un seul Server.GetStatus si le miroir n'est pas fiable ou incomplet
+            if not self.model.live or any(cid not in self.model.clients for cid in volumes):
+                await self._request("Server.GetStatus")
+            
+            calls = []
+            for client_id, volume in volumes.items():
+                current = self.model.clients.get(client_id, {}).get("config", {}).get("volume", {})
+                calls.append(("Client.SetVolume", {
+                    "id": client_id,
+                    "volume": {
+                        "percent": max(0, min(100, volume)),
+                        "muted": current.get("muted", False) if muted is None else muted
+                    }
+                }))
+            
+            results = await self.rpc.call_batch(calls)
+            
+            for (_, params), result in zip(calls, results):
+                if result:
+                    self._mirror_volume(params["id"], result.get("volume", params["volume"]))
+            return all(results)
+            
+        except Exception as e:
+            self.logger.error(f"Error setting volumes: {e}")
+            return False
+    
     async def set_mute(self, client_id: str, muted: bool) -> bool:
         """Mute/unmute un client"""
         try:
-            # Récupérer le volume actuel
-            clients = await self.get_clients()
-            current_volume = 50  # Valeur par défaut
-            
-            for client in clients:
-                if client["id"] == client_id:
-                    current_volume = client["volume"]
-                    break
-            
-            result = await self._request("Client.SetVolume", {
-                "id": client_id,
-                "volume": {"percent": current_volume, "muted": muted}
-            })
+            current = await self._get_client_volume(client_id) or {}
+            requested = {"percent": current.get("percent", 50), "muted": muted}
+            
+            result = await self._request("Client.SetVolume", {"id": client_id, "volume": requested})
+            if result:
+                self._mirror_volume(client_id, result.get("volume", requested))
             return bool(result)
             
         except Exception as e:
@@ -149,10 +211,10 @@ class SnapcastService:
     async def set_client_latency(self, client_id: str, latency: int) -> bool:
         """Configure la latence d'un client"""
         try:
-            result = await self._request("Client.SetLatency", {
-                "id": client_id,
-                "latency": max(0, min(1000, latency))
-            })
+            latency = max(0, min(1000, latency))
+            result = await self._request("Client.SetLatency", {"id": client_id, "latency": latency})
+            if result:
+                self._mirror("Client.OnLatencyChanged", {"id": client_id, "latency": result.get("latency", latency)})
             return bool(result)
             
         except Exception as e:
@@ -162,10 +224,10 @@ class SnapcastService:
     async def set_client_name(self, client_id: str, name: str) -> bool:
         """Configure le nom d'un client"""
         try:
-            result = await self._request("Client.SetName", {
-                "id": client_id,
-                "name": name.strip()
-            })
+            name = name.strip()
+            result = await self._request("Client.SetName", {"id": client_id, "name": name})
+            if result:
+                self._mirror("Client.OnNameChanged", {"id": client_id, "name": result.get("name", name)})
             return bool(result)
             
         except Exception as e:
@@ -175,82 +237,59 @@ class SnapcastService:
     # === REQUÊTES D'ÉTAT (pour les API REST) ===
     
     async def get_clients(self) -> List[Dict[str, Any]]:
-        """Récupère les clients (utilisé par les API REST)"""
+        """Récupère les clients (utilisé par les API REST, servi par le modèle s'il est à jour)"""
         try:
-            status = await self._request("Server.GetStatus")
-            return self._extract_clients(status)
+            if not await self._ensure_model():
+                return []
+            return [
+                {k: v for k, v in view.items() if k in self.CLIENT_FIELDS}
+                for view in self._client_views()
+            ]
         except Exception as e:
             self.logger.error(f"Error getting clients: {e}")
             return []
     
-    def _extract_clients(self, status: dict) -> List[Dict[str, Any]]:
-        """Extrait et filtre les clients du statut serveur"""
-        clients = []
-        exclude_names = {'snapweb client', 'snapweb'}
-        
-        for group in status.get("server", {}).get("groups", []):
-            for client_data in group.get("clients", []):
-                if not client_data.get("connected"):
-                    continue
-                
-                name = client_data["config"]["name"] or client_data["host"]["name"]
-                if any(exclude in name.lower() for exclude in exclude_names):
-                    continue
-                
-                clients.append({
-                    "id": client_data["id"],
-                    "name": name,
-                    "volume": client_data["config"]["volume"]["percent"],
-                    "muted": client_data["config"]["volume"]["muted"],
-                    "host": client_data["host"]["name"],
-                    "ip": client_data["host"]["ip"].replace("::ffff:", "")
-                })
-        
-        return clients
-    
     async def get_detailed_clients(self) -> List[Dict[str, Any]]:
         """Récupère les clients avec informations détaillées"""
         try:
-            status = await self._request("Server.GetStatus")
-            clients = []
-            exclude_names = {'snapweb client', 'snapweb'}
-            
-            for group in status.get("server", {}).get("groups", []):
-                for client_data in group.get("clients", []):
-                    if not client_data.get("connected"):
-                        continue
-                    
-                    name = client_data["config"]["name"] or client_data["host"]["name"]
-                    if any(exclude in name.lower() for exclude in exclude_names):
-                        continue
-                    
-                    last_seen = client_data.get("lastSeen", {})
-                    
-                    clients.append({
-                        "id": client_data["id"],
-                        "name": name,
-                        "volume": client_data["config"]["volume"]["percent"],
-                        "muted": client_data["config"]["volume"]["muted"],
-                        "host": client_data["host"]["name"],
-                        "ip": client_data["host"]["ip"].replace("::ffff:", ""),
-                        "mac": client_data["host"]["mac"],
-                        "latency": client_data["config"]["latency"],
-                        "last_seen": last_seen,
-                        "connection_quality": self._calculate_connection_quality(last_seen),
-                        "host_info": {
-                            "arch": client_data["host"].get("arch", ""),
-                            "os": client_data["host"].get("os", "")
-                        },
-                        "snapclient_info": client_data.get("snapclient", {}),
-                        "group_id": group["id"]
-                    })
-            
-            return clients
-            
+            if not await self._ensure_model():
+                return []
+            return list(self._client_views())
         except Exception as e:
             self.logger.error(f"Error getting detailed clients: {e}")
             return []
     
+    def _client_views(self) -> Iterator[Dict[str, Any]]:
+        """Clients connectés du modèle au format API (snapweb exclus)"""
+        for group_id, client_data in self.model.iter_clients():
+            if not client_data.get("connected"):
+                continue
+            view = self.client_view(client_data, group_id)
+            if not any(exclude in view["name"].lower() for exclude in self.EXCLUDED_NAMES):
+                yield view
+    
+    def client_view(self, client_data: Dict[str, Any], group_id: Optional[str]) -> Dict[str, Any]:
+        """Client Snapcast brut → format détaillé des API REST"""
+        last_seen = client_data.get("lastSeen", {})
+        return {
+            "id": client_data["id"],
+            "name": client_data["config"]["name"] or client_data["host"]["name"],
+            "volume": client_data["config"]["volume"]["percent"],
+            "muted": client_data["config"]["volume"]["muted"],
+            "host": client_data["host"]["name"],
+            "ip": client_data["host"]["ip"].replace("::ffff:", ""),
+            "mac": client_data["host"].get("mac", ""),
+            "latency": client_data["config"].get("latency", 0),
+            "last_seen": last_seen,
+            "connection_quality": self._calculate_connection_quality(last_seen),
+            "host_info": {
+                "arch": client_data["host"].get("arch", ""),
+                "os": client_data["host"].get("os", "")
+            },
+            "snapclient_info": client_data.get("snapclient", {}),
+            "group_id": group_id
+        }
+    
     def _calculate_connection_quality(self, last_seen: Dict[str, Any]) -> str:
         """Calcule la qualité de connexion basée sur lastSeen"""
         if not last_seen:
@@ -270,7 +309,9 @@ class SnapcastService:
             return False
 
     async def get_server_status(self) -> dict:
-        """Récupère le statut complet du serveur Snapcast"""
+        """Récupère le statut complet du serveur Snapcast (reconstruit depuis le modèle s'il est à jour)"""
+        if self.model.live and self.model.loaded:
+            return self.model.to_status()
         return await self._request("Server.GetStatus")
 
     # === CONFIGURATION SERVEUR ===
@@ -279,7 +320,7 @@ class SnapcastService:
         """Récupère la configuration serveur"""
         try:
             # Récupérer les infos API et lecture fichier en parallèle
-            api_task = self._request("Server.GetStatus")
+            api_task = self.get_server_status()
             file_task = self._read_snapserver_conf()
             
             status, file_config = await asyncio.gather(api_task, file_task)
@@ -312,6 +353,19 @@ class SnapcastService:
             self.logger.error(f"Error getting server config: {e}")
             return {}
     
+    async def get_stream_settings(self) -> Dict[str, Any]:
+        """Réglages buffer/chunk_ms/codec de la section [stream] de snapserver.conf"""
+        stream = (await self._read_snapserver_conf()).get("parsed_config", {}).get("stream", {})
+        settings = {}
+        for key, name in (("buffer", "buffer_ms"), ("chunk_ms", "chunk_ms")):
+            try:
+                settings[name] = int(stream[key])
+            except (KeyError, ValueError):
+                pass
+        if "codec" in stream:
+            settings["codec"] = stream["codec"]
+        return settings
+    
     async def _read_snapserver_conf(self) -> Dict[str, Any]:
         """Parser pour snapserver.conf"""
         try:
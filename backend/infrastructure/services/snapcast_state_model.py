@@ -0,0 +1,204 @@
+# backend/infrastructure/services/snapcast_state_model.py
+"""
+Modèle d'état Snapcast normalisé (serveur, groupes, clients, streams) mis à jour par les notifications
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class SnapcastChange:
+    """Changement structurel d'une entité du modèle"""
+    kind: str  # "server" | "group" | "client" | "stream"
+    entity_id: str
+    action: str  # "added" | "removed" | "updated"
+    fields: Dict[str, Any] = field(default_factory=dict)  # Chemin pointé → nouvelle valeur (None si supprimé)
+
+
+_MISSING = object()
+
+
+def flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Aplatit un dict imbriqué en chemins pointés ('config.volume.percent')"""
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flat.update(flatten(value, f"{path}."))
+        else:
+            flat[path] = value
+    return flat
+
+
+def diff_fields(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Champs modifiés entre deux versions d'une entité"""
+    old_flat, new_flat = flatten(old), flatten(new)
+    changed = {path: value for path, value in new_flat.items() if old_flat.get(path, _MISSING) != value}
+    changed.update({path: None for path in old_flat.keys() - new_flat.keys()})
+    return changed
+
+
+class SnapcastStateModel:
+    """État Snapcast en mémoire : Server.GetStatus complet puis mises à jour incrémentales"""
+
+    def __init__(self):
+        self.server: Dict[str, Any] = {}  # Infos serveur (host, snapserver)
+        self.groups: Dict[str, Dict[str, Any]] = {}  # Groupe sans clients + "clients": [ids]
+        self.clients: Dict[str, Dict[str, Any]] = {}  # Données brutes Snapcast par id
+        self.streams: Dict[str, Dict[str, Any]] = {}
+        self._client_group: Dict[str, str] = {}
+        self.loaded = False  # Au moins un état complet reçu
+        self.live = False  # True tant que le flux de notifications est connecté
+
+    # === CHARGEMENT COMPLET ===
+
+    def load_status(self, status: Dict[str, Any]) -> List[SnapcastChange]:
+        """Remplace l'état par un Server.GetStatus / Server.OnUpdate et retourne les différences"""
+        server = status.get("server", {})
+        groups, clients, client_group = {}, {}, {}
+
+        for group in server.get("groups", []):
+            group_id = group.get("id")
+            if not group_id:
+                continue
+            members = [c for c in group.get("clients", []) if c.get("id")]
+            groups[group_id] = {**{k: v for k, v in group.items() if k != "clients"},
+                                "clients": [c["id"] for c in members]}
+            for client in members:
+                clients[client["id"]] = client
+                client_group[client["id"]] = group_id
+
+        streams = {s["id"]: s for s in server.get("streams", []) if s.get("id")}
+        server_info = server.get("server", {})
+
+        changes = []
+        if self.server != server_info:
+            changes.append(SnapcastChange("server", "", "updated", diff_fields(self.server, server_info)))
+        changes += self._diff_collection("group", self.groups, groups)
+        changes += self._diff_collection("stream", self.streams, streams)
+        changes += self._diff_collection(
+            "client",
+            {cid: self._client_entity(cid) for cid in self.clients},
+            {cid: {**client, "group_id": client_group[cid]} for cid, client in clients.items()}
+        )
+
+        self.server, self.groups, self.clients, self.streams = server_info, groups, clients, streams
+        self._client_group = client_group
+        self.loaded = True
+        return changes
+
+    @staticmethod
+    def _diff_collection(kind: str, old: Dict[str, Dict[str, Any]],
+                         new: Dict[str, Dict[str, Any]]) -> List[SnapcastChange]:
+        """Entités ajoutées, supprimées et champs modifiés d'une collection"""
+        changes = []
+        for entity_id, entity in new.items():
+            previous = old.get(entity_id)
+            if previous is None:
+                changes.append(SnapcastChange(kind, entity_id, "added", flatten(entity)))
+            elif previous != entity:
+                changes.append(SnapcastChange(kind, entity_id, "updated", diff_fields(previous, entity)))
+        for entity_id in old.keys() - new.keys():
+            changes.append(SnapcastChange(kind, entity_id, "removed"))
+        return changes
+
+    # === NOTIFICATIONS ===
+
+    def apply_notification(self, method: str, params: Dict[str, Any]) -> List[SnapcastChange]:
+        """Applique une notification Snapcast et retourne les changements effectifs"""
+        entity_id = params.get("id")
+
+        if method == "Server.OnUpdate":
+            return self.load_status(params)
+        if method in ("Client.OnConnect", "Client.OnDisconnect"):
+            return self._replace_client(params.get("client") or {})
+        if method in ("Client.OnVolumeChanged", "Client.OnMute"):
+            volume = {k: v for k, v in params.get("volume", {}).items() if k in ("percent", "muted")}
+            return self._update_entity("client", self.clients, entity_id, lambda c: c.setdefault("config", {}).setdefault("volume", {}).update(volume))
+        if method == "Client.OnNameChanged":
+            return self._update_entity("client", self.clients, entity_id, lambda c: c.setdefault("config", {}).update(name=params.get("name", "")))
+        if method == "Client.OnLatencyChanged":
+            return self._update_entity("client", self.clients, entity_id, lambda c: c.setdefault("config", {}).update(latency=params.get("latency", 0)))
+        if method == "Group.OnMute":
+            return self._update_entity("group", self.groups, entity_id, lambda g: g.update(muted=params.get("mute", False)))
+        if method == "Group.OnStreamChanged":
+            return self._update_entity("group", self.groups, entity_id, lambda g: g.update(stream_id=params.get("stream_id", "")))
+        if method == "Group.OnNameChanged":
+            return self._update_entity("group", self.groups, entity_id, lambda g: g.update(name=params.get("name", "")))
+        if method == "Stream.OnUpdate":
+            return self._replace_entity("stream", self.streams, entity_id, params.get("stream") or {})
+        if method == "Stream.OnProperties":
+            return self._update_entity("stream", self.streams, entity_id, lambda s: s.update(properties=params.get("properties", {})))
+        return []
+
+    def _client_entity(self, client_id: str) -> Dict[str, Any]:
+        """Client avec son groupe (appartenance comparée comme un champ)"""
+        return {**self.clients[client_id], "group_id": self._client_group.get(client_id)}
+
+    def _replace_client(self, client: Dict[str, Any]) -> List[SnapcastChange]:
+        """Remplace un client complet (Client.OnConnect / OnDisconnect)"""
+        client_id = client.get("id")
+        if not client_id:
+            return []
+        previous = self._client_entity(client_id) if client_id in self.clients else None
+        self.clients[client_id] = client
+        current = self._client_entity(client_id)
+        if previous is None:
+            return [SnapcastChange("client", client_id, "added", flatten(current))]
+        fields = diff_fields(previous, current)
+        return [SnapcastChange("client", client_id, "updated", fields)] if fields else []
+
+    @staticmethod
+    def _update_entity(kind: str, collection: Dict[str, Dict[str, Any]], entity_id: Optional[str],
+                       mutate: Callable[[Dict[str, Any]], None]) -> List[SnapcastChange]:
+        """Modifie une entité connue en place"""
+        if entity_id not in collection:
+            return []
+        previous = flatten(collection[entity_id])
+        mutate(collection[entity_id])
+        fields = {k: v for k, v in flatten(collection[entity_id]).items() if previous.get(k, _MISSING) != v}
+        return [SnapcastChange(kind, entity_id, "updated", fields)] if fields else []
+
+    @staticmethod
+    def _replace_entity(kind: str, collection: Dict[str, Dict[str, Any]], entity_id: Optional[str],
+                        entity: Dict[str, Any]) -> List[SnapcastChange]:
+        """Remplace un groupe ou un stream complet"""
+        if not entity_id or not entity:
+            return []
+        previous = collection.get(entity_id)
+        collection[entity_id] = entity
+        if previous is None:
+            return [SnapcastChange(kind, entity_id, "added", flatten(entity))]
+        fields = diff_fields(previous, entity)
+        return [SnapcastChange(kind, entity_id, "updated", fields)] if fields else []
+
+    # === LECTURE ===
+
+    def group_of(self, client_id: str) -> Optional[str]:
+        """Groupe d'un client"""
+        return self._client_group.get(client_id)
+
+    def iter_clients(self) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+        """(group_id, client) dans l'ordre des groupes, puis les clients sans groupe"""
+        for group_id, group in self.groups.items():
+            for client_id in group["clients"]:
+                client = self.clients.get(client_id)
+                if client is not None:
+                    yield group_id, client
+        for client_id, client in self.clients.items():
+            if client_id not in self._client_group:
+                yield None, client
+
+    def to_status(self) -> Dict[str, Any]:
+        """Reconstruit un résultat au format Server.GetStatus"""
+        return {
+            "server": {
+                "groups": [
+                    {**{k: v for k, v in group.items() if k != "clients"},
+                     "clients": [self.clients[cid] for cid in group["clients"] if cid in self.clients]}
+                    for group in self.groups.values()
+                ],
+                "server": self.server,
+                "streams": list(self.streams.values())
+            }
+        }
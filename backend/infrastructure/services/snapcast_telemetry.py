@@ -0,0 +1,210 @@
+# backend/infrastructure/services/snapcast_telemetry.py
+"""
+Télémétrie Snapcast - Séries temporelles circulaires (lastSeen, reconnexions, latence, buffer) et percentiles
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import numpy as np
+from backend.infrastructure.services.snapcast_state_model import SnapcastChange
+
+
+class RingSeries:
+    """Série temporelle de taille fixe (horodatages float64, valeurs float32)"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._values = np.zeros(capacity, dtype=np.float32)
+        self._head = 0  # Prochain emplacement écrit
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Ajoute un point en écrasant le plus ancien si la série est pleine"""
+        self._times[self._head] = timestamp
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def values(self) -> np.ndarray:
+        """Valeurs dans l'ordre chronologique"""
+        if self._count < self.capacity:
+            return self._values[:self._count]
+        return np.roll(self._values, -self._head)
+
+    def last(self) -> Optional[float]:
+        """Dernière valeur"""
+        return float(self._values[self._head - 1]) if self._count else None
+
+    def stats(self, percentiles=(50, 95, 99)) -> Dict[str, Any]:
+        """Percentiles, min, max et dernière valeur (arrondis à 0.1)"""
+        return summarize(self.values(), percentiles, self.last())
+
+
+def summarize(values: np.ndarray, percentiles=(50, 95, 99), last: Optional[float] = None) -> Dict[str, Any]:
+    """Résumé statistique d'un tableau de valeurs"""
+    if not len(values):
+        return {"samples": 0}
+    summary = {f"p{p}": round(float(v), 1) for p, v in zip(percentiles, np.percentile(values, percentiles))}
+    summary.update({
+        "samples": int(len(values)),
+        "min": round(float(values.min()), 1),
+        "max": round(float(values.max()), 1)
+    })
+    if last is not None:
+        summary["last"] = round(last, 1)
+    return summary
+
+
+@dataclass
+class ClientTelemetry:
+    """Séries d'un client Snapcast"""
+    name: str
+    last_seen_age_ms: RingSeries
+    latency_ms: RingSeries
+    reconnects: int = 0
+    last_reconnect: Optional[float] = None
+    connected: bool = True
+
+
+@dataclass
+class ServerTelemetry:
+    """Séries des réglages serveur (snapserver.conf)"""
+    buffer_ms: RingSeries
+    chunk_ms: RingSeries
+    codec: Optional[str] = None
+
+
+class SnapcastTelemetryCollector:
+    """Échantillonne l'état des clients Snapcast tant que le socket de contrôle Snapcast est connecté"""
+
+    SAMPLE_INTERVAL = 10.0  # secondes
+    CAPACITY = 360  # 1 h à 10 s
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, snapcast_service, interval: Optional[float] = None, capacity: Optional[int] = None):
+        self.snapcast_service = snapcast_service
+        self.interval = interval or self.SAMPLE_INTERVAL
+        self.capacity = capacity or self.CAPACITY
+        self.logger = logging.getLogger(__name__)
+
+        self.clients: Dict[str, ClientTelemetry] = {}
+        self.server = ServerTelemetry(RingSeries(self.capacity), RingSeries(self.capacity))
+        self._task: Optional[asyncio.Task] = None
+        self._started_at = time.time()
+
+    async def initialize(self) -> bool:
+        """Abonnement aux changements du modèle Snapcast et démarrage de l'échantillonnage"""
+        self.snapcast_service.add_change_listener(self.on_changes)
+        if self._task is None:
+            self._task = asyncio.create_task(self._sampling_loop())
+        return True
+
+    async def cleanup(self) -> None:
+        """Arrête l'échantillonnage"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sampling_loop(self) -> None:
+        """Un échantillon par intervalle, uniquement quand les notifications Snapcast sont connectées"""
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self.snapcast_service.model.live:
+                continue
+            try:
+                await self.sample()
+            except Exception as e:
+                self.logger.error(f"Snapcast telemetry sample failed: {e}")
+
+    # === ÉCHANTILLONNAGE ===
+
+    async def sample(self, now: Optional[float] = None) -> None:
+        """Relève lastSeen/latence de chaque client et les réglages buffer/chunk_ms"""
+        # lastSeen n'est pas notifié : lecture directe, sans toucher au modèle partagé
+        status, settings = await asyncio.gather(
+            self.snapcast_service.rpc.call("Server.GetStatus"),
+            self.snapcast_service.get_stream_settings()
+        )
+        now = time.time() if now is None else now
+
+        for group in status.get("server", {}).get("groups", []):
+            for client in group.get("clients", []):
+                if client.get("id") and client.get("connected"):
+                    self._sample_client(client, now)
+
+        if "buffer_ms" in settings:
+            self.server.buffer_ms.append(now, settings["buffer_ms"])
+        if "chunk_ms" in settings:
+            self.server.chunk_ms.append(now, settings["chunk_ms"])
+        self.server.codec = settings.get("codec", self.server.codec)
+
+    def _sample_client(self, client: Dict[str, Any], now: float) -> None:
+        """Âge du dernier message reçu du client et latence configurée"""
+        telemetry = self._client(client["id"])
+        config = client.get("config", {})
+        telemetry.name = config.get("name") or client.get("host", {}).get("name", client["id"])
+        telemetry.latency_ms.append(now, config.get("latency", 0))
+
+        last_seen = client.get("lastSeen")
+        if last_seen:
+            seen_at = last_seen.get("sec", 0) + last_seen.get("usec", 0) / 1e6
+            telemetry.last_seen_age_ms.append(now, max(0.0, (now - seen_at) * 1000))
+
+    def _client(self, client_id: str) -> ClientTelemetry:
+        telemetry = self.clients.get(client_id)
+        if telemetry is None:
+            telemetry = ClientTelemetry(client_id, RingSeries(self.capacity), RingSeries(self.capacity))
+            self.clients[client_id] = telemetry
+        return telemetry
+
+    def on_changes(self, changes: List[SnapcastChange]) -> None:
+        """Compte les reconnexions à partir des changements notifiés par Snapcast"""
+        for change in changes:
+            if change.kind != "client" or "connected" not in change.fields:
+                continue
+            telemetry = self._client(change.entity_id)
+            connected = bool(change.fields["connected"])
+            if connected and (change.action == "added" or not telemetry.connected):
+                telemetry.reconnects += 1
+                telemetry.last_reconnect = time.time()
+            telemetry.connected = connected
+
+    # === EXPOSITION ===
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Percentiles par client et réglages serveur sur la fenêtre conservée"""
+        clients = {}
+        for client_id, telemetry in self.clients.items():
+            ages = telemetry.last_seen_age_ms.values()
+            clients[client_id] = {
+                "name": telemetry.name,
+                "connected": telemetry.connected,
+                "reconnects": telemetry.reconnects,
+                "last_reconnect": telemetry.last_reconnect,
+                "last_seen_age_ms": telemetry.last_seen_age_ms.stats(self.PERCENTILES),
+                # Jitter : variation de l'âge lastSeen d'un échantillon à l'autre
+                "last_seen_jitter_ms": summarize(np.abs(np.diff(ages)), self.PERCENTILES),
+                "latency_ms": telemetry.latency_ms.stats(self.PERCENTILES)
+            }
+
+        return {
+            "interval_s": self.interval,
+            "window_s": self.interval * self.capacity,
+            "since": self._started_at,
+            "server": {
+                "buffer_ms": self.server.buffer_ms.stats(self.PERCENTILES),
+                "chunk_ms": self.server.chunk_ms.stats(self.PERCENTILES),
+                "codec": self.server.codec
+            },
+            "clients": clients
+        }
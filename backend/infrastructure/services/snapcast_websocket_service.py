@@ -2,40 +2,42 @@
 """
 Service WebSocket Snapcast ALLÉGÉ - SANS gestion du volume (délégué au VolumeService)
 """
-import asyncio
-import json
 import logging
-import aiohttp
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from backend.infrastructure.services.snapcast_rpc_client import SnapcastRpcClient
+from backend.infrastructure.services.snapcast_state_model import SnapcastChange
 
 class SnapcastWebSocketService:
     """Service WebSocket pour notifications Snapcast NON-VOLUME - VolumeService gère tout le volume"""
     
-    def __init__(self, state_machine, routing_service, host: str = "localhost", port: int = 1780):
+    # Chemins du modèle Snapcast → champs client de l'UI
+    UI_FIELDS = {
+        "config.name": "name",
+        "host.name": "host",
+        "host.ip": "ip",
+        "config.latency": "latency",
+        "group_id": "group_id"
+    }
+    
+    def __init__(self, state_machine, routing_service, host: str = "localhost", port: int = 1780,
+                 rpc_client: Optional[SnapcastRpcClient] = None):
         self.state_machine = state_machine
         self.routing_service = routing_service
-        self.host = host
-        self.port = port
-        self.ws_url = f"ws://{host}:{port}/jsonrpc"
         self.logger = logging.getLogger(__name__)
         
-        # État de connexion
-        self.session: Optional[aiohttp.ClientSession] = None
-        self.websocket: Optional[aiohttp.ClientWebSocketResponse] = None
+        # Connexion persistante partagée avec SnapcastService (commandes + notifications)
+        self.rpc = rpc_client if rpc_client is not None else SnapcastRpcClient(host, port)
+        self.rpc.set_notification_handler(self._handle_message)
+        self.rpc.set_connection_handlers(self._on_connected, self._on_disconnected)
+        
         self.running = False
         self.should_connect = False
-        self.reconnect_task = None
         self._known_client_ids = set()
-
-        
-        # ID pour les requêtes JSON-RPC
-        self.request_id = 0
     
     async def initialize(self) -> bool:
         """Initialise le service WebSocket"""
         try:
-            self.logger.info(f"Initializing Snapcast WebSocket service: {self.ws_url}")
-            self.session = aiohttp.ClientSession()
+            self.logger.info(f"Initializing Snapcast WebSocket service: {self.rpc.ws_url}")
             self.running = True
             
             # Vérifier l'état initial du multiroom
@@ -54,7 +56,7 @@ class SnapcastWebSocketService:
 
                 if self.should_connect:
                     self.logger.info("Multiroom already enabled, starting WebSocket connection")
-                    self.reconnect_task = asyncio.create_task(self._connection_loop())
+                    await self.rpc.start()
                 else:
                     self.logger.info("Multiroom disabled, WebSocket will connect when multiroom is enabled")
             
@@ -72,8 +74,8 @@ class SnapcastWebSocketService:
         self.logger.info("Starting Snapcast WebSocket connection (multiroom enabled)")
         self.should_connect = True
         
-        if not self.reconnect_task and self.running:
-            self.reconnect_task = asyncio.create_task(self._connection_loop())
+        if self.running:
+            await self.rpc.start()
     
     async def stop_connection(self) -> None:
         """Arrête la connexion WebSocket quand le multiroom est désactivé"""
@@ -83,19 +85,8 @@ class SnapcastWebSocketService:
         self.logger.info("Stopping Snapcast WebSocket connection (multiroom disabled)")
         self.should_connect = False
 
-        # Annuler la tâche de reconnexion
-        if self.reconnect_task:
-            self.reconnect_task.cancel()
-            try:
-                await self.reconnect_task
-            except asyncio.CancelledError:
-                pass
-            self.reconnect_task = None
-
-        # Fermer la connexion WebSocket actuelle
-        if self.websocket:
-            await self.websocket.close()
-            self.websocket = None
+        # Les commandes Snapcast repassent en HTTP
+        await self.rpc.stop()
 
         # Ne PLUS vider les caches - on garde la mémoire des clients existants
         # pour éviter de réinitialiser leurs volumes lors de la réactivation du multiroom
@@ -107,78 +98,23 @@ class SnapcastWebSocketService:
         self.running = False
         self.should_connect = False
         
-        # Annuler la tâche de reconnexion
-        if self.reconnect_task:
-            self.reconnect_task.cancel()
-            try:
-                await self.reconnect_task
-            except asyncio.CancelledError:
-                pass
-        
-        # Fermer la connexion WebSocket
-        if self.websocket:
-            await self.websocket.close()
-        
-        # Fermer la session
-        if self.session:
-            await self.session.close()
+        # La session est fermée par SnapcastService.close()
+        await self.rpc.stop()
     
-    async def _connection_loop(self) -> None:
-        """Boucle de connexion avec reconnexion intelligente"""
-        reconnect_delay = 5  # Délai initial
-        max_delay = 30       # Délai maximum
-        
-        while self.running and self.should_connect:
-            try:
-                await self._connect_and_listen()
-                # Reset délai si connexion réussie
-                reconnect_delay = 5
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.error(f"WebSocket connection error: {e}")
-            
-            if self.running and self.should_connect:
-                self.logger.info(f"Reconnecting to Snapcast WebSocket in {reconnect_delay} seconds...")
-                await asyncio.sleep(reconnect_delay)
-                reconnect_delay = min(reconnect_delay * 1.5, max_delay)
+    async def _on_connected(self) -> None:
+        """Connexion établie : état initial (Server.GetStatus amorce aussi le miroir)"""
+        await self._initialize_existing_clients()
+        self._set_mirror_live(True)
     
-    async def _connect_and_listen(self) -> None:
-        """Se connecte et écoute les messages WebSocket"""
-        try:
-            self.logger.info(f"Connecting to Snapcast WebSocket: {self.ws_url}")
-            
-            timeout = aiohttp.ClientTimeout(total=5)
-            self.websocket = await self.session.ws_connect(self.ws_url, timeout=timeout)
-            self.logger.info("Connected to Snapcast WebSocket")
-            
-            # Envoyer un ping initial pour vérifier la connexion
-            await self._send_request("Server.GetRPCVersion")
-
-            # Initialiser les clients déjà connectés
-            await self._initialize_existing_clients()
-
-            # Écouter les messages
-            async for msg in self.websocket:
-                if msg.type == aiohttp.WSMsgType.TEXT:
-                    try:
-                        data = json.loads(msg.data)
-                        await self._handle_message(data)
-                    except json.JSONDecodeError as e:
-                        self.logger.error(f"Invalid JSON received: {e}")
-                elif msg.type == aiohttp.WSMsgType.ERROR:
-                    self.logger.error(f"WebSocket error: {self.websocket.exception()}")
-                    break
-                elif msg.type == aiohttp.WSMsgType.CLOSE:
-                    self.logger.info("WebSocket connection closed")
-                    break
-                    
-        except aiohttp.ClientConnectorError:
-            self.logger.warning("Cannot connect to Snapcast server - server may not be running")
-        except Exception as e:
-            self.logger.error(f"WebSocket connection failed: {e}")
-        finally:
-            self.websocket = None
+    def _on_disconnected(self) -> None:
+        """Sans notifications le miroir peut dériver : les commandes relisent l'état serveur"""
+        self._set_mirror_live(False)
+    
+    def _set_mirror_live(self, live: bool) -> None:
+        """Active/désactive l'usage du miroir clients par SnapcastService"""
+        snapcast_service = getattr(self.state_machine, 'snapcast_service', None)
+        if snapcast_service:
+            snapcast_service.set_mirror_live(live)
     
     async def _initialize_existing_clients(self) -> None:
         """Initialise les clients déjà connectés au moment de la connexion WebSocket"""
@@ -198,6 +134,19 @@ class SnapcastWebSocketService:
 
             groups = status.get('server', {}).get('groups', [])
 
+            # Clients partis pendant la coupure (Server.GetStatus ne produit pas de notification)
+            connected_ids = {
+                client.get('id') for group in groups for client in group.get('clients', [])
+                if client.get('connected')
+            }
+            for client_id in self._known_client_ids - connected_ids:
+                self.logger.info(f"🔴 CLIENT DISCONNECTED while offline: {client_id}")
+                self._known_client_ids.discard(client_id)
+                await self._broadcast_snapcast_event("client_disconnected", {
+                    "client_id": client_id,
+                    "client_name": "Unknown"
+                })
+
             for group in groups:
                 for client in group.get('clients', []):
                     if not client.get('connected'):
@@ -224,36 +173,10 @@ class SnapcastWebSocketService:
         except Exception as e:
             self.logger.error(f"Error initializing existing clients: {e}", exc_info=True)
 
-    async def _send_request(self, method: str, params: Optional[Dict] = None) -> None:
-        """Envoie une requête JSON-RPC"""
-        if not self.websocket:
-            return
-        
-        self.request_id += 1
-        request = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "id": self.request_id
-        }
-        
-        if params:
-            request["params"] = params
-        
-        try:
-            await self.websocket.send_str(json.dumps(request))
-        except Exception as e:
-            self.logger.error(f"Failed to send request: {e}")
-    
     async def _handle_message(self, data: Dict[str, Any]) -> None:
-        """Traite un message JSON-RPC reçu"""
+        """Traite une notification JSON-RPC (les réponses sont résolues par le client RPC)"""
         try:
-            # Notification Snapcast (pas de "id" dans les notifications)
-            if "method" in data and "id" not in data:
-                await self._handle_notification(data)
-            # Réponse à une requête (avec "id")
-            elif "result" in data or "error" in data:
-                await self._handle_response(data)
-                
+            await self._handle_notification(data)
         except Exception as e:
             self.logger.error(f"Error handling message: {e}")
     
@@ -264,11 +187,16 @@ class SnapcastWebSocketService:
         
         self.logger.info(f"📨 SNAPCAST NOTIFICATION RECEIVED: {method}")
         
+        # Modèle d'état de SnapcastService mis à jour avant toute délégation
+        snapcast_service = getattr(self.state_machine, 'snapcast_service', None)
+        changes = snapcast_service.apply_notification(method, params) if snapcast_service else []
+        
         non_volume_notifications = {
             "Client.OnConnect": lambda p: self._handle_client_connect(p),
             "Client.OnDisconnect": lambda p: self._handle_client_disconnect(p),
             "Client.OnNameChanged": lambda p: self._handle_client_name_changed(p),
-            "Server.OnUpdate": lambda p: self._handle_server_update(p)
+            "Client.OnLatencyChanged": lambda p: self._publish_client_changes(changes),
+            "Server.OnUpdate": lambda p: self._handle_server_update(changes)
         }
         
         if method in non_volume_notifications:
@@ -278,41 +206,37 @@ class SnapcastWebSocketService:
         else:
             self.logger.debug(f"Unhandled notification: {method}")
     
-    async def _handle_server_update(self, params: Dict[str, Any]) -> None:
-        """Gère Server.OnUpdate et détecte les nouveaux clients ET les déconnexions"""
+    async def _handle_server_update(self, changes: List[SnapcastChange]) -> None:
+        """Gère Server.OnUpdate depuis le diff du modèle : nouveaux clients, déconnexions, champs modifiés"""
         try:
-            server = params.get("server", {})
-            groups = server.get("groups", [])
-            
-            # Extraire tous les clients connectés
-            current_client_ids = set()
+            snapcast_service = getattr(self.state_machine, 'snapcast_service', None)
+            clients = snapcast_service.model.clients if snapcast_service else {}
             new_clients = []
             
-            for group in groups:
-                for client in group.get("clients", []):
-                    if not client.get("connected"):
-                        continue
-                    
-                    client_id = client.get("id")
-                    current_client_ids.add(client_id)
-                    
+            for change in changes:
+                if change.kind != "client" or (change.action == "updated" and "connected" not in change.fields):
+                    continue
+                
+                client_id = change.entity_id
+                client = clients.get(client_id) if change.action != "removed" else None
+                
+                if client and client.get("connected"):
                     # Nouveau client détecté ?
                     if client_id not in self._known_client_ids:
                         self.logger.info(f"🟢 NEW CLIENT DETECTED in Server.OnUpdate: {client_id}")
+                        self._known_client_ids.add(client_id)
                         new_clients.append(client)
+                elif client_id in self._known_client_ids:
+                    # Client disparu ou passé déconnecté
+                    self.logger.info(f"🔴 CLIENT DISCONNECTED detected in Server.OnUpdate: {client_id}")
+                    self._known_client_ids.discard(client_id)
+                    await self._broadcast_snapcast_event("client_disconnected", {
+                        "client_id": client_id,
+                        "client_name": (client or {}).get("config", {}).get("name") or "Unknown"
+                    })
             
-            # NOUVEAU : Détecter les clients disparus (déconnectés)
-            disconnected_client_ids = self._known_client_ids - current_client_ids
-            
-            for disconnected_id in disconnected_client_ids:
-                self.logger.info(f"🔴 CLIENT DISCONNECTED detected in Server.OnUpdate: {disconnected_id}")
-                await self._broadcast_snapcast_event("client_disconnected", {
-                    "client_id": disconnected_id,
-                    "client_name": "Unknown"  # On n'a plus accès au nom
-                })
-            
-            # Mettre à jour le cache
-            self._known_client_ids = current_client_ids
+            # Champs modifiés des clients déjà affichés (nom, IP, latence, groupe...)
+            await self._publish_client_changes(changes)
             
             # Initialiser les nouveaux clients
             for client in new_clients:
@@ -324,13 +248,34 @@ class SnapcastWebSocketService:
             
         except Exception as e:
             self.logger.error(f"Error handling Server.OnUpdate: {e}", exc_info=True)
-        
-    
-    async def _handle_response(self, response: Dict[str, Any]) -> None:
-        """Traite une réponse à une requête"""
-        if "error" in response:
-            self.logger.error(f"Snapcast RPC error: {response['error']}")
     
+    async def _publish_client_changes(self, changes: List[SnapcastChange]) -> None:
+        """Diffuse uniquement les champs UI modifiés des clients connus (volume/mute ont leurs événements)"""
+        snapcast_service = getattr(self.state_machine, 'snapcast_service', None)
+        if not snapcast_service:
+            return
+        
+        updates = []
+        for change in changes:
+            if change.kind != "client" or change.action != "updated" or change.entity_id not in self._known_client_ids:
+                continue
+            
+            ui_fields = {self.UI_FIELDS[path] for path in change.fields if path in self.UI_FIELDS}
+            if "host" in ui_fields:
+                ui_fields.add("name")  # Nom affiché = nom configuré ou nom d'hôte
+            client = snapcast_service.model.clients.get(change.entity_id)
+            if not ui_fields or not client:
+                continue
+            
+            view = snapcast_service.client_view(client, snapcast_service.model.group_of(change.entity_id))
+            updates.append({
+                "client_id": change.entity_id,
+                "fields": {name: view[name] for name in sorted(ui_fields)}
+            })
+        
+        if updates:
+            await self._broadcast_snapcast_event("clients_updated", {"clients": updates})
+        
     # === HANDLERS ALLÉGÉS - SANS GESTION VOLUME ===
     
     async def _handle_client_connect(self, params: Dict[str, Any]) -> None:
@@ -349,6 +294,7 @@ class SnapcastWebSocketService:
             return  # Ne pas envoyer l'événement avec un volume incorrect
         
         display_volume = volume_service.convert_alsa_to_display(alsa_volume)
+        self._known_client_ids.add(client_id)
         
         self.logger.info(f"🔵 NEW CLIENT CONNECTED:")
         self.logger.info(f"  - ID: {client_id}")
@@ -371,6 +317,7 @@ class SnapcastWebSocketService:
     async def _handle_client_disconnect(self, params: Dict[str, Any]) -> None:
         """Client déconnecté - Version allégée"""
         client = params.get("client", {})
+        self._known_client_ids.discard(client.get("id"))
         
         await self._broadcast_snapcast_event("client_disconnected", {
             "client_id": client.get("id"),
@@ -0,0 +1,252 @@
+# backend/infrastructure/services/snapclient_fleet_update_service.py
+"""
+Mise à jour snapclient de toute la flotte de satellites - Paquet téléchargé une fois, servi en LAN, canary d'abord
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from backend.infrastructure.services.artifact_cache import ArtifactCache, SNAPCAST_RELEASES_URL
+
+
+class SnapclientFleetUpdateService:
+    """Orchestre les mises à jour snapclient des satellites (parallélisme borné, canaries, rollback)"""
+
+    GITHUB_DOWNLOAD_URL = SNAPCAST_RELEASES_URL
+    ARTIFACT_PATH = "/api/dependencies/artifacts"
+    API_PORT = 8000  # Port uvicorn du backend (main.py, écoute sur 0.0.0.0)
+    PACKAGE_ARCH = "arm64"
+    DEFAULT_CODENAME = "bookworm"  # Valeur de repli de l'agent milo-sat
+    DEFAULT_PARALLELISM = 2
+    DEFAULT_CANARIES = 1
+
+    FINAL_STATES = ("updated", "failed", "rolled_back", "rollback_failed", "skipped")
+
+    def __init__(self, satellite_service, artifact_cache: Optional[ArtifactCache] = None,
+                 artifact_base_url: Optional[str] = None):
+        self.satellite_service = satellite_service
+        self.artifact_cache = artifact_cache or ArtifactCache()
+        # URL imposée (config / MILO_ARTIFACTS_URL), sinon déduite par satellite de l'adresse qui le joint
+        self.artifact_base_url = artifact_base_url or os.environ.get("MILO_ARTIFACTS_URL")
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = asyncio.Lock()
+        self.state: Optional[Dict[str, Any]] = None  # Exécution en cours ou dernière exécution
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    # === PAQUETS ===
+
+    def package_name(self, version: str, codename: str) -> str:
+        return f"snapclient_{version}-1_{self.PACKAGE_ARCH}_{codename}.deb"
+
+    async def ensure_package(self, version: str, codename: str) -> Dict[str, Any]:
+        """Télécharge le .deb depuis GitHub une seule fois (cache d'artefacts partagé)"""
+        filename = self.package_name(version, codename)
+        entry = await self.artifact_cache.fetch(f"{self.GITHUB_DOWNLOAD_URL}/v{version}/{filename}", filename)
+        return {**entry, "filename": filename, "version": version}
+
+    def artifact_url(self, satellite_ip: str) -> str:
+        """Base des artefacts telle que le satellite joint Milo (pas de nom d'hôte ni de port supposés)"""
+        if self.artifact_base_url:
+            return self.artifact_base_url.rstrip("/")
+        host = self._local_address(satellite_ip)
+        host = f"[{host}]" if ":" in host else host
+        return f"http://{host}:{self.API_PORT}{self.ARTIFACT_PATH}"
+
+    @staticmethod
+    def _local_address(remote_ip: str) -> str:
+        """Adresse locale de l'interface qui route vers le satellite (aucun paquet envoyé)"""
+        family = socket.AF_INET6 if ":" in remote_ip else socket.AF_INET
+        try:
+            with socket.socket(family, socket.SOCK_DGRAM) as sock:
+                sock.connect((remote_ip, 9))
+                return sock.getsockname()[0]
+        except OSError:
+            return f"{socket.gethostname()}.local"
+
+    def _update_target(self, package: Dict[str, Any], satellite_ip: str) -> Dict[str, Any]:
+        """Corps de POST /update : le satellite télécharge le blob depuis Milo et vérifie le sha256"""
+        return {
+            "version": package["version"],
+            "deb_url": f"{self.artifact_url(satellite_ip)}/{package['sha256']}",
+            "sha256": package["sha256"]
+        }
+
+    # === ORCHESTRATION ===
+
+    async def update_fleet(
+        self,
+        hostnames: Optional[List[str]] = None,
+        version: Optional[str] = None,
+        parallelism: Optional[int] = None,
+        canaries: Optional[int] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """Met à jour les satellites : canaries d'abord, puis le reste avec un parallélisme borné"""
+        if self._lock.locked():
+            return {"success": False, "error": "Fleet update already in progress"}
+
+        async with self._lock:
+            self.state = {"running": True, "target_version": version, "started_at": time.time(),
+                          "finished_at": None, "nodes": {}}
+            try:
+                result = await self._run(
+                    hostnames, version,
+                    max(1, parallelism or self.DEFAULT_PARALLELISM),
+                    self.DEFAULT_CANARIES if canaries is None else max(0, canaries),
+                    progress_callback
+                )
+            except Exception as e:
+                self.logger.error(f"Fleet update failed: {e}")
+                result = {"success": False, "error": str(e)}
+            finally:
+                self.state.update(running=False, finished_at=time.time())
+                self.satellite_service.invalidate_cache()
+
+            self.state["result"] = result
+            return {**result, **self.get_status()}
+
+    async def _run(self, hostnames, version, parallelism, canaries, progress_callback) -> Dict[str, Any]:
+        target = version or await self.satellite_service._get_latest_snapclient_version()
+        if not target:
+            return {"success": False, "error": "Could not determine target version"}
+        self.state["target_version"] = target
+
+        satellites = await self.satellite_service.discover_satellites(force=True)
+        if hostnames:
+            # L'ordre fourni est respecté : les premiers servent de canaries
+            by_name = {s["hostname"]: s for s in satellites}
+            satellites = [by_name[h] for h in hostnames if h in by_name]
+        else:
+            satellites = sorted(satellites, key=lambda s: s["hostname"])
+
+        plan = [s for s in satellites if s.get("snapclient_version") != target]
+        if not plan:
+            return {"success": True, "message": "All satellites are up to date"}
+
+        async def progress():
+            if progress_callback:
+                await progress_callback(self.get_status())
+
+        for index, satellite in enumerate(plan):
+            self.state["nodes"][satellite["hostname"]] = {
+                "state": "pending",
+                "progress": 0,
+                "message": "Waiting",
+                "canary": index < canaries,
+                "old_version": satellite.get("snapclient_version"),
+                "new_version": None
+            }
+        await progress()
+
+        # Un seul téléchargement WAN par version Debian présente dans la flotte
+        codenames = {s.get("debian_codename") or self.DEFAULT_CODENAME for s in plan}
+        packages = dict(zip(codenames, await asyncio.gather(*[self.ensure_package(target, c) for c in codenames])))
+
+        semaphore = asyncio.Semaphore(parallelism)
+
+        async def run(satellite) -> bool:
+            async with semaphore:
+                codename = satellite.get("debian_codename") or self.DEFAULT_CODENAME
+                return await self._update_node(satellite, target, packages[codename], progress)
+
+        canary_results = await asyncio.gather(*[run(s) for s in plan[:canaries]])
+        if not all(canary_results):
+            for satellite in plan[canaries:]:
+                self.state["nodes"][satellite["hostname"]].update(state="skipped", message="Canary update failed")
+            await progress()
+            self.logger.warning(f"⚠️ Fleet update to {target} aborted: canary failed")
+            return {"success": False, "error": "Canary update failed, remaining satellites skipped"}
+
+        results = await asyncio.gather(*[run(s) for s in plan[canaries:]])
+        success = all(results)
+        self.logger.info(f"✅ Fleet update to {target} done ({sum(canary_results) + sum(results)}/{len(plan)} updated)")
+        return {"success": success} if success else {"success": False, "error": "Some satellites failed to update"}
+
+    async def _update_node(self, satellite: Dict[str, Any], target: str, package: Dict[str, Any],
+                           progress: Callable[[], Awaitable[None]]) -> bool:
+        """Met à jour un satellite et le ramène à sa version précédente en cas d'échec"""
+        hostname = satellite["hostname"]
+        node = self.state["nodes"][hostname]
+
+        async def node_progress(message: str, percent: int):
+            node.update(progress=percent, message=message)
+            await progress()
+
+        node.update(state="updating", message=f"Updating to {target}")
+        result = await self.satellite_service.update_satellite(
+            hostname, node_progress, self._update_target(package, satellite["ip"]), ip=satellite["ip"]
+        )
+
+        if result.get("success") and result.get("new_version") == target:
+            node.update(state="updated", progress=100, new_version=target, message=f"Updated to {target}")
+            await progress()
+            return True
+
+        error = result.get("error") or f"Version mismatch after update: {result.get('new_version')}"
+        node.update(state="failed", error=error, message=error)
+        self.logger.warning(f"⚠️ Satellite {hostname} failed to update: {error}")
+        await progress()
+
+        await self._rollback(satellite, node, node_progress)
+        await progress()
+        return False
+
+    async def _rollback(self, satellite: Dict[str, Any], node: Dict[str, Any],
+                        node_progress: Callable[[str, int], Awaitable[None]]) -> None:
+        """Réinstalle la version précédente si le satellite n'y est plus ; l'agent redémarre simplement snapclient s'il y est resté arrêté"""
+        hostname, ip = satellite["hostname"], satellite["ip"]
+        old_version = node["old_version"]
+
+        info = await self.satellite_service._check_satellite_api(hostname, ip)
+        if info.get("online") and info.get("version") == old_version and info.get("running"):
+            node["message"] = f"{node['error']} (unchanged, still on {old_version})"
+            return
+        if not old_version:
+            return
+
+        node.update(state="rolling_back", progress=0, message=f"Rolling back to {old_version}")
+        try:
+            codename = satellite.get("debian_codename") or self.DEFAULT_CODENAME
+            package = await self.ensure_package(old_version, codename)
+            await self.satellite_service.update_satellite(
+                hostname, node_progress, self._update_target(package, ip), ip=ip
+            )
+        except Exception as e:
+            self.logger.error(f"Rollback failed on {hostname}: {e}")
+
+        info = await self.satellite_service._check_satellite_api(hostname, ip)
+        if info.get("online") and info.get("version") == old_version and info.get("running"):
+            node.update(state="rolled_back", progress=100, message=f"Rolled back to {old_version}")
+        else:
+            node.update(state="rollback_failed", message=f"Rollback to {old_version} failed")
+            self.logger.error(f"❌ Satellite {hostname} could not be rolled back to {old_version}")
+
+    # === EXPOSITION ===
+
+    def get_status(self) -> Dict[str, Any]:
+        """Progression agrégée de la mise à jour de flotte"""
+        if not self.state:
+            return {"running": False, "nodes": {}}
+
+        nodes = self.state["nodes"]
+        counts: Dict[str, int] = {}
+        for node in nodes.values():
+            counts[node["state"]] = counts.get(node["state"], 0) + 1
+        done = sum(100 if n["state"] in self.FINAL_STATES else n["progress"] for n in nodes.values())
+
+        return {
+            "running": self.state["running"],
+            "target_version": self.state["target_version"],
+            "started_at": self.state["started_at"],
+            "finished_at": self.state["finished_at"],
+            "progress": int(done / len(nodes)) if nodes else 100,
+            "counts": counts,
+            "result": self.state.get("result"),
+            "nodes": {hostname: dict(node) for hostname, node in nodes.items()}
+        }
@@ -3,7 +3,7 @@ Gestionnaire pour les services systemd.
 """
 import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class SystemdServiceManager:
     """Gestionnaire générique pour les services systemd."""
@@ -12,7 +12,9 @@ class SystemdServiceManager:
         self.logger = logging.getLogger(__name__)
     
     async def start(self, service: str) -> bool:
-        """Démarre un service systemd."""
+        """Démarre un service systemd (déjà actif, ex. daemon en veille chaude : ni systemctl ni attente)."""
+        if await self.is_active(service):
+            return True
         return await self._control_service(service, "start")
     
     async def stop(self, service: str) -> bool:
@@ -71,6 +73,29 @@ class SystemdServiceManager:
             self.logger.error(f"Erreur lors de la récupération du statut: {e}")
             return {"error": str(e)}
     
+    async def get_resource_usage(self, service: str) -> Dict[str, Optional[int]]:
+        """Mémoire (octets) et temps CPU cumulé (ns) d'un service, None si indisponible."""
+        usage: Dict[str, Optional[int]] = {"memory": None, "cpu_nsec": None}
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "systemctl", "show", service,
+                "--property=MemoryCurrent,CPUUsageNSec",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await proc.communicate()
+            properties = dict(
+                line.split("=", 1) for line in stdout.decode().strip().split("\n") if "=" in line
+            )
+            for key, prop in (("memory", "MemoryCurrent"), ("cpu_nsec", "CPUUsageNSec")):
+                value = properties.get(prop, "")
+                # "[not set]" ou valeur max (uint64) quand la comptabilité systemd est désactivée
+                if value.isdigit() and int(value) < 2**64 - 1:
+                    usage[key] = int(value)
+        except Exception as e:
+            self.logger.error(f"Erreur lecture ressources {service}: {e}")
+        return usage
+
     async def _control_service(self, service: str, action: str) -> bool:
         """Contrôle un service systemd."""
         try:
@@ -0,0 +1,110 @@
+# backend/infrastructure/services/volume_command_pipeline.py
+"""
+Pipeline de commandes volume - Coalescence "dernière valeur gagnante" à cadence bornée
+"""
+import asyncio
+import logging
+import time
+from typing import Optional, List, Callable, Awaitable, Dict, Any
+
+ApplyCallback = Callable[[Optional[float], float, bool], Awaitable[bool]]
+
+
+class VolumeCommandPipeline:
+    """
+    Actionneur volume unique pour toutes les sources (rotary, téléphones, app Mac).
+
+    Les commandes ne sont pas exécutées une par une : les deltas s'accumulent, une cible
+    absolue remplace tout ce qui la précède, et un worker applique uniquement la valeur
+    effective au plus une fois par MIN_APPLY_INTERVAL_MS. Tous les appelants en attente
+    reçoivent le résultat de l'application qui a intégré leur commande.
+    """
+
+    MIN_APPLY_INTERVAL_MS = 20
+
+    def __init__(self, apply_callback: ApplyCallback, min_interval_ms: Optional[int] = None):
+        self._apply = apply_callback
+        self.min_interval = (min_interval_ms if min_interval_ms is not None else self.MIN_APPLY_INTERVAL_MS) / 1000
+        self.logger = logging.getLogger(__name__)
+
+        # Commande effective en attente
+        self._pending_target: Optional[float] = None
+        self._pending_delta = 0.0
+        self._pending_show_bar = False
+        self._waiters: List[asyncio.Future] = []
+
+        self._worker: Optional[asyncio.Task] = None
+        self._last_apply_time = 0.0
+
+        # Métriques
+        self._submitted = 0
+        self._applied = 0
+
+    # === SOUMISSION ===
+
+    def submit_delta(self, delta: float, show_bar: bool = True) -> asyncio.Future:
+        """Ajoute un delta à la commande en attente"""
+        self._pending_delta += delta
+        return self._enqueue(show_bar)
+
+    def submit_target(self, target: float, show_bar: bool = True) -> asyncio.Future:
+        """Remplace la commande en attente par une cible absolue (les deltas précédents sont absorbés)"""
+        self._pending_target = float(target)
+        self._pending_delta = 0.0
+        return self._enqueue(show_bar)
+
+    def _enqueue(self, show_bar: bool) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._pending_show_bar = self._pending_show_bar or show_bar
+        self._submitted += 1
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        return future
+
+    # === WORKER ===
+
+    async def _run(self) -> None:
+        """Applique les commandes coalescées tant qu'il y en a"""
+        while self._waiters:
+            wait = self._last_apply_time + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            target, delta, show_bar = self._pending_target, self._pending_delta, self._pending_show_bar
+            waiters = self._waiters
+            self._pending_target = None
+            self._pending_delta = 0.0
+            self._pending_show_bar = False
+            self._waiters = []
+
+            try:
+                success = await self._apply(target, delta, show_bar)
+            except Exception as e:
+                self.logger.error(f"Error applying volume command: {e}")
+                success = False
+
+            self._last_apply_time = time.monotonic()
+            self._applied += 1
+
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(success)
+
+    async def close(self) -> None:
+        """Attend la fin de la commande en cours"""
+        if self._worker and not self._worker.done():
+            try:
+                await self._worker
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Commandes reçues vs appliquées"""
+        return {
+            "submitted": self._submitted,
+            "applied": self._applied,
+            "pending": len(self._waiters),
+            "min_interval_ms": int(self.min_interval * 1000)
+        }
@@ -0,0 +1,121 @@
+# backend/infrastructure/services/volume_ramp.py
+"""
+Moteur de rampes volume - Un seul timer à cadence fixe partagé par les modes direct et multiroom
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Callable, Awaitable
+
+RampApply = Callable[[Dict[str, float]], Awaitable[bool]]
+
+
+def ease_in_out(progress: float) -> float:
+    """Courbe smoothstep : départ et arrivée doux, pas de marche audible"""
+    progress = max(0.0, min(1.0, progress))
+    return progress * progress * (3.0 - 2.0 * progress)
+
+
+@dataclass
+class _Ramp:
+    """Rampe active d'un canal (valeurs en volume affiché, déjà perceptuel via le mapping -M)"""
+    start: Dict[str, float]
+    target: Dict[str, float]
+    started_at: float
+    duration: float
+    apply: RampApply
+    future: asyncio.Future
+    current: Dict[str, float] = field(default_factory=dict)
+
+
+class VolumeRampEngine:
+    """
+    Fait glisser le volume vers sa cible par pas fixes au lieu d'un saut.
+
+    Chaque canal ("direct", "multiroom") porte un dict de valeurs (une par sortie) ;
+    relancer une rampe sur un canal actif la reprend depuis sa position courante,
+    ce qui permet de changer de cible en cours de route sans à-coup.
+    """
+
+    STEP_MS = 20
+
+    def __init__(self, step_ms: Optional[int] = None):
+        self.step = (step_ms if step_ms is not None else self.STEP_MS) / 1000
+        self.logger = logging.getLogger(__name__)
+        self._ramps: Dict[str, _Ramp] = {}
+        self._timer: Optional[asyncio.Task] = None
+
+    def is_active(self, channel: str) -> bool:
+        return channel in self._ramps
+
+    def position(self, channel: str) -> Optional[Dict[str, float]]:
+        """Dernières valeurs appliquées par la rampe active du canal"""
+        ramp = self._ramps.get(channel)
+        return dict(ramp.current) if ramp else None
+
+    def ramp_to(self, channel: str, start: Dict[str, float], target: Dict[str, float],
+                duration_ms: int, apply: RampApply) -> asyncio.Future:
+        """Démarre (ou réoriente) la rampe d'un canal, le future se résout à l'arrivée"""
+        previous = self._ramps.pop(channel, None)
+        if previous:
+            # Reprise depuis la position réelle pour éviter un saut
+            start = {**start, **previous.current}
+            if not previous.future.done():
+                previous.future.set_result(False)
+
+        future = asyncio.get_running_loop().create_future()
+        self._ramps[channel] = _Ramp(
+            start=dict(start),
+            target=dict(target),
+            started_at=time.monotonic(),
+            duration=max(duration_ms, 0) / 1000,
+            apply=apply,
+            future=future,
+            current={key: start.get(key, value) for key, value in target.items()}
+        )
+
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._run())
+        return future
+
+    def cancel(self, channel: str) -> None:
+        """Arrête la rampe à sa position courante"""
+        ramp = self._ramps.pop(channel, None)
+        if ramp and not ramp.future.done():
+            ramp.future.set_result(False)
+
+    def cancel_all(self) -> None:
+        for channel in list(self._ramps):
+            self.cancel(channel)
+
+    async def _run(self) -> None:
+        """Timer unique : un pas par canal actif toutes les STEP_MS"""
+        next_tick = time.monotonic()
+
+        while self._ramps:
+            now = time.monotonic()
+
+            for channel, ramp in list(self._ramps.items()):
+                progress = 1.0 if ramp.duration <= 0 else (now - ramp.started_at) / ramp.duration
+                eased = ease_in_out(progress)
+
+                values = {
+                    key: ramp.start.get(key, target) + (target - ramp.start.get(key, target)) * eased
+                    for key, target in ramp.target.items()
+                }
+
+                try:
+                    await ramp.apply(values)
+                    ramp.current = values
+                except Exception as e:
+                    self.logger.error(f"Error applying ramp step on {channel}: {e}")
+
+                # La rampe a pu être réorientée pendant l'application
+                if progress >= 1.0 and self._ramps.get(channel) is ramp:
+                    del self._ramps[channel]
+                    if not ramp.future.done():
+                        ramp.future.set_result(True)
+
+            next_tick += self.step
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
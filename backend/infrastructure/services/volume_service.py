@@ -4,29 +4,46 @@ Service de gestion du volume pour Milo - Version production OPTIM avec I/O async
 """
 import asyncio
 import logging
-import alsaaudio
-import re
 import json
 import os
 import aiofiles
+import numpy as np
 from typing import Optional, Dict, Any, List
 import time
 from pathlib import Path
 from backend.infrastructure.services.settings_service import SettingsService
+from backend.infrastructure.hardware.mixer_backend import MixerBackend, create_mixer_backend
+from backend.infrastructure.hardware.mixer_watcher import MixerWatcher
+from backend.infrastructure.services.volume_command_pipeline import VolumeCommandPipeline
+from backend.infrastructure.services.volume_ramp import VolumeRampEngine
+from backend.infrastructure.services.multiroom_volume_state import (
+    MultiroomVolumeState,
+    alsa_to_display_array,
+    display_to_alsa_array,
+    round_half_up_array
+)
 
 class VolumeService:
     """Service de gestion du volume système - Volume multiroom centralisé"""
     
     LAST_VOLUME_FILE = Path("/var/lib/milo/last_volume.json")
+    RAMP_MIN_DISPLAY_DELTA = 3  # En dessous, saut direct (pas de rotary rampé)
     
-    def __init__(self, state_machine, snapcast_service, settings_service=None):
+    def __init__(self, state_machine, snapcast_service, settings_service=None,
+                 mixer_backend: Optional[MixerBackend] = None):
         self.state_machine = state_machine
         self.snapcast_service = snapcast_service
         # Utiliser l'injection ou créer une instance locale en fallback
         self.settings_service = settings_service if settings_service is not None else SettingsService()
-        self.mixer: Optional[alsaaudio.Mixer] = None
+        # Handle mixer persistant (pyalsaaudio / session amixer), injectable pour les tests
+        self.mixer: Optional[MixerBackend] = mixer_backend
+        self._mixer_watcher: Optional[MixerWatcher] = None
         self.logger = logging.getLogger(__name__)
         self._volume_lock = asyncio.Lock()
+        # Toutes les commandes (rotary, téléphones, app Mac) passent par un actionneur unique
+        self._command_pipeline = VolumeCommandPipeline(self._apply_volume_command)
+        # Rampes : un seul timer partagé entre mode direct et multiroom
+        self._ramp_engine = VolumeRampEngine()
         
         # Configuration volume
         self._alsa_min_volume = 0
@@ -35,16 +52,18 @@ class VolumeService:
         self._restore_last_volume = False
         self._mobile_volume_steps = 5
         self._rotary_volume_steps = 2
+        self._ramp_duration_ms = 200
         
         # États internes
         self._precise_display_volume = 0.0
         self._multiroom_volume = 50.0
-        self._last_alsa_volume = 0
-        self._alsa_cache_time = 0
+        self._last_alsa_volume = 0  # Tenu à jour par nos écritures et par le MixerWatcher
         self._adjustment_counter = 0  # Compteur pour gérer ajustements concurrents
+        self._mixer_recheck_pending = False  # Événement mixer reçu pendant un ajustement : relu à la fin
+        self._muted = False  # Soft mute : volumes logiques conservés, sorties à 0
         
         # États display par client
-        self._client_display_states = {}
+        self._client_display_states = MultiroomVolumeState()
         self._client_states_initialized = False
         
         # Caches
@@ -81,6 +100,7 @@ class VolumeService:
             self._restore_last_volume = volume_config.get("restore_last_volume", False)
             self._mobile_volume_steps = volume_config.get("mobile_volume_steps", 5)
             self._rotary_volume_steps = volume_config.get("rotary_volume_steps", 2)
+            self._ramp_duration_ms = volume_config.get("ramp_duration_ms", 200)
         except Exception as e:
             self.logger.error(f"Error loading volume config: {e}")
     
@@ -199,6 +219,15 @@ class VolumeService:
             self.logger.error(f"Error reloading rotary steps: {e}")
             return False
 
+    async def reload_ramp_config(self) -> bool:
+        """Recharge la durée des rampes"""
+        try:
+            self._ramp_duration_ms = await self._reload_volume_setting("ramp_duration_ms", 200)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error reloading ramp config: {e}")
+            return False
+
     def _display_to_alsa_old_limits(self, display_volume: int, old_min: int, old_max: int) -> int:
         """Convertit avec les anciennes limites"""
         old_alsa_range = old_max - old_min
@@ -236,7 +265,7 @@ class VolumeService:
     
     def _invalidate_all_caches(self) -> None:
         """Invalide tous les caches"""
-        self._client_display_states = {}
+        self._client_display_states = MultiroomVolumeState()
         self._client_states_initialized = False
         self._snapcast_clients_cache = []
         self._snapcast_cache_time = 0
@@ -427,10 +456,10 @@ class VolumeService:
         try:
             await self._load_volume_config()  # ✅ AWAIT
 
-            try:
-                self.mixer = alsaaudio.Mixer('Digital')
-            except Exception as e:
-                self.logger.error(f"Digital mixer not found: {e}")
+            if self.mixer is None:
+                self.mixer = create_mixer_backend('Digital')
+            if self.mixer is None:
+                self.logger.error("Digital mixer not found")
                 return False
 
             startup_display = self._determine_startup_volume()
@@ -444,7 +473,10 @@ class VolumeService:
             self._precise_display_volume = float(startup_display)
             self._multiroom_volume = float(startup_display)
             self._last_alsa_volume = startup_alsa
-            self._alsa_cache_time = time.time()
+
+            # Changements externes (alsamixer, autres processus) notifiés par événements ALSA
+            self._mixer_watcher = MixerWatcher(self.mixer, self._on_mixer_changed)
+            self._mixer_watcher.start()
 
             asyncio.create_task(self._delayed_initial_broadcast())
             return True
@@ -480,69 +512,88 @@ class VolumeService:
             return self._round_half_up(self._precise_display_volume)
     
     async def set_display_volume(self, display_volume: int, show_bar: bool = True) -> bool:
-        """Définit le volume (0-100%) avec timeout"""
+        """Définit le volume (0-100%) via le pipeline coalescé avec timeout"""
+        future = self._command_pipeline.submit_target(self._clamp_display_volume(float(display_volume)), show_bar)
+        return await self._wait_volume_command(future)
+    
+    async def adjust_display_volume(self, delta: int, show_bar: bool = True) -> bool:
+        """Ajustement centralisé via le pipeline coalescé avec timeout"""
+        future = self._command_pipeline.submit_delta(delta, show_bar)
+        return await self._wait_volume_command(future)
+    
+    async def _wait_volume_command(self, future: asyncio.Future) -> bool:
+        """Attend l'application de la commande (partagée avec les commandes coalescées)"""
         try:
             async with asyncio.timeout(2.0):  # Timeout de 2 secondes
-                async with self._volume_lock:
-                    try:
-                        self._adjustment_counter += 1
-                        clamped = self._clamp_display_volume(float(display_volume))
-
-                        if self._is_multiroom_enabled():
-                            success = await self._set_multiroom_volume_centralized(int(clamped))
-                        else:
-                            alsa = self._display_to_alsa(int(clamped))
-                            success = await self._apply_alsa_volume_direct(alsa)
-                            if success:
-                                self._precise_display_volume = clamped
-
-                        if success:
-                            self._save_last_volume(int(clamped))
-                            await self._schedule_broadcast(show_bar)
-
-                        asyncio.create_task(self._mark_adjustment_done())
-                        return success
-                    except Exception as e:
-                        self.logger.error(f"Error setting volume: {e}")
-                        self._adjustment_counter = max(0, self._adjustment_counter - 1)
-                        return False
+                return await asyncio.shield(future)
         except asyncio.TimeoutError:
-            self.logger.error("Timeout waiting for volume lock (>2s)")
+            self.logger.error("Timeout waiting for volume command (>2s)")
             return False
     
-    async def adjust_display_volume(self, delta: int, show_bar: bool = True) -> bool:
-        """Ajustement centralisé avec timeout"""
-        try:
-            async with asyncio.timeout(2.0):  # Timeout de 2 secondes
-                async with self._volume_lock:
-                    try:
-                        self._adjustment_counter += 1
+    async def _apply_volume_command(self, target: Optional[float], delta: float, show_bar: bool) -> bool:
+        """Applique la valeur effective d'une rafale de commandes (appelé par le pipeline)"""
+        if target is None and delta == 0:
+            return True  # Les deltas se sont annulés
+        
+        async with self._volume_lock:
+            try:
+                self._adjustment_counter += 1
+                multiroom = self._is_multiroom_enabled()
+                channel = "multiroom" if multiroom else "direct"
+
+                # Toute commande volume lève le soft mute (remontée toujours rampée)
+                unmuting = self._muted
+                if unmuting:
+                    await self._release_mute_flags(multiroom)
 
-                        if self._is_multiroom_enabled():
-                            success = await self._adjust_multiroom_volume_centralized(delta)
-                        else:
-                            success = await self._adjust_volume_direct(delta)
+                if target is not None:
+                    clamped = self._clamp_display_volume(target + delta)
+                    current = self._multiroom_volume if multiroom else self._precise_display_volume
+                    ramp = unmuting or self._should_ramp(channel, abs(clamped - current))
 
+                    if multiroom:
+                        success = await self._set_multiroom_volume_centralized(int(clamped), ramp=ramp)
+                    elif ramp:
+                        self._start_direct_ramp(clamped)
+                        self._precise_display_volume = clamped
+                        success = True
+                    else:
+                        self._ramp_engine.cancel("direct")
+                        alsa = self._display_to_alsa(int(clamped))
+                        success = await self._apply_alsa_volume_direct(alsa)
                         if success:
-                            final = await self.get_display_volume()
-                            self._save_last_volume(final)
-                            await self._schedule_broadcast(show_bar)
-
-                        asyncio.create_task(self._mark_adjustment_done())
-                        return success
-                    except Exception as e:
-                        self.logger.error(f"Error adjusting: {e}")
-                        self._adjustment_counter = max(0, self._adjustment_counter - 1)
-                        return False
-        except asyncio.TimeoutError:
-            self.logger.error("Timeout waiting for volume lock (>2s)")
-            return False
+                            self._precise_display_volume = clamped
+                else:
+                    # Un delta pendant une rampe la réoriente au lieu de la couper
+                    ramp = unmuting or self._ramp_engine.is_active(channel)
+                    if multiroom:
+                        success = await self._adjust_multiroom_volume_centralized(delta, ramp=ramp)
+                    else:
+                        success = await self._adjust_volume_direct(delta, ramp=ramp)
+
+                if success:
+                    final = await self.get_display_volume()
+                    self._save_last_volume(final)
+                    await self._schedule_broadcast(show_bar)
+
+                asyncio.create_task(self._mark_adjustment_done())
+                return success
+            except Exception as e:
+                self.logger.error(f"Error applying volume command: {e}")
+                self._adjustment_counter = max(0, self._adjustment_counter - 1)
+                return False
     
-    async def _adjust_volume_direct(self, delta: int) -> bool:
+    async def _adjust_volume_direct(self, delta: float, ramp: bool = False) -> bool:
         """Ajustement mode direct"""
         try:
             current = self._precise_display_volume
             new_precise = self._clamp_display_volume(current + delta)
+
+            if ramp:
+                self._start_direct_ramp(new_precise)
+                self._precise_display_volume = new_precise
+                return True
+
             new_display = self._round_half_up(new_precise)
             new_alsa = self._display_to_alsa(new_display)
             
@@ -554,7 +605,7 @@ class VolumeService:
             self.logger.error(f"Error direct adjust: {e}")
             return False
     
-    async def _adjust_multiroom_volume_centralized(self, delta: int) -> bool:
+    async def _adjust_multiroom_volume_centralized(self, delta: float, ramp: bool = False) -> bool:
         """Ajustement multiroom précis"""
         try:
             clients = await self._get_snapcast_clients_cached()
@@ -562,61 +613,13 @@ class VolumeService:
                 return False
             
             await self._initialize_client_display_states()
-            
-            operations = []
-            events = []
-            new_volumes = []
-            
-            for client in clients:
-                client_id = client["id"]
-                current = self._client_display_states.get(client_id)
-                
-                if current is None:
-                    alsa = client.get("volume", 0)
-                    current = float(self._alsa_to_display(alsa))
-                    self._client_display_states[client_id] = current
-                
-                new_precise = self._clamp_display_volume(current + delta)
-                self._client_display_states[client_id] = new_precise
-                
-                alsa = self._display_to_alsa_precise(new_precise)
-                alsa_clamped = self._clamp_alsa_volume(alsa)
-                
-                operations.append((client_id, alsa_clamped))
-                events.append({
-                    "client_id": client_id,
-                    "volume": self._round_half_up(new_precise),
-                    "muted": client.get("muted", False)
-                })
-                
-                if not client.get("muted", False):
-                    new_volumes.append(new_precise)
-            
-            if new_volumes:
-                self._multiroom_volume = sum(new_volumes) / len(new_volumes)
-            
-            await asyncio.gather(
-                *[self.snapcast_service.set_volume(cid, alsa) for cid, alsa in operations]
-            )
-            
-            for evt in events:
-                await self.state_machine.broadcast_event("snapcast", "client_volume_changed", {
-                    "client_id": evt["client_id"],
-                    "volume": evt["volume"],
-                    "muted": evt["muted"],
-                    "source": "multiroom_precise"
-                })
-            
-            self._snapcast_clients_cache = []
-            self._snapcast_cache_time = 0
-            
-            return True
+            return await self._apply_multiroom_delta(clients, delta, ramp, "multiroom_precise")
             
         except Exception as e:
             self.logger.error(f"Error multiroom adjust: {e}")
             return False
     
-    async def _set_multiroom_volume_centralized(self, target: int) -> bool:
+    async def _set_multiroom_volume_centralized(self, target: int, ramp: bool = False) -> bool:
         """Set multiroom avec delta uniforme"""
         try:
             clients = await self._get_snapcast_clients_cached()
@@ -624,64 +627,171 @@ class VolumeService:
                 return False
             
             await self._initialize_client_display_states()
-            old = self._multiroom_volume
-            delta = target - old
-            
-            operations = []
-            events = []
-            new_volumes = []
-            
-            for client in clients:
-                client_id = client["id"]
-                current = self._client_display_states.get(client_id)
-                
-                if current is None:
-                    alsa = client.get("volume", 0)
-                    current = float(self._alsa_to_display(alsa))
-                    self._client_display_states[client_id] = current
-                
-                new_precise = self._clamp_display_volume(current + delta)
-                self._client_display_states[client_id] = new_precise
-                
-                alsa = self._display_to_alsa_precise(new_precise)
-                alsa_clamped = self._clamp_alsa_volume(alsa)
-                
-                operations.append((client_id, alsa_clamped))
-                events.append({
-                    "client_id": client_id,
-                    "volume": self._round_half_up(new_precise),
-                    "muted": client.get("muted", False)
-                })
-                
-                if not client.get("muted", False):
-                    new_volumes.append(new_precise)
-            
-            if new_volumes:
-                self._multiroom_volume = sum(new_volumes) / len(new_volumes)
-            else:
-                self._multiroom_volume = float(target)
-            
-            await asyncio.gather(
-                *[self.snapcast_service.set_volume(cid, alsa) for cid, alsa in operations]
-            )
-            
-            for evt in events:
-                await self.state_machine.broadcast_event("snapcast", "client_volume_changed", {
-                    "client_id": evt["client_id"],
-                    "volume": evt["volume"],
-                    "muted": evt["muted"],
-                    "source": "multiroom_uniform"
-                })
-            
-            self._snapcast_clients_cache = []
-            self._snapcast_cache_time = 0
-            
-            return True
+            delta = target - self._multiroom_volume
+            return await self._apply_multiroom_delta(clients, delta, ramp, "multiroom_uniform", fallback_volume=target)
             
         except Exception as e:
             self.logger.error(f"Error set multiroom: {e}")
             return False
     
+    async def _apply_multiroom_delta(self, clients: List[Dict[str, Any]], delta: float, ramp: bool,
+                                     source: str, fallback_volume: Optional[float] = None) -> bool:
+        """Delta uniforme sur tous les clients en opérations vectorisées, un seul broadcast"""
+        count = len(clients)
+        client_ids = [client["id"] for client in clients]
+        reported_alsa = np.fromiter((client.get("volume", 0) for client in clients), dtype=np.float64, count=count)
+        muted = np.fromiter((client.get("muted", False) for client in clients), dtype=bool, count=count)
+        
+        reported_display = alsa_to_display_array(reported_alsa, self._alsa_min_volume, self._alsa_max_volume)
+        positions = self._client_display_states.indices(client_ids, reported_display)
+        new_display = self._client_display_states.apply_delta(positions, delta)
+        new_alsa = display_to_alsa_array(new_display, self._alsa_min_volume, self._alsa_max_volume)
+        
+        active = new_display[~muted]
+        if active.size:
+            self._multiroom_volume = float(active.mean())
+        elif fallback_volume is not None:
+            self._multiroom_volume = float(fallback_volume)
+        
+        if ramp:
+            self._start_multiroom_ramp(
+                dict(zip(client_ids, reported_display.tolist())),
+                dict(zip(client_ids, new_display.tolist()))
+            )
+        else:
+            self._ramp_engine.cancel("multiroom")
+            await self.snapcast_service.set_volumes(dict(zip(client_ids, new_alsa.tolist())))
+        
+        # Format colonne : une seule trame quel que soit le nombre de satellites
+        await self.state_machine.broadcast_event("snapcast", "clients_volume_changed", {
+            "client_ids": client_ids,
+            "volumes": round_half_up_array(new_display).tolist(),
+            "muted": muted.tolist(),
+            "source": source
+        })
+        
+        self._snapcast_clients_cache = []
+        self._snapcast_cache_time = 0
+        
+        return True
+    
+    # === RAMPES & SOFT MUTE ===
+
+    def _should_ramp(self, channel: str, distance: float) -> bool:
+        """Rampe pour les grands écarts, ou pour réorienter une rampe en cours"""
+        if self._ramp_duration_ms <= 0:
+            return False
+        return self._ramp_engine.is_active(channel) or distance >= self.RAMP_MIN_DISPLAY_DELTA
+
+    def _track_ramp(self, future: asyncio.Future) -> asyncio.Future:
+        """Les valeurs intermédiaires d'une rampe ne doivent pas être vues comme externes"""
+        self._adjustment_counter += 1
+        future.add_done_callback(lambda _: asyncio.create_task(self._mark_adjustment_done()))
+        return future
+
+    def _start_direct_ramp(self, target_display: float) -> asyncio.Future:
+        """Rampe du mixer local depuis sa position réelle"""
+        start = self._clamp_display_volume(float(self._alsa_to_display(self._last_alsa_volume)))
+
+        async def step(values: Dict[str, float]) -> bool:
+            alsa = self._clamp_alsa_volume(self._display_to_alsa_precise(values["main"]))
+            if alsa == self._last_alsa_volume:
+                return True  # Pas d'écriture pour une valeur inchangée
+            return await self._set_mixer_volume(alsa)
+
+        return self._track_ramp(self._ramp_engine.ramp_to(
+            "direct", {"main": start}, {"main": target_display}, self._ramp_duration_ms, step
+        ))
+
+    def _start_multiroom_ramp(self, start_volumes: Dict[str, float], targets: Dict[str, float]) -> asyncio.Future:
+        """Rampe de tous les clients Snapcast sur le même timer"""
+        sent = {cid: self._clamp_alsa_volume(self._display_to_alsa_precise(v)) for cid, v in start_volumes.items()}
+
+        async def step(values: Dict[str, float]) -> bool:
+            changed = {}
+            for cid, display in values.items():
+                alsa = self._clamp_alsa_volume(self._display_to_alsa_precise(display))
+                if sent.get(cid) != alsa:
+                    sent[cid] = alsa
+                    changed[cid] = alsa
+            if changed:
+                await self.snapcast_service.set_volumes(changed)
+            return True
+
+        return self._track_ramp(self._ramp_engine.ramp_to(
+            "multiroom", start_volumes, targets, self._ramp_duration_ms, step
+        ))
+
+    @property
+    def muted(self) -> bool:
+        return self._muted
+
+    async def set_muted(self, muted: bool) -> bool:
+        """Soft mute/unmute : rampe vers 0 puis coupure, les volumes logiques sont conservés"""
+        if muted == self._muted:
+            return True
+
+        if not muted:
+            # La commande volume lève le mute et remonte en rampe vers le volume logique
+            return await self.set_display_volume(await self.get_display_volume(), show_bar=True)
+
+        try:
+            async with self._volume_lock:
+                self._adjustment_counter += 1
+                multiroom = self._is_multiroom_enabled()
+                self._muted = True
+
+                if multiroom:
+                    clients = await self._get_snapcast_clients_cached()
+                    start = {c["id"]: float(self._alsa_to_display(c.get("volume", 0))) for c in clients}
+                    future = self._start_multiroom_ramp(start, {cid: 0.0 for cid in start})
+                else:
+                    future = self._start_direct_ramp(0.0)
+
+            # Hors verrou : une commande volume pendant la descente annule le mute
+            completed = await future
+            if completed and self._muted:
+                await self._engage_mute_flags(multiroom)
+
+            asyncio.create_task(self._mark_adjustment_done())
+            await self._schedule_broadcast(show_bar=False)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error setting mute: {e}")
+            self._adjustment_counter = max(0, self._adjustment_counter - 1)
+            return False
+
+    async def toggle_mute(self) -> bool:
+        """Bascule le soft mute (bouton du rotary)"""
+        return await self.set_muted(not self._muted)
+
+    async def _engage_mute_flags(self, multiroom: bool) -> None:
+        """Fin de descente : coupure franche, volumes clients restaurés sous le flag mute"""
+        if not multiroom:
+            if self.mixer and self.mixer.set_volume(0):
+                self._last_alsa_volume = 0
+            return
+
+        # Volumes logiques restaurés sous le flag mute, une seule requête batch
+        await self.snapcast_service.set_volumes({
+            client_id: self._clamp_alsa_volume(self._display_to_alsa_precise(display))
+            for client_id, display in self._client_display_states.items()
+        }, muted=True)
+        self._snapcast_clients_cache = []
+        self._snapcast_cache_time = 0
+
+    async def _release_mute_flags(self, multiroom: bool) -> None:
+        """Lève le mute : les sorties repartent de 0 pour la rampe de remontée"""
+        self._muted = False
+        if not multiroom:
+            return
+
+        await self.snapcast_service.set_volumes(
+            {client_id: self._alsa_min_volume for client_id in self._client_display_states}, muted=False
+        )
+        self._snapcast_clients_cache = []
+        self._snapcast_cache_time = 0
+
     # === BATCHING ===
     
     async def _schedule_broadcast(self, show_bar: bool = True) -> None:
@@ -711,7 +821,8 @@ class VolumeService:
                 "multiroom_mode": self._is_multiroom_enabled(),
                 "show_bar": show_bar,
                 "source": "volume_service",
-                "mobile_steps": self._mobile_volume_steps
+                "mobile_steps": self._mobile_volume_steps,
+                "muted": self._muted
             })
         except Exception as e:
             self.logger.error(f"Error broadcast: {e}")
@@ -731,59 +842,46 @@ class VolumeService:
     async def _apply_alsa_volume_direct(self, alsa_volume: int) -> bool:
         """Applique ALSA direct"""
         try:
-            return await self._set_amixer_volume_fast(alsa_volume)
+            return await self._set_mixer_volume(alsa_volume)
         except Exception:
             return False
     
-    async def _get_amixer_volume_fast(self) -> Optional[int]:
-        """Lecture amixer rapide"""
-        current_time = time.time()
-
-        if self._adjustment_counter > 0 and (current_time - self._alsa_cache_time) < 0.01:
-            return self._last_alsa_volume
-        
+    async def _set_mixer_volume(self, alsa_volume: int) -> bool:
+        """Écriture via le handle mixer persistant (pas de fork/exec)"""
         try:
-            proc = await asyncio.create_subprocess_exec(
-                "amixer", "-M", "get", "Digital",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.DEVNULL
-            )
-            stdout, _ = await proc.communicate()
-            
-            if proc.returncode != 0:
-                return self._last_alsa_volume
-            
-            output = stdout.decode()
-            match = re.search(r'\[(\d+)%\]', output)
+            if self.mixer is None:
+                return False
             
-            if match:
-                volume = int(match.group(1))
-                self._last_alsa_volume = volume
-                self._alsa_cache_time = current_time
-                return volume
-            else:
-                return self._last_alsa_volume
-        except Exception:
-            return self._last_alsa_volume
-    
-    async def _set_amixer_volume_fast(self, alsa_volume: int) -> bool:
-        """Écriture amixer rapide"""
-        try:
             limited = self._clamp_alsa_volume(alsa_volume)
+            if not self.mixer.set_volume(limited):
+                return False
             
-            proc = await asyncio.create_subprocess_exec(
-                "amixer", "-M", "set", "Digital", f"{limited}%",
-                stdout=asyncio.subprocess.DEVNULL,
-                stderr=asyncio.subprocess.DEVNULL
-            )
-            await proc.communicate()
-            
-            self._last_alsa_volume = limited
-            self._alsa_cache_time = time.time()
-            return proc.returncode == 0
+            # Valeur relue : le matériel quantifie le dB, l'écho du MixerWatcher porte la valeur effective
+            readback = self.mixer.get_volume()
+            self._last_alsa_volume = readback if readback is not None else limited
+            return True
         except Exception:
             return False
     
+    def _on_mixer_changed(self, alsa_volume: int) -> None:
+        """Changement du mixer notifié par le MixerWatcher (boucle asyncio)"""
+        if alsa_volume == self._last_alsa_volume:
+            return  # Écho de notre propre écriture
+        
+        if self._adjustment_counter > 0:
+            # Valeur intermédiaire d'un ajustement en cours, ou changement externe : relu à la fin de l'ajustement
+            self._mixer_recheck_pending = True
+            return
+        
+        self._last_alsa_volume = alsa_volume
+        
+        if self._is_multiroom_enabled():
+            return  # En multiroom le volume affiché suit les clients Snapcast
+        
+        self.logger.info(f"External mixer change detected: ALSA {alsa_volume}%")
+        self._precise_display_volume = float(self._clamp_display_volume(self._alsa_to_display(alsa_volume)))
+        asyncio.create_task(self._schedule_broadcast(show_bar=False))
+    
     async def _get_snapcast_clients_cached(self):
         """Clients avec cache"""
         current = time.time() * 1000
@@ -803,11 +901,18 @@ class VolumeService:
         """Fin ajustement"""
         await asyncio.sleep(0.15)
         self._adjustment_counter = max(0, self._adjustment_counter - 1)
+
+        if self._adjustment_counter == 0 and self._mixer_recheck_pending:
+            self._mixer_recheck_pending = False
+            # Le mixer diffère de notre dernière écriture : changement externe pendant l'ajustement
+            volume = self.mixer.get_volume() if self.mixer else None
+            if volume is not None:
+                self._on_mixer_changed(volume)
     
     async def _set_startup_volume_direct(self, alsa_volume: int) -> bool:
         """Startup direct"""
         try:
-            success = await self._set_amixer_volume_fast(alsa_volume)
+            success = await self._set_mixer_volume(alsa_volume)
             if success:
                 display = self._alsa_to_display(alsa_volume)
                 self.logger.info(f"Direct startup: {display}%")
@@ -824,16 +929,11 @@ class VolumeService:
                 return True
             
             display = self._alsa_to_display(alsa_volume)
-            operations = []
             
             for client in clients:
-                client_id = client["id"]
-                operations.append((client_id, alsa_volume))
-                self._set_client_display_volume(client_id, float(display))
+                self._set_client_display_volume(client["id"], float(display))
             
-            await asyncio.gather(
-                *[self.snapcast_service.set_volume(cid, alsa) for cid, alsa in operations]
-            )
+            await self.snapcast_service.set_volumes({client["id"]: alsa_volume for client in clients})
             
             self._multiroom_volume = float(display)
             self._client_states_initialized = True
@@ -870,7 +970,8 @@ class VolumeService:
             "startup_volume": self._default_startup_display_volume,
             "restore_last_volume": self._restore_last_volume,
             "mobile_steps": self._mobile_volume_steps,
-            "rotary_steps": self._rotary_volume_steps
+            "rotary_steps": self._rotary_volume_steps,
+            "ramp_duration_ms": self._ramp_duration_ms
         }
     
     def get_rotary_step(self) -> int:
@@ -887,8 +988,10 @@ class VolumeService:
                 "volume": volume,
                 "multiroom_enabled": multiroom,
                 "mixer_available": self.mixer is not None,
+                "muted": self._muted,
                 "display_volume": True,
-                "config": self.get_volume_config_public()
+                "config": self.get_volume_config_public(),
+                "pipeline": self._command_pipeline.get_stats()
             }
 
             if multiroom:
@@ -928,6 +1031,10 @@ class VolumeService:
     async def cleanup(self) -> None:
         """Nettoie et attend la fin des tasks en cours"""
         try:
+            # Laisser le pipeline appliquer la dernière commande en attente
+            await self._command_pipeline.close()
+            self._ramp_engine.cancel_all()
+
             # Attendre la fin de la task de broadcast si elle existe
             if self._broadcast_task and not self._broadcast_task.done():
                 await self._broadcast_task
@@ -936,6 +1043,12 @@ class VolumeService:
             if self._save_volume_task and not self._save_volume_task.done():
                 await self._save_volume_task
 
+            if self._mixer_watcher:
+                self._mixer_watcher.stop()
+
+            if self.mixer:
+                self.mixer.close()
+
             self.logger.info("VolumeService cleanup completed")
         except Exception as e:
             self.logger.error(f"Error during volume service cleanup: {e}")
\ No newline at end of file
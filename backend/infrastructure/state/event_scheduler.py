@@ -0,0 +1,170 @@
+# backend/infrastructure/state/event_scheduler.py
+"""
+Ordonnanceur d'événements - Coalescence par (catégorie, type, clé), débit max par sujet, flush aligné sur des frames
+"""
+import asyncio
+import logging
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+EmitCallback = Callable[[str, str, Dict[str, Any]], Awaitable[None]]
+MergeCallback = Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]
+
+# Champs décrivant le point de départ d'une rafale : la première valeur est conservée
+FIRST_WINS = ("old_state",)
+
+
+def merge_data(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Fusion par défaut : le plus récent gagne, les dicts imbriqués (metadata) sont fusionnés"""
+    merged = {**old, **new}
+    for key, value in new.items():
+        if isinstance(value, dict) and isinstance(old.get(key), dict):
+            merged[key] = {**old[key], **value}
+    for key in FIRST_WINS:
+        if key in old:
+            merged[key] = old[key]
+    return merged
+
+
+def merge_client_updates(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """snapcast.clients_updated : champs modifiés fusionnés client par client"""
+    clients: Dict[str, Dict[str, Any]] = {}
+    for update in old.get("clients", []) + new.get("clients", []):
+        fields = clients.setdefault(update["client_id"], {})
+        fields.update(update.get("fields", {}))
+    return {**old, **new, "clients": [{"client_id": cid, "fields": fields} for cid, fields in clients.items()]}
+
+
+@dataclass(frozen=True)
+class TopicPolicy:
+    """Débit d'un sujet : intervalle minimal entre deux émissions d'une même clé"""
+    min_interval: float
+    key_field: Optional[str] = None  # Champ de data distinguant les clés (client, source)
+    merge: MergeCallback = field(default=merge_data)
+
+
+# Sujets à haute fréquence ; les autres événements passent sans délai
+DEFAULT_POLICIES: Dict[Tuple[str, str], TopicPolicy] = {
+    ("plugin", "state_changed"): TopicPolicy(0.1, "source"),  # Ticks métadonnées radio, seek Spotify
+    ("volume", "volume_changed"): TopicPolicy(0.05),
+    ("snapcast", "client_volume_changed"): TopicPolicy(0.1, "client_id"),
+    ("snapcast", "clients_volume_changed"): TopicPolicy(0.1),
+    ("snapcast", "clients_updated"): TopicPolicy(0.2, merge=merge_client_updates),
+}
+
+
+class EventScheduler:
+    """Entre la machine à états et le WebSocket : un événement isolé part tout de suite,
+    une rafale est fusionnée et émise au plus tôt à la frame suivant l'intervalle minimal"""
+
+    FRAME_INTERVAL = 1 / 30  # Secondes, cadence de rafraîchissement des écrans
+
+    def __init__(self, emit: EmitCallback, policies: Optional[Dict[Tuple[str, str], TopicPolicy]] = None):
+        self._emit = emit
+        self.policies = DEFAULT_POLICIES if policies is None else policies
+        self._pending: Dict[Tuple, Dict[str, Any]] = {}  # Ordre d'insertion = ordre d'émission
+        self._last_emit: Dict[Tuple, float] = {}
+        self._wakeup = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self.received: Counter = Counter()
+        self.emitted: Counter = Counter()
+        self.logger = logging.getLogger(__name__)
+
+    async def submit(self, category: str, event_type: str, data: Dict[str, Any]) -> None:
+        """Soumet un événement : émis, fusionné dans un envoi en attente, ou différé"""
+        self.received[f"{category}.{event_type}"] += 1
+        policy = self.policies.get((category, event_type))
+        if policy is None:
+            # Barrière : les événements différés partent avant, l'ordre causal est conservé
+            await self.flush()
+            await self._send(category, event_type, data)
+            return
+
+        key = (category, event_type, data.get(policy.key_field) if policy.key_field else None)
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending["data"] = policy.merge(pending["data"], data)
+            return
+
+        now = asyncio.get_running_loop().time()
+        earliest = self._last_emit.get(key, -math.inf) + policy.min_interval
+        if now >= earliest:
+            self._last_emit[key] = now
+            await self._send(category, event_type, data)
+            return
+
+        self._pending[key] = {"category": category, "type": event_type, "data": data, "due": self._align(earliest)}
+        self._ensure_flusher()
+
+    def _align(self, when: float) -> float:
+        """Prochaine frontière de frame (horloge de la boucle) à partir de when"""
+        return math.ceil(when / self.FRAME_INTERVAL) * self.FRAME_INTERVAL
+
+    def _ensure_flusher(self) -> None:
+        self._wakeup.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            self._wakeup.clear()
+            delay = min(entry["due"] for entry in self._pending.values()) - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    continue  # Nouvel événement : échéance la plus proche recalculée
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush_due(loop.time())
+
+    async def _flush_due(self, now: float) -> None:
+        due = [key for key, entry in self._pending.items() if entry["due"] <= now]
+        for key in due:
+            entry = self._pending.pop(key, None)
+            if entry is not None:
+                self._last_emit[key] = now
+                await self._send(entry["category"], entry["type"], entry["data"])
+
+    async def flush(self) -> None:
+        """Émet immédiatement tous les événements en attente (barrière, tests, arrêt)"""
+        if not self._pending:
+            return
+        now = asyncio.get_running_loop().time()
+        entries, self._pending = self._pending, {}
+        for key, entry in entries.items():
+            self._last_emit[key] = now
+            await self._send(entry["category"], entry["type"], entry["data"])
+
+    async def _send(self, category: str, event_type: str, data: Dict[str, Any]) -> None:
+        self.emitted[f"{category}.{event_type}"] += 1
+        try:
+            await self._emit(category, event_type, data)
+        except Exception as e:
+            self.logger.error(f"Error emitting event {category}/{event_type}: {e}")
+
+    async def close(self) -> None:
+        """Émet le reliquat et arrête la tâche de flush"""
+        if self._flusher and not self._flusher.done():
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Événements reçus vs émis, au total et par sujet"""
+        received, emitted = sum(self.received.values()), sum(self.emitted.values())
+        return {
+            "received": received,
+            "emitted": emitted,
+            "coalesced": received - emitted - len(self._pending),
+            "pending": len(self._pending),
+            "topics": {
+                topic: {"received": count, "emitted": self.emitted.get(topic, 0)}
+                for topic, count in sorted(self.received.items())
+            }
+        }
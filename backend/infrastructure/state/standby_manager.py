@@ -0,0 +1,210 @@
+# backend/infrastructure/state/standby_manager.py
+"""
+Veille chaude des plugins - Daemons des sources les plus utilisées laissés démarrés, évincés sous pression mémoire / CPU
+"""
+import asyncio
+import logging
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from backend.domain.audio_state import AudioSource
+
+Routing = Tuple[bool, bool]  # (multiroom_enabled, equalizer_enabled) au moment de la mise en veille
+
+
+@dataclass
+class WarmDaemon:
+    """Plugin en veille chaude et dernières mesures de ses services"""
+    plugin: Any
+    routing: Routing
+    since: float
+    memory: Optional[int] = None  # Octets
+    cpu_percent: Optional[float] = None
+    _cpu_sample: Optional[Tuple[float, int]] = field(default=None, repr=False)  # (instant, CPUUsageNSec)
+
+
+class StandbyManager:
+    """Garde en veille chaude les N sources les plus utilisées (historique des activations),
+    dans un budget mémoire ; évince la moins utilisée sous pression"""
+
+    MAX_WARM = 2
+    HISTORY_SIZE = 50  # Activations prises en compte pour le classement
+    MEMORY_BUDGET_MB = 150  # Mémoire cumulée des daemons en veille
+    MIN_AVAILABLE_MB = 100  # MemAvailable en dessous duquel plus rien n'est gardé en veille
+    MAX_CPU_PERCENT = 5.0  # Un daemon en veille doit être inactif
+    CHECK_INTERVAL = 30.0
+
+    def __init__(self, lock: Optional[asyncio.Lock] = None, routing: Optional[Callable[[], Routing]] = None):
+        self.history: Deque[AudioSource] = deque(maxlen=self.HISTORY_SIZE)
+        self.warm: Dict[AudioSource, WarmDaemon] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions: Counter = Counter()
+        self._lock = lock or asyncio.Lock()  # Verrou des transitions : pas d'éviction pendant un démarrage
+        self._routing = routing  # Routage ALSA courant, pour évincer les daemons devenus obsolètes
+        self._monitor: Optional[asyncio.Task] = None
+        self.logger = logging.getLogger(__name__)
+
+    def ranking(self) -> List[AudioSource]:
+        """Sources par fréquence d'activation, la plus récente en cas d'égalité"""
+        counts = Counter(self.history)
+        last_use = {source: index for index, source in enumerate(self.history)}
+        return sorted(counts, key=lambda source: (counts[source], last_use[source]), reverse=True)
+
+    def record_use(self, source: AudioSource) -> None:
+        """Activation d'une source (fin de transition réussie)"""
+        self.history.append(source)
+
+    async def release(self, source: AudioSource, plugin: Any, routing: Routing) -> bool:
+        """Quitte une source : veille chaude si elle est parmi les plus utilisées, arrêt sinon.
+        Retourne True si le plugin est en veille (appelé sous le verrou des transitions)"""
+        if self._keeps_warm(source, plugin) and await plugin.enter_standby():
+            self.warm[source] = WarmDaemon(plugin, routing, asyncio.get_running_loop().time())
+            self.logger.info("🔥 %s kept warm (%d warm)", source.value, len(self.warm))
+            await self._enforce_limits()
+            self._ensure_monitor()
+            return source in self.warm
+
+        await plugin.stop()
+        return False
+
+    async def claim(self, source: AudioSource, routing: Routing) -> None:
+        """Source sur le point de démarrer : sort de la veille, arrêt d'abord si le routage a changé depuis"""
+        daemon = self.warm.pop(source, None)
+        if daemon is None:
+            self.misses += 1
+            return
+        if daemon.routing != routing:
+            # Le daemon tourne encore avec l'ancien périphérique ALSA (MILO_MODE / MILO_EQUALIZER)
+            await self._stop(source, daemon, "routing")
+            self.misses += 1
+            return
+        self.hits += 1
+
+    def clear(self) -> None:
+        """Oublie les daemons en veille (arrêt d'urgence : tous les plugins ont été arrêtés)"""
+        for daemon in self.warm.values():
+            daemon.plugin.in_standby = False
+        self.warm.clear()
+
+    def _keeps_warm(self, source: AudioSource, plugin: Any) -> bool:
+        if getattr(plugin, "SUPPORTS_STANDBY", False) is not True:
+            return False
+        if source not in self.ranking()[:self.MAX_WARM]:
+            return False
+        available = self._available_memory_mb()
+        return available is None or available >= self.MIN_AVAILABLE_MB
+
+    async def _enforce_limits(self, routing: Optional[Routing] = None) -> None:
+        """Évince (la moins utilisée d'abord) au-delà de MAX_WARM, du budget mémoire ou d'un usage CPU anormal"""
+        if routing is not None:
+            for source, daemon in list(self.warm.items()):
+                if daemon.routing != routing:
+                    await self._stop(source, daemon, "routing")
+
+        await self._measure()
+        for source, daemon in list(self.warm.items()):
+            if daemon.cpu_percent is not None and daemon.cpu_percent > self.MAX_CPU_PERCENT:
+                await self._stop(source, daemon, "cpu")
+
+        while self.warm:
+            reason = self._pressure()
+            if reason is None:
+                break
+            source = self._least_used()
+            await self._stop(source, self.warm[source], reason)
+
+    def _pressure(self) -> Optional[str]:
+        if len(self.warm) > self.MAX_WARM:
+            return "count"
+        memory = sum(daemon.memory or 0 for daemon in self.warm.values())
+        if memory > self.MEMORY_BUDGET_MB * 1024 * 1024:
+            return "memory_budget"
+        available = self._available_memory_mb()
+        if available is not None and available < self.MIN_AVAILABLE_MB:
+            return "memory_pressure"
+        return None
+
+    def _least_used(self) -> AudioSource:
+        rank = {source: index for index, source in enumerate(self.ranking())}
+        return max(self.warm, key=lambda source: rank.get(source, len(rank)))
+
+    async def _measure(self) -> None:
+        """Mémoire et CPU des services de chaque daemon en veille (systemd MemoryCurrent / CPUUsageNSec)"""
+        now = asyncio.get_running_loop().time()
+        for daemon in self.warm.values():
+            memory, cpu_nsec = 0, 0
+            measured = False
+            for service in daemon.plugin.standby_services():
+                usage = await daemon.plugin.service_manager.get_resource_usage(service)
+                if usage.get("memory") is not None:
+                    memory += usage["memory"]
+                    measured = True
+                cpu_nsec += usage.get("cpu_nsec") or 0
+            daemon.memory = memory if measured else None
+
+            if daemon._cpu_sample is not None and cpu_nsec:
+                elapsed = now - daemon._cpu_sample[0]
+                if elapsed > 0:
+                    daemon.cpu_percent = round((cpu_nsec - daemon._cpu_sample[1]) / (elapsed * 1e9) * 100, 1)
+            daemon._cpu_sample = (now, cpu_nsec)
+
+    async def _stop(self, source: AudioSource, daemon: WarmDaemon, reason: str) -> None:
+        self.warm.pop(source, None)
+        self.evictions[reason] += 1
+        self.logger.info("❄️ Evicting warm %s (%s)", source.value, reason)
+        try:
+            await daemon.plugin.stop()
+        except Exception as e:
+            self.logger.error(f"Error stopping warm {source.value}: {e}")
+        daemon.plugin.in_standby = False
+
+    @staticmethod
+    def _available_memory_mb() -> Optional[float]:
+        try:
+            with open("/proc/meminfo") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        return int(line.split()[1]) / 1024
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _ensure_monitor(self) -> None:
+        if self._monitor is None or self._monitor.done():
+            self._monitor = asyncio.create_task(self._run_monitor())
+
+    async def _run_monitor(self) -> None:
+        """Contrôle périodique tant qu'un daemon est en veille"""
+        while self.warm:
+            await asyncio.sleep(self.CHECK_INTERVAL)
+            try:
+                async with self._lock:
+                    await self._enforce_limits(self._routing() if self._routing else None)
+            except Exception as e:
+                self.logger.error(f"Warm standby check failed: {e}")
+
+    async def close(self) -> None:
+        if self._monitor:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "warm": {
+                source.value: {
+                    "memory_mb": round(daemon.memory / 1024 / 1024, 1) if daemon.memory is not None else None,
+                    "cpu_percent": daemon.cpu_percent
+                }
+                for source, daemon in self.warm.items()
+            },
+            "ranking": [source.value for source in self.ranking()],
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": dict(self.evictions),
+            "available_memory_mb": self._available_memory_mb()
+        }
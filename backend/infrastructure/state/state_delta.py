@@ -0,0 +1,81 @@
+# backend/infrastructure/state/state_delta.py
+"""
+État versionné pour le protocole WebSocket v2 - Numéro de séquence et deltas façon JSON Patch (RFC 6902)
+"""
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+PatchOp = Dict[str, Any]
+
+
+def _escape(key: str) -> str:
+    """Segment de chemin JSON Pointer (RFC 6901)"""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(segment: str) -> str:
+    return segment.replace("~1", "/").replace("~0", "~")
+
+
+def _same(old: Any, new: Any) -> bool:
+    # True == 1 en Python : le type compte pour le client JS
+    return type(old) is type(new) and old == new
+
+
+def diff_state(old: Dict[str, Any], new: Dict[str, Any], path: str = "") -> List[PatchOp]:
+    """Opérations add/remove/replace transformant old en new (les dicts sont comparés récursivement, les listes en bloc)"""
+    ops: List[PatchOp] = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+
+    for key, value in new.items():
+        key_path = f"{path}/{_escape(key)}"
+        if key not in old:
+            ops.append({"op": "add", "path": key_path, "value": value})
+        elif isinstance(old[key], dict) and isinstance(value, dict):
+            ops.extend(diff_state(old[key], value, key_path))
+        elif not _same(old[key], value):
+            ops.append({"op": "replace", "path": key_path, "value": value})
+    return ops
+
+
+def apply_patch(document: Dict[str, Any], ops: List[PatchOp]) -> Dict[str, Any]:
+    """Applique des opérations sans modifier document (copie des seuls dicts traversés)"""
+    result = dict(document)
+    for op in ops:
+        segments = [_unescape(s) for s in op["path"].split("/")[1:]]
+        parent = result
+        for segment in segments[:-1]:
+            parent[segment] = dict(parent[segment])
+            parent = parent[segment]
+
+        if op["op"] == "remove":
+            parent.pop(segments[-1], None)
+        else:
+            parent[segments[-1]] = op["value"]
+    return result
+
+
+class VersionedState:
+    """Dernier état diffusé et numéro de séquence, incrémenté à chaque changement effectif"""
+
+    def __init__(self):
+        self.seq = 0
+        self._snapshot: Dict[str, Any] = {}
+
+    def update(self, state: Dict[str, Any]) -> Optional[List[PatchOp]]:
+        """Enregistre l'état courant ; retourne le delta (None si rien n'a changé)"""
+        # Copie profonde : les métadonnées du SystemAudioState sont modifiées sur place,
+        # les valeurs des opérations doivent rester figées jusqu'à leur envoi
+        state = copy.deepcopy(state)
+        ops = diff_state(self._snapshot, state)
+        if not ops:
+            return None
+        self._snapshot = state
+        self.seq += 1
+        return ops
+
+    def snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        """Séquence et copie de l'état complet (envoyé à la connexion et aux resync)"""
+        return self.seq, copy.deepcopy(self._snapshot)
@@ -1,6 +1,9 @@
 # backend/infrastructure/state/state_machine.py
 """
 Machine à états unifiée avec buffering des updates pendant transitions
+
+Mutations synchrones (sans await, donc atomiques sur la boucle asyncio) et diffusion découplée :
+les événements passent par une file de commandes consommée par une tâche unique (acteur)
 """
 import asyncio
 import time
@@ -9,6 +12,10 @@ from collections import deque
 import logging
 from backend.domain.audio_state import AudioSource, PluginState, SystemAudioState
 from backend.application.interfaces.audio_source import AudioSourcePlugin
+from backend.infrastructure.state.event_scheduler import EventScheduler
+from backend.infrastructure.state.state_delta import VersionedState
+from backend.infrastructure.state.standby_manager import StandbyManager
+from backend.infrastructure.state.transition_planner import TransitionPlan, TransitionPlanner, TransitionTiming
 
 class UnifiedAudioStateMachine:
     """
@@ -31,8 +38,6 @@ class UnifiedAudioStateMachine:
         }
         self.logger = logging.getLogger(__name__)
         self._transition_lock = asyncio.Lock()
-        self._state_lock = asyncio.Lock()  # Lock pour protéger system_state
-        self._buffer_lock = asyncio.Lock()  # Lock pour protéger _buffered_updates
 
         # NOUVEAU: Queue FIFO pour buffer les updates pendant les transitions
         self._buffered_updates: deque[Tuple[AudioSource, PluginState, Optional[Dict[str, Any]]]] = deque(maxlen=self.MAX_BUFFERED_UPDATES)
@@ -40,6 +45,22 @@ class UnifiedAudioStateMachine:
         # Cache pour to_dict()
         self._state_cache: Optional[Dict[str, Any]] = None
 
+        # Dernier état diffusé et séquence (deltas du protocole WebSocket v2)
+        self.versioned_state = VersionedState()
+
+        # Coalescence et débit par sujet des événements diffusés
+        self.event_scheduler = EventScheduler(self._emit_event)
+
+        # Déroulé des transitions (recouvrement arrêt / démarrage) et durées par phase
+        self.transition_planner = TransitionPlanner()
+
+        # Veille chaude des sources les plus utilisées (évite le démarrage à froid au retour)
+        self.standby_manager = StandbyManager(self._transition_lock, self._routing)
+
+        # Acteur de diffusion : file de commandes à consommateur unique, les appelants n'attendent jamais l'envoi
+        self._commands: asyncio.Queue = asyncio.Queue()
+        self._actor: Optional[asyncio.Task] = None
+
     
     def _sync_routing_state(self) -> None:
         """
@@ -81,6 +102,31 @@ class UnifiedAudioStateMachine:
             self._sync_routing_state()
         return self.system_state.to_dict()
     
+    @property
+    def state_changed_since_broadcast(self) -> bool:
+        """Mutation pas encore prise en compte par la séquence d'état (diffusion en file)"""
+        return self._state_cache is None
+
+    async def get_state_snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        """État complet et séquence des deltas (connexion et resync WebSocket v2)"""
+        if self._state_cache is None:
+            self._state_cache = self.system_state.to_dict()
+        # Changement pas encore diffusé (événement en file) : son delta part tout de suite en state_sync,
+        # la séquence des autres clients reste continue et l'événement en file n'aura plus de delta
+        state_patch = self.versioned_state.update(self._state_cache)
+        snapshot = self.versioned_state.snapshot()
+        if state_patch and self.websocket_handler:
+            await self.websocket_handler.handle_event({
+                "category": "system",
+                "type": "state_sync",
+                "source": "system",
+                "data": {"full_state": self._state_cache},
+                "timestamp": time.time(),
+                "state_seq": snapshot[0],
+                "state_patch": state_patch
+            })
+        return snapshot
+
     async def transition_to_source(self, target_source: AudioSource) -> bool:
         """Effectue une transition vers une nouvelle source avec timeout"""
         async with self._transition_lock:
@@ -105,73 +151,73 @@ class UnifiedAudioStateMachine:
                 self.logger.error(f"No plugin registered for source: {target_source.value}")
                 return False
 
+            plan = self.transition_planner.plan(self.system_state, target_source)
+            timing = self.transition_planner.begin(plan)
+
             try:
                 # Appliquer le timeout sur toute la transition
                 async with asyncio.timeout(self.TRANSITION_TIMEOUT):
                     self.logger.debug("Setting transition state")
-                    async with self._state_lock:
-                        from_source = self.system_state.active_source.value
-                        self.system_state.transitioning = True
-                        self.system_state.target_source = target_source
-                        self._state_cache = None  # Invalider le cache
+                    from_source = self.system_state.active_source.value
+                    self.system_state.transitioning = True
+                    self.system_state.target_source = target_source
+                    self._state_cache = None  # Invalider le cache
 
                     self.logger.debug("Broadcasting transition start")
-                    await self._broadcast_event("system", "transition_start", {
+                    self._publish("system", "transition_start", {
                         "from_source": from_source,
                         "to_source": target_source.value,
                         "source": "system"
                     })
 
-                    self.logger.debug("Stopping current source")
-                    await self._stop_current_source()
-
                     if target_source != AudioSource.NONE:
-                        self.logger.debug("Starting new source: %s", target_source.value)
-                        success = await self._start_new_source(target_source)
+                        self.logger.debug("Switching source (%s): %s", plan.reason, target_source.value)
+                        success = await timing.measure("switch", self._switch_source(plan, timing))
                         self.logger.debug("Start new source result: %s", success)
                         if not success:
                             raise ValueError(f"Failed to start {target_source.value}")
                     else:
+                        self.logger.debug("Stopping current source")
+                        if await timing.measure("stop", self._stop_plugin(plan.from_source)):
+                            self._mark_stopped()
                         self.logger.debug("Setting to NONE")
-                        async with self._state_lock:
-                            self.system_state.active_source = AudioSource.NONE
-                            self.system_state.plugin_state = PluginState.INACTIVE
-                            self.system_state.metadata = {}
+                        self.system_state.active_source = AudioSource.NONE
+                        self.system_state.plugin_state = PluginState.INACTIVE
+                        self.system_state.metadata = {}
 
                     self.logger.debug("Resetting transition state")
-                    async with self._state_lock:
-                        self.system_state.transitioning = False
-                        self.system_state.target_source = None
-                        self._state_cache = None  # Invalider le cache
-                        final_source = self.system_state.active_source.value
-                        final_state = self.system_state.plugin_state.value
+                    self.system_state.transitioning = False
+                    self.system_state.target_source = None
+                    self._state_cache = None  # Invalider le cache
+                    final_source = self.system_state.active_source.value
+                    final_state = self.system_state.plugin_state.value
 
                     # NOUVEAU: Rejouer les updates bufferisés
-                    await self._replay_buffered_updates()
+                    self._replay_buffered_updates()
 
                     self.logger.debug("Broadcasting transition complete")
-                    await self._broadcast_event("system", "transition_complete", {
+                    self._publish("system", "transition_complete", {
                         "active_source": final_source,
                         "plugin_state": final_state,
                         "source": "system"
                     })
 
                     self.logger.info("Transition completed successfully: %s", target_source.value)
+                    timing.success = True
                     return True
 
             except asyncio.TimeoutError:
                 self.logger.error("Transition timeout after %s seconds", self.TRANSITION_TIMEOUT)
-                async with self._state_lock:
-                    self.system_state.transitioning = False
-                    self.system_state.target_source = None
-                    self.system_state.error = "Transition timeout"
-                    self._state_cache = None  # Invalider le cache
+                self.system_state.transitioning = False
+                self.system_state.target_source = None
+                self.system_state.error = "Transition timeout"
+                self._state_cache = None  # Invalider le cache
 
                 # Vider la queue des updates bufferisés (obsolètes après un échec)
-                await self._clear_buffered_updates()
+                self._clear_buffered_updates()
 
                 await self._emergency_stop()
-                await self._broadcast_event("system", "error", {
+                self._publish("system", "error", {
                     "error": "timeout",
                     "message": f"Transition timeout after {self.TRANSITION_TIMEOUT}s",
                     "attempted_source": target_source.value,
@@ -181,35 +227,44 @@ class UnifiedAudioStateMachine:
 
             except Exception as e:
                 self.logger.error("Transition error: %s", str(e))
-                async with self._state_lock:
-                    self.system_state.transitioning = False
-                    self.system_state.target_source = None
-                    self.system_state.error = str(e)
-                    self._state_cache = None  # Invalider le cache
+                self.system_state.transitioning = False
+                self.system_state.target_source = None
+                self.system_state.error = str(e)
+                self._state_cache = None  # Invalider le cache
 
                 # Vider la queue des updates bufferisés (obsolètes après un échec)
-                await self._clear_buffered_updates()
+                self._clear_buffered_updates()
 
                 await self._emergency_stop()
-                await self._broadcast_event("system", "error", {
+                self._publish("system", "error", {
                     "error": str(e),
                     "attempted_source": target_source.value,
                     "source": "system"
                 })
                 return False
+
+            finally:
+                timing.finish()
+                self.transition_planner.record(timing)
+                self.logger.info(
+                    "⏱️ Transition %s -> %s (%s): %s",
+                    timing.from_source, timing.to_source, plan.reason,
+                    ", ".join(f"{phase} {ms:.0f}ms" for phase, ms in timing.phases.items())
+                )
     
     async def update_plugin_state(self, source: AudioSource, new_state: PluginState,
                                metadata: Optional[Dict[str, Any]] = None) -> None:
         """
-        Met à jour l'état d'un plugin avec protection thread-safe et buffering pendant transitions
+        Met à jour l'état d'un plugin avec buffering pendant transitions
 
         NOUVEAU: Les updates qui arrivent pendant une transition sont maintenant bufferisés
         et rejoués après la transition au lieu d'être ignorés.
+
+        Retourne sans attendre la diffusion (callbacks des plugins non bloqués par un client lent)
         """
-        # CRITIQUE: Lecture thread-safe de active_source et transitioning
-        async with self._state_lock:
-            current_active_source = self.system_state.active_source
-            is_transitioning = self.system_state.transitioning
+        # Lecture et mutation sans await : atomiques vis-à-vis des autres tâches
+        current_active_source = self.system_state.active_source
+        is_transitioning = self.system_state.transitioning
 
         if source != current_active_source:
             self.logger.warning("Ignoring state update from inactive source: %s", source.value)
@@ -217,46 +272,44 @@ class UnifiedAudioStateMachine:
 
         # NOUVEAU: Buffer les updates pendant les transitions au lieu de les ignorer
         if is_transitioning:
-            async with self._buffer_lock:
-                queue_size = len(self._buffered_updates)
-                self.logger.info(
-                    "🔄 Buffering update during transition: %s -> %s (queue size: %d)",
-                    source.value,
-                    new_state.value,
-                    queue_size
-                )
-                self._buffered_updates.append((source, new_state, metadata))
+            queue_size = len(self._buffered_updates)
+            self.logger.info(
+                "🔄 Buffering update during transition: %s -> %s (queue size: %d)",
+                source.value,
+                new_state.value,
+                queue_size
+            )
+            self._buffered_updates.append((source, new_state, metadata))
 
-                # Log warning si la queue est presque pleine (60% au lieu de 80%)
-                if len(self._buffered_updates) > self.MAX_BUFFERED_UPDATES * 0.6:
-                    self.logger.warning(
-                        "⚠️ Buffered updates queue is %d%% full",
-                        int(len(self._buffered_updates) / self.MAX_BUFFERED_UPDATES * 100)
-                    )
+            # Log warning si la queue est presque pleine (60% au lieu de 80%)
+            if len(self._buffered_updates) > self.MAX_BUFFERED_UPDATES * 0.6:
+                self.logger.warning(
+                    "⚠️ Buffered updates queue is %d%% full",
+                    int(len(self._buffered_updates) / self.MAX_BUFFERED_UPDATES * 100)
+                )
             return
 
         # Appliquer l'update normalement
-        await self._apply_plugin_state_update(source, new_state, metadata)
+        self._apply_plugin_state_update(source, new_state, metadata)
 
-    async def _apply_plugin_state_update(self, source: AudioSource, new_state: PluginState,
-                                         metadata: Optional[Dict[str, Any]] = None) -> None:
+    def _apply_plugin_state_update(self, source: AudioSource, new_state: PluginState,
+                                   metadata: Optional[Dict[str, Any]] = None) -> None:
         """Applique une mise à jour d'état de plugin (méthode interne)"""
-        async with self._state_lock:
-            old_state = self.system_state.plugin_state
-            self.system_state.plugin_state = new_state
+        old_state = self.system_state.plugin_state
+        self.system_state.plugin_state = new_state
 
-            if metadata:
-                self.system_state.metadata.update(metadata)
+        if metadata:
+            self.system_state.metadata.update(metadata)
 
-            if new_state == PluginState.ERROR:
-                self.system_state.error = metadata.get("error") if metadata else "Unknown error"
-            else:
-                self.system_state.error = None
+        if new_state == PluginState.ERROR:
+            self.system_state.error = metadata.get("error") if metadata else "Unknown error"
+        else:
+            self.system_state.error = None
 
-            # Invalider le cache
-            self._state_cache = None
+        # Invalider le cache
+        self._state_cache = None
 
-        await self._broadcast_event("plugin", "state_changed", {
+        self._publish("plugin", "state_changed", {
             "source": source.value,
             "old_state": old_state.value,
             "new_state": new_state.value,
@@ -264,13 +317,12 @@ class UnifiedAudioStateMachine:
         })
     
     async def update_multiroom_state(self, enabled: bool) -> None:
-        """Met à jour l'état multiroom dans l'état système avec protection thread-safe"""
-        async with self._state_lock:
-            old_state = self.system_state.multiroom_enabled
-            self.system_state.multiroom_enabled = enabled
-            self._state_cache = None  # Invalider le cache
+        """Met à jour l'état multiroom dans l'état système"""
+        old_state = self.system_state.multiroom_enabled
+        self.system_state.multiroom_enabled = enabled
+        self._state_cache = None  # Invalider le cache
 
-        await self._broadcast_event("system", "state_changed", {
+        self._publish("system", "state_changed", {
             "old_state": old_state,
             "new_state": enabled,
             "multiroom_changed": True,
@@ -279,35 +331,63 @@ class UnifiedAudioStateMachine:
         })
     
     async def update_equalizer_state(self, enabled: bool) -> None:
-        """Met à jour l'état de l'equalizer dans l'état système avec protection thread-safe"""
-        async with self._state_lock:
-            old_state = self.system_state.equalizer_enabled
-            self.system_state.equalizer_enabled = enabled
-            self._state_cache = None  # Invalider le cache
+        """Met à jour l'état de l'equalizer dans l'état système"""
+        old_state = self.system_state.equalizer_enabled
+        self.system_state.equalizer_enabled = enabled
+        self._state_cache = None  # Invalider le cache
 
-        await self._broadcast_event("system", "state_changed", {
+        self._publish("system", "state_changed", {
             "old_state": old_state,
             "new_state": enabled,
             "equalizer_changed": True,
             "source": "equalizer"
         })
     
-    async def _stop_current_source(self) -> None:
-        """Arrête la source actuellement active avec protection thread-safe"""
-        if self.system_state.active_source != AudioSource.NONE:
-            current_plugin = self.plugins.get(self.system_state.active_source)
-            if current_plugin:
-                try:
-                    await current_plugin.stop()
-                    async with self._state_lock:
-                        self.system_state.plugin_state = PluginState.INACTIVE
-                        self.system_state.metadata = {}
-                        self._state_cache = None  # Invalider le cache
-                except Exception as e:
-                    self.logger.error(f"Error stopping {self.system_state.active_source.value}: {e}")
-    
-    async def _start_new_source(self, source: AudioSource) -> bool:
-        """Démarre une nouvelle source avec protection thread-safe"""
+    async def _switch_source(self, plan: TransitionPlan, timing: TransitionTiming) -> bool:
+        """Arrête l'ancienne source et démarre la nouvelle, en parallèle quand le plan le permet"""
+        if plan.overlap:
+            stopped, started = await asyncio.gather(
+                timing.measure("stop", self._stop_plugin(plan.from_source)),
+                timing.measure("start", self._start_plugin(plan.to_source))
+            )
+        else:
+            # L'initialisation ne touche pas au périphérique audio : toujours recouverte avec l'arrêt
+            stopped, prepared = await asyncio.gather(
+                timing.measure("stop", self._stop_plugin(plan.from_source)),
+                timing.measure("prepare", self._prepare_plugin(plan.to_source))
+            )
+            started = prepared and await timing.measure("start", self._start_plugin(plan.to_source))
+
+        # Mutations appliquées après les deux opérations, dans l'ordre d'une transition séquentielle
+        if stopped:
+            self._mark_stopped()
+        if started:
+            self._activate_source(plan.to_source)
+        return started
+
+    async def _stop_plugin(self, source: AudioSource) -> bool:
+        """Arrête le plugin d'une source (sans toucher à l'état) ; False en cas d'erreur"""
+        plugin = self.plugins.get(source) if source != AudioSource.NONE else None
+        if not plugin:
+            return False
+        try:
+            await self.standby_manager.release(source, plugin, self._routing())
+            return True
+        except Exception as e:
+            self.logger.error(f"Error stopping {source.value}: {e}")
+            return False
+
+    def _routing(self) -> Tuple[bool, bool]:
+        """Routage ALSA courant (périphérique utilisé par les daemons démarrés maintenant)"""
+        return (self.system_state.multiroom_enabled, self.system_state.equalizer_enabled)
+
+    def _mark_stopped(self) -> None:
+        self.system_state.plugin_state = PluginState.INACTIVE
+        self.system_state.metadata = {}
+        self._state_cache = None  # Invalider le cache
+
+    async def _prepare_plugin(self, source: AudioSource) -> bool:
+        """Initialise le plugin d'une source si nécessaire"""
         plugin = self.plugins.get(source)
         if not plugin:
             return False
@@ -319,114 +399,151 @@ class UnifiedAudioStateMachine:
                 else:
                     self.logger.error("Failed to initialize plugin: %s", source.value)
                     return False
+            return True
+        except Exception as e:
+            self.logger.error("Error initializing %s: %s", source.value, e)
+            return False
 
-            success = await plugin.start()
-            if success:
-                async with self._state_lock:
-                    self.system_state.active_source = source
-
-                    # Force l'état à READY si le plugin n'a pas notifié
-                    if self.system_state.plugin_state == PluginState.INACTIVE:
-                        self.system_state.plugin_state = PluginState.READY
-
-                    # Invalider le cache
-                    self._state_cache = None
-
-                self.logger.info("Active source changed to: %s", source.value)
-                return True
-            else:
-                return False
-
+    async def _start_plugin(self, source: AudioSource) -> bool:
+        """Démarre le plugin d'une source (sans toucher à l'état)"""
+        if not await self._prepare_plugin(source):
+            return False
+        try:
+            await self.standby_manager.claim(source, self._routing())
+            return bool(await self.plugins[source].start())
         except Exception as e:
             self.logger.error("Error starting %s: %s", source.value, e)
             return False
+
+    def _activate_source(self, source: AudioSource) -> None:
+        self.system_state.active_source = source
+        self.standby_manager.record_use(source)
+
+        # Force l'état à READY si le plugin n'a pas notifié
+        if self.system_state.plugin_state == PluginState.INACTIVE:
+            self.system_state.plugin_state = PluginState.READY
+
+        # Invalider le cache
+        self._state_cache = None
+        self.logger.info("Active source changed to: %s", source.value)
     
     async def _emergency_stop(self) -> None:
-        """Arrêt d'urgence - arrête tous les processus avec protection thread-safe"""
+        """Arrêt d'urgence - arrête tous les processus"""
         for plugin in self.plugins.values():
             if plugin:
                 try:
                     await plugin.stop()
                 except Exception as e:
                     self.logger.error(f"Emergency stop error: {e}")
+        self.standby_manager.clear()
 
-        async with self._state_lock:
-            self.system_state.active_source = AudioSource.NONE
-            self.system_state.plugin_state = PluginState.INACTIVE
-            self.system_state.metadata = {}
-            self.system_state.error = None
-            self._state_cache = None  # Invalider le cache
+        self.system_state.active_source = AudioSource.NONE
+        self.system_state.plugin_state = PluginState.INACTIVE
+        self.system_state.metadata = {}
+        self.system_state.error = None
+        self._state_cache = None  # Invalider le cache
 
-    async def _replay_buffered_updates(self) -> None:
+    def _replay_buffered_updates(self) -> None:
         """
         Rejoue les updates bufferisés après une transition
 
         NOUVEAU: Cette méthode est appelée après chaque transition réussie pour
         appliquer les updates qui sont arrivés pendant la transition.
         """
-        async with self._buffer_lock:
-            if not self._buffered_updates:
-                return
-
-            buffered_count = len(self._buffered_updates)
-            self.logger.info("📤 Replaying %d buffered update(s) after transition", buffered_count)
-
-            # Traiter tous les updates bufferisés dans l'ordre FIFO
-            while self._buffered_updates:
-                source, new_state, metadata = self._buffered_updates.popleft()
-
-                # Vérifier que la source est toujours active
-                async with self._state_lock:
-                    current_active_source = self.system_state.active_source
-
-                if source == current_active_source:
-                    try:
-                        await self._apply_plugin_state_update(source, new_state, metadata)
-                        self.logger.debug(
-                            "✅ Replayed buffered update: %s -> %s",
-                            source.value,
-                            new_state.value
-                        )
-                    except Exception as e:
-                        self.logger.error(
-                            "❌ Failed to replay buffered update: %s -> %s: %s",
-                            source.value,
-                            new_state.value,
-                            e
-                        )
-                else:
+        if not self._buffered_updates:
+            return
+
+        buffered_count = len(self._buffered_updates)
+        self.logger.info("📤 Replaying %d buffered update(s) after transition", buffered_count)
+
+        # Traiter tous les updates bufferisés dans l'ordre FIFO
+        while self._buffered_updates:
+            source, new_state, metadata = self._buffered_updates.popleft()
+
+            # Vérifier que la source est toujours active
+            if source == self.system_state.active_source:
+                try:
+                    self._apply_plugin_state_update(source, new_state, metadata)
                     self.logger.debug(
-                        "⏭️ Skipping buffered update from inactive source: %s",
-                        source.value
+                        "✅ Replayed buffered update: %s -> %s",
+                        source.value,
+                        new_state.value
+                    )
+                except Exception as e:
+                    self.logger.error(
+                        "❌ Failed to replay buffered update: %s -> %s: %s",
+                        source.value,
+                        new_state.value,
+                        e
                     )
+            else:
+                self.logger.debug(
+                    "⏭️ Skipping buffered update from inactive source: %s",
+                    source.value
+                )
 
         self.logger.info("✅ Finished replaying buffered updates")
 
-    async def _clear_buffered_updates(self) -> None:
+    def _clear_buffered_updates(self) -> None:
         """Vide la queue des updates bufferisés"""
-        async with self._buffer_lock:
-            if self._buffered_updates:
-                discarded_count = len(self._buffered_updates)
-                self._buffered_updates.clear()
-                self.logger.warning(
-                    "🗑️ Cleared %d buffered update(s) after transition failure",
-                    discarded_count
-                )
+        if self._buffered_updates:
+            discarded_count = len(self._buffered_updates)
+            self._buffered_updates.clear()
+            self.logger.warning(
+                "🗑️ Cleared %d buffered update(s) after transition failure",
+                discarded_count
+            )
     
     async def broadcast_event(self, category: str, event_type: str, data: Dict[str, Any]) -> None:
         """Publie un événement directement au WebSocket - Méthode publique pour les routes"""
-        await self._broadcast_event(category, event_type, data)
+        self._publish(category, event_type, data)
     
-    async def _broadcast_event(self, category: str, event_type: str, data: Dict[str, Any]) -> None:
-        """Publie un événement directement au WebSocket avec cache optimisé"""
+    def _publish(self, category: str, event_type: str, data: Dict[str, Any]) -> None:
+        """Met un événement dans la file de l'acteur de diffusion, sans attendre"""
         if not self.websocket_handler:
             return
-
-        # Utiliser le cache si disponible, sinon recalculer
-        async with self._state_lock:
-            if self._state_cache is None:
-                self._state_cache = self.system_state.to_dict()
-            current_state = self._state_cache
+        if self._actor is None or self._actor.done():
+            self._actor = asyncio.create_task(self._run_actor())
+        self._commands.put_nowait((category, event_type, data))
+
+    async def _run_actor(self) -> None:
+        """Consommateur unique : transmet les événements à l'ordonnanceur dans l'ordre de publication"""
+        while True:
+            category, event_type, data = await self._commands.get()
+            try:
+                await self.event_scheduler.submit(category, event_type, data)
+            except Exception as e:
+                self.logger.error(f"Event dispatch failed ({category}/{event_type}): {e}")
+            finally:
+                self._commands.task_done()
+
+    async def flush_events(self) -> None:
+        """Attend la diffusion de tous les événements publiés, y compris ceux retenus par l'ordonnanceur"""
+        await self._commands.join()
+        await self.event_scheduler.flush()
+
+    async def close(self) -> None:
+        """Diffuse les événements restants puis arrête l'acteur (arrêt de l'application)"""
+        await self._commands.join()
+        if self._actor:
+            self._actor.cancel()
+            try:
+                await self._actor
+            except asyncio.CancelledError:
+                pass
+            self._actor = None
+        await self.standby_manager.close()
+        await self.event_scheduler.close()
+
+    async def _emit_event(self, category: str, event_type: str, data: Dict[str, Any]) -> None:
+        """Émet un événement au WebSocket avec cache optimisé ; état, delta et séquence pris à l'émission"""
+
+        # Utiliser le cache si disponible, sinon recalculer ; delta et séquence calculés sans await intermédiaire
+        if self._state_cache is None:
+            self._state_cache = self.system_state.to_dict()
+        current_state = self._state_cache
+        state_patch = self.versioned_state.update(current_state)
+        state_seq = self.versioned_state.seq
 
         self.logger.debug(
             "BROADCAST: %s/%s | active_source:%s, plugin_state:%s, transitioning:%s, target_source:%s",
@@ -443,7 +560,10 @@ class UnifiedAudioStateMachine:
             "type": event_type,
             "source": data.get("source", category),
             "data": {**data, "full_state": current_state},
-            "timestamp": time.time()
+            "timestamp": time.time(),
+            "state_seq": state_seq
         }
+        if state_patch:
+            event_data["state_patch"] = state_patch
 
         await self.websocket_handler.handle_event(event_data)
\ No newline at end of file
@@ -0,0 +1,95 @@
+# backend/infrastructure/state/transition_planner.py
+"""
+Planification des transitions de source - Arrêt et démarrage en parallèle quand le périphérique ALSA le permet
+"""
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Deque, Dict, TypeVar
+from backend.domain.audio_state import AudioSource, SystemAudioState
+
+T = TypeVar("T")
+
+
+@dataclass
+class TransitionPlan:
+    """Déroulé d'une transition : overlap = arrêt de l'ancienne source pendant le démarrage de la nouvelle"""
+    from_source: AudioSource
+    to_source: AudioSource
+    overlap: bool
+    reason: str
+
+
+@dataclass
+class TransitionTiming:
+    """Durées par phase d'une transition (ms) : prepare, stop, start, switch, total"""
+    from_source: str
+    to_source: str
+    overlapped: bool
+    phases: Dict[str, float] = field(default_factory=dict)
+    success: bool = False
+    timestamp: float = field(default_factory=time.time)
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    async def measure(self, phase: str, awaitable: Awaitable[T]) -> T:
+        """Attend une phase en enregistrant sa durée propre (même si elle tourne en parallèle d'une autre)"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.phases[phase] = round((time.perf_counter() - start) * 1000, 1)
+
+    def finish(self) -> None:
+        self.phases["total"] = round((time.perf_counter() - self._started) * 1000, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "from_source": self.from_source,
+            "to_source": self.to_source,
+            "overlapped": self.overlapped,
+            "success": self.success,
+            "phases": dict(self.phases),
+            "timestamp": self.timestamp
+        }
+
+
+class TransitionPlanner:
+    """Choisit le déroulé d'une transition selon le routage ALSA et garde l'historique des durées"""
+
+    HISTORY_SIZE = 20
+
+    def __init__(self):
+        self.history: Deque[TransitionTiming] = deque(maxlen=self.HISTORY_SIZE)
+
+    def plan(self, state: SystemAudioState, target: AudioSource) -> TransitionPlan:
+        source = state.active_source
+        if AudioSource.NONE in (source, target):
+            return TransitionPlan(source, target, False, "single_source")
+        # Multiroom sans equalizer : chaque source écrit sur son propre sous-périphérique du Loopback
+        if state.multiroom_enabled and not state.equalizer_enabled:
+            return TransitionPlan(source, target, True, "loopback_subdevices")
+        # Direct : DAC en accès exclusif (pas de dmix) ; equalizer : un seul plugin equal partagé
+        reason = "shared_equalizer" if state.equalizer_enabled else "exclusive_device"
+        return TransitionPlan(source, target, False, reason)
+
+    def begin(self, plan: TransitionPlan) -> TransitionTiming:
+        return TransitionTiming(plan.from_source.value, plan.to_source.value, plan.overlap)
+
+    def record(self, timing: TransitionTiming) -> None:
+        self.history.append(timing)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Dernières transitions et moyenne par phase des transitions réussies"""
+        totals: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        for timing in self.history:
+            if not timing.success:
+                continue
+            for phase, duration in timing.phases.items():
+                totals[phase] = totals.get(phase, 0.0) + duration
+                counts[phase] = counts.get(phase, 0) + 1
+
+        return {
+            "transitions": [timing.to_dict() for timing in self.history],
+            "average_ms": {phase: round(totals[phase] / counts[phase], 1) for phase in totals}
+        }
@@ -43,6 +43,9 @@ state_machine = container.audio_state_machine()
 routing_service = container.audio_routing_service()
 snapcast_service = container.snapcast_service()
 snapcast_websocket_service = container.snapcast_websocket_service()
+snapcast_telemetry = container.snapcast_telemetry()
+latency_calibration_service = container.latency_calibration_service()
+satellite_service = container.satellite_service()
 equalizer_service = container.equalizer_service()
 volume_service = container.volume_service()
 rotary_controller = container.rotary_controller()
@@ -85,7 +88,12 @@ async def lifespan(app: FastAPI):
     logger.info("Milo backend shutting down...")
     try:
         await snapcast_websocket_service.cleanup()
+        await snapcast_telemetry.cleanup()
+        await satellite_service.close()
+        await state_machine.close()
+        await ws_manager.close_all()
         await volume_service.cleanup()
+        await snapcast_service.close()
         rotary_controller.cleanup()
         screen_controller.cleanup()
         logger.info("Cleanup completed")
@@ -120,7 +128,9 @@ app.include_router(audio_router)
 routing_router = create_routing_router(routing_service, state_machine)
 app.include_router(routing_router)
 
-snapcast_router = create_snapcast_router(routing_service, snapcast_service, state_machine)
+snapcast_router = create_snapcast_router(
+    routing_service, snapcast_service, state_machine, snapcast_telemetry, latency_calibration_service
+)
 app.include_router(snapcast_router)
 
 equalizer_router = create_equalizer_router(equalizer_service, state_machine)
@@ -158,7 +168,9 @@ app.include_router(settings_router, prefix="/api/settings", tags=["settings"])
 
 dependencies_router = create_dependencies_router(
     ws_manager=container.websocket_manager(),
-    snapcast_service=container.snapcast_service()
+    snapcast_service=container.snapcast_service(),
+    satellite_service=satellite_service,
+    artifact_cache=container.artifact_cache()
 )
 app.include_router(dependencies_router)
 
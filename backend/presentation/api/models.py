@@ -32,6 +32,11 @@ class VolumeAdjustRequest(BaseModel):
     show_bar: bool = Field(default=True)
 
 
+class VolumeMuteRequest(BaseModel):
+    """Requête de soft mute"""
+    muted: bool
+
+
 class SnapcastVolumeRequest(BaseModel):
     """Requête de volume Snapcast"""
     volume: int = Field(..., ge=0, le=100)
@@ -19,6 +19,21 @@ def create_router(state_machine):
         """Récupère l'état actuel du système audio"""
         return await state_machine.get_current_state()
 
+    @router.get("/events/metrics")
+    async def get_event_metrics():
+        """Événements reçus vs émis par l'ordonnanceur (coalescence et débit par sujet)"""
+        return state_machine.event_scheduler.get_metrics()
+
+    @router.get("/transitions/metrics")
+    async def get_transition_metrics():
+        """Durées par phase des dernières transitions de source (arrêt, démarrage, recouvrement)"""
+        return state_machine.transition_planner.get_metrics()
+
+    @router.get("/standby")
+    async def get_standby_status():
+        """Daemons en veille chaude (mémoire, CPU), classement d'usage et évictions"""
+        return state_machine.standby_manager.get_metrics()
+
     @router.post("/source/{source_name}")
     @limiter.limit("20/minute")  # Max 20 changements de source par minute
     async def change_audio_source(request: Request, source_name: str):
@@ -3,18 +3,23 @@
 Routes API pour la gestion des dépendances - Version complète avec satellites
 """
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import FileResponse
 from typing import Dict, Any
 from backend.infrastructure.services.dependency_version_service import DependencyVersionService
 from backend.infrastructure.services.dependency_update_service import DependencyUpdateService
 from backend.infrastructure.services.satellite_dependency_update_service import SatelliteDependencyUpdateService
+from backend.infrastructure.services.snapclient_fleet_update_service import SnapclientFleetUpdateService
+from backend.infrastructure.services.artifact_cache import ArtifactCache, SNAPCAST_ASSET_REGEX, SNAPCAST_RELEASES_URL
 
-def create_dependencies_router(ws_manager, snapcast_service):
+def create_dependencies_router(ws_manager, snapcast_service, satellite_service=None, artifact_cache=None):
     """Router pour les dépendances locales et satellites"""
     router = APIRouter(prefix="/api/dependencies", tags=["dependencies"])
     
+    artifact_cache = artifact_cache or ArtifactCache()
     dependency_service = DependencyVersionService()
-    update_service = DependencyUpdateService()
-    satellite_service = SatelliteDependencyUpdateService(snapcast_service)
+    update_service = DependencyUpdateService(artifact_cache)
+    satellite_service = satellite_service or SatelliteDependencyUpdateService(snapcast_service)
+    fleet_service = SnapclientFleetUpdateService(satellite_service, artifact_cache)
     
     # Store pour suivre les mises à jour en cours
     active_updates = {}
@@ -58,10 +63,10 @@ def create_dependencies_router(ws_manager, snapcast_service):
     # === ROUTES SATELLITES (spécifiques, avant les routes génériques) ===
     
     @router.get("/satellites")
-    async def get_satellites():
-        """Récupère la liste des satellites détectés avec leurs versions"""
+    async def get_satellites(refresh: bool = False):
+        """Récupère la liste des satellites détectés avec leurs versions (cache, refresh=true pour forcer)"""
         try:
-            satellites = await satellite_service.discover_satellites()
+            satellites = await satellite_service.discover_satellites(force=refresh)
             
             # Enrichir avec version disponible et update_available
             latest_version = await satellite_service._get_latest_snapclient_version()
@@ -86,6 +91,89 @@ def create_dependencies_router(ws_manager, snapcast_service):
                 "count": 0
             }
     
+    # === CACHE D'ARTEFACTS (servi aux satellites en LAN, requêtes Range supportées) ===
+    
+    def _artifact_response(path, digest: str, filename: str = None) -> FileResponse:
+        return FileResponse(
+            path,
+            media_type="application/octet-stream",
+            filename=filename,
+            headers={
+                "ETag": f'"{digest}"',
+                "X-Checksum-Sha256": digest,
+                "Cache-Control": "public, max-age=31536000, immutable"
+            }
+        )
+    
+    @router.get("/artifacts/{digest}")
+    async def get_artifact(digest: str):
+        """Blob du cache par son sha256"""
+        path = artifact_cache.get_blob(digest)
+        if not path:
+            raise HTTPException(status_code=404, detail="Artifact not found")
+        return _artifact_response(path, digest)
+    
+    @router.get("/artifacts/snapcast/v{version}/{filename}")
+    async def get_snapcast_artifact(version: str, filename: str):
+        """Asset snapcast par nom : téléchargé depuis GitHub au premier appel puis servi depuis le cache"""
+        if not SNAPCAST_ASSET_REGEX.match(filename) or f"_{version}-" not in filename:
+            raise HTTPException(status_code=404, detail="Unknown snapcast asset")
+        try:
+            entry = await artifact_cache.fetch(f"{SNAPCAST_RELEASES_URL}/v{version}/{filename}", filename)
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=str(e))
+        return _artifact_response(entry["path"], entry["sha256"], filename)
+    
+    @router.post("/satellites/fleet-update")
+    async def update_satellite_fleet(background_tasks: BackgroundTasks, payload: Dict[str, Any] = None):
+        """Lance la mise à jour de tous les satellites (hostnames, version, parallelism, canaries optionnels)"""
+        if fleet_service.running:
+            return {
+                "status": "error",
+                "message": "Fleet update already in progress"
+            }
+        
+        payload = payload or {}
+        
+        async def progress_callback(status: Dict[str, Any]):
+            await ws_manager.broadcast_dict({
+                "category": "dependencies",
+                "type": "satellite_fleet_update_progress",
+                "source": "satellite_fleet_update",
+                "data": status
+            })
+        
+        async def do_update():
+            result = await fleet_service.update_fleet(
+                hostnames=payload.get("hostnames"),
+                version=payload.get("version"),
+                parallelism=payload.get("parallelism"),
+                canaries=payload.get("canaries"),
+                progress_callback=progress_callback
+            )
+            
+            await ws_manager.broadcast_dict({
+                "category": "dependencies",
+                "type": "satellite_fleet_update_complete",
+                "source": "satellite_fleet_update",
+                "data": result
+            })
+        
+        background_tasks.add_task(do_update)
+        
+        return {
+            "status": "success",
+            "message": "Fleet update started"
+        }
+    
+    @router.get("/satellites/fleet-update")
+    async def get_satellite_fleet_update_status():
+        """Progression de la mise à jour de flotte en cours (ou de la dernière)"""
+        return {
+            "status": "success",
+            **fleet_service.get_status()
+        }
+    
     @router.get("/satellites/{hostname}")
     async def get_satellite_status(hostname: str):
         """Récupère le statut d'un satellite spécifique"""
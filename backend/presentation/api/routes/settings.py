@@ -246,6 +246,28 @@ def create_settings_router(
             reload_callback=volume_service.reload_rotary_steps_config
         )
     
+    # Volume ramp
+    @router.get("/volume-ramp")
+    async def get_volume_ramp():
+        vol = await settings.get_setting('volume') or {}
+        return {
+            "status": "success",
+            "config": {"ramp_duration_ms": vol.get("ramp_duration_ms", 200)}
+        }
+    
+    @router.post("/volume-ramp")
+    async def set_volume_ramp(payload: Dict[str, Any]):
+        duration = payload.get('ramp_duration_ms')
+        
+        return await _handle_setting_update(
+            payload,
+            validator=lambda p: p.get('ramp_duration_ms') is not None and 0 <= p['ramp_duration_ms'] <= 2000,
+            setter=lambda: settings.set_setting('volume.ramp_duration_ms', duration),
+            event_type="volume_ramp_changed",
+            event_data={"config": {"ramp_duration_ms": duration}},
+            reload_callback=volume_service.reload_ramp_config
+        )
+    
     # Dock apps - VERSION AVEC DÉSACTIVATION DES PROCESSUS
     @router.get("/dock-apps")
     async def get_dock_apps():
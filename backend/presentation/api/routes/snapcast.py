@@ -9,7 +9,8 @@ from typing import Dict, Any
 
 logger = logging.getLogger(__name__)
 
-def create_snapcast_router(routing_service, snapcast_service, state_machine):
+def create_snapcast_router(routing_service, snapcast_service, state_machine, telemetry=None,
+                           calibration_service=None):
     """Crée le router Snapcast - Version simplifiée"""
     router = APIRouter(prefix="/api/routing/snapcast", tags=["snapcast"])
 
@@ -185,6 +186,31 @@ def create_snapcast_router(routing_service, snapcast_service, state_machine):
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
+    # === ROUTES CALIBRATION LATENCE ===
+    
+    @router.post("/calibration")
+    async def run_latency_calibration(payload: Dict[str, Any] = None):
+        """Calibre et applique la latence de chaque client (apply=false pour mesurer seulement)"""
+        if not calibration_service:
+            raise HTTPException(status_code=503, detail="Calibration not available")
+        
+        routing_state = routing_service.get_state()
+        if not routing_state.get('multiroom_enabled', False):
+            raise HTTPException(status_code=400, detail="Multiroom not active")
+        
+        if calibration_service.running:
+            raise HTTPException(status_code=409, detail="Calibration already in progress")
+        
+        apply = bool((payload or {}).get("apply", True))
+        return await calibration_service.calibrate(apply=apply)
+    
+    @router.get("/calibration")
+    async def get_latency_calibration():
+        """Dernier résultat de calibration"""
+        if not calibration_service:
+            return {"running": False, "last_result": None}
+        return {"running": calibration_service.running, "last_result": calibration_service.last_result}
+    
     # === ROUTES MONITORING ===
     
     @router.get("/monitoring")
@@ -217,6 +243,7 @@ def create_snapcast_router(routing_service, snapcast_service, state_machine):
                 "available": True,
                 "clients": display_clients,
                 "server_config": server_config,
+                "telemetry": telemetry.get_summary() if telemetry else {},
                 "timestamp": time.time()
             }
         except Exception as e:
@@ -2,7 +2,7 @@
 Routes API pour la gestion du volume - Version volume affiché (0-100%) avec validation
 """
 from fastapi import APIRouter, HTTPException
-from backend.presentation.api.models import VolumeSetRequest, VolumeAdjustRequest
+from backend.presentation.api.models import VolumeSetRequest, VolumeAdjustRequest, VolumeMuteRequest
 
 def create_volume_router(volume_service):
     """Crée le router volume avec injection de dépendances"""
@@ -59,6 +59,22 @@ def create_volume_router(volume_service):
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
+    @router.post("/mute")
+    async def set_mute(request: VolumeMuteRequest):
+        """Soft mute/unmute (rampe, volume conservé)"""
+        try:
+            success = await volume_service.set_muted(request.muted)
+
+            if success:
+                return {"status": "success", "muted": volume_service.muted}
+            else:
+                raise HTTPException(status_code=500, detail="Failed to set mute")
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    
     @router.post("/increase")
     async def increase_volume():
         """Augmente le volume affiché de 5%"""
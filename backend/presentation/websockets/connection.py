@@ -0,0 +1,195 @@
+# backend/presentation/websockets/connection.py
+"""
+Connexion WebSocket cliente - File d'envoi bornée et tâche d'écriture dédiée
+"""
+import asyncio
+import itertools
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+from fastapi import WebSocket
+from backend.presentation.websockets.protocol import ALWAYS_DELIVERED, PROTOCOL_V1
+from backend.presentation.websockets.serializer import JSON_WIRE, Payload, WireFormat
+
+# Code de fermeture "Try Again Later" : le client se reconnecte et repart d'un état complet
+CLOSE_LAGGING = 1013
+
+_unique_keys = itertools.count()
+
+
+# Événements d'état remplaçables par le plus récent, et champ de data identifiant l'entité
+# (None : l'événement décrit l'état entier du sujet ; plugin.state_changed est distingué par sa source)
+LATEST_WINS_TOPICS: Dict[Tuple[str, str], Optional[str]] = {
+    ("plugin", "state_changed"): None,
+    ("system", "state_changed"): None,
+    ("volume", "volume_changed"): None,
+    ("snapcast", "client_volume_changed"): "client_id",
+    ("snapcast", "client_mute_changed"): "client_id",
+    ("snapcast", "client_name_changed"): "client_id",
+    ("snapcast", "clients_volume_changed"): None,
+}
+
+
+def state_topic(event: Dict[str, Any]) -> Optional[Hashable]:
+    """Sujet de coalescence d'un événement d'état (None : événement ponctuel, jamais fusionné)"""
+    if event.get("snapshot"):
+        return None
+    topic = (event.get("category"), event.get("type"))
+    if topic not in LATEST_WINS_TOPICS:
+        return None
+    data = event.get("data")
+    if not isinstance(data, dict):
+        return None
+    if "state_seq" not in event and "full_state" not in data:
+        return None
+    key_field = LATEST_WINS_TOPICS[topic]
+    entity = data.get(key_field) if key_field else None
+    if key_field and entity is None:
+        return None
+    return (*topic, event.get("source"), entity)
+
+
+class ClientConnection:
+    """File bornée d'une connexion : les événements d'état se remplacent par sujet (le dernier gagne)"""
+
+    MAX_PENDING = 64  # Au-delà, le client décroche durablement et est déconnecté
+    SEND_TIMEOUT = 10.0  # Secondes pour une trame avant de considérer le client bloqué
+
+    def __init__(self, websocket: WebSocket, protocol: int = PROTOCOL_V1,
+                 on_lagging: Optional[Callable[["ClientConnection"], Awaitable[None]]] = None,
+                 wire: WireFormat = JSON_WIRE):
+        self.websocket = websocket
+        self.protocol = protocol
+        self.wire = wire
+        self.pending: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self.topics: Optional[Set[str]] = None  # None : tous les sujets
+        self.excluded: Set[str] = set()
+        self.sent = 0
+        self.coalesced = 0
+        self.closed = False
+        self._on_lagging = on_lagging
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+        self.logger = logging.getLogger(__name__)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._writer())
+
+    def cancel(self) -> None:
+        """Arrête la tâche d'écriture et vide la file"""
+        self.closed = True
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self.pending.clear()
+        self._idle.set()
+
+    async def stop(self) -> None:
+        self.cancel()
+        if self._task and self._task is not asyncio.current_task():
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def subscribe(self, topics: Iterable[str]) -> None:
+        """Ajoute des sujets ; le premier abonnement restreint la connexion à ses seuls sujets"""
+        topics = set(topics)
+        if self.topics is None:
+            self.topics = set()
+        self.topics |= topics
+        self.excluded -= topics
+
+    def unsubscribe(self, topics: Iterable[str]) -> None:
+        topics = set(topics)
+        if self.topics is not None:
+            self.topics -= topics
+        self.excluded |= topics
+
+    def wants(self, event: Dict[str, Any]) -> bool:
+        """Filtrage par abonnement : sujet catégorie ou catégorie.type"""
+        category = event.get("category")
+        if category in ALWAYS_DELIVERED:
+            return True
+        names = (category, f"{category}.{event.get('type')}")
+        if any(name in self.excluded for name in names):
+            return False
+        return self.topics is None or any(name in self.topics for name in names)
+
+    def enqueue(self, event: Dict[str, Any], payload: Optional[Payload] = None) -> bool:
+        """Ajoute un événement déjà rendu pour ce protocole (payload : déjà encodé au format de la
+        connexion) ; False si la file déborde"""
+        if self.closed:
+            return True
+
+        topic = state_topic(event)
+        key = topic if topic is not None else next(_unique_keys)
+        item = {"event": event, "payload": payload}
+
+        queued = self.pending.get(key)
+        if queued is not None:
+            if "state_patch" in event or "state_patch" in queued["event"]:
+                item = self._merge_patches(key, queued, item)
+            if item is not None:
+                self.pending.pop(key)
+                self.coalesced += 1
+            else:
+                key, item = next(_unique_keys), {"event": event, "payload": payload}
+
+        self.pending[key] = item
+        self._idle.clear()
+        self._wakeup.set()
+        return len(self.pending) <= self.MAX_PENDING
+
+    def _merge_patches(self, key: Hashable, queued: Dict[str, Any],
+                       item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fusionne deux deltas v2 consécutifs : ops concaténées, base de séquence de l'ancien"""
+        # Fusion seulement en fin de file : un delta intermédiaire d'un autre sujet casserait la séquence
+        if next(reversed(self.pending)) != key:
+            return None
+
+        old, new = queued["event"], item["event"]
+        if "state_base_seq" in old:
+            base = old["state_base_seq"]
+        elif "state_patch" in old:
+            base = old.get("state_seq", 0) - 1
+        else:
+            base = old.get("state_seq", 0)  # Sans delta : état inchangé, le client est déjà à cette séquence
+        ops = old.get("state_patch", []) + new.get("state_patch", [])
+        merged = {**new, "state_base_seq": base}
+        if ops:
+            merged["state_patch"] = ops
+        return {"event": merged, "payload": None}  # Ré-encodé par l'écrivain, hors du chemin de broadcast
+
+    async def drain(self) -> None:
+        """Attend que la file soit vide (tests, arrêt)"""
+        await self._idle.wait()
+
+    async def _writer(self) -> None:
+        while not self.closed:
+            if not self.pending:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            _, item = self.pending.popitem(last=False)
+            payload = item["payload"] or self.wire.encode(item["event"])
+            send = self.websocket.send_bytes if self.wire.binary else self.websocket.send_text
+            try:
+                await asyncio.wait_for(send(payload), timeout=self.SEND_TIMEOUT)
+                self.sent += 1
+            except asyncio.TimeoutError:
+                self.logger.warning(f"WebSocket client stalled (>{self.SEND_TIMEOUT}s), disconnecting")
+                await self._lagging()
+                return
+            except Exception as e:
+                self.logger.warning(f"Failed to send to client: {e}")
+                await self._lagging()
+                return
+
+    async def _lagging(self) -> None:
+        self.cancel()
+        if self._on_lagging:
+            await self._on_lagging(self)
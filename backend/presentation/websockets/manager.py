@@ -1,69 +1,193 @@
 # backend/presentation/websockets/manager.py
 """
-Gestion des connexions WebSocket - Version OPTIM avec broadcast parallèle
+Gestion des connexions WebSocket - Une file d'envoi et une tâche d'écriture par connexion
 """
-from typing import Set, Dict, Any
+from collections import deque
+from typing import Set, Dict, Any, Iterable, List, Optional, Tuple
 import logging
-import json
-import asyncio
+import uuid
 from fastapi import WebSocket
+from backend.presentation.websockets.connection import CLOSE_LAGGING, ClientConnection
+from backend.presentation.websockets.protocol import (
+    PROTOCOL_V1, PROTOCOL_V2, render_event, session_event, state_sync_event
+)
+from backend.presentation.websockets.serializer import JSON_WIRE, Payload, WireFormat
 
 class WebSocketManager:
     """Gestionnaire de connexions WebSocket simplifié"""
-    
+
+    REPLAY_SIZE = 256  # Événements conservés pour la reprise de session après une coupure brève
+
     def __init__(self):
         self.active_connections: Set[WebSocket] = set()
+        self.protocols: Dict[WebSocket, int] = {}  # Version du protocole par connexion
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.lagging_disconnects = 0
+
+        # Journal de rejeu : séquence d'événements propre à ce processus (session_id change au redémarrage)
+        self.session_id = uuid.uuid4().hex[:12]
+        self.event_seq = 0
+        self.replay_log: deque = deque(maxlen=self.REPLAY_SIZE)
+        self.resumed_sessions = 0
         self.logger = logging.getLogger(__name__)
-    
-    async def connect(self, websocket: WebSocket) -> None:
-        """Établit une connexion WebSocket"""
-        await websocket.accept()
+
+    async def connect(self, websocket: WebSocket, protocol: int = PROTOCOL_V1,
+                      topics: Optional[Iterable[str]] = None, resume_from: Optional[int] = None,
+                      wire: WireFormat = JSON_WIRE, subprotocol: Optional[str] = None) -> bool:
+        """Établit une connexion WebSocket (topics : abonnement initial, None pour tous les sujets)
+
+        resume_from : dernier event_seq reçu par le client ; retourne True si les événements manqués
+        ont été rejoués (pas besoin d'état initial)
+
+        wire : format des trames négocié, subprotocol : sous-protocole accepté dans la poignée de main
+        """
+        if subprotocol is not None:
+            await websocket.accept(subprotocol=subprotocol)
+        else:
+            await websocket.accept()
+        client = ClientConnection(websocket, protocol, on_lagging=self._drop_lagging, wire=wire)
+        if topics is not None:
+            client.subscribe(topics)
+
+        # Session puis rejeu mis en file sans await : aucun broadcast ne peut s'intercaler
+        missed = self._missed_events(resume_from)
+        resumed = missed is not None and self._replay(client, missed)
+        if not resumed:
+            client.enqueue(session_event(self.session_id, self.event_seq, resumed=False))
+
+        client.start()
         self.active_connections.add(websocket)
-        self.logger.info(f"WebSocket connected, total: {len(self.active_connections)}")
-    
+        self.protocols[websocket] = protocol
+        self.clients[websocket] = client
+        if resumed:
+            self.resumed_sessions += 1
+        self.logger.info(
+            f"WebSocket {'resumed' if resumed else 'connected'}, total: {len(self.active_connections)}"
+        )
+        return resumed
+
+    def _missed_events(self, resume_from: Optional[int]) -> Optional[List[Dict[str, Any]]]:
+        """Événements postérieurs à resume_from, None si le journal ne couvre plus le trou"""
+        if resume_from is None or resume_from > self.event_seq:
+            return None
+        if resume_from == self.event_seq:
+            return []
+        if not self.replay_log or self.replay_log[0]["event_seq"] > resume_from + 1:
+            return None
+        return [event for event in self.replay_log if event["event_seq"] > resume_from]
+
+    def _replay(self, client: ClientConnection, missed: List[Dict[str, Any]]) -> bool:
+        """Met en file la session et les événements manqués ; False si la file déborde"""
+        client.enqueue(session_event(self.session_id, self.event_seq, resumed=True, replayed=len(missed)))
+        for event in missed:
+            message = self._message_for(client, event, {})
+            if message and not client.enqueue(*message):
+                client.pending.clear()  # Trop en retard : repart d'un état complet
+                return False
+        return True
+
     def disconnect(self, websocket: WebSocket) -> None:
         """Ferme une connexion WebSocket"""
         self.active_connections.discard(websocket)
+        self.protocols.pop(websocket, None)
+        client = self.clients.pop(websocket, None)
+        if client:
+            client.cancel()
         self.logger.info(f"WebSocket disconnected, total: {len(self.active_connections)}")
-    
+
+    async def send(self, websocket: WebSocket, event_data: Dict[str, Any], payload: Optional[Payload] = None) -> None:
+        """Envoie un événement déjà au format de la connexion (payload : encodage déjà fait), via sa file"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        if not client.enqueue(event_data, payload):
+            await self._drop_lagging(client)
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Abonne une connexion à des sujets ; retourne l'abonnement courant"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return None
+        client.subscribe(topics)
+        return self.subscriptions(websocket)
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> Optional[Dict[str, Any]]:
+        client = self.clients.get(websocket)
+        if client is None:
+            return None
+        client.unsubscribe(topics)
+        return self.subscriptions(websocket)
+
+    def subscriptions(self, websocket: WebSocket) -> Optional[Dict[str, Any]]:
+        client = self.clients.get(websocket)
+        if client is None:
+            return None
+        return {
+            "topics": sorted(client.topics) if client.topics is not None else None,
+            "excluded": sorted(client.excluded)
+        }
+
     async def broadcast_dict(self, event_data: Dict[str, Any]) -> None:
-        """Diffuse un événement à toutes les connexions en parallèle avec timeout"""
+        """Diffuse un événement : mise en file par connexion, sans attendre les clients lents"""
+        # Journalisé même sans connexion : un client qui se reconnecte le recevra au rejeu
+        self.event_seq += 1
+        event_data = {**event_data, "event_seq": self.event_seq}
+        self.replay_log.append(event_data)
+
         if not self.active_connections:
             self.logger.debug("No active connections to broadcast to")
             return
 
-        message = json.dumps(event_data)
-        category = event_data.get("category", "unknown")
-        event_type = event_data.get("type", "unknown")
-
-        # self.logger.info(f"Broadcasting event: {category}.{event_type} to {len(self.active_connections)} clients")
-
-        async def send_to_client(connection: WebSocket):
-            """Envoie un message à un client avec timeout"""
-            try:
-                await asyncio.wait_for(connection.send_text(message), timeout=1.0)
-                return connection, None
-            except asyncio.TimeoutError:
-                self.logger.warning(f"Timeout sending to client (>1s)")
-                return connection, "timeout"
-            except Exception as e:
-                self.logger.warning(f"Failed to send to client: {e}")
-                return connection, str(e)
-
-        # Envoi parallèle à tous les clients
-        results = await asyncio.gather(
-            *[send_to_client(conn) for conn in self.active_connections],
-            return_exceptions=True
-        )
+        # Un seul rendu par version de protocole et un seul encodage par format de trame,
+        # uniquement si un abonné en a besoin
+        messages: Dict[Any, Any] = {}
+        overflowing = []
+        for client in list(self.clients.values()):
+            message = self._message_for(client, event_data, messages)
+            if message and not client.enqueue(*message):
+                overflowing.append(client)
+
+        for client in overflowing:
+            await self._drop_lagging(client)
+
+    def _message_for(self, client: ClientConnection, event_data: Dict[str, Any],
+                     messages: Dict[Any, Any]) -> Optional[Tuple[Dict[str, Any], Payload]]:
+        """Événement rendu et encodé pour une connexion (cache partagé par version et format), None si filtré"""
+        if client.wants(event_data):
+            version = client.protocol
+        elif "state_patch" in event_data and client.protocol >= PROTOCOL_V2:
+            version = "sync"  # Non abonné : delta seul, pour la continuité de séquence
+        else:
+            return None
+
+        if version not in messages:
+            messages[version] = state_sync_event(event_data) if version == "sync" else render_event(event_data, version)
+        key = (version, client.wire.name)
+        if key not in messages:
+            messages[key] = (messages[version], client.wire.encode(messages[version]))
+        return messages[key]
+
+    async def _drop_lagging(self, client: ClientConnection) -> None:
+        """Déconnecte un client qui décroche durablement (file pleine ou envoi bloqué)"""
+        if client.websocket not in self.clients:
+            return
+        self.lagging_disconnects += 1
+        self.logger.warning(f"Dropping lagging WebSocket client ({len(client.pending)} pending events)")
+        self.disconnect(client.websocket)
+        try:
+            await client.websocket.close(code=CLOSE_LAGGING)
+        except Exception:
+            pass
+
+    async def drain(self) -> None:
+        """Attend l'envoi de tous les événements en file"""
+        for client in list(self.clients.values()):
+            await client.drain()
 
-        # Nettoyer les connexions en erreur
-        disconnected = set()
-        for result in results:
-            if isinstance(result, tuple):
-                connection, error = result
-                if error:
-                    disconnected.add(connection)
-
-        if disconnected:
-            self.active_connections -= disconnected
-            self.logger.info(f"Removed {len(disconnected)} dead connection(s)")
\ No newline at end of file
+    async def close_all(self) -> None:
+        """Arrête les tâches d'écriture (arrêt de l'application)"""
+        for client in list(self.clients.values()):
+            await client.stop()
+        self.clients.clear()
+        self.active_connections.clear()
+        self.protocols.clear()
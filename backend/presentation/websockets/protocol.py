@@ -0,0 +1,102 @@
+# backend/presentation/websockets/protocol.py
+"""
+Versions du protocole WebSocket - v1 : full_state dans chaque événement, v2 : snapshot puis deltas séquencés
+"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import WebSocket
+from backend.presentation.websockets.serializer import WireFormat, select_wire_format
+
+PROTOCOL_V1 = 1
+PROTOCOL_V2 = 2
+
+STATE_SYNC_KEYS = ("state_seq", "state_patch")
+
+# Catégories livrées quel que soit l'abonnement (ping, snapshots, transitions)
+ALWAYS_DELIVERED = frozenset({"system"})
+MAX_TOPICS = 32
+
+
+def negotiate_protocol(websocket: WebSocket) -> int:
+    """Version demandée par le client (/ws?v=2), v1 par défaut pour les clients existants"""
+    return PROTOCOL_V2 if websocket.query_params.get("v") == "2" else PROTOCOL_V1
+
+
+def negotiate_wire_format(websocket: WebSocket) -> Tuple[WireFormat, Optional[str]]:
+    """Format des trames (Sec-WebSocket-Protocol: milo.msgpack, milo.cbor), JSON texte par défaut"""
+    return select_wire_format(websocket.scope.get("subprotocols") or [])
+
+
+def parse_topics(value: Any) -> Optional[List[str]]:
+    """Sujets "catégorie" ou "catégorie.type" d'un message subscribe/unsubscribe (None si invalide)"""
+    if isinstance(value, str):
+        value = [topic for topic in value.split(",") if topic]
+    if not isinstance(value, list) or len(value) > MAX_TOPICS:
+        return None
+    if not all(isinstance(topic, str) and 0 < len(topic) <= 64 for topic in value):
+        return None
+    return value
+
+
+def requested_resume(websocket: WebSocket, session_id: str) -> Optional[int]:
+    """Dernier event_seq présenté par le client (/ws?resume=<session>:<seq>), None si autre session"""
+    session, _, seq = websocket.query_params.get("resume", "").partition(":")
+    if session != session_id or not seq.isdigit():
+        return None
+    return int(seq)
+
+
+def requested_topics(websocket: WebSocket) -> Optional[List[str]]:
+    """Abonnement initial (/ws?topics=plugin,volume), None : tous les sujets"""
+    value = websocket.query_params.get("topics")
+    return parse_topics(value) if value is not None else None
+
+
+def render_event(event: Dict[str, Any], version: int) -> Dict[str, Any]:
+    """Forme d'un événement pour une version : v2 sans full_state, v1 sans champs de séquence"""
+    if version >= PROTOCOL_V2:
+        data = event.get("data")
+        if not isinstance(data, dict) or "full_state" not in data:
+            return event
+        return {**event, "data": {k: v for k, v in data.items() if k != "full_state"}}
+
+    if not any(key in event for key in STATE_SYNC_KEYS):
+        return event
+    return {k: v for k, v in event.items() if k not in STATE_SYNC_KEYS}
+
+
+def snapshot_event(seq: int, state: Dict[str, Any]) -> Dict[str, Any]:
+    """État complet v2 (connexion ou resync) : les deltas suivants partent de state_seq"""
+    return {
+        "category": "system",
+        "type": "state_changed",
+        "source": "system",
+        "data": {"full_state": state},
+        "state_seq": seq,
+        "snapshot": True,
+        "timestamp": time.time()
+    }
+
+
+def state_sync_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Delta seul d'un événement filtré par l'abonnement : la séquence v2 reste continue"""
+    return {
+        "category": "system",
+        "type": "state_sync",
+        "source": "system",
+        "state_seq": event["state_seq"],
+        "state_patch": event["state_patch"],
+        **({"event_seq": event["event_seq"]} if "event_seq" in event else {}),
+        "timestamp": event.get("timestamp", time.time())
+    }
+
+
+def session_event(session_id: str, event_seq: int, resumed: bool, replayed: int = 0) -> Dict[str, Any]:
+    """Premier message d'une connexion : session de rejeu et position dans le journal"""
+    return {
+        "category": "system",
+        "type": "session",
+        "source": "system",
+        "data": {"session": session_id, "event_seq": event_seq, "resumed": resumed, "replayed": replayed},
+        "timestamp": time.time()
+    }
@@ -0,0 +1,142 @@
+# backend/presentation/websockets/serializer.py
+"""
+Sérialisation des messages WebSocket - orjson ou msgspec si disponibles, json de la stdlib sinon ;
+formats binaires MessagePack / CBOR négociés par sous-protocole
+"""
+import json
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # Dépendance optionnelle
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Dépendance optionnelle
+    msgspec = None
+
+try:
+    import msgpack
+except ImportError:  # Dépendance optionnelle
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # Dépendance optionnelle
+    cbor2 = None
+
+
+def _enum_value(obj: Any) -> Any:
+    # Même rendu qu'orjson et msgspec pour les Enum du domaine
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_enum_value).encode("utf-8")
+
+
+def _available_backends() -> Dict[str, Callable[[Any], bytes]]:
+    """Encodeurs installés, du plus rapide au plus lent"""
+    backends: Dict[str, Callable[[Any], bytes]] = {}
+    if orjson is not None:
+        backends["orjson"] = lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    if msgspec is not None:
+        backends["msgspec"] = msgspec.json.Encoder().encode
+    backends["json"] = _stdlib_dumps
+    return backends
+
+
+class JsonSerializer:
+    """Encode un message une seule fois en UTF-8 ; le texte est partagé par toutes les connexions"""
+
+    def __init__(self, backend: Optional[str] = None):
+        backends = _available_backends()
+        if backend is not None and backend not in backends:
+            raise ValueError(f"JSON backend not available: {backend}")
+        self.name = backend or next(iter(backends))
+        self._dumps = backends[self.name]
+        self._loads = orjson.loads if self.name == "orjson" else json.loads
+
+    def encode(self, obj: Any) -> bytes:
+        """Message → octets UTF-8"""
+        return self._dumps(obj)
+
+    def encode_text(self, obj: Any) -> str:
+        """Message → texte d'une trame WebSocket texte (décodage UTF-8 unique)"""
+        return self._dumps(obj).decode("utf-8")
+
+    def decode(self, data: Any) -> Any:
+        """Message client (texte ou octets) → objet"""
+        return self._loads(data)
+
+
+def available_backends() -> list:
+    """Noms des encodeurs utilisables (benchmark, diagnostic)"""
+    return list(_available_backends())
+
+
+# Instance partagée par le manager et le serveur WebSocket
+serializer = JsonSerializer()
+
+
+Payload = Union[str, bytes]
+
+
+class WireFormat:
+    """Format des trames d'une connexion : même schéma d'événement, encodage texte ou binaire"""
+
+    def __init__(self, name: str, subprotocol: str, binary: bool,
+                 encode: Callable[[Any], Payload], decode: Callable[[Any], Any]):
+        self.name = name
+        self.subprotocol = subprotocol
+        self.binary = binary
+        self.encode = encode
+        self.decode = decode
+
+    def __repr__(self) -> str:
+        return f"WireFormat({self.name})"
+
+
+def _cbor_enum_value(encoder: Any, obj: Any) -> None:
+    encoder.encode(_enum_value(obj))
+
+
+def _msgpack_codec() -> Optional[Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    if msgspec is not None:
+        return msgspec.msgpack.Encoder().encode, msgspec.msgpack.Decoder().decode
+    if msgpack is not None:
+        return (lambda obj: msgpack.packb(obj, use_bin_type=True, default=_enum_value),
+                lambda data: msgpack.unpackb(data, raw=False))
+    return None
+
+
+def _wire_formats() -> Dict[str, WireFormat]:
+    """Formats utilisables par sous-protocole, dans l'ordre de préférence du serveur"""
+    formats = {"milo.json": WireFormat("json", "milo.json", False, serializer.encode_text, serializer.decode)}
+    codec = _msgpack_codec()
+    if codec is not None:
+        formats["milo.msgpack"] = WireFormat("msgpack", "milo.msgpack", True, *codec)
+    if cbor2 is not None:
+        formats["milo.cbor"] = WireFormat(
+            "cbor", "milo.cbor", True, lambda obj: cbor2.dumps(obj, default=_cbor_enum_value), cbor2.loads
+        )
+    return formats
+
+
+WIRE_FORMATS = _wire_formats()
+
+# Format des clients sans sous-protocole (frontend web, clients existants)
+JSON_WIRE = WIRE_FORMATS["milo.json"]
+
+
+def select_wire_format(subprotocols: Iterable[str]) -> Tuple[WireFormat, Optional[str]]:
+    """Premier sous-protocole proposé par le client et disponible ; (JSON, None) sinon"""
+    for subprotocol in subprotocols:
+        wire = WIRE_FORMATS.get(subprotocol)
+        if wire is not None:
+            return wire, subprotocol
+    return JSON_WIRE, None
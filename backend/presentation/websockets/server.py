@@ -2,12 +2,15 @@
 """
 Serveur WebSocket - Version finale avec état initial frais et ping/pong
 """
-import json
 import asyncio
 import time
 from fastapi import WebSocket, WebSocketDisconnect
 from backend.presentation.websockets.manager import WebSocketManager
-from backend.domain.audio_state import AudioSource
+from backend.presentation.websockets.protocol import (
+    PROTOCOL_V2, negotiate_protocol, negotiate_wire_format, parse_topics, requested_resume, requested_topics
+)
+from backend.presentation.websockets.serializer import JSON_WIRE, Payload, WireFormat
+from backend.presentation.websockets.snapshot import StateSnapshotService
 
 class WebSocketServer:
     """Serveur WebSocket simplifié avec état initial correct et heartbeat"""
@@ -17,6 +20,7 @@ class WebSocketServer:
     def __init__(self, ws_manager: WebSocketManager, state_machine):
         self.manager = ws_manager
         self.state_machine = state_machine
+        self.snapshots = StateSnapshotService(state_machine)
 
     async def _send_ping(self, websocket: WebSocket):
         """Envoie des pings périodiques pour maintenir la connexion"""
@@ -28,55 +32,67 @@ class WebSocketServer:
                     "type": "ping",
                     "timestamp": time.time()
                 }
-                await websocket.send_text(json.dumps(ping_message))
+                await self.manager.send(websocket, ping_message)
             except Exception:
                 # La connexion est fermée
                 break
     
+    async def _handle_client_message(self, websocket: WebSocket, message: Payload,
+                                     wire: WireFormat = JSON_WIRE) -> None:
+        """Messages client : resync v2 après un trou dans les séquences, abonnements aux sujets"""
+        try:
+            request = wire.decode(message)
+        except Exception:
+            # Trame illisible dans le format négocié
+            return
+        if not isinstance(request, dict):
+            return
+
+        request_type = request.get("type")
+        if request_type == "resync":
+            event, payload = await self.snapshots.get(PROTOCOL_V2, wire)
+            await self.manager.send(websocket, event, payload)
+        elif request_type in ("subscribe", "unsubscribe"):
+            topics = parse_topics(request.get("topics"))
+            if topics is None:
+                return
+            if request_type == "subscribe":
+                subscriptions = self.manager.subscribe(websocket, topics)
+            else:
+                subscriptions = self.manager.unsubscribe(websocket, topics)
+            await self.manager.send(websocket, {
+                "category": "system",
+                "type": "subscriptions",
+                "data": subscriptions,
+                "timestamp": time.time()
+            })
+    
+    async def _receive_loop(self, websocket: WebSocket, wire: WireFormat = JSON_WIRE) -> None:
+        """Maintient la connexion ouverte"""
+        while True:
+            # Recevoir les messages (pong du client, resync v2, abonnements), dans le format négocié
+            message = await (websocket.receive_bytes() if wire.binary else websocket.receive_text())
+            await self._handle_client_message(websocket, message, wire)
+
     async def websocket_endpoint(self, websocket: WebSocket):
         """Point d'entrée WebSocket avec état initial frais et heartbeat"""
-        await self.manager.connect(websocket)
+        protocol = negotiate_protocol(websocket)
+        wire, subprotocol = negotiate_wire_format(websocket)
+        resumed = await self.manager.connect(
+            websocket, protocol, requested_topics(websocket),
+            resume_from=requested_resume(websocket, self.manager.session_id),
+            wire=wire, subprotocol=subprotocol
+        )
 
         # Démarrer la task de ping en arrière-plan
         ping_task = asyncio.create_task(self._send_ping(websocket))
 
         try:
-            # Récupérer l'état initial de la machine à états
-            current_state = await self.state_machine.get_current_state()
-
-            # Si un plugin est actif, forcer un refresh des métadonnées
-            if current_state['active_source'] != 'none':
-                active_source = AudioSource(current_state['active_source'])
-                active_plugin = self.state_machine.plugins.get(active_source)
-
-                if active_plugin and hasattr(active_plugin, '_refresh_metadata'):
-                    # Forcer un refresh pour avoir la position actuelle
-                    await active_plugin._refresh_metadata()
-
-                    # Récupérer l'état frais du plugin
-                    plugin_status = await active_plugin.get_initial_state()
-
-                    # Mettre à jour l'état courant avec les données fraîches
-                    current_state['metadata'] = plugin_status.get('metadata', {})
-                    current_state['device_connected'] = plugin_status.get('device_connected', False)
-                    current_state['ws_connected'] = plugin_status.get('ws_connected', False)
-                    current_state['is_playing'] = plugin_status.get('is_playing', False)
-
-            # Envoyer l'état initial
-            initial_event = {
-                "category": "system",
-                "type": "state_changed",
-                "source": "system",
-                "data": {"full_state": current_state},
-                "timestamp": current_state.get("timestamp", 0)
-            }
-
-            await websocket.send_text(json.dumps(initial_event))
-
-            # Maintenir la connexion ouverte
-            while True:
-                # Recevoir les messages (pong du client si implémenté)
-                await websocket.receive_text()
+            # Reprise : événements manqués déjà rejoués, ni état initial ni refresh des métadonnées
+            if not resumed:
+                event, payload = await self.snapshots.get(protocol, wire)
+                await self.manager.send(websocket, event, payload)
+            await self._receive_loop(websocket, wire)
 
         except WebSocketDisconnect:
             pass
@@ -0,0 +1,114 @@
+# backend/presentation/websockets/snapshot.py
+"""
+État initial des connexions WebSocket - Snapshot partagé, pré-sérialisé, rafraîchi en single-flight
+"""
+import asyncio
+import logging
+import math
+from typing import Any, Dict, Optional, Tuple
+from backend.domain.audio_state import AudioSource
+from backend.presentation.websockets.protocol import PROTOCOL_V2, snapshot_event
+from backend.presentation.websockets.serializer import JSON_WIRE, Payload, WireFormat
+
+# Champs du plugin actif rafraîchis à la connexion (position de lecture, connexion de l'appareil)
+PLUGIN_STATUS_FIELDS = ("device_connected", "ws_connected", "is_playing")
+
+
+class StateSnapshotService:
+    """Snapshot initial partagé par les connexions : invalidé par la séquence d'état,
+    refresh des métadonnées du plugin actif au plus une fois par intervalle"""
+
+    REFRESH_INTERVAL = 5.0  # Secondes entre deux refresh amont (HTTP go-librespot, etc.)
+
+    def __init__(self, state_machine):
+        self.state_machine = state_machine
+        self._lock = asyncio.Lock()  # Single-flight : une seule reconstruction à la fois
+        self._key: Optional[Tuple[int, int]] = None  # (state_seq, génération du refresh plugin)
+        self._seq = 0
+        self._state: Dict[str, Any] = {}
+        self._events: Dict[int, Dict[str, Any]] = {}  # Rendu par version, partagé entre formats
+        self._messages: Dict[Tuple[int, str], Tuple[Dict[str, Any], Payload]] = {}
+        self._plugin_source: Optional[AudioSource] = None
+        self._plugin_status: Optional[Dict[str, Any]] = None
+        self._refreshed_at = -math.inf
+        self._generation = 0
+        self.hits = 0
+        self.builds = 0
+        self.refreshes = 0
+        self.logger = logging.getLogger(__name__)
+
+    async def get(self, protocol: int, wire: WireFormat = JSON_WIRE) -> Tuple[Dict[str, Any], Payload]:
+        """Événement d'état initial et sa trame encodée pour une version de protocole et un format"""
+        key = (protocol, wire.name)
+        cached = self._messages.get(key)
+        if cached is not None and self._fresh():
+            self.hits += 1
+            return cached
+
+        async with self._lock:
+            if not self._fresh():
+                await self._rebuild()
+            if key not in self._messages:
+                if protocol not in self._events:
+                    self._events[protocol] = self._render(protocol)
+                event = self._events[protocol]
+                self._messages[key] = (event, wire.encode(event))
+            return self._messages[key]
+
+    def _refresh_due(self) -> bool:
+        if self.state_machine.system_state.active_source != self._plugin_source:
+            return True
+        return asyncio.get_running_loop().time() - self._refreshed_at >= self.REFRESH_INTERVAL
+
+    def _fresh(self) -> bool:
+        # Mutation pas encore diffusée (acteur de diffusion) : la séquence avancera au prochain snapshot
+        if self.state_machine.state_changed_since_broadcast:
+            return False
+        key = (self.state_machine.versioned_state.seq, self._generation)
+        return self._key == key and not self._refresh_due()
+
+    async def _rebuild(self) -> None:
+        if self._refresh_due():
+            await self._refresh_plugin()
+
+        seq, state = await self.state_machine.get_state_snapshot()
+        if self._plugin_status is not None and state.get("active_source") == getattr(self._plugin_source, "value", None):
+            state["metadata"] = self._plugin_status.get("metadata", {})
+            for field in PLUGIN_STATUS_FIELDS:
+                state[field] = self._plugin_status.get(field, False)
+
+        self._seq, self._state = seq, state
+        self._events = {}
+        self._messages = {}
+        self._key = (seq, self._generation)
+        self.builds += 1
+
+    async def _refresh_plugin(self) -> None:
+        """Refresh amont du plugin actif (position de lecture fraîche)"""
+        source = self.state_machine.system_state.active_source
+        self._plugin_source = source
+        self._refreshed_at = asyncio.get_running_loop().time()
+        self._generation += 1
+        self._plugin_status = None
+
+        plugin = self.state_machine.plugins.get(source) if source != AudioSource.NONE else None
+        if not plugin or not hasattr(plugin, '_refresh_metadata'):
+            return
+
+        self.refreshes += 1
+        try:
+            await plugin._refresh_metadata()
+            self._plugin_status = await plugin.get_initial_state()
+        except Exception as e:
+            self.logger.warning(f"Plugin refresh for initial state failed: {e}")
+
+    def _render(self, protocol: int) -> Dict[str, Any]:
+        if protocol >= PROTOCOL_V2:
+            return snapshot_event(self._seq, self._state)
+        return {
+            "category": "system",
+            "type": "state_changed",
+            "source": "system",
+            "data": {"full_state": self._state},
+            "timestamp": self._state.get("timestamp", 0)
+        }
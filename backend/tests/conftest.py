@@ -4,6 +4,8 @@ Configuration pytest - Fixtures partagées pour tous les tests
 """
 import pytest
 import asyncio
+import json
+from aiohttp import web, WSMsgType
 from unittest.mock import Mock, AsyncMock
 from backend.domain.audio_state import AudioSource, PluginState
 
@@ -65,3 +67,121 @@ def mock_async_lock():
     lock.__aenter__ = AsyncMock(return_value=None)
     lock.__aexit__ = AsyncMock(return_value=None)
     return lock
+
+
+class FakeSnapserver:
+    """Snapserver JSON-RPC minimal (HTTP + WebSocket) qui compte les appels par méthode et transport"""
+
+    @staticmethod
+    def make_client(client_id: str, percent: int = 30, muted: bool = False) -> dict:
+        """Client au format Server.GetStatus"""
+        return {
+            "id": client_id,
+            "connected": True,
+            "config": {"name": client_id, "latency": 0, "volume": {"percent": percent, "muted": muted}},
+            "host": {"name": client_id, "ip": "192.168.1.10", "mac": "00:00:00:00:00:00"}
+        }
+
+    def __init__(self, clients):
+        self.clients = {c["id"]: c for c in clients}
+        self.calls = []  # (transport, method, params)
+        self.batches = []  # (transport, taille)
+        self.silent_methods = set()  # Méthodes auxquelles le serveur ne répond pas (timeouts)
+        self.sockets = []
+        self.runner = None
+        self.port = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/jsonrpc", self._handle_http)
+        app.router.add_get("/jsonrpc", self._handle_ws)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", self.port or 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.disconnect_all()
+        await self.runner.cleanup()
+
+    async def disconnect_all(self):
+        for ws in list(self.sockets):
+            await ws.close()
+
+    async def notify(self, method: str, params: dict, sender=None):
+        """Pousse une notification aux WebSockets connectées, sauf celle qui a envoyé la commande (comme snapserver)"""
+        for ws in list(self.sockets):
+            if ws is not sender:
+                await ws.send_str(json.dumps({"jsonrpc": "2.0", "method": method, "params": params}))
+
+    def _execute(self, transport: str, request: dict, notifications: list):
+        method, params = request["method"], request.get("params", {})
+        self.calls.append((transport, method, params))
+
+        if method == "Server.GetStatus":
+            result = {"server": {"groups": [{"id": "g1", "clients": list(self.clients.values())}]}}
+        elif method == "Client.SetVolume":
+            if params["id"] not in self.clients:
+                return {"id": request["id"], "jsonrpc": "2.0", "error": {"code": -32603, "message": "Client not found"}}
+            self.clients[params["id"]]["config"]["volume"] = dict(params["volume"])
+            result = {"volume": params["volume"]}
+            notifications.append(("Client.OnVolumeChanged", {"id": params["id"], "volume": params["volume"]}))
+        elif method in ("Client.SetName", "Client.SetLatency") and params.get("id") in self.clients:
+            key = "name" if method == "Client.SetName" else "latency"
+            self.clients[params["id"]]["config"][key] = params[key]
+            result = {key: params[key]}
+            notifications.append((f"Client.On{key.capitalize()}Changed", {"id": params["id"], key: params[key]}))
+        elif method == "Group.SetStream":
+            result = {"stream_id": params["stream_id"]}
+            notifications.append(("Group.OnStreamChanged", {"id": params["id"], "stream_id": params["stream_id"]}))
+        elif method == "Server.GetRPCVersion":
+            result = {"major": 2, "minor": 0, "patch": 0}
+        else:
+            result = {}
+        return {"id": request["id"], "jsonrpc": "2.0", "result": result}
+
+    async def _dispatch(self, transport: str, data, sender=None):
+        """Requête simple ou batch JSON-RPC 2.0, puis notifications aux autres sessions"""
+        notifications = []
+        if isinstance(data, list):
+            self.batches.append((transport, len(data)))
+            response = [self._execute(transport, request, notifications) for request in data]
+        else:
+            response = self._execute(transport, data, notifications)
+        for method, params in notifications:
+            await self.notify(method, params, sender=sender)
+        return response
+
+    async def _handle_http(self, request):
+        return web.json_response(await self._dispatch("http", await request.json()))
+
+    async def _handle_ws(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.append(ws)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                if isinstance(data, dict) and data["method"] in self.silent_methods:
+                    self.calls.append(("ws", data["method"], data.get("params", {})))
+                    continue
+                response = await self._dispatch("ws", data, sender=ws)
+                await ws.send_str(json.dumps(response))
+        finally:
+            self.sockets.remove(ws)
+        return ws
+
+    def count(self, method: str, transport: str = None) -> int:
+        return sum(1 for t, m, _ in self.calls if m == method and (transport is None or t == transport))
+
+
+@pytest.fixture
+async def fake_snapserver():
+    """Snapserver local avec deux clients (c1 muté)"""
+    server = FakeSnapserver([FakeSnapserver.make_client("c1", 30, muted=True), FakeSnapserver.make_client("c2", 40)])
+    await server.start()
+    yield server
+    await server.stop()
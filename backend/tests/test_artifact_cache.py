@@ -0,0 +1,236 @@
+# backend/tests/test_artifact_cache.py
+"""
+Tests unitaires pour le cache d'artefacts (adressage sha256, déduplication, reprise Range)
+"""
+import asyncio
+import hashlib
+import pytest
+from aiohttp import web
+from backend.infrastructure.services.artifact_cache import ArtifactCache
+
+PAYLOAD = bytes(range(256)) * 1024  # 256 Kio
+DIGEST = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class FakeOrigin:
+    """Serveur d'assets supportant Range, pouvant couper la première réponse en cours de route"""
+
+    def __init__(self, cut_first: bool = False):
+        self.cut_first = cut_first
+        self.ranges = []
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{name}", self._asset)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def _asset(self, request):
+        self.ranges.append(request.headers.get("Range"))
+        start = int(request.headers["Range"][6:-1]) if "Range" in request.headers else 0
+        response = web.StreamResponse(status=206 if start else 200)
+        response.content_length = len(PAYLOAD) - start
+        await response.prepare(request)
+
+        if self.cut_first and len(self.ranges) == 1:
+            for offset in range(0, len(PAYLOAD) // 2, 16384):
+                await response.write(PAYLOAD[offset:offset + 16384])
+                await asyncio.sleep(0.01)
+            request.transport.abort()  # Connexion perdue en plein téléchargement
+            return response
+
+        await response.write(PAYLOAD[start:])
+        return response
+
+
+class FakeGitHub:
+    """Releases GitHub simulées : assets (contenu dépendant du nom) et API avec digest ou SHA256SUMS"""
+
+    REPO = "badaix/snapcast"
+
+    def __init__(self, digests: str = "api"):
+        self.digests = digests  # "api", "sums", "wrong" ou "none"
+        self.runner = None
+        self.url = None
+
+    @staticmethod
+    def content(name: str) -> bytes:
+        return f"deb {name}".encode() * 100
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{owner}/{repo}/releases/download/{tag}/{name}", self._asset)
+        app.router.add_get("/repos/{owner}/{repo}/releases/tags/{tag}", self._release)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    def asset_url(self, tag: str, name: str) -> str:
+        return f"{self.url}/{self.REPO}/releases/download/{tag}/{name}"
+
+    def names(self, tag: str):
+        version = tag[1:]
+        return [f"snapclient_{version}-1_arm64_bookworm.deb", f"snapserver_{version}-1_arm64_bookworm.deb"]
+
+    async def _asset(self, request):
+        name = request.match_info["name"]
+        if name == "SHA256SUMS":
+            return web.Response(text="".join(
+                f"{hashlib.sha256(self.content(n)).hexdigest()} *{n}\n" for n in self.names(request.match_info["tag"])
+            ))
+        return web.Response(body=self.content(name))
+
+    async def _release(self, request):
+        tag = request.match_info["tag"]
+        assets = []
+        for name in self.names(tag):
+            digest = hashlib.sha256(b"tampered" if self.digests == "wrong" else self.content(name)).hexdigest()
+            assets.append({"name": name, "digest": f"sha256:{digest}" if self.digests in ("api", "wrong") else None})
+        if self.digests == "sums":
+            assets.append({"name": "SHA256SUMS", "browser_download_url": self.asset_url(tag, "SHA256SUMS")})
+        return web.json_response({"tag_name": tag, "assets": assets})
+
+    def cache(self, root) -> ArtifactCache:
+        return ArtifactCache(str(root), github_url=self.url, github_api_url=self.url)
+
+
+@pytest.fixture
+async def github():
+    fake = FakeGitHub()
+    await fake.start()
+    yield fake
+    await fake.runner.cleanup()
+
+
+@pytest.fixture
+async def origin():
+    fake = FakeOrigin()
+    await fake.start()
+    yield fake
+    await fake.runner.cleanup()
+
+
+class TestArtifactCache:
+    """Tests du cache adressé par contenu"""
+
+    @pytest.mark.asyncio
+    async def test_fetch_once_and_store_by_digest(self, origin, tmp_path):
+        cache = ArtifactCache(str(tmp_path))
+
+        entries = await asyncio.gather(*[cache.fetch(f"{origin.url}/pkg.deb", "pkg.deb") for _ in range(3)])
+        again = await cache.fetch(f"{origin.url}/pkg.deb", "pkg.deb", sha256=DIGEST)
+
+        assert len(origin.ranges) == 1
+        assert all(e["sha256"] == DIGEST for e in entries) and again["sha256"] == DIGEST
+        assert entries[0]["path"] == tmp_path / "blobs" / "sha256" / DIGEST
+        assert cache.get_blob(DIGEST).read_bytes() == PAYLOAD
+        assert cache.get_blob("../index.json") is None
+
+        # Index persistant : une nouvelle instance retrouve l'artefact sans le retélécharger
+        assert ArtifactCache(str(tmp_path)).get("pkg.deb")["size"] == len(PAYLOAD)
+
+    @pytest.mark.asyncio
+    async def test_checksum_mismatch_is_rejected(self, origin, tmp_path):
+        cache = ArtifactCache(str(tmp_path))
+
+        with pytest.raises(RuntimeError, match="Checksum mismatch"):
+            await cache.fetch(f"{origin.url}/pkg.deb", "pkg.deb", sha256="0" * 64)
+
+        assert cache.get("pkg.deb") is None
+        assert list((tmp_path / "partial").iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_interrupted_download_resumes_with_range(self, tmp_path):
+        origin = FakeOrigin(cut_first=True)
+        await origin.start()
+        try:
+            entry = await ArtifactCache(str(tmp_path)).fetch(f"{origin.url}/pkg.deb", "pkg.deb", sha256=DIGEST)
+        finally:
+            await origin.runner.cleanup()
+
+        assert origin.ranges[0] is None
+        resumed_at = int(origin.ranges[1][6:-1])
+        assert 0 < resumed_at <= len(PAYLOAD) // 2
+        assert entry["path"].read_bytes() == PAYLOAD
+
+    @pytest.mark.asyncio
+    async def test_export_under_original_name(self, origin, tmp_path):
+        cache = ArtifactCache(str(tmp_path / "cache"))
+        await cache.fetch(f"{origin.url}/pkg.deb", "pkg.deb")
+        (tmp_path / "install").mkdir()
+
+        exported = await cache.export("pkg.deb", tmp_path / "install" / "pkg.deb")
+
+        assert exported.read_bytes() == PAYLOAD
+        with pytest.raises(FileNotFoundError):
+            await cache.export("missing.deb", tmp_path / "install" / "missing.deb")
+
+
+class TestUpstreamChecksums:
+    """Vérification des assets de release contre le checksum publié en amont"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("digests", ["api", "sums"])
+    async def test_download_verified_against_upstream(self, github, tmp_path, digests):
+        github.digests = digests
+        name = "snapclient_0.32.0-1_arm64_bookworm.deb"
+
+        entry = await github.cache(tmp_path).fetch(github.asset_url("v0.32.0", name), name)
+
+        assert entry["verified"] is True
+        assert entry["sha256"] == hashlib.sha256(FakeGitHub.content(name)).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_upstream_mismatch_is_rejected(self, github, tmp_path):
+        github.digests = "wrong"
+        name = "snapclient_0.32.0-1_arm64_bookworm.deb"
+        cache = github.cache(tmp_path)
+
+        with pytest.raises(RuntimeError, match="Checksum mismatch"):
+            await cache.fetch(github.asset_url("v0.32.0", name), name)
+
+        assert cache.get(name) is None
+        assert list((tmp_path / "blobs" / "sha256").iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_release_without_checksum_is_marked_unverified(self, github, tmp_path):
+        github.digests = "none"
+        name = "snapclient_0.28.0-1_arm64_bookworm.deb"
+
+        entry = await github.cache(tmp_path).fetch(github.asset_url("v0.28.0", name), name)
+
+        assert entry["verified"] is False
+
+
+class TestArtifactEviction:
+    """Éviction des anciennes versions d'un paquet"""
+
+    @pytest.mark.asyncio
+    async def test_keeps_most_recent_versions_per_package(self, github, tmp_path):
+        cache = github.cache(tmp_path)
+        cache.KEEP_VERSIONS = 2
+        fetched = {}
+        for version in ("0.29.0", "0.30.0", "0.31.0"):
+            for name in github.names(f"v{version}"):
+                fetched[name] = await cache.fetch(github.asset_url(f"v{version}", name), name)
+            if version == "0.30.0":
+                # Réutilisée (rollback possible) : plus récente que 0.29.0 pour l'éviction
+                await cache.fetch(github.asset_url("v0.29.0", "snapclient_0.29.0-1_arm64_bookworm.deb"),
+                                  "snapclient_0.29.0-1_arm64_bookworm.deb")
+
+        kept = set(cache._load_index())
+        assert kept == {
+            "snapclient_0.29.0-1_arm64_bookworm.deb", "snapclient_0.31.0-1_arm64_bookworm.deb",
+            "snapserver_0.30.0-1_arm64_bookworm.deb", "snapserver_0.31.0-1_arm64_bookworm.deb"
+        }
+        evicted = fetched["snapclient_0.30.0-1_arm64_bookworm.deb"]
+        assert not evicted["path"].exists()
+        assert cache.get_blob(evicted["sha256"]) is None
+        assert len(list((tmp_path / "blobs" / "sha256").iterdir())) == 4
@@ -0,0 +1,105 @@
+# backend/tests/test_event_scheduler.py
+"""
+Tests unitaires pour l'ordonnanceur d'événements (coalescence et débit par sujet)
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from backend.infrastructure.state.event_scheduler import EventScheduler, TopicPolicy, merge_client_updates
+
+
+@pytest.fixture
+def emit():
+    return AsyncMock()
+
+
+def emitted(emit):
+    return [(call.args[0], call.args[1], call.args[2]) for call in emit.await_args_list]
+
+
+class TestEventScheduler:
+    """Tests de coalescence, débit et ordre d'émission"""
+
+    @pytest.mark.asyncio
+    async def test_isolated_event_emitted_immediately(self, emit):
+        scheduler = EventScheduler(emit)
+
+        await scheduler.submit("plugin", "state_changed", {"source": "radio", "metadata": {"title": "A"}})
+        await scheduler.submit("radio", "favorite_added", {"station_id": 1})
+
+        assert [e[1] for e in emitted(emit)] == ["state_changed", "favorite_added"]
+
+    @pytest.mark.asyncio
+    async def test_burst_coalesced_per_key(self, emit):
+        scheduler = EventScheduler(emit)
+
+        for position in range(50):
+            await scheduler.submit("plugin", "state_changed", {
+                "source": "librespot", "old_state": "ready" if position == 1 else "connected",
+                "metadata": {"position": position, **({"title": "T"} if position == 1 else {})}
+            })
+        await scheduler.submit("plugin", "state_changed", {"source": "radio", "metadata": {"title": "R"}})
+        assert len(emitted(emit)) == 2  # Front montant de chaque clé
+
+        await asyncio.sleep(0.2)
+
+        events = emitted(emit)
+        assert len(events) == 3
+        merged = events[2][2]
+        assert merged["metadata"] == {"position": 49, "title": "T"}
+        assert merged["old_state"] == "ready"  # Point de départ de la rafale conservé
+
+        metrics = scheduler.get_metrics()
+        assert metrics["received"] == 51 and metrics["emitted"] == 3 and metrics["coalesced"] == 48
+        assert metrics["topics"]["plugin.state_changed"] == {"received": 51, "emitted": 3}
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_and_frame_alignment(self, emit):
+        scheduler = EventScheduler(emit, {("volume", "volume_changed"): TopicPolicy(0.1)})
+        loop = asyncio.get_running_loop()
+        times = []
+        emit.side_effect = lambda *args: times.append(loop.time())
+
+        start = loop.time()
+        while loop.time() - start < 0.5:
+            await scheduler.submit("volume", "volume_changed", {"volume": int((loop.time() - start) * 100)})
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.15)
+
+        assert 4 <= len(times) <= 7  # ~10/s au lieu de ~100/s
+        assert all(b - a >= 0.1 - 0.01 for a, b in zip(times, times[1:]))
+        for t in times[1:]:
+            frames = t / EventScheduler.FRAME_INTERVAL
+            assert frames - int(frames) < 0.5  # Émis juste après une frontière de frame
+        assert emitted(emit)[-1][2]["volume"] >= 45
+
+    @pytest.mark.asyncio
+    async def test_unthrottled_event_flushes_pending_first(self, emit):
+        scheduler = EventScheduler(emit)
+
+        await scheduler.submit("volume", "volume_changed", {"volume": 1})
+        await scheduler.submit("volume", "volume_changed", {"volume": 2})
+        await scheduler.submit("system", "transition_start", {})
+
+        assert [(e[1], e[2].get("volume")) for e in emitted(emit)] == [
+            ("volume_changed", 1), ("volume_changed", 2), ("transition_start", None)
+        ]
+
+    def test_merge_client_updates(self):
+        old = {"clients": [{"client_id": "a", "fields": {"volume": 10}}, {"client_id": "b", "fields": {"muted": True}}]}
+        new = {"clients": [{"client_id": "a", "fields": {"volume": 20, "latency": 5}}]}
+
+        assert merge_client_updates(old, new)["clients"] == [
+            {"client_id": "a", "fields": {"volume": 20, "latency": 5}},
+            {"client_id": "b", "fields": {"muted": True}}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_close_emits_remaining(self, emit):
+        scheduler = EventScheduler(emit)
+        await scheduler.submit("volume", "volume_changed", {"volume": 1})
+        await scheduler.submit("volume", "volume_changed", {"volume": 2})
+
+        await scheduler.close()
+
+        assert [e[2]["volume"] for e in emitted(emit)] == [1, 2]
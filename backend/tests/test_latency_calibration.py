@@ -0,0 +1,214 @@
+# backend/tests/test_latency_calibration.py
+"""
+Tests unitaires pour la calibration de latence Snapcast (boucle simulée avec de faux satellites)
+"""
+import asyncio
+import base64
+import time
+import numpy as np
+import pytest
+from aiohttp import web
+from unittest.mock import Mock, AsyncMock
+from backend.infrastructure.services.latency_calibration_service import (
+    LatencyCalibrationService,
+    SAMPLE_RATE,
+    compute_latency_offsets,
+    find_pattern_onset,
+    generate_calibration_pattern
+)
+
+
+class FakeRoom:
+    """Diffusion simulée : mémorise l'instant où Milo joue le motif"""
+
+    def __init__(self):
+        self.played = asyncio.Event()
+        self.play_at = None
+
+    async def play(self, pcm: bytes, play_at: float) -> None:
+        self.play_at = play_at
+        self.played.set()
+
+
+class FakeCalibrationSatellite:
+    """Agent milo-sat simulé : enregistre le motif avec un retard donné (ou déclare son retard de sortie)
+
+    clock_skew_s décale l'horloge du satellite par rapport à celle de Milo ;
+    clock_probe=False simule un agent antérieur à la sonde d'horloge.
+    """
+
+    def __init__(self, room: FakeRoom, delay_ms: float = None, output_delay_ms: float = None,
+                 clock_skew_s: float = 0.0, clock_probe: bool = True):
+        self.room = room
+        self.delay_ms = delay_ms
+        self.output_delay_ms = output_delay_ms
+        self.clock_skew_s = clock_skew_s
+        self.runner = None
+        self.url = None
+        self.clock_probe = clock_probe
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/calibration/capture", self._capture)
+        if self.clock_probe:
+            app.router.add_get("/calibration/clock", self._clock)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def _clock(self, request):
+        return web.json_response({"time": time.time() + self.clock_skew_s})
+
+    async def _capture(self, request):
+        body = await request.json()
+        if self.delay_ms is None:
+            return web.json_response({"available": False, "output_delay_ms": self.output_delay_ms})
+
+        await self.room.played.wait()
+        rate = body["sample_rate"]
+        recording = np.random.default_rng(1).normal(0, 0.05, int(rate * body["duration_ms"] / 1000))
+        onset = round((self.room.play_at + self.delay_ms / 1000 - body["start_at"]) * rate)
+        pattern = generate_calibration_pattern(rate) * 0.3
+        recording[onset:onset + len(pattern)] += pattern[:len(recording) - onset]
+        pcm = (np.clip(recording, -1, 1) * 32767).astype("<i2").tobytes()
+        return web.json_response({
+            "available": True,
+            "started_at": body["start_at"] + self.clock_skew_s,  # Lu sur l'horloge du satellite
+            "sample_rate": rate,
+            "pcm": base64.b64encode(pcm).decode(),
+            "output_delay_ms": self.output_delay_ms
+        })
+
+
+class TestCalibrationMath:
+    """Tests de la détection du motif et du calcul des latences"""
+
+    def test_finds_pattern_in_noise(self):
+        pattern = generate_calibration_pattern()
+        recording = np.random.default_rng(0).normal(0, 0.1, SAMPLE_RATE * 2).astype(np.float32)
+        recording[12345:12345 + len(pattern)] += pattern * 0.2
+
+        onset, confidence = find_pattern_onset(recording, pattern)
+
+        assert onset == 12345
+        assert confidence > LatencyCalibrationService.MIN_CONFIDENCE
+
+    def test_silence_has_low_confidence(self):
+        pattern = generate_calibration_pattern()
+        noise = np.random.default_rng(0).normal(0, 0.1, SAMPLE_RATE * 2).astype(np.float32)
+
+        assert find_pattern_onset(noise, pattern)[1] < LatencyCalibrationService.MIN_CONFIDENCE
+
+    def test_offsets_align_on_earliest(self):
+        offsets = compute_latency_offsets({"a": 170.0, "b": 215.4, "c": 2000.0}, {"a": 0, "b": 10, "c": 0})
+
+        assert offsets == {"a": 0, "b": 55, "c": 1000}
+
+
+class TestLatencyCalibrationLoop:
+    """Boucle complète : diffusion, captures des satellites, application des latences"""
+
+    @pytest.fixture
+    async def setup(self):
+        room = FakeRoom()
+        # Chaîne complète = buffer 150 ms + sortie ALSA + 20 ms (aplay, loopback, codec, micro)
+        satellites = {
+            "sat1": FakeCalibrationSatellite(room, delay_ms=170, output_delay_ms=0),
+            "sat2": FakeCalibrationSatellite(room, delay_ms=215, output_delay_ms=45),
+            "sat3": FakeCalibrationSatellite(room, output_delay_ms=30)
+        }
+        for satellite in satellites.values():
+            await satellite.start()
+
+        snapcast = Mock()
+        snapcast.get_detailed_clients = AsyncMock(return_value=[
+            {"id": cid, "name": cid, "ip": "127.0.0.1", "latency": 10 if cid == "sat3" else 0}
+            for cid in ("sat1", "sat2", "sat3", "offline")
+        ])
+        snapcast.get_stream_settings = AsyncMock(return_value={"buffer_ms": 150})
+        snapcast.set_client_latency = AsyncMock(return_value=True)
+
+        service = LatencyCalibrationService(
+            snapcast,
+            player=room.play,
+            agent_url=lambda c: satellites[c["id"]].url if c["id"] in satellites else "http://127.0.0.1:9"
+        )
+        service.SCHEDULE_DELAY_S = 0.05
+        yield service, snapcast, satellites
+        for satellite in satellites.values():
+            await satellite.runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_measures_and_applies_latencies(self, setup):
+        service, snapcast, _ = setup
+
+        result = await service.calibrate()
+
+        assert result["success"] is True
+        assert result["reference"] == "capture" and result["pipeline_ms"] == 20.0
+        clients = result["clients"]
+        assert clients["sat1"]["mode"] == "capture" and abs(clients["sat1"]["delay_ms"] - 170) < 0.1
+        # Retard déclaré (150 + 30 - 10) recalé sur la référence capture
+        assert clients["sat3"]["mode"] == "reported+pipeline" and clients["sat3"]["delay_ms"] == 190.0
+        assert {cid: c["latency_after"] for cid, c in clients.items()} == {"sat1": 0, "sat2": 45, "sat3": 30}
+        assert "offline" in result["skipped"]
+
+        # Seules les latences modifiées sont envoyées à Snapcast
+        assert sorted(call.args for call in snapcast.set_client_latency.await_args_list) == [("sat2", 45), ("sat3", 30)]
+
+    @pytest.mark.asyncio
+    async def test_clock_skew_is_corrected(self, setup):
+        service, _, satellites = setup
+        satellites["sat2"].clock_skew_s = 0.25
+
+        clients = (await service.calibrate(apply=False))["clients"]
+
+        assert abs(clients["sat2"]["clock_offset_ms"] - 250) < service.MAX_CLOCK_UNCERTAINTY_MS
+        assert abs(clients["sat2"]["delay_ms"] - 215) < service.MAX_CLOCK_UNCERTAINTY_MS
+        assert clients["sat1"]["clock_offset_ms"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_reported_clients_skipped_without_pipeline_offset(self, setup):
+        service, _, satellites = setup
+        for satellite in (satellites["sat1"], satellites["sat2"]):
+            satellite.output_delay_ms = None
+
+        result = await service.calibrate(apply=False)
+
+        assert result["reference"] == "capture" and result["pipeline_ms"] is None
+        assert set(result["clients"]) == {"sat1", "sat2"}
+        assert "pipeline offset" in result["skipped"]["sat3"]["error"]
+
+    @pytest.mark.asyncio
+    async def test_reported_only_fleet(self, setup):
+        service, _, satellites = setup
+        for satellite in (satellites["sat1"], satellites["sat2"]):
+            satellite.delay_ms = None
+
+        result = await service.calibrate(apply=False)
+
+        assert result["reference"] == "reported"
+        assert {cid: c["delay_ms"] for cid, c in result["clients"].items()} == {"sat1": 150.0, "sat2": 195.0, "sat3": 170.0}
+
+    @pytest.mark.asyncio
+    async def test_agent_without_clock_probe_assumes_synced_clocks(self, setup):
+        service, _, satellites = setup
+        satellites["sat1"].clock_probe = False
+        await satellites["sat1"].runner.cleanup()
+        await satellites["sat1"].start()
+
+        clients = (await service.calibrate(apply=False))["clients"]
+
+        assert abs(clients["sat1"]["delay_ms"] - 170) < 0.1
+
+    @pytest.mark.asyncio
+    async def test_measure_only(self, setup):
+        service, snapcast, _ = setup
+
+        result = await service.calibrate(apply=False)
+
+        assert result["clients"]["sat2"]["latency_after"] == 45
+        snapcast.set_client_latency.assert_not_awaited()
+        assert service.last_result is result
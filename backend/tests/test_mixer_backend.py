@@ -0,0 +1,262 @@
+# backend/tests/test_mixer_backend.py
+"""
+Tests unitaires pour les backends mixer persistants (+ benchmark fork/exec vs handle persistant)
+"""
+import asyncio
+import shutil
+import time
+import pytest
+from unittest.mock import Mock, AsyncMock
+from backend.infrastructure.hardware.mixer_backend import (
+    AmixerSessionBackend,
+    FakeMixerBackend,
+    normalized_to_db,
+    db_to_normalized,
+    DB_GAIN_MUTE
+)
+from backend.infrastructure.hardware.mixer_watcher import MixerWatcher
+from backend.infrastructure.services.volume_service import VolumeService
+
+
+class QuantizingMixerBackend(FakeMixerBackend):
+    """Contrôle matériel à pas de dB : la valeur relue diffère de la valeur écrite"""
+
+    def set_volume(self, volume: int) -> bool:
+        volume = int(volume)
+        return super().set_volume(volume + 1 if volume % 7 == 0 else volume)
+
+
+class TestVolumeMapping:
+    """Tests de la courbe mappée (équivalent amixer -M)"""
+
+    def test_linear_scale_for_small_db_range(self):
+        """Plage <= 24 dB : mapping linéaire en dB"""
+        assert normalized_to_db(0.0, -2000, 0) == -2000
+        assert normalized_to_db(1.0, -2000, 0) == 0
+        assert normalized_to_db(0.5, -2000, 0) == -1000
+        assert db_to_normalized(-1000, -2000, 0) == 0.5
+
+    def test_log_scale_round_trip(self):
+        """Plage large (HiFiBerry Digital : -103.5 dB → 0) : aller-retour stable"""
+        min_db, max_db = -10350, 0
+        for percent in (0, 1, 10, 37, 50, 65, 100):
+            value_db = normalized_to_db(percent / 100, min_db, max_db)
+            assert min_db <= value_db <= max_db
+            assert round(db_to_normalized(value_db, min_db, max_db) * 100) == percent
+
+    def test_log_scale_is_perceptual(self):
+        """50% mappé correspond à environ -18 dB (courbe cubique), pas à la moitié de la plage"""
+        value_db = normalized_to_db(0.5, -10350, 0)
+        assert -1900 < value_db < -1700
+
+    def test_mute_floor(self):
+        """Un minimum "mute" ne casse pas la conversion"""
+        assert normalized_to_db(0.0, DB_GAIN_MUTE, 0) == DB_GAIN_MUTE
+        assert db_to_normalized(0, DB_GAIN_MUTE, 0) == 1.0
+
+
+class TestFakeMixerBackend:
+    """Tests du backend en mémoire"""
+
+    def test_set_and_get(self):
+        backend = FakeMixerBackend(volume=10)
+        assert backend.set_volume(42) is True
+        assert backend.get_volume() == 42
+        assert backend.history == [42]
+
+    def test_clamps(self):
+        backend = FakeMixerBackend()
+        backend.set_volume(150)
+        assert backend.get_volume() == 100
+
+    def test_fail_writes(self):
+        backend = FakeMixerBackend(volume=20, fail_writes=True)
+        assert backend.set_volume(50) is False
+        assert backend.get_volume() == 20
+
+
+@pytest.mark.skipif(shutil.which("cat") is None, reason="cat not available")
+class TestAmixerSessionBackend:
+    """Tests de la session persistante (cat remplace amixer)"""
+
+    def test_writes_go_through_single_process(self):
+        backend = AmixerSessionBackend("Digital", command=["cat"])
+        pid = backend._proc.pid
+        try:
+            for volume in (10, 20, 30):
+                assert backend.set_volume(volume) is True
+            assert backend._proc.pid == pid
+            assert backend.get_volume() == 30
+        finally:
+            backend.close()
+
+    def test_restarts_dead_session(self):
+        backend = AmixerSessionBackend("Digital", command=["cat"])
+        try:
+            backend._proc.kill()
+            backend._proc.wait()
+            assert backend.set_volume(15) is True
+            assert backend._proc.poll() is None
+        finally:
+            backend.close()
+
+
+class TestMixerWatcher:
+    """Tests du thread d'écoute des événements mixer"""
+
+    @pytest.mark.asyncio
+    async def test_notifies_only_actual_changes(self):
+        backend = FakeMixerBackend(volume=20)
+        changes = []
+        received = asyncio.Event()
+
+        def on_change(volume):
+            changes.append(volume)
+            received.set()
+
+        watcher = MixerWatcher(backend, on_change)
+        assert watcher.start() is True
+        try:
+            backend.simulate_external_change(20)  # Même valeur : pas de notification
+            backend.simulate_external_change(45)
+            await asyncio.wait_for(received.wait(), timeout=2)
+        finally:
+            watcher.stop()
+            backend.close()
+
+        assert changes == [45]
+
+    @pytest.mark.asyncio
+    async def test_unsupported_backend(self):
+        backend = AmixerSessionBackend("Digital", command=["cat"])
+        try:
+            watcher = MixerWatcher(backend, lambda volume: None)
+            assert watcher.start() is False
+            assert watcher.running is False
+        finally:
+            backend.close()
+
+
+class TestVolumeServiceMixer:
+    """Tests de VolumeService avec un backend injecté"""
+
+    @pytest.fixture
+    def service(self):
+        state_machine = Mock()
+        state_machine.broadcast_event = AsyncMock()
+        state_machine.routing_service = Mock()
+        state_machine.routing_service.get_state = Mock(return_value={'multiroom_enabled': False})
+        snapcast = Mock()
+        snapcast.get_clients = AsyncMock(return_value=[])
+        return VolumeService(state_machine, snapcast, settings_service=Mock(), mixer_backend=FakeMixerBackend())
+
+    @pytest.mark.asyncio
+    async def test_set_mixer_volume_clamps_to_limits(self, service):
+        assert await service._set_mixer_volume(90) is True
+        assert service.mixer.get_volume() == service._alsa_max_volume
+        assert service._last_alsa_volume == service._alsa_max_volume
+
+    @pytest.mark.asyncio
+    async def test_external_change_updates_display_volume(self, service):
+        service._schedule_broadcast = AsyncMock()
+        service._last_alsa_volume = 20
+
+        service._on_mixer_changed(39)
+        await asyncio.sleep(0)
+
+        assert service._last_alsa_volume == 39
+        assert service._precise_display_volume == 60.0
+        service._schedule_broadcast.assert_awaited_once_with(show_bar=False)
+
+    @pytest.mark.asyncio
+    async def test_own_write_echo_is_ignored(self, service):
+        service._schedule_broadcast = AsyncMock()
+        await service._set_mixer_volume(30)
+
+        service._on_mixer_changed(30)
+        await asyncio.sleep(0)
+
+        service._schedule_broadcast.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_external_change_during_adjustment_is_rechecked(self, service):
+        service._schedule_broadcast = AsyncMock()
+        await service._set_mixer_volume(30)
+        service._adjustment_counter = 1
+
+        # alsamixer pendant un ajustement : ignoré sur le moment, relu à la fin
+        service.mixer.volume = 39
+        service._on_mixer_changed(39)
+        assert service._last_alsa_volume == 30
+
+        await service._mark_adjustment_done()
+        await asyncio.sleep(0)
+
+        assert service._last_alsa_volume == 39
+        assert service._precise_display_volume == 60.0
+        service._schedule_broadcast.assert_awaited_once_with(show_bar=False)
+
+    @pytest.mark.asyncio
+    async def test_quantized_readback_is_not_external(self, service):
+        service.mixer = QuantizingMixerBackend()
+        service._schedule_broadcast = AsyncMock()
+        service._precise_display_volume = 42.0
+        service._adjustment_counter = 1
+        await service._set_mixer_volume(28)
+
+        service._on_mixer_changed(29)  # Écho de notre écriture, quantifiée par le matériel
+        await service._mark_adjustment_done()
+        await asyncio.sleep(0)
+
+        assert service._last_alsa_volume == 29
+        assert service._precise_display_volume == 42.0
+        service._schedule_broadcast.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_set_mixer_volume_without_mixer(self, service):
+        service.mixer = None
+        assert await service._set_mixer_volume(30) is False
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(shutil.which("true") is None or shutil.which("cat") is None,
+                    reason="coreutils not available")
+class TestMixerBenchmark:
+    """Benchmark : un processus par pas (ancien chemin amixer) vs handle persistant"""
+
+    STEPS = 50
+
+    @pytest.mark.asyncio
+    async def test_persistent_handle_beats_fork_exec(self):
+        # Ancien chemin : un fork/exec par pas ("true" remplace amixer, coût de lancement seul)
+        start = time.perf_counter()
+        for _ in range(self.STEPS):
+            proc = await asyncio.create_subprocess_exec(
+                "true", stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            await proc.communicate()
+        spawn_per_step = (time.perf_counter() - start) / self.STEPS
+
+        session = AmixerSessionBackend("Digital", command=["cat"])
+        try:
+            start = time.perf_counter()
+            for i in range(self.STEPS):
+                session.set_volume(i)
+            session_per_step = (time.perf_counter() - start) / self.STEPS
+        finally:
+            session.close()
+
+        fake = FakeMixerBackend()
+        start = time.perf_counter()
+        for i in range(self.STEPS):
+            fake.set_volume(i)
+        handle_per_step = (time.perf_counter() - start) / self.STEPS
+
+        print(
+            f"\nper step: fork/exec={spawn_per_step * 1e6:.0f}µs "
+            f"amixer-session={session_per_step * 1e6:.1f}µs "
+            f"in-process={handle_per_step * 1e6:.2f}µs"
+        )
+
+        assert session_per_step * 10 < spawn_per_step
+        assert handle_per_step * 10 < spawn_per_step
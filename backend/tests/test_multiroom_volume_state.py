@@ -0,0 +1,132 @@
+# backend/tests/test_multiroom_volume_state.py
+"""
+Tests unitaires pour les états volume multiroom vectorisés
+"""
+import numpy as np
+import pytest
+from unittest.mock import Mock, AsyncMock
+from backend.infrastructure.hardware.mixer_backend import FakeMixerBackend
+from backend.infrastructure.services.multiroom_volume_state import (
+    MultiroomVolumeState,
+    alsa_to_display_array,
+    display_to_alsa_array,
+    round_half_up_array
+)
+from backend.infrastructure.services.volume_service import VolumeService
+
+
+class TestMultiroomVolumeState:
+    """Tests du conteneur dict-compatible"""
+
+    def test_behaves_like_dict(self):
+        state = MultiroomVolumeState({"a": 10.0, "b": 20.0})
+        state["c"] = 30.0
+        del state["a"]
+
+        assert state == {"b": 20.0, "c": 30.0}
+        assert len(state) == 2
+        assert state.get("a", "missing") == "missing"
+        assert isinstance(state["b"], float)
+
+    def test_grows_beyond_initial_capacity(self):
+        state = MultiroomVolumeState()
+        for i in range(MultiroomVolumeState.INITIAL_CAPACITY * 3):
+            state[f"client{i}"] = float(i)
+
+        assert len(state) == MultiroomVolumeState.INITIAL_CAPACITY * 3
+        assert state["client40"] == 40.0
+
+    def test_apply_delta_clamps(self):
+        state = MultiroomVolumeState({"a": 95.0, "b": 3.0})
+        positions = state.indices(["a", "b", "c"], np.array([0.0, 0.0, 50.0]))
+
+        updated = state.apply_delta(positions, 10)
+
+        assert updated.tolist() == [100.0, 13.0, 60.0]
+        assert state == {"a": 100.0, "b": 13.0, "c": 60.0}
+
+    def test_positions_are_reused_for_same_clients(self):
+        state = MultiroomVolumeState({"a": 1.0, "b": 2.0})
+        first = state.indices(["a", "b"], np.zeros(2))
+        assert state.indices(["a", "b"], np.zeros(2)) is first
+
+        del state["a"]
+        assert state.indices(["b"], np.zeros(1)).tolist() == [0]
+
+
+class TestVectorizedConversions:
+    """Les versions tableau donnent les mêmes valeurs que les conversions scalaires"""
+
+    @pytest.fixture
+    def service(self):
+        service = VolumeService(Mock(), Mock(), settings_service=Mock(), mixer_backend=FakeMixerBackend())
+        service._alsa_min_volume = 5
+        service._alsa_max_volume = 65
+        return service
+
+    def test_matches_scalar_conversions(self, service):
+        display = np.linspace(-10, 110, 241)
+        alsa = np.arange(0, 101, dtype=np.float64)
+
+        assert display_to_alsa_array(display, 5, 65).tolist() == [
+            service._clamp_alsa_volume(service._display_to_alsa_precise(v)) for v in display.tolist()
+        ]
+        assert alsa_to_display_array(alsa, 5, 65).tolist() == [
+            service._alsa_to_display(int(v)) for v in alsa.tolist()
+        ]
+        in_range = np.clip(display, 0, 100)
+        assert round_half_up_array(in_range).tolist() == [
+            service._round_half_up(v) for v in in_range.tolist()
+        ]
+
+
+class TestMultiroomBatchAdjust:
+    """Tests de l'ajustement multiroom vectorisé dans VolumeService"""
+
+    CLIENT_COUNT = 32
+
+    @pytest.fixture
+    def service(self):
+        state_machine = Mock()
+        state_machine.broadcast_event = AsyncMock()
+        state_machine.routing_service = Mock()
+        state_machine.routing_service.get_state = Mock(return_value={'multiroom_enabled': True})
+        snapcast = Mock()
+        snapcast.get_clients = AsyncMock(return_value=[
+            {"id": f"client{i}", "volume": 26, "muted": i == 0} for i in range(self.CLIENT_COUNT)
+        ])
+        snapcast.set_volumes = AsyncMock(return_value=True)
+        service = VolumeService(state_machine, snapcast, settings_service=Mock(), mixer_backend=FakeMixerBackend())
+        service._ramp_duration_ms = 0
+        return service
+
+    @pytest.mark.asyncio
+    async def test_adjust_sends_single_batch_event(self, service):
+        assert await service.adjust_display_volume(10) is True
+
+        events = [c.args for c in service.state_machine.broadcast_event.await_args_list if c.args[0] == "snapcast"]
+        assert len(events) == 1
+        _, event_type, data = events[0]
+        assert event_type == "clients_volume_changed"
+        assert len(data["client_ids"]) == self.CLIENT_COUNT
+        assert set(data["volumes"]) == {50}
+        assert data["muted"][0] is True
+
+        # Tous les clients en un seul appel batch
+        service.snapcast_service.set_volumes.assert_awaited_once()
+        volumes = service.snapcast_service.set_volumes.await_args.args[0]
+        assert len(volumes) == self.CLIENT_COUNT
+        assert set(volumes.values()) == {service._display_to_alsa(50)}
+        assert await service.get_display_volume() == 50
+
+    @pytest.mark.asyncio
+    async def test_set_applies_uniform_delta(self, service):
+        await service._initialize_client_display_states()
+        service._client_display_states["client1"] = 20.0
+        await service._recalculate_multiroom_volume()
+
+        assert await service.set_display_volume(60, show_bar=False) is True
+
+        # Moyenne des clients non mutés passée à 60, écarts relatifs conservés
+        assert await service.get_display_volume() == 60
+        assert service._client_display_states["client1"] < service._client_display_states["client2"]
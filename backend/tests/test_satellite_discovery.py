@@ -0,0 +1,114 @@
+# backend/tests/test_satellite_discovery.py
+"""
+Tests unitaires pour la découverte parallèle des satellites milo-sat
+"""
+import asyncio
+import time
+import pytest
+from aiohttp import web
+from unittest.mock import Mock, AsyncMock
+from backend.infrastructure.services.satellite_dependency_update_service import SatelliteDependencyUpdateService
+
+
+class FakeSatellites:
+    """API /status de plusieurs satellites sur des adresses loopback distinctes (même port)"""
+
+    def __init__(self, delays):
+        self.delays = delays  # ip -> délai de réponse (secondes)
+        self.requests = []
+        self.runners = []
+        self.port = 0
+
+    async def start(self):
+        for ip in self.delays:
+            app = web.Application()
+            app.router.add_get("/status", self._status)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, ip, self.port)
+            await site.start()
+            self.port = site._server.sockets[0].getsockname()[1]
+            self.runners.append(runner)
+
+    async def stop(self):
+        for runner in self.runners:
+            await runner.cleanup()
+
+    async def _status(self, request):
+        ip = request.transport.get_extra_info("sockname")[0]
+        self.requests.append(ip)
+        await asyncio.sleep(self.delays[ip])
+        return web.json_response({"uptime": 10, "snapclient": {"version": "0.31.0", "running": True}})
+
+
+@pytest.fixture
+async def satellites():
+    fake = FakeSatellites({"127.0.0.2": 0.0, "127.0.0.3": 0.0, "127.0.0.4": 1.0})
+    await fake.start()
+    yield fake
+    await fake.stop()
+
+
+@pytest.fixture
+async def service(satellites):
+    snapcast = Mock()
+    snapcast.get_clients = AsyncMock(return_value=[
+        {"id": f"c{i}", "name": f"Sat {i}", "host": f"milo-sat-{i}", "ip": f"127.0.0.{i}"} for i in (2, 3, 4)
+    ] + [{"id": "milo", "name": "Milo", "host": "milo", "ip": "127.0.0.1"}])
+    service = SatelliteDependencyUpdateService(snapcast)
+    service.satellite_api_port = satellites.port
+    service.PROBE_TIMEOUT = 0.3
+    yield service
+    await service.close()
+
+
+class TestSatelliteDiscovery:
+    """Tests de la découverte concurrente et du cache"""
+
+    @pytest.mark.asyncio
+    async def test_probes_run_concurrently(self, service, satellites):
+        start = time.perf_counter()
+        found = await service.discover_satellites()
+        elapsed = time.perf_counter() - start
+
+        # Le satellite lent n'ajoute qu'un timeout, pas un timeout par satellite
+        assert [s["hostname"] for s in found] == ["milo-sat-2", "milo-sat-3"]
+        assert elapsed < 2 * service.PROBE_TIMEOUT
+        assert sorted(satellites.requests) == ["127.0.0.2", "127.0.0.3", "127.0.0.4"]
+
+    @pytest.mark.asyncio
+    async def test_results_are_cached(self, service, satellites):
+        await service.discover_satellites()
+        session = service._session
+        satellites.requests.clear()
+
+        found = await service.discover_satellites()
+        found[0]["online"] = False  # Copie : le cache n'est pas modifié
+
+        assert satellites.requests == []
+        assert (await service.discover_satellites())[0]["online"] is True
+        service.snapcast_service.get_clients.assert_awaited_once()
+
+        await service.discover_satellites(force=True)
+        assert service._session is session
+        assert len(satellites.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_discovery(self, service):
+        results = await asyncio.gather(*[service.discover_satellites() for _ in range(5)])
+
+        assert all(len(r) == 2 for r in results)
+        service.snapcast_service.get_clients.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_background_refresher_keeps_cache_warm(self, service):
+        service.REFRESH_INTERVAL = 0.05
+        await service.initialize()
+
+        async with asyncio.timeout(2):
+            while service.snapcast_service.get_clients.await_count < 2:
+                await asyncio.sleep(0.01)
+
+        assert len(service._satellites_cache) == 2
+        await service.close()
+        assert service._refresh_task is None and service._session is None
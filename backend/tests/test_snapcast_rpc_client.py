@@ -0,0 +1,198 @@
+# backend/tests/test_snapcast_rpc_client.py
+"""
+Tests unitaires pour le client JSON-RPC Snapcast (WebSocket persistante + secours HTTP)
+"""
+import asyncio
+import time
+import pytest
+from backend.infrastructure.services.snapcast_rpc_client import SnapcastRpcClient
+
+
+async def wait_until(predicate, timeout: float = 2.0):
+    """Attend qu'une condition devienne vraie"""
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def client(fake_snapserver):
+    client = SnapcastRpcClient(host="127.0.0.1", port=fake_snapserver.port)
+    client.RECONNECT_DELAY = 0.05
+    yield client
+    await client.close()
+
+
+class TestSnapcastRpcClient:
+    """Tests du transport des commandes"""
+
+    @pytest.mark.asyncio
+    async def test_http_when_not_started(self, client, fake_snapserver):
+        result = await client.call("Server.GetRPCVersion")
+
+        assert result["major"] == 2
+        assert fake_snapserver.count("Server.GetRPCVersion", "http") == 1
+
+    @pytest.mark.asyncio
+    async def test_commands_go_over_socket(self, client, fake_snapserver):
+        await client.start()
+        await wait_until(lambda: client.connected)
+
+        results = await asyncio.gather(*[
+            client.call("Client.SetVolume", {"id": "c2", "volume": {"percent": p, "muted": False}})
+            for p in (10, 20, 30)
+        ])
+
+        # Réponses associées à leur requête par id
+        assert [r["volume"]["percent"] for r in results] == [10, 20, 30]
+        assert fake_snapserver.count("Client.SetVolume", "ws") == 3
+        assert fake_snapserver.count("Client.SetVolume", "http") == 0
+
+    @pytest.mark.asyncio
+    async def test_rpc_error_returns_empty_result(self, client):
+        await client.start()
+        await wait_until(lambda: client.connected)
+
+        assert await client.call("Client.SetVolume", {"id": "unknown", "volume": {"percent": 1}}) == {}
+
+    @pytest.mark.asyncio
+    async def test_timeout_falls_back_to_http(self, client, fake_snapserver):
+        await client.start()
+        await wait_until(lambda: client.connected)
+        fake_snapserver.silent_methods.add("Server.GetStatus")
+
+        result = await client.call("Server.GetStatus", timeout=0.1)
+
+        assert "server" in result
+        assert fake_snapserver.count("Server.GetStatus", "http") == 1
+        assert client.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_drop(self, client, fake_snapserver):
+        connections = []
+
+        async def on_connected():
+            connections.append(True)
+
+        client.set_connection_handlers(on_connected, lambda: None)
+        await client.start()
+        await wait_until(lambda: len(connections) == 1)
+
+        await fake_snapserver.disconnect_all()
+        await wait_until(lambda: len(connections) == 2)
+
+        await client.call("Server.GetRPCVersion")
+        assert fake_snapserver.count("Server.GetRPCVersion", "ws") == 1
+
+    @pytest.mark.asyncio
+    async def test_notifications_dispatched_in_order(self, client, fake_snapserver):
+        received = []
+
+        async def handler(notification):
+            # Un handler peut envoyer une commande sans bloquer la lecture des réponses
+            await client.call("Server.GetRPCVersion")
+            received.append(notification["params"]["id"])
+
+        client.set_notification_handler(handler)
+        await client.start()
+        await wait_until(lambda: client.connected)
+
+        for client_id in ("a", "b", "c"):
+            await fake_snapserver.notify("Client.OnNameChanged", {"id": client_id, "name": client_id})
+        await wait_until(lambda: len(received) == 3)
+
+        assert received == ["a", "b", "c"]
+        assert fake_snapserver.count("Server.GetRPCVersion", "ws") == 3
+
+    @pytest.mark.asyncio
+    async def test_stop_returns_to_http(self, client, fake_snapserver):
+        await client.start()
+        await wait_until(lambda: client.connected)
+        await client.stop()
+
+        assert client.connected is False
+        await client.call("Server.GetRPCVersion")
+        assert fake_snapserver.count("Server.GetRPCVersion", "http") == 1
+
+
+class TestSnapcastRpcBatch:
+    """Tests des requêtes batch JSON-RPC 2.0"""
+
+    @pytest.mark.asyncio
+    async def test_batch_over_http(self, client, fake_snapserver):
+        results = await client.call_batch([
+            ("Client.SetVolume", {"id": "c1", "volume": {"percent": 11, "muted": False}}),
+            ("Client.SetVolume", {"id": "unknown", "volume": {"percent": 12, "muted": False}}),
+            ("Client.SetVolume", {"id": "c2", "volume": {"percent": 13, "muted": False}})
+        ])
+
+        # Résultats dans l'ordre des appels, erreur individuelle → {}
+        assert [r.get("volume", {}).get("percent") for r in results] == [11, None, 13]
+        assert fake_snapserver.batches == [("http", 3)]
+
+    @pytest.mark.asyncio
+    async def test_batch_over_socket(self, client, fake_snapserver):
+        await client.start()
+        await wait_until(lambda: client.connected)
+
+        results = await client.call_batch([
+            ("Group.SetStream", {"id": "g1", "stream_id": "Multiroom"}),
+            ("Server.GetRPCVersion", None)
+        ])
+
+        assert results[0] == {"stream_id": "Multiroom"}
+        assert results[1]["major"] == 2
+        assert fake_snapserver.batches == [("ws", 2)]
+        assert client.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self, client, fake_snapserver):
+        assert await client.call_batch([]) == []
+        assert fake_snapserver.calls == []
+
+
+@pytest.mark.slow
+class TestSnapcastBatchBenchmark:
+    """Benchmark : 20 clients, un Client.SetVolume par client vs une seule requête batch"""
+
+    CLIENTS = 20
+    ROUNDS = 10
+
+    @pytest.mark.asyncio
+    async def test_batch_beats_per_client_calls(self, client, fake_snapserver):
+        for i in range(self.CLIENTS):
+            fake_snapserver.clients[f"sat{i}"] = fake_snapserver.make_client(f"sat{i}")
+        ids = list(fake_snapserver.clients)
+
+        def calls(percent):
+            return [("Client.SetVolume", {"id": cid, "volume": {"percent": percent, "muted": False}}) for cid in ids]
+
+        async def per_client(percent):
+            await asyncio.gather(*[client.call(method, params) for method, params in calls(percent)])
+
+        async def batched(percent):
+            await client.call_batch(calls(percent))
+
+        async def measure(operation):
+            start = time.perf_counter()
+            for i in range(self.ROUNDS):
+                await operation(i)
+            return (time.perf_counter() - start) / self.ROUNDS
+
+        http_per_client = await measure(per_client)
+        http_batch = await measure(batched)
+
+        await client.start()
+        await wait_until(lambda: client.connected)
+        ws_per_client = await measure(per_client)
+        ws_batch = await measure(batched)
+
+        print(
+            f"\n{len(ids)} clients: http per-client={http_per_client * 1e3:.2f}ms "
+            f"http batch={http_batch * 1e3:.2f}ms ws per-client={ws_per_client * 1e3:.2f}ms "
+            f"ws batch={ws_batch * 1e3:.2f}ms"
+        )
+
+        assert http_batch < http_per_client
+        assert ws_batch < ws_per_client
+        assert fake_snapserver.batches.count(("ws", len(ids))) == self.ROUNDS
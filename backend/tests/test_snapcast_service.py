@@ -0,0 +1,109 @@
+# backend/tests/test_snapcast_service.py
+"""
+Tests unitaires pour SnapcastService - Miroir d'état clients et session partagée
+"""
+import pytest
+from backend.infrastructure.services.snapcast_service import SnapcastService
+
+
+@pytest.fixture
+async def service(fake_snapserver):
+    service = SnapcastService(host="127.0.0.1", port=fake_snapserver.port)
+    yield service
+    await service.close()
+
+
+class TestSnapcastClientMirror:
+    """Tests du miroir d'état clients"""
+
+    @pytest.mark.asyncio
+    async def test_set_volume_uses_live_mirror(self, service, fake_snapserver):
+        await service.get_clients()
+        service.set_mirror_live(True)
+        fake_snapserver.calls.clear()
+
+        for volume in (10, 20, 30):
+            assert await service.set_volume("c1", volume) is True
+
+        # Une seule RPC par changement, mute conservé depuis le miroir
+        assert fake_snapserver.count("Server.GetStatus") == 0
+        assert fake_snapserver.count("Client.SetVolume") == 3
+        assert fake_snapserver.calls[-1][2]["volume"] == {"percent": 30, "muted": True}
+
+    @pytest.mark.asyncio
+    async def test_set_mute_keeps_mirrored_volume(self, service, fake_snapserver):
+        await service.get_clients()
+        service.set_mirror_live(True)
+        await service.set_volume("c2", 55)
+
+        assert await service.set_mute("c2", True) is True
+        assert fake_snapserver.calls[-1][2]["volume"] == {"percent": 55, "muted": True}
+
+    @pytest.mark.asyncio
+    async def test_notifications_update_mirror(self, service, fake_snapserver):
+        await service.get_clients()
+        service.set_mirror_live(True)
+
+        service.apply_notification("Client.OnVolumeChanged", {"id": "c1", "volume": {"percent": 70, "muted": False}})
+        await service.set_mute("c1", True)
+        assert fake_snapserver.calls[-1][2]["volume"] == {"percent": 70, "muted": True}
+
+        service.apply_notification("Client.OnConnect", {"id": "c3", "client": fake_snapserver.make_client("c3", 12)})
+        await service.set_mute("c3", True)
+        assert fake_snapserver.calls[-1][2]["volume"] == {"percent": 12, "muted": True}
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_server_status_without_notifications(self, service, fake_snapserver):
+        await service.get_clients()
+        fake_snapserver.clients["c2"]["config"]["volume"]["muted"] = True  # Changement non notifié
+        fake_snapserver.calls.clear()
+
+        await service.set_volume("c2", 45)
+
+        assert fake_snapserver.count("Server.GetStatus") == 1
+        assert fake_snapserver.calls[-1][2]["volume"] == {"percent": 45, "muted": True}
+
+    @pytest.mark.asyncio
+    async def test_session_is_reused(self, service):
+        await service.get_clients()
+        session = service.rpc._session
+        await service.set_volume("c1", 10)
+
+        assert service.rpc._session is session
+        await service.close()
+        assert service.rpc._session is None
+
+
+class TestSnapcastBatchCommands:
+    """Tests des opérations multi-clients en une requête"""
+
+    @pytest.mark.asyncio
+    async def test_set_volumes_is_one_request(self, service, fake_snapserver):
+        await service.get_clients()
+        service.set_mirror_live(True)
+        fake_snapserver.calls.clear()
+
+        assert await service.set_volumes({"c1": 15, "c2": 25}) is True
+
+        assert fake_snapserver.batches == [("http", 2)]
+        assert fake_snapserver.count("Server.GetStatus") == 0
+        # Mute conservé client par client
+        assert fake_snapserver.clients["c1"]["config"]["volume"] == {"percent": 15, "muted": True}
+        assert fake_snapserver.clients["c2"]["config"]["volume"] == {"percent": 25, "muted": False}
+
+    @pytest.mark.asyncio
+    async def test_set_volumes_with_explicit_mute(self, service, fake_snapserver):
+        assert await service.set_volumes({"c1": 5, "c2": 5}, muted=False) is True
+
+        assert fake_snapserver.count("Server.GetStatus") == 1  # Miroir non live
+        assert all(not c["config"]["volume"]["muted"] for c in fake_snapserver.clients.values())
+
+    @pytest.mark.asyncio
+    async def test_set_volumes_reports_partial_failure(self, service, fake_snapserver):
+        assert await service.set_volumes({"c1": 5, "ghost": 5}) is False
+
+    @pytest.mark.asyncio
+    async def test_all_groups_moved_in_one_batch(self, service, fake_snapserver):
+        assert await service.set_all_groups_to_multiroom() is True
+        assert fake_snapserver.batches == [("http", 1)]
+        assert fake_snapserver.count("Group.SetStream") == 1
@@ -0,0 +1,200 @@
+# backend/tests/test_snapcast_state_model.py
+"""
+Tests unitaires pour le modèle d'état Snapcast incrémental et les mises à jour UI par diff
+"""
+import asyncio
+import copy
+import pytest
+from unittest.mock import Mock, AsyncMock
+from backend.infrastructure.services.snapcast_service import SnapcastService
+from backend.infrastructure.services.snapcast_state_model import SnapcastStateModel, diff_fields
+from backend.infrastructure.services.snapcast_websocket_service import SnapcastWebSocketService
+
+
+def make_client(client_id: str, percent: int = 30) -> dict:
+    """Client au format Server.GetStatus"""
+    return {
+        "id": client_id,
+        "connected": True,
+        "config": {"name": client_id, "latency": 0, "volume": {"percent": percent, "muted": False}},
+        "host": {"name": client_id, "ip": "::ffff:192.168.1.10", "mac": "00:00:00:00:00:00"}
+    }
+
+
+def make_status(*groups):
+    """Statut serveur : groupes (id, stream, clients)"""
+    return {"server": {
+        "groups": [{"id": gid, "stream_id": stream, "muted": False, "clients": clients} for gid, stream, clients in groups],
+        "server": {"host": {"name": "milo"}},
+        "streams": [{"id": "Multiroom", "status": "idle"}]
+    }}
+
+
+@pytest.fixture
+def status():
+    return make_status(("g1", "Multiroom", [make_client("c1"), make_client("c2")]))
+
+
+class TestSnapcastStateModel:
+    """Tests du modèle normalisé et du calcul de diff"""
+
+    def test_diff_fields(self):
+        old = {"config": {"name": "a", "volume": {"percent": 1}}, "extra": 1}
+        new = {"config": {"name": "a", "volume": {"percent": 2}}}
+
+        assert diff_fields(old, new) == {"config.volume.percent": 2, "extra": None}
+
+    def test_load_status_diff(self, status):
+        model = SnapcastStateModel()
+        changes = model.load_status(status)
+
+        assert {(c.kind, c.entity_id, c.action) for c in changes} >= {
+            ("group", "g1", "added"), ("client", "c1", "added"), ("stream", "Multiroom", "added")
+        }
+        assert model.group_of("c2") == "g1"
+
+        # Même état → aucun changement
+        assert model.load_status(copy.deepcopy(status)) == []
+
+    def test_full_update_reports_only_changed_fields(self, status):
+        model = SnapcastStateModel()
+        model.load_status(status)
+        updated = copy.deepcopy(status)
+        updated["server"]["groups"][0]["clients"][1]["config"]["latency"] = 40
+        updated["server"]["groups"][0]["clients"].pop(0)
+
+        changes = model.load_status(updated)
+
+        assert [(c.kind, c.entity_id, c.action, c.fields) for c in changes if c.kind == "client"] == [
+            ("client", "c2", "updated", {"config.latency": 40}),
+            ("client", "c1", "removed", {})
+        ]
+        assert changes[0].kind == "group" and changes[0].fields == {"clients": ["c2"]}
+
+    def test_group_move_is_a_client_field(self, status):
+        model = SnapcastStateModel()
+        model.load_status(status)
+        c1, c2 = status["server"]["groups"][0]["clients"]
+
+        changes = model.load_status(make_status(("g1", "Multiroom", [c1]), ("g2", "Multiroom", [c2])))
+
+        assert [c.fields for c in changes if c.kind == "client"] == [{"group_id": "g2"}]
+
+    def test_incremental_notifications(self, status):
+        model = SnapcastStateModel()
+        model.load_status(status)
+
+        [change] = model.apply_notification("Client.OnLatencyChanged", {"id": "c1", "latency": 25})
+        assert change.fields == {"config.latency": 25}
+
+        [change] = model.apply_notification("Group.OnStreamChanged", {"id": "g1", "stream_id": "default"})
+        assert (change.kind, change.fields) == ("group", {"stream_id": "default"})
+
+        # Valeur identique ou entité inconnue → aucun changement
+        assert model.apply_notification("Client.OnNameChanged", {"id": "c1", "name": "c1"}) == []
+        assert model.apply_notification("Client.OnLatencyChanged", {"id": "ghost", "latency": 1}) == []
+
+    def test_to_status_roundtrip(self, status):
+        model = SnapcastStateModel()
+        model.load_status(status)
+
+        assert SnapcastStateModel().load_status(model.to_status()) != []
+        assert model.load_status(model.to_status()) == []
+
+
+class TestSnapcastServiceModelReads:
+    """Les API REST sont servies par le modèle quand les notifications sont connectées"""
+
+    @pytest.fixture
+    async def service(self, fake_snapserver):
+        service = SnapcastService(host="127.0.0.1", port=fake_snapserver.port)
+        yield service
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_reads_without_upstream_calls_when_live(self, service, fake_snapserver):
+        await service.get_clients()
+        service.set_mirror_live(True)
+        fake_snapserver.calls.clear()
+
+        clients = await service.get_clients()
+        detailed = await service.get_detailed_clients()
+        await service.set_client_group_to_multiroom("c1")
+
+        assert [c["id"] for c in clients] == ["c1", "c2"]
+        assert set(clients[0]) == {"id", "name", "volume", "muted", "host", "ip"}
+        assert detailed[1]["group_id"] == "g1"
+        assert fake_snapserver.count("Server.GetStatus") == 0
+
+    @pytest.mark.asyncio
+    async def test_own_commands_written_back_to_model(self, service, fake_snapserver):
+        # Commandes sur la socket de contrôle : snapserver ne notifie pas la session émettrice
+        await service.rpc.start()
+        async with asyncio.timeout(2):
+            while not service.rpc.connected:
+                await asyncio.sleep(0.01)
+        await service.get_clients()
+        service.set_mirror_live(True)
+
+        assert await service.set_client_name("c1", " Salon ")
+        assert await service.set_client_latency("c2", 40)
+        assert await service.set_client_group_to_multiroom("c1")
+
+        clients = await service.get_clients()
+        assert clients[0]["name"] == "Salon"
+        assert service.model.clients["c2"]["config"]["latency"] == 40
+        assert service.model.groups["g1"]["stream_id"] == "Multiroom"
+        assert fake_snapserver.count("Client.SetName", "ws") == 1
+        assert fake_snapserver.count("Server.GetStatus") == 1
+
+    @pytest.mark.asyncio
+    async def test_reads_refresh_when_not_live(self, service, fake_snapserver):
+        await service.get_clients()
+        fake_snapserver.clients["c2"]["connected"] = False
+
+        assert [c["id"] for c in await service.get_clients()] == ["c1"]
+        assert fake_snapserver.count("Server.GetStatus") == 2
+
+
+class TestSnapcastWebSocketDiff:
+    """Server.OnUpdate traité à partir du diff du modèle"""
+
+    @pytest.fixture
+    def ws_service(self, status):
+        snapcast_service = SnapcastService(rpc_client=Mock())
+        snapcast_service.model.load_status(status)
+        snapcast_service.set_client_group_to_multiroom = AsyncMock(return_value=True)
+        state_machine = Mock()
+        state_machine.broadcast_event = AsyncMock()
+        state_machine.snapcast_service = snapcast_service
+        state_machine.volume_service.initialize_new_client_volume = AsyncMock(return_value=True)
+        service = SnapcastWebSocketService(state_machine, None, rpc_client=Mock())
+        service._known_client_ids = {"c1", "c2"}
+        return service
+
+    def broadcasts(self, service):
+        return [c.args[1:] for c in service.state_machine.broadcast_event.await_args_list]
+
+    @pytest.mark.asyncio
+    async def test_unchanged_update_is_silent(self, ws_service, status):
+        await ws_service._handle_notification({"method": "Server.OnUpdate", "params": copy.deepcopy(status)})
+
+        assert self.broadcasts(ws_service) == []
+        ws_service.state_machine.volume_service.initialize_new_client_volume.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_update_publishes_changes(self, ws_service, status):
+        updated = copy.deepcopy(status)
+        clients = updated["server"]["groups"][0]["clients"]
+        clients[0]["connected"] = False
+        clients[1]["config"]["name"] = "Cuisine"
+        clients.append(make_client("c3", 20))
+
+        await ws_service._handle_notification({"method": "Server.OnUpdate", "params": updated})
+
+        events = self.broadcasts(ws_service)
+        assert events[0][0] == "client_disconnected" and events[0][1]["client_id"] == "c1"
+        assert events[1][0] == "clients_updated"
+        assert events[1][1]["clients"] == [{"client_id": "c2", "fields": {"name": "Cuisine"}}]
+        assert ws_service._known_client_ids == {"c2", "c3"}
+        ws_service.state_machine.volume_service.initialize_new_client_volume.assert_awaited_once_with("c3", 20)
@@ -0,0 +1,84 @@
+# backend/tests/test_snapcast_telemetry.py
+"""
+Tests unitaires pour la télémétrie Snapcast (séries circulaires, reconnexions, percentiles)
+"""
+import pytest
+from backend.infrastructure.services.snapcast_service import SnapcastService
+from backend.infrastructure.services.snapcast_telemetry import RingSeries, SnapcastTelemetryCollector
+
+
+class TestRingSeries:
+    """Tests de la série temporelle circulaire"""
+
+    def test_overwrites_oldest(self):
+        series = RingSeries(4)
+        for i in range(6):
+            series.append(float(i), i * 10)
+
+        assert len(series) == 4
+        assert series.values().tolist() == [20, 30, 40, 50]
+        assert series.last() == 50
+
+    def test_stats(self):
+        series = RingSeries(200)
+        for i in range(101):
+            series.append(float(i), i)
+
+        stats = series.stats()
+        assert (stats["p50"], stats["p95"], stats["min"], stats["max"]) == (50.0, 95.0, 0.0, 100.0)
+        assert stats["samples"] == 101
+        assert RingSeries(3).stats() == {"samples": 0}
+
+
+class TestSnapcastTelemetryCollector:
+    """Tests de l'échantillonnage et de l'agrégation"""
+
+    @pytest.fixture
+    async def collector(self, fake_snapserver, tmp_path):
+        conf = tmp_path / "snapserver.conf"
+        conf.write_text("[stream]\nsource = pipe:///tmp/snapfifo?name=Multiroom\nbuffer = 1000\nchunk_ms = 20\ncodec = flac\n")
+        service = SnapcastService(host="127.0.0.1", port=fake_snapserver.port)
+        service.snapserver_conf = conf
+        collector = SnapcastTelemetryCollector(service, interval=60, capacity=10)
+        await collector.initialize()
+        yield collector
+        await collector.cleanup()
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_sample_records_last_seen_and_settings(self, collector, fake_snapserver):
+        fake_snapserver.clients["c2"]["config"]["latency"] = 15
+        for now, age in ((1000.0, 0.2), (1010.0, 0.5), (1020.0, 0.3)):
+            for client in fake_snapserver.clients.values():
+                client["lastSeen"] = {"sec": int(now - age), "usec": round((now - age) % 1 * 1e6)}
+            await collector.sample(now=now)
+
+        summary = collector.get_summary()
+        c1 = summary["clients"]["c1"]
+        assert c1["last_seen_age_ms"]["max"] == 500.0
+        assert c1["last_seen_jitter_ms"]["max"] == 300.0
+        assert summary["clients"]["c2"]["latency_ms"]["last"] == 15.0
+        assert summary["server"]["buffer_ms"]["last"] == 1000.0
+        assert summary["server"]["chunk_ms"]["p50"] == 20.0
+        assert summary["server"]["codec"] == "flac"
+
+    @pytest.mark.asyncio
+    async def test_sample_does_not_touch_shared_model(self, collector, fake_snapserver):
+        await collector.sample()
+
+        assert collector.snapcast_service.model.loaded is False
+        assert fake_snapserver.count("Server.GetStatus") == 1
+
+    @pytest.mark.asyncio
+    async def test_reconnects_counted_from_notifications(self, collector, fake_snapserver):
+        service = collector.snapcast_service
+        await service.get_clients()
+        client = fake_snapserver.make_client("c1")
+
+        for connected in (False, True, False, True):
+            service.apply_notification("Client.OnConnect" if connected else "Client.OnDisconnect",
+                                       {"id": "c1", "client": {**client, "connected": connected}})
+
+        c1 = collector.get_summary()["clients"]["c1"]
+        assert c1["reconnects"] == 2
+        assert c1["connected"] is True
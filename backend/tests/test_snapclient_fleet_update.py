@@ -0,0 +1,242 @@
+# backend/tests/test_snapclient_fleet_update.py
+"""
+Tests unitaires pour la mise à jour snapclient de la flotte (canaries, parallélisme, rollback)
+"""
+import asyncio
+import hashlib
+import time
+import pytest
+from aiohttp import web
+from unittest.mock import Mock, AsyncMock
+from backend.infrastructure.services.satellite_dependency_update_service import SatelliteDependencyUpdateService
+from backend.infrastructure.services.snapclient_fleet_update_service import SnapclientFleetUpdateService
+from backend.infrastructure.services.artifact_cache import ArtifactCache
+
+
+class FakeReleases:
+    """Assets GitHub simulés : compte les téléchargements"""
+
+    def __init__(self):
+        self.downloads = []
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/v{version}/{name}", self._asset)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def _asset(self, request):
+        self.downloads.append(request.match_info["name"])
+        return web.Response(body=f"deb {request.match_info['name']}".encode())
+
+
+class FakeFleet:
+    """Agents milo-sat simulés sur des adresses loopback distinctes (même port)"""
+
+    def __init__(self, count: int, version: str = "0.31.0"):
+        self.satellites = {
+            f"127.0.0.{i + 2}": {"hostname": f"milo-sat-{i + 1}", "version": version, "running": True,
+                                 "busy": False, "last_result": {}, "fail": None}
+            for i in range(count)
+        }
+        self.updates = []  # (hostname, payload, started, finished)
+        self.restarts = []
+        self.active = 0
+        self.max_active = 0
+        self.runners = []
+        self.port = 0
+
+    def by_name(self, hostname):
+        return next(s for s in self.satellites.values() if s["hostname"] == hostname)
+
+    async def start(self):
+        for ip in self.satellites:
+            app = web.Application()
+            app.router.add_get("/status", self._status)
+            app.router.add_post("/update", self._update)
+            app.router.add_get("/update/status", self._update_status)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, ip, self.port)
+            await site.start()
+            self.port = site._server.sockets[0].getsockname()[1]
+            self.runners.append(runner)
+
+    async def stop(self):
+        for runner in self.runners:
+            await runner.cleanup()
+
+    def _satellite(self, request):
+        return self.satellites[request.transport.get_extra_info("sockname")[0]]
+
+    async def _status(self, request):
+        sat = self._satellite(request)
+        return web.json_response({"uptime": 10, "debian_codename": "bookworm",
+                                  "snapclient": {"version": sat["version"], "running": sat["running"]}})
+
+    async def _update(self, request):
+        sat = self._satellite(request)
+        payload = await request.json()
+        if sat["busy"]:
+            return web.json_response({"detail": "busy"}, status=409)
+        if payload["version"] == sat["version"]:
+            if sat["running"]:
+                return web.json_response({"success": False, "message": "Already up to date"})
+            # Version demandée déjà installée, snapclient arrêté : redémarrage sans réinstallation
+            sat.update(running=True, last_result={"success": True})
+            self.restarts.append(sat["hostname"])
+            return web.json_response({"success": True, "message": "Snapclient restarted"})
+
+        sat.update(busy=True, last_result=None)
+        asyncio.create_task(self._install(sat, payload))
+        return web.json_response({"success": True})
+
+    async def _install(self, sat, payload):
+        record = {"hostname": sat["hostname"], "payload": payload, "started": time.monotonic()}
+        self.updates.append(record)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.1)
+        self.active -= 1
+
+        if sat["fail"] == "download":
+            sat["last_result"] = {"success": False, "error": "Checksum mismatch"}
+        elif sat["fail"] == "stopped":
+            # Échec de l'installation après l'arrêt du service : ancienne version, snapclient arrêté
+            sat.update(running=False, last_result={"success": False, "error": "Install failed"})
+        elif sat["fail"] == "broken" and payload["version"] != "0.31.0":
+            # Paquet installé mais snapclient ne redémarre pas
+            sat.update(version=payload["version"], running=False, last_result={"success": False, "error": "Failed to start"})
+        else:
+            sat.update(version=payload["version"], running=True, last_result={"success": True})
+        record["finished"] = time.monotonic()
+        sat["busy"] = False
+
+    async def _update_status(self, request):
+        sat = self._satellite(request)
+        return web.json_response({"update_in_progress": sat["busy"], "last_result": sat["last_result"]})
+
+
+@pytest.fixture
+async def releases():
+    fake = FakeReleases()
+    await fake.start()
+    yield fake
+    await fake.runner.cleanup()
+
+
+@pytest.fixture
+async def fleet():
+    fake = FakeFleet(4)
+    await fake.start()
+    yield fake
+    await fake.stop()
+
+
+@pytest.fixture
+async def service(fleet, releases, tmp_path):
+    snapcast = Mock()
+    snapcast.get_clients = AsyncMock(return_value=[
+        {"id": ip, "name": sat["hostname"], "host": sat["hostname"], "ip": ip} for ip, sat in fleet.satellites.items()
+    ])
+    satellites = SatelliteDependencyUpdateService(snapcast)
+    satellites.satellite_api_port = fleet.port
+    satellites.UPDATE_CHECK_INTERVAL = 0.02
+    satellites.UPDATE_MAX_WAIT = 3
+
+    service = SnapclientFleetUpdateService(satellites, ArtifactCache(str(tmp_path)))
+    service.GITHUB_DOWNLOAD_URL = releases.url
+    yield service
+    await satellites.close()
+
+
+class TestSnapclientFleetUpdate:
+    """Tests de l'orchestration de la mise à jour de flotte"""
+
+    def test_artifact_url_from_config_or_route(self, monkeypatch):
+        monkeypatch.delenv("MILO_ARTIFACTS_URL", raising=False)
+        assert SnapclientFleetUpdateService(Mock()).artifact_url("127.0.0.5") == \
+            "http://127.0.0.1:8000/api/dependencies/artifacts"
+
+        monkeypatch.setenv("MILO_ARTIFACTS_URL", "http://192.168.1.2:8080/api/dependencies/artifacts/")
+        assert SnapclientFleetUpdateService(Mock()).artifact_url("127.0.0.5") == \
+            "http://192.168.1.2:8080/api/dependencies/artifacts"
+
+    @pytest.mark.asyncio
+    async def test_canary_first_then_bounded_parallelism(self, service, fleet, releases):
+        events = []
+
+        async def progress(status):
+            events.append(status)
+
+        result = await service.update_fleet(version="0.32.0", parallelism=2, progress_callback=progress)
+
+        assert result["success"] is True
+        assert result["counts"] == {"updated": 4}
+        assert all(s["version"] == "0.32.0" for s in fleet.satellites.values())
+
+        # Un seul téléchargement WAN, servi par Milo sous son sha256
+        assert releases.downloads == ["snapclient_0.32.0-1_arm64_bookworm.deb"]
+        digest = hashlib.sha256(b"deb snapclient_0.32.0-1_arm64_bookworm.deb").hexdigest()
+        assert service.artifact_cache.get_blob(digest) is not None
+        # URL construite depuis l'adresse qui joint le satellite (loopback ici), pas milo.local
+        assert all(u["payload"] == {"version": "0.32.0", "deb_url": f"http://127.0.0.1:8000/api/dependencies/artifacts/{digest}",
+                                    "sha256": digest}
+                   for u in fleet.updates)
+
+        # Canary seul d'abord, puis deux à la fois
+        canary, *others = fleet.updates
+        assert canary["hostname"] == "milo-sat-1"
+        assert all(u["started"] >= canary["finished"] for u in others)
+        assert fleet.max_active == 2
+
+        assert events[-1]["progress"] == 100 and events[0]["nodes"]["milo-sat-1"]["canary"] is True
+
+    @pytest.mark.asyncio
+    async def test_failed_node_is_rolled_back(self, service, fleet, releases):
+        fleet.by_name("milo-sat-3")["fail"] = "broken"
+
+        result = await service.update_fleet(version="0.32.0")
+
+        assert result["success"] is False
+        node = result["nodes"]["milo-sat-3"]
+        assert node["state"] == "rolled_back"
+        assert fleet.by_name("milo-sat-3")["version"] == "0.31.0"
+        assert fleet.by_name("milo-sat-3")["running"] is True
+        assert result["counts"] == {"updated": 3, "rolled_back": 1}
+        assert "snapclient_0.31.0-1_arm64_bookworm.deb" in releases.downloads
+
+    @pytest.mark.asyncio
+    async def test_stopped_node_on_old_version_is_restarted(self, service, fleet, releases):
+        fleet.by_name("milo-sat-2")["fail"] = "stopped"
+
+        result = await service.update_fleet(version="0.32.0")
+
+        assert result["nodes"]["milo-sat-2"]["state"] == "rolled_back"
+        assert fleet.by_name("milo-sat-2")["running"] is True
+        assert fleet.restarts == ["milo-sat-2"]
+        assert [u["hostname"] for u in fleet.updates].count("milo-sat-2") == 1  # Pas de réinstallation
+
+    @pytest.mark.asyncio
+    async def test_failed_canary_stops_rollout(self, service, fleet):
+        fleet.by_name("milo-sat-1")["fail"] = "download"
+
+        result = await service.update_fleet(version="0.32.0", canaries=1)
+
+        assert result["success"] is False
+        # Satellite inchangé : pas de rollback nécessaire, les autres ne sont pas touchés
+        assert result["nodes"]["milo-sat-1"]["state"] == "failed"
+        assert result["counts"] == {"failed": 1, "skipped": 3}
+        assert [u["hostname"] for u in fleet.updates] == ["milo-sat-1"]
+
+    @pytest.mark.asyncio
+    async def test_up_to_date_fleet_is_noop(self, service, fleet, releases):
+        result = await service.update_fleet(version="0.31.0")
+
+        assert result["success"] is True
+        assert fleet.updates == [] and releases.downloads == []
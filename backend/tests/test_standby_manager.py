@@ -0,0 +1,278 @@
+# backend/tests/test_standby_manager.py
+"""
+Tests unitaires pour la veille chaude des plugins (daemons gardés démarrés, éviction mémoire / CPU)
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock, AsyncMock
+from backend.domain.audio_state import AudioSource, PluginState
+from backend.infrastructure.services.systemd_manager import SystemdServiceManager
+from backend.infrastructure.state.standby_manager import StandbyManager
+from backend.infrastructure.state.state_machine import UnifiedAudioStateMachine
+
+DIRECT = (False, False)
+MULTIROOM = (True, False)
+MB = 1024 * 1024
+
+
+class FakeStandbyPlugin:
+    """Plugin supportant la veille chaude : démarrage à froid lent, sortie de veille immédiate"""
+
+    SUPPORTS_STANDBY = True
+
+    def __init__(self, name, cold_start=0.0, memory=20 * MB, cpu_nsec=0):
+        self.name = name
+        self.cold_start = cold_start
+        self._initialized = True
+        self.in_standby = False
+        self.running = False
+        self.cold_starts = 0
+        self.service_manager = Mock()
+        self.service_manager.get_resource_usage = AsyncMock(
+            side_effect=lambda service: {"memory": self.memory, "cpu_nsec": self.cpu_nsec}
+        )
+        self.memory = memory
+        self.cpu_nsec = cpu_nsec
+
+    async def initialize(self):
+        return True
+
+    async def start(self):
+        if not self.running:
+            self.cold_starts += 1
+            await asyncio.sleep(self.cold_start)
+        self.running = True
+        self.in_standby = False
+        return True
+
+    async def enter_standby(self):
+        self.in_standby = True
+        return True
+
+    async def stop(self):
+        self.running = False
+        return True
+
+    def standby_services(self):
+        return [f"milo-{self.name}.service"]
+
+
+@pytest.fixture
+async def manager(monkeypatch):
+    monkeypatch.setattr(StandbyManager, "_available_memory_mb", staticmethod(lambda: 1000.0))
+    manager = StandbyManager()
+    yield manager
+    await manager.close()
+
+
+@pytest.fixture
+async def state_machine(mock_websocket_handler, mock_routing_service, monkeypatch):
+    monkeypatch.setattr(StandbyManager, "_available_memory_mb", staticmethod(lambda: 1000.0))
+    sm = UnifiedAudioStateMachine(routing_service=mock_routing_service, websocket_handler=mock_websocket_handler)
+    yield sm
+    await sm.close()
+
+
+def use(manager, *sources):
+    for source in sources:
+        manager.record_use(source)
+
+
+class TestStandbySelection:
+    """Choix des sources gardées en veille selon l'historique d'usage"""
+
+    def test_ranking_by_frequency_then_recency(self, manager):
+        use(manager, AudioSource.RADIO, AudioSource.LIBRESPOT, AudioSource.RADIO, AudioSource.ROC, AudioSource.LIBRESPOT)
+
+        assert manager.ranking() == [AudioSource.LIBRESPOT, AudioSource.RADIO, AudioSource.ROC]
+
+    @pytest.mark.asyncio
+    async def test_top_sources_kept_warm_others_stopped(self, manager):
+        use(manager, AudioSource.RADIO, AudioSource.RADIO, AudioSource.LIBRESPOT, AudioSource.LIBRESPOT, AudioSource.ROC)
+        radio, roc = FakeStandbyPlugin("radio"), FakeStandbyPlugin("roc")
+        radio.running = roc.running = True
+
+        assert await manager.release(AudioSource.RADIO, radio, DIRECT) is True
+        assert await manager.release(AudioSource.ROC, roc, DIRECT) is False
+
+        assert radio.running and radio.in_standby
+        assert not roc.running
+        assert list(manager.warm) == [AudioSource.RADIO]
+
+    @pytest.mark.asyncio
+    async def test_plugin_without_standby_is_stopped(self, manager, mock_plugin):
+        use(manager, AudioSource.LIBRESPOT)
+
+        assert await manager.release(AudioSource.LIBRESPOT, mock_plugin, DIRECT) is False
+        mock_plugin.stop.assert_awaited_once()
+        assert manager.warm == {}
+
+    @pytest.mark.asyncio
+    async def test_low_system_memory_disables_standby(self, manager, monkeypatch):
+        monkeypatch.setattr(StandbyManager, "_available_memory_mb", staticmethod(lambda: 60.0))
+        use(manager, AudioSource.RADIO)
+        radio = FakeStandbyPlugin("radio")
+        radio.running = True
+
+        assert await manager.release(AudioSource.RADIO, radio, DIRECT) is False
+        assert not radio.running
+
+
+class TestStandbyClaim:
+    """Sortie de veille au démarrage de la source"""
+
+    @pytest.mark.asyncio
+    async def test_claim_with_same_routing_is_a_hit(self, manager):
+        use(manager, AudioSource.RADIO)
+        radio = FakeStandbyPlugin("radio")
+        radio.running = True
+        await manager.release(AudioSource.RADIO, radio, DIRECT)
+
+        await manager.claim(AudioSource.RADIO, DIRECT)
+
+        assert radio.running
+        assert manager.warm == {}
+        assert (manager.hits, manager.misses) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_claim_after_routing_change_stops_daemon(self, manager):
+        use(manager, AudioSource.RADIO)
+        radio = FakeStandbyPlugin("radio")
+        radio.running = True
+        await manager.release(AudioSource.RADIO, radio, DIRECT)
+
+        # Le daemon a été démarré vers le DAC direct : il doit redémarrer vers le Loopback
+        await manager.claim(AudioSource.RADIO, MULTIROOM)
+
+        assert not radio.running and not radio.in_standby
+        assert manager.evictions["routing"] == 1 and manager.misses == 1
+
+
+class TestStandbyEviction:
+    """Éviction sous pression (nombre, budget mémoire, mémoire système, CPU)"""
+
+    @pytest.mark.asyncio
+    async def test_least_used_evicted_over_memory_budget(self, manager):
+        use(manager, AudioSource.RADIO, AudioSource.RADIO, AudioSource.ROC)
+        radio = FakeStandbyPlugin("radio", memory=100 * MB)
+        roc = FakeStandbyPlugin("roc", memory=80 * MB)
+        radio.running = roc.running = True
+
+        await manager.release(AudioSource.RADIO, radio, DIRECT)
+        await manager.release(AudioSource.ROC, roc, DIRECT)
+
+        assert list(manager.warm) == [AudioSource.RADIO]
+        assert not roc.running
+        assert manager.evictions == {"memory_budget": 1}
+
+    @pytest.mark.asyncio
+    async def test_monitor_evicts_under_memory_pressure(self, manager, monkeypatch):
+        monkeypatch.setattr(StandbyManager, "CHECK_INTERVAL", 0.01)
+        use(manager, AudioSource.RADIO)
+        radio = FakeStandbyPlugin("radio")
+        radio.running = True
+        await manager.release(AudioSource.RADIO, radio, DIRECT)
+
+        monkeypatch.setattr(StandbyManager, "_available_memory_mb", staticmethod(lambda: 50.0))
+        await asyncio.wait_for(manager._monitor, 1)
+
+        assert not radio.running
+        assert manager.evictions == {"memory_pressure": 1}
+
+    @pytest.mark.asyncio
+    async def test_busy_daemon_evicted_on_cpu(self, manager, monkeypatch):
+        monkeypatch.setattr(StandbyManager, "CHECK_INTERVAL", 0.05)
+        use(manager, AudioSource.RADIO)
+        radio = FakeStandbyPlugin("radio", cpu_nsec=1)
+        radio.running = True
+        await manager.release(AudioSource.RADIO, radio, DIRECT)
+
+        # 50 ms de CPU par intervalle de 50 ms : ~100 %
+        radio.cpu_nsec += int(0.05 * 1e9)
+        await asyncio.wait_for(manager._monitor, 1)
+
+        assert not radio.running
+        assert manager.evictions == {"cpu": 1}
+
+    @pytest.mark.asyncio
+    async def test_close_stops_monitor(self, manager):
+        use(manager, AudioSource.RADIO)
+        await manager.release(AudioSource.RADIO, FakeStandbyPlugin("radio"), DIRECT)
+
+        await manager.close()
+
+        assert manager._monitor is None
+        assert AudioSource.RADIO in manager.warm
+
+
+class TestSystemdFastPath:
+    """Service déjà actif : ni systemctl start ni attente"""
+
+    @pytest.mark.asyncio
+    async def test_start_skips_active_service(self):
+        service_manager = SystemdServiceManager()
+        service_manager.is_active = AsyncMock(return_value=True)
+        service_manager._control_service = AsyncMock(return_value=True)
+
+        assert await service_manager.start("milo-radio.service")
+        service_manager._control_service.assert_not_awaited()
+
+        service_manager.is_active = AsyncMock(return_value=False)
+        assert await service_manager.start("milo-radio.service")
+        service_manager._control_service.assert_awaited_once_with("milo-radio.service", "start")
+
+
+class TestStateMachineStandby:
+    """Intégration aux transitions de la machine à états"""
+
+    @pytest.mark.asyncio
+    async def test_switch_back_to_warm_source(self, state_machine, mock_plugin):
+        radio = FakeStandbyPlugin("radio")
+        state_machine.register_plugin(AudioSource.RADIO, radio)
+        state_machine.register_plugin(AudioSource.LIBRESPOT, mock_plugin)
+
+        assert await state_machine.transition_to_source(AudioSource.RADIO)
+        assert await state_machine.transition_to_source(AudioSource.LIBRESPOT)
+        assert radio.running and radio.in_standby
+
+        assert await state_machine.transition_to_source(AudioSource.RADIO)
+        assert radio.cold_starts == 1
+        assert state_machine.system_state.active_source == AudioSource.RADIO
+        assert state_machine.system_state.plugin_state == PluginState.READY
+        assert state_machine.standby_manager.hits == 1
+        # Plugin sans veille chaude : arrêté normalement
+        mock_plugin.stop.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_emergency_stop_clears_standby(self, state_machine):
+        radio = FakeStandbyPlugin("radio")
+        state_machine.register_plugin(AudioSource.RADIO, radio)
+        assert await state_machine.transition_to_source(AudioSource.RADIO)
+        assert await state_machine.transition_to_source(AudioSource.NONE)
+        assert AudioSource.RADIO in state_machine.standby_manager.warm
+
+        await state_machine._emergency_stop()
+
+        assert not radio.running
+        assert state_machine.standby_manager.warm == {}
+
+
+@pytest.mark.slow
+class TestWarmSwitchBenchmark:
+    """Benchmark : retour sur une source avec démarrage à froid simulé (systemctl + attente mpv, 1 s)"""
+
+    @pytest.mark.asyncio
+    async def test_warm_vs_cold_switch(self, state_machine, mock_plugin, monkeypatch):
+        state_machine.register_plugin(AudioSource.RADIO, FakeStandbyPlugin("radio", cold_start=1.0))
+        state_machine.register_plugin(AudioSource.LIBRESPOT, mock_plugin)
+
+        results = {}
+        for label in ("cold", "warm"):
+            assert await state_machine.transition_to_source(AudioSource.LIBRESPOT)
+            start = time.perf_counter()
+            assert await state_machine.transition_to_source(AudioSource.RADIO)
+            results[label] = (time.perf_counter() - start) * 1000
+
+        print("\n" + ", ".join(f"{label} {ms:.0f}ms" for label, ms in results.items()))
+        assert results["warm"] < results["cold"] - 800
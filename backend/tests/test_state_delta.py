@@ -0,0 +1,141 @@
+# backend/tests/test_state_delta.py
+"""
+Tests unitaires pour les deltas d'état du protocole WebSocket v2
+"""
+import json
+import pytest
+from unittest.mock import Mock, AsyncMock
+from backend.infrastructure.state.state_delta import VersionedState, apply_patch, diff_state
+from backend.infrastructure.state.state_machine import UnifiedAudioStateMachine
+from backend.domain.audio_state import AudioSource, PluginState
+from backend.presentation.websockets.manager import WebSocketManager
+from backend.presentation.websockets.protocol import PROTOCOL_V1, PROTOCOL_V2, render_event
+
+
+def make_state(**metadata):
+    return {
+        "active_source": "radio",
+        "plugin_state": "connected",
+        "transitioning": False,
+        "target_source": None,
+        "metadata": {"station_name": "FIP", "favicon": "http://x/" + "f" * 200, "is_playing": True, **metadata},
+        "error": None,
+        "multiroom_enabled": False,
+        "equalizer_enabled": False
+    }
+
+
+class TestStateDiff:
+    """Tests du calcul et de l'application des deltas"""
+
+    def test_roundtrip(self):
+        old = make_state(title="A", a_b={"x": 1})
+        new = make_state(title="B", **{"a/b": 2})
+        new["metadata"].pop("favicon")
+        new["transitioning"] = 1  # Type différent : remplacé même si égal en Python
+
+        ops = diff_state(old, new)
+
+        assert {"op": "replace", "path": "/metadata/title", "value": "B"} in ops
+        assert {"op": "remove", "path": "/metadata/favicon"} in ops
+        assert {"op": "add", "path": "/metadata/a~1b", "value": 2} in ops
+        assert {"op": "replace", "path": "/transitioning", "value": 1} in ops
+        assert apply_patch(old, ops) == new
+        assert old == make_state(title="A", a_b={"x": 1})  # Document source non modifié
+
+    def test_versioned_state_sequence(self):
+        versioned = VersionedState()
+        state = make_state(title="A")
+
+        assert versioned.update(state) is not None and versioned.seq == 1
+        assert versioned.update(state) is None and versioned.seq == 1
+
+        # Les valeurs des opérations restent figées si l'état source est modifié ensuite
+        state["metadata"]["title"] = "B"
+        ops = versioned.update(state)
+        state["metadata"]["title"] = "C"
+        assert ops == [{"op": "replace", "path": "/metadata/title", "value": "B"}]
+        assert versioned.snapshot() == (2, make_state(title="B"))
+
+
+class TestStateMachineDeltas:
+    """Séquence et deltas attachés aux événements de la machine à états"""
+
+    @pytest.fixture
+    def state_machine(self, mock_websocket_handler, mock_routing_service):
+        return UnifiedAudioStateMachine(routing_service=mock_routing_service, websocket_handler=mock_websocket_handler)
+
+    @pytest.mark.asyncio
+    async def test_events_carry_sequence_and_patch(self, state_machine, mock_websocket_handler):
+        state_machine.system_state.active_source = AudioSource.RADIO
+        await state_machine.update_plugin_state(AudioSource.RADIO, PluginState.CONNECTED, {"title": "A"})
+        await state_machine.broadcast_event("volume", "volume_changed", {"volume": 40})
+        await state_machine.flush_events()  # Diffusion découplée : état pris à l'émission
+        await state_machine.update_plugin_state(AudioSource.RADIO, PluginState.CONNECTED, {"title": "B"})
+        await state_machine.flush_events()  # Second tick dans l'intervalle minimal du sujet
+
+        first, volume, second = [call.args[0] for call in mock_websocket_handler.handle_event.call_args_list]
+        assert first["state_seq"] == 1 and "state_patch" in first
+        assert volume["state_seq"] == 1 and "state_patch" not in volume
+        assert second["state_seq"] == 2
+        assert second["state_patch"] == [{"op": "replace", "path": "/metadata/title", "value": "B"}]
+
+        seq, snapshot = await state_machine.get_state_snapshot()
+        assert seq == 2 and snapshot == second["data"]["full_state"]
+
+    @pytest.mark.asyncio
+    async def test_snapshot_broadcasts_pending_change(self, state_machine, mock_websocket_handler):
+        state_machine.system_state.active_source = AudioSource.RADIO
+        await state_machine.update_plugin_state(AudioSource.RADIO, PluginState.CONNECTED, {"title": "A"})
+        await state_machine.flush_events()
+        await state_machine.update_plugin_state(AudioSource.RADIO, PluginState.CONNECTED, {"title": "B"})
+        assert state_machine.state_changed_since_broadcast  # Événement encore en file
+
+        seq, snapshot = await state_machine.get_state_snapshot()
+        await state_machine.flush_events()
+
+        first, sync, queued = [call.args[0] for call in mock_websocket_handler.handle_event.call_args_list]
+        assert (sync["type"], sync["state_seq"]) == ("state_sync", 2) and seq == 2
+        assert apply_patch(first["data"]["full_state"], sync["state_patch"]) == snapshot
+        # L'événement en file part ensuite sans delta : pas de trou dans la séquence des clients v2
+        assert queued["state_seq"] == 2 and "state_patch" not in queued
+
+
+class TestProtocolRendering:
+    """Rendu des événements selon la version négociée par connexion"""
+
+    def test_render_event(self):
+        event = {"category": "plugin", "type": "state_changed", "data": {"source": "radio", "full_state": make_state()},
+                 "state_seq": 3, "state_patch": []}
+
+        assert render_event(event, PROTOCOL_V1) == {k: v for k, v in event.items() if k not in ("state_seq", "state_patch")}
+        assert "full_state" not in render_event(event, PROTOCOL_V2)["data"]
+        assert render_event(event, PROTOCOL_V2)["state_seq"] == 3
+
+    @pytest.mark.asyncio
+    async def test_manager_encodes_per_protocol(self):
+        manager = WebSocketManager()
+        legacy, delta = Mock(), Mock()
+        for ws in (legacy, delta):
+            ws.accept = AsyncMock()
+            ws.send_text = AsyncMock()
+        await manager.connect(legacy, PROTOCOL_V1)
+        await manager.connect(delta, PROTOCOL_V2)
+
+        # Tick radio typique : seule la position change dans un état riche en métadonnées
+        versioned = VersionedState()
+        versioned.update(make_state(position=1, artist="x" * 100, title="y" * 100))
+        state = make_state(position=2, artist="x" * 100, title="y" * 100)
+        event = {"category": "plugin", "type": "state_changed", "source": "radio",
+                 "data": {"full_state": state}, "state_seq": 2, "state_patch": versioned.update(state)}
+        await manager.broadcast_dict(event)
+        await manager.drain()
+
+        legacy_message = legacy.send_text.await_args.args[0]
+        delta_message = delta.send_text.await_args.args[0]
+        assert json.loads(legacy_message)["data"]["full_state"] == state
+        assert json.loads(delta_message)["state_patch"] == [{"op": "replace", "path": "/metadata/position", "value": 2}]
+        assert len(delta_message) * 4 < len(legacy_message)
+
+        manager.disconnect(delta)
+        assert delta not in manager.protocols
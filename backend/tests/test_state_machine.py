@@ -4,9 +4,10 @@ Tests unitaires pour UnifiedAudioStateMachine
 """
 import pytest
 import asyncio
-from unittest.mock import Mock, AsyncMock, patch
+import time
+from unittest.mock import Mock, AsyncMock
 from backend.infrastructure.state.state_machine import UnifiedAudioStateMachine
-from backend.domain.audio_state import AudioSource, PluginState, SystemAudioState
+from backend.domain.audio_state import AudioSource, PluginState
 
 
 class TestUnifiedAudioStateMachine:
@@ -216,6 +217,7 @@ class TestUnifiedAudioStateMachine:
     async def test_broadcast_event(self, state_machine, mock_websocket_handler):
         """Test de broadcast d'événements"""
         await state_machine.broadcast_event("test", "test_event", {"data": "value"})
+        await state_machine.flush_events()
 
         mock_websocket_handler.handle_event.assert_called_once()
         call_args = mock_websocket_handler.handle_event.call_args[0][0]
@@ -383,3 +385,107 @@ class TestUnifiedAudioStateMachine:
 
         # Attendre la fin de la transition
         await transition_task
+
+
+class SlowWebSocketHandler:
+    """Handler dont la diffusion simule un client lent"""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.events = []
+
+    async def handle_event(self, event):
+        await asyncio.sleep(self.delay)
+        self.events.append(event)
+
+
+class TestStateMachineActor:
+    """Diffusion découplée : file de commandes consommée par un acteur unique"""
+
+    @pytest.fixture
+    def handler(self):
+        return SlowWebSocketHandler()
+
+    @pytest.fixture
+    def state_machine(self, handler, mock_routing_service):
+        sm = UnifiedAudioStateMachine(routing_service=mock_routing_service, websocket_handler=handler)
+        sm.system_state.active_source = AudioSource.RADIO
+        return sm
+
+    @pytest.mark.asyncio
+    async def test_update_returns_before_broadcast(self, state_machine, handler):
+        start = time.perf_counter()
+        await state_machine.update_plugin_state(AudioSource.RADIO, PluginState.CONNECTED, {"title": "A"})
+        await state_machine.update_multiroom_state(True)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.01
+        assert state_machine.system_state.metadata == {"title": "A"}  # État lisible immédiatement
+        assert state_machine.system_state.multiroom_enabled is True
+        assert handler.events == []
+
+        await state_machine.flush_events()
+        assert [e["type"] for e in handler.events] == ["state_changed", "state_changed"]
+        assert handler.events[-1]["data"]["full_state"]["multiroom_enabled"] is True
+
+    @pytest.mark.asyncio
+    async def test_events_delivered_in_publication_order(self, state_machine, handler):
+        handler.delay = 0
+        for i in range(5):
+            await state_machine.broadcast_event("radio", "favorite_added", {"station_id": i})
+        await state_machine.broadcast_event("system", "transition_start", {"source": "system"})
+
+        await state_machine.flush_events()
+
+        assert [e["data"].get("station_id") for e in handler.events] == [0, 1, 2, 3, 4, None]
+
+    @pytest.mark.asyncio
+    async def test_failing_broadcast_does_not_stop_actor(self, state_machine):
+        handler = AsyncMock()
+        handler.handle_event.side_effect = [ConnectionError("client gone"), None]
+        state_machine.websocket_handler = handler
+
+        await state_machine.broadcast_event("radio", "favorite_added", {"station_id": 1})
+        await state_machine.broadcast_event("radio", "favorite_added", {"station_id": 2})
+        await state_machine.flush_events()
+
+        assert handler.handle_event.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_close_delivers_pending_events(self, state_machine, handler):
+        handler.delay = 0.01
+        await state_machine.broadcast_event("radio", "favorite_added", {"station_id": 1})
+        await state_machine.update_plugin_state(AudioSource.RADIO, PluginState.CONNECTED, {"title": "B"})
+
+        await state_machine.close()
+
+        assert len(handler.events) == 2
+        assert state_machine._actor is None
+
+
+@pytest.mark.slow
+class TestPluginCallbackLatencyBenchmark:
+    """Benchmark : latence des callbacks de plugin avec une diffusion lente (50 ms par événement)"""
+
+    UPDATES = 1000
+
+    @pytest.mark.asyncio
+    async def test_callback_latency(self, mock_routing_service):
+        handler = SlowWebSocketHandler(delay=0.05)
+        state_machine = UnifiedAudioStateMachine(routing_service=mock_routing_service, websocket_handler=handler)
+        state_machine.system_state.active_source = AudioSource.LIBRESPOT
+
+        latencies = []
+        for position in range(self.UPDATES):
+            start = time.perf_counter()
+            await state_machine.update_plugin_state(AudioSource.LIBRESPOT, PluginState.CONNECTED, {"position": position})
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+        await state_machine.close()
+
+        latencies.sort()
+        p50, p99 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+        print(f"\n{self.UPDATES} plugin updates: p50 {p50 * 1e6:.1f}µs, p99 {p99 * 1e6:.1f}µs, "
+              f"{len(handler.events)} events broadcast")
+        assert p99 < 0.005
+        assert handler.events[-1]["data"]["full_state"]["metadata"]["position"] == self.UPDATES - 1
@@ -0,0 +1,146 @@
+# backend/tests/test_transition_planner.py
+"""
+Tests unitaires pour la planification des transitions de source (recouvrement arrêt / démarrage)
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock, AsyncMock
+from backend.domain.audio_state import AudioSource, PluginState, SystemAudioState
+from backend.infrastructure.state.state_machine import UnifiedAudioStateMachine
+from backend.infrastructure.state.transition_planner import TransitionPlanner
+
+
+def slow_plugin(events, name, stop_delay=0.0, start_delay=0.0, init_delay=0.0, initialized=True):
+    """Plugin dont les opérations simulent la latence systemctl et journalisent leur début et fin"""
+    plugin = Mock()
+    plugin._initialized = initialized
+
+    def timed(action, delay, result=True):
+        async def run():
+            events.append(f"{name}.{action}")
+            await asyncio.sleep(delay)
+            events.append(f"{name}.{action}.done")
+            return result
+        return run
+
+    plugin.stop = AsyncMock(side_effect=timed("stop", stop_delay))
+    plugin.start = AsyncMock(side_effect=timed("start", start_delay))
+    plugin.initialize = AsyncMock(side_effect=timed("initialize", init_delay))
+    return plugin
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+@pytest.fixture
+def state_machine(mock_websocket_handler, mock_routing_service):
+    sm = UnifiedAudioStateMachine(routing_service=mock_routing_service, websocket_handler=mock_websocket_handler)
+    sm.system_state.active_source = AudioSource.LIBRESPOT
+    sm.system_state.plugin_state = PluginState.CONNECTED
+    sm.system_state.metadata = {"title": "Spotify"}
+    return sm
+
+
+class TestTransitionPlanner:
+    """Choix du déroulé selon le routage ALSA"""
+
+    def test_plan_follows_audio_device(self):
+        planner = TransitionPlanner()
+        state = SystemAudioState(active_source=AudioSource.LIBRESPOT)
+
+        assert planner.plan(state, AudioSource.RADIO).reason == "exclusive_device"
+        state.multiroom_enabled = True
+        assert planner.plan(state, AudioSource.RADIO).overlap is True
+        state.equalizer_enabled = True
+        assert planner.plan(state, AudioSource.RADIO).reason == "shared_equalizer"
+        assert planner.plan(state, AudioSource.NONE).reason == "single_source"
+        state.active_source = AudioSource.NONE
+        assert planner.plan(state, AudioSource.RADIO).overlap is False
+
+
+class TestOverlappedTransitions:
+    """Transitions de la machine à états selon le plan"""
+
+    @pytest.mark.asyncio
+    async def test_multiroom_overlaps_stop_and_start(self, state_machine, events):
+        state_machine.system_state.multiroom_enabled = True
+        state_machine.register_plugin(AudioSource.LIBRESPOT, slow_plugin(events, "spotify", stop_delay=0.3))
+        state_machine.register_plugin(AudioSource.RADIO, slow_plugin(events, "radio", start_delay=0.1))
+
+        start = time.perf_counter()
+        assert await state_machine.transition_to_source(AudioSource.RADIO)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.38
+        assert events.index("radio.start") < events.index("spotify.stop.done")
+        # L'arrêt fini après le démarrage n'écrase pas l'état de la nouvelle source
+        assert state_machine.system_state.active_source == AudioSource.RADIO
+        assert state_machine.system_state.plugin_state == PluginState.READY
+        assert state_machine.system_state.metadata == {}
+
+        timing = state_machine.transition_planner.history[-1]
+        assert timing.overlapped and timing.success
+        assert set(timing.phases) == {"stop", "start", "switch", "total"}
+        assert timing.phases["switch"] < timing.phases["stop"] + timing.phases["start"]
+
+    @pytest.mark.asyncio
+    async def test_direct_mode_starts_after_stop(self, state_machine, events):
+        state_machine.register_plugin(AudioSource.LIBRESPOT, slow_plugin(events, "spotify", stop_delay=0.2))
+        state_machine.register_plugin(AudioSource.RADIO, slow_plugin(
+            events, "radio", init_delay=0.2, start_delay=0.05, initialized=False
+        ))
+
+        start = time.perf_counter()
+        assert await state_machine.transition_to_source(AudioSource.RADIO)
+        elapsed = time.perf_counter() - start
+
+        # DAC exclusif : démarrage après l'arrêt, mais l'initialisation est recouverte
+        assert events.index("radio.start") > events.index("spotify.stop.done")
+        assert events.index("radio.initialize") < events.index("spotify.stop.done")
+        assert elapsed < 0.4
+        timing = state_machine.transition_planner.history[-1]
+        assert not timing.overlapped and "prepare" in timing.phases
+
+    @pytest.mark.asyncio
+    async def test_failed_transition_recorded(self, state_machine, events):
+        state_machine.system_state.multiroom_enabled = True
+        radio = slow_plugin(events, "radio")
+        radio.start = AsyncMock(return_value=False)
+        state_machine.register_plugin(AudioSource.LIBRESPOT, slow_plugin(events, "spotify"))
+        state_machine.register_plugin(AudioSource.RADIO, radio)
+
+        assert not await state_machine.transition_to_source(AudioSource.RADIO)
+
+        state_machine.plugins[AudioSource.RADIO].start = AsyncMock(return_value=True)
+        assert await state_machine.transition_to_source(AudioSource.RADIO)
+
+        metrics = state_machine.transition_planner.get_metrics()
+        assert [t["success"] for t in metrics["transitions"]] == [False, True]
+        assert metrics["average_ms"]["total"] == metrics["transitions"][-1]["phases"]["total"]
+
+
+@pytest.mark.slow
+class TestTransitionLatencyBenchmark:
+    """Benchmark : Spotify → Radio avec des latences systemctl simulées (arrêt 500 ms, démarrage 600 ms)"""
+
+    @pytest.mark.asyncio
+    async def test_switch_latency_by_routing(self, mock_websocket_handler, mock_routing_service):
+        results = {}
+        for multiroom in (False, True):
+            sm = UnifiedAudioStateMachine(routing_service=mock_routing_service, websocket_handler=mock_websocket_handler)
+            sm.system_state.active_source = AudioSource.LIBRESPOT
+            sm.system_state.multiroom_enabled = multiroom
+            sm.register_plugin(AudioSource.LIBRESPOT, slow_plugin([], "spotify", stop_delay=0.5))
+            sm.register_plugin(AudioSource.RADIO, slow_plugin([], "radio", start_delay=0.6))
+
+            assert await sm.transition_to_source(AudioSource.RADIO)
+            results["multiroom" if multiroom else "direct"] = sm.transition_planner.history[-1].phases
+
+        print("\n" + "\n".join(
+            f"{mode:9} " + ", ".join(f"{phase} {ms:.0f}ms" for phase, ms in phases.items())
+            for mode, phases in results.items()
+        ))
+        assert results["multiroom"]["total"] < results["direct"]["total"] - 400
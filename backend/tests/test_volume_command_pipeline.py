@@ -0,0 +1,114 @@
+# backend/tests/test_volume_command_pipeline.py
+"""
+Tests unitaires pour VolumeCommandPipeline et son intégration dans VolumeService
+"""
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock
+from backend.infrastructure.services.volume_command_pipeline import VolumeCommandPipeline
+from backend.infrastructure.services.volume_service import VolumeService
+from backend.infrastructure.hardware.mixer_backend import FakeMixerBackend
+
+
+class TestVolumeCommandPipeline:
+    """Tests de la coalescence des commandes"""
+
+    @pytest.mark.asyncio
+    async def test_single_command_applied_immediately(self):
+        apply = AsyncMock(return_value=True)
+        pipeline = VolumeCommandPipeline(apply, min_interval_ms=20)
+
+        assert await pipeline.submit_delta(3) is True
+        apply.assert_awaited_once_with(None, 3, True)
+
+    @pytest.mark.asyncio
+    async def test_burst_of_deltas_is_coalesced(self):
+        apply = AsyncMock(return_value=True)
+        pipeline = VolumeCommandPipeline(apply, min_interval_ms=20)
+
+        futures = [pipeline.submit_delta(1, show_bar=False) for _ in range(10)]
+        results = await asyncio.gather(*futures)
+
+        assert results == [True] * 10
+        # Le premier delta part seul, les 9 suivants sont fusionnés
+        assert apply.await_count <= 2
+        total = sum(call.args[1] for call in apply.await_args_list)
+        assert total == 10
+
+    @pytest.mark.asyncio
+    async def test_target_absorbs_previous_deltas(self):
+        apply = AsyncMock(return_value=True)
+        pipeline = VolumeCommandPipeline(apply, min_interval_ms=20)
+
+        first = pipeline.submit_delta(5)
+        await first
+        pipeline.submit_delta(4)
+        pipeline.submit_target(40)
+        last = pipeline.submit_delta(-2, show_bar=False)
+        await last
+
+        assert apply.await_args_list[-1].args == (40.0, -2, True)
+
+    @pytest.mark.asyncio
+    async def test_failure_is_reported_to_all_waiters(self):
+        apply = AsyncMock(side_effect=Exception("boom"))
+        pipeline = VolumeCommandPipeline(apply, min_interval_ms=0)
+
+        results = await asyncio.gather(pipeline.submit_delta(1), pipeline.submit_delta(1))
+        assert results == [False, False]
+
+    @pytest.mark.asyncio
+    async def test_stats(self):
+        pipeline = VolumeCommandPipeline(AsyncMock(return_value=True), min_interval_ms=20)
+        await asyncio.gather(*[pipeline.submit_delta(1) for _ in range(5)])
+
+        stats = pipeline.get_stats()
+        assert stats["submitted"] == 5
+        assert stats["applied"] < 5
+        assert stats["pending"] == 0
+
+
+class TestVolumeServicePipeline:
+    """Tests de VolumeService en mode direct avec le pipeline"""
+
+    @pytest.fixture
+    def service(self):
+        state_machine = Mock()
+        state_machine.broadcast_event = AsyncMock()
+        state_machine.routing_service = Mock()
+        state_machine.routing_service.get_state = Mock(return_value={'multiroom_enabled': False})
+        snapcast = Mock()
+        snapcast.get_clients = AsyncMock(return_value=[])
+        service = VolumeService(state_machine, snapcast, settings_service=Mock(),
+                                mixer_backend=FakeMixerBackend())
+        service._precise_display_volume = 20.0
+        return service
+
+    @pytest.mark.asyncio
+    async def test_rotary_burst_hits_mixer_once_per_interval(self, service):
+        results = await asyncio.gather(*[service.adjust_display_volume(2) for _ in range(15)])
+
+        assert all(results)
+        assert await service.get_display_volume() == 50
+        assert len(service.mixer.history) <= 2
+        assert service.mixer.get_volume() == service._display_to_alsa(50)
+
+    @pytest.mark.asyncio
+    async def test_set_then_adjust_uses_latest_value(self, service):
+        results = await asyncio.gather(
+            service.adjust_display_volume(10),
+            service.set_display_volume(70),
+            service.adjust_display_volume(-5)
+        )
+
+        assert all(results)
+        assert await service.get_display_volume() == 65
+
+    @pytest.mark.asyncio
+    async def test_cancelling_deltas_do_not_touch_mixer(self, service):
+        await service.adjust_display_volume(1)
+        history = list(service.mixer.history)
+
+        await asyncio.gather(service.adjust_display_volume(3), service.adjust_display_volume(-3))
+
+        assert service.mixer.history == history
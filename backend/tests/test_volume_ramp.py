@@ -0,0 +1,147 @@
+# backend/tests/test_volume_ramp.py
+"""
+Tests unitaires pour le moteur de rampes volume et le soft mute
+"""
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock
+from backend.infrastructure.hardware.mixer_backend import FakeMixerBackend
+from backend.infrastructure.services.volume_ramp import VolumeRampEngine, ease_in_out
+from backend.infrastructure.services.volume_service import VolumeService
+
+
+class TestVolumeRampEngine:
+    """Tests du moteur de rampes"""
+
+    def test_easing_bounds(self):
+        assert ease_in_out(0.0) == 0.0
+        assert ease_in_out(1.0) == 1.0
+        assert ease_in_out(0.5) == 0.5
+        assert ease_in_out(1.5) == 1.0
+
+    @pytest.mark.asyncio
+    async def test_ramp_is_monotonic_and_reaches_target(self):
+        engine = VolumeRampEngine(step_ms=5)
+        steps = []
+
+        async def apply(values):
+            steps.append(values["main"])
+            return True
+
+        assert await engine.ramp_to("direct", {"main": 10.0}, {"main": 60.0}, 50, apply) is True
+        assert steps[-1] == 60.0
+        assert len(steps) > 2
+        assert steps == sorted(steps)
+        assert engine.is_active("direct") is False
+
+    @pytest.mark.asyncio
+    async def test_retarget_resumes_from_current_position(self):
+        engine = VolumeRampEngine(step_ms=5)
+        steps = []
+
+        async def apply(values):
+            steps.append(values["main"])
+            return True
+
+        first = engine.ramp_to("direct", {"main": 0.0}, {"main": 100.0}, 200, apply)
+        await asyncio.sleep(0.05)
+        position = engine.position("direct")["main"]
+
+        second = engine.ramp_to("direct", {"main": 0.0}, {"main": 20.0}, 50, apply)
+        assert await first is False
+        assert await second is True
+
+        # Pas de retour à 0 : la nouvelle rampe part de la position atteinte
+        after_retarget = steps[steps.index(position) + 1:]
+        assert all(value >= min(position, 20.0) for value in after_retarget)
+        assert steps[-1] == 20.0
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_at_current_position(self):
+        engine = VolumeRampEngine(step_ms=5)
+        apply = AsyncMock(return_value=True)
+
+        future = engine.ramp_to("direct", {"main": 0.0}, {"main": 100.0}, 500, apply)
+        await asyncio.sleep(0.03)
+        engine.cancel("direct")
+        count = apply.await_count
+        await asyncio.sleep(0.03)
+
+        assert await future is False
+        assert apply.await_count == count
+
+    @pytest.mark.asyncio
+    async def test_channels_share_one_timer(self):
+        engine = VolumeRampEngine(step_ms=5)
+        apply = AsyncMock(return_value=True)
+
+        engine.ramp_to("direct", {"main": 0.0}, {"main": 50.0}, 30, apply)
+        timer = engine._timer
+        engine.ramp_to("multiroom", {"a": 0.0, "b": 10.0}, {"a": 50.0, "b": 60.0}, 30, apply)
+
+        assert engine._timer is timer
+        await timer
+        assert not engine.is_active("direct") and not engine.is_active("multiroom")
+
+
+class TestVolumeServiceRamp:
+    """Tests des rampes et du soft mute dans VolumeService (mode direct)"""
+
+    @pytest.fixture
+    def service(self):
+        state_machine = Mock()
+        state_machine.broadcast_event = AsyncMock()
+        state_machine.routing_service = Mock()
+        state_machine.routing_service.get_state = Mock(return_value={'multiroom_enabled': False})
+        snapcast = Mock()
+        snapcast.get_clients = AsyncMock(return_value=[])
+        service = VolumeService(state_machine, snapcast, settings_service=Mock(), mixer_backend=FakeMixerBackend())
+        service._ramp_duration_ms = 60
+        service._ramp_engine.step = 0.005
+        return service
+
+    @pytest.mark.asyncio
+    async def test_large_set_is_ramped(self, service):
+        assert await service.set_display_volume(80) is True
+        assert await service.get_display_volume() == 80
+
+        await asyncio.sleep(0.15)
+        history = service.mixer.history
+        assert len(history) > 2
+        assert history == sorted(history)
+        assert history[-1] == service._display_to_alsa(80)
+
+    @pytest.mark.asyncio
+    async def test_small_set_jumps(self, service):
+        await service.set_display_volume(2)
+        assert service.mixer.history == [service._display_to_alsa(2)]
+
+    @pytest.mark.asyncio
+    async def test_ramp_disabled(self, service):
+        service._ramp_duration_ms = 0
+        await service.set_display_volume(80)
+        assert service.mixer.history == [service._display_to_alsa(80)]
+
+    @pytest.mark.asyncio
+    async def test_soft_mute_keeps_logical_volume(self, service):
+        await service.set_display_volume(60)
+        await asyncio.sleep(0.1)
+
+        assert await service.set_muted(True) is True
+        assert service.muted is True
+        assert service.mixer.get_volume() == 0
+        assert await service.get_display_volume() == 60
+
+        assert await service.set_muted(False) is True
+        await asyncio.sleep(0.1)
+        assert service.muted is False
+        assert service.mixer.get_volume() == service._display_to_alsa(60)
+
+    @pytest.mark.asyncio
+    async def test_volume_command_clears_mute(self, service):
+        await service.set_muted(True)
+        await service.adjust_display_volume(2)
+        await asyncio.sleep(0.1)
+
+        assert service.muted is False
+        assert service.mixer.get_volume() == service._display_to_alsa(2)
@@ -0,0 +1,238 @@
+# backend/tests/test_ws_backpressure.py
+"""
+Tests unitaires pour les files d'envoi par connexion du WebSocketManager
+"""
+import asyncio
+import json
+import time
+import pytest
+from unittest.mock import Mock, AsyncMock
+from backend.infrastructure.state.state_delta import apply_patch
+from backend.presentation.websockets.connection import CLOSE_LAGGING, ClientConnection
+from backend.presentation.websockets.manager import WebSocketManager
+from backend.presentation.websockets.protocol import PROTOCOL_V1, PROTOCOL_V2
+
+
+class FakeClient:
+    """WebSocket factice : enregistre les trames, peut bloquer les envois"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.messages = []
+        self.released = asyncio.Event()
+        self.released.set()
+        self.websocket = Mock()
+        self.websocket.accept = AsyncMock()
+        self.websocket.close = AsyncMock()
+        self.websocket.send_text = self._send_text
+
+    async def _send_text(self, text):
+        await self.released.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        message = json.loads(text)
+        if message["type"] != "session":  # Premier message de chaque connexion, hors du scénario testé
+            self.messages.append(message)
+
+    def block(self):
+        self.released.clear()
+
+    def release(self):
+        self.released.set()
+
+
+def position_event(position, seq=None, patch=None):
+    event = {"category": "plugin", "type": "state_changed", "source": "radio",
+             "data": {"full_state": {"metadata": {"position": position}}}}
+    if seq is not None:
+        event["state_seq"] = seq
+        event["state_patch"] = patch
+    return event
+
+
+async def connect(manager, client, *args):
+    """Connecte et attend l'envoi du message de session"""
+    await manager.connect(client.websocket, *args)
+    await manager.clients[client.websocket].drain()
+
+
+@pytest.fixture
+async def manager():
+    manager = WebSocketManager()
+    yield manager
+    await manager.close_all()
+
+
+class TestSendQueues:
+    """Coalescence et isolation des clients lents"""
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_delay_others(self, manager):
+        healthy, slow = FakeClient(), FakeClient()
+        await connect(manager, healthy)
+        await connect(manager, slow)
+        slow.block()
+
+        start = time.perf_counter()
+        for i in range(20):
+            await manager.broadcast_dict({"category": "volume", "type": "volume_changed", "data": {"volume": i}})
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - start
+
+        await manager.clients[healthy.websocket].drain()
+        assert elapsed < 0.1
+        assert [m["data"]["volume"] for m in healthy.messages] == list(range(20))
+        assert slow.messages == [] and slow.websocket in manager.active_connections
+
+    @pytest.mark.asyncio
+    async def test_state_events_latest_wins(self, manager):
+        client = FakeClient()
+        await connect(manager, client, PROTOCOL_V1)
+        client.block()
+        await manager.broadcast_dict(position_event(0))
+        await asyncio.sleep(0)  # Le premier événement est en cours d'envoi
+
+        for position in range(1, 30):
+            await manager.broadcast_dict(position_event(position))
+        await manager.broadcast_dict({"category": "system", "type": "notification", "data": {"n": 1}})
+        await manager.broadcast_dict({"category": "system", "type": "notification", "data": {"n": 2}})
+
+        client.release()
+        await manager.drain()
+
+        positions = [m["data"]["full_state"]["metadata"]["position"] for m in client.messages if "full_state" in m["data"]]
+        assert positions == [0, 29]
+        assert [m["data"]["n"] for m in client.messages if "n" in m["data"]] == [1, 2]  # Ponctuels jamais fusionnés
+        assert manager.clients[client.websocket].coalesced == 28
+
+    @pytest.mark.asyncio
+    async def test_coalescing_keyed_by_entity(self, manager):
+        client = FakeClient()
+        await connect(manager, client, PROTOCOL_V1)
+        client.block()
+        await manager.broadcast_dict(position_event(0))
+        await asyncio.sleep(0)
+
+        for volume, client_id in enumerate(["a", "b", "c", "a"]):
+            await manager.broadcast_dict({"category": "snapcast", "type": "client_volume_changed",
+                                          "source": "external_sync",
+                                          "data": {"client_id": client_id, "volume": volume, "full_state": {}}})
+        for client_id in ("x", "y"):
+            await manager.broadcast_dict({"category": "snapcast", "type": "client_connected",
+                                          "source": "snapcast",
+                                          "data": {"client_id": client_id, "full_state": {}}})
+
+        client.release()
+        await manager.drain()
+
+        volumes = {m["data"]["client_id"]: m["data"]["volume"] for m in client.messages
+                   if m["type"] == "client_volume_changed"}
+        assert volumes == {"a": 3, "b": 1, "c": 2}
+        assert [m["data"]["client_id"] for m in client.messages if m["type"] == "client_connected"] == ["x", "y"]
+        assert manager.clients[client.websocket].coalesced == 1
+
+    @pytest.mark.asyncio
+    async def test_v2_patches_merged_in_sequence(self, manager):
+        client = FakeClient()
+        await connect(manager, client, PROTOCOL_V2)
+        client.block()
+        await manager.broadcast_dict(position_event(1, 1, [{"op": "replace", "path": "/position", "value": 1}]))
+        await asyncio.sleep(0)
+
+        for seq in range(2, 6):
+            await manager.broadcast_dict(position_event(seq, seq, [{"op": "replace", "path": "/position", "value": seq}]))
+        await manager.broadcast_dict({"category": "volume", "type": "volume_changed", "data": {"volume": 3}, "state_seq": 5})
+        await manager.broadcast_dict(position_event(6, 6, [{"op": "add", "path": "/title", "value": "x"}]))
+
+        client.release()
+        await manager.drain()
+
+        # Rejoue la logique du client : un delta s'applique sur state_base_seq (ou state_seq - 1)
+        state, seq = {"position": 0}, 0
+        for message in client.messages:
+            if "state_patch" in message:
+                assert message.get("state_base_seq", message["state_seq"] - 1) == seq
+                state, seq = apply_patch(state, message["state_patch"]), message["state_seq"]
+        assert state == {"position": 5, "title": "x"} and seq == 6
+        assert len(client.messages) == 4
+
+    @pytest.mark.asyncio
+    async def test_patch_merged_after_event_without_patch(self, manager):
+        client = FakeClient()
+        await connect(manager, client, PROTOCOL_V2)
+        client.block()
+        await manager.broadcast_dict(position_event(1, 1, [{"op": "replace", "path": "/position", "value": 1}]))
+        await asyncio.sleep(0)
+
+        # Tick sans changement d'état (séquence seule), puis un vrai changement
+        no_change = position_event(1, 1)
+        no_change.pop("state_patch")
+        await manager.broadcast_dict(no_change)
+        await manager.broadcast_dict(position_event(2, 2, [{"op": "replace", "path": "/position", "value": 2}]))
+
+        client.release()
+        await manager.drain()
+
+        merged = client.messages[-1]
+        assert merged["state_base_seq"] == 1 and merged["state_seq"] == 2
+        assert merged["state_patch"] == [{"op": "replace", "path": "/position", "value": 2}]
+
+    @pytest.mark.asyncio
+    async def test_overflow_disconnects_lagging_client(self, manager, monkeypatch):
+        monkeypatch.setattr(ClientConnection, "MAX_PENDING", 5)
+        healthy, slow = FakeClient(), FakeClient()
+        await connect(manager, healthy)
+        await connect(manager, slow)
+        slow.block()
+
+        for i in range(8):
+            await manager.broadcast_dict({"category": "system", "type": "notification", "data": {"n": i}})
+            await asyncio.sleep(0)
+
+        assert slow.websocket not in manager.active_connections
+        slow.websocket.close.assert_awaited_once_with(code=CLOSE_LAGGING)
+        assert manager.lagging_disconnects == 1
+
+        await manager.drain()
+        assert len(healthy.messages) == 8
+
+    @pytest.mark.asyncio
+    async def test_stalled_send_disconnects(self, manager, monkeypatch):
+        monkeypatch.setattr(ClientConnection, "SEND_TIMEOUT", 0.05)
+        client = FakeClient()
+        await connect(manager, client)
+        client.block()
+
+        await manager.broadcast_dict({"category": "system", "type": "notification", "data": {}})
+        await asyncio.sleep(0.15)
+
+        assert client.websocket not in manager.active_connections
+        client.websocket.close.assert_awaited_once_with(code=CLOSE_LAGGING)
+
+
+@pytest.mark.slow
+class TestBroadcastLatencyBenchmark:
+    """Benchmark : latence de livraison aux clients sains avec un client lent (300 ms par trame)"""
+
+    HEALTHY = 10
+    EVENTS = 20
+
+    @pytest.mark.asyncio
+    async def test_healthy_latency_independent_of_slow_client(self, manager):
+        healthy = [FakeClient() for _ in range(self.HEALTHY)]
+        slow = FakeClient(delay=0.3)
+        for client in healthy + [slow]:
+            await connect(manager, client)
+
+        start = time.perf_counter()
+        for i in range(self.EVENTS):
+            await manager.broadcast_dict(position_event(i))
+            await asyncio.sleep(0.005)
+        for client in healthy:
+            await manager.clients[client.websocket].drain()
+        elapsed = time.perf_counter() - start
+
+        print(f"\n{self.EVENTS} events to {self.HEALTHY} healthy clients + 1 slow: {elapsed * 1e3:.1f}ms, "
+              f"slow client received {len(slow.messages)} (coalesced {manager.clients[slow.websocket].coalesced})")
+        assert elapsed < 0.3
+        assert all(len(client.messages) == self.EVENTS for client in healthy)
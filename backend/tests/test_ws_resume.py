@@ -0,0 +1,148 @@
+# backend/tests/test_ws_resume.py
+"""
+Tests unitaires pour le journal de rejeu et la reprise de session WebSocket
+"""
+import json
+import pytest
+from collections import deque
+from unittest.mock import Mock, AsyncMock
+from fastapi import WebSocketDisconnect
+from backend.domain.audio_state import AudioSource
+from backend.presentation.websockets.connection import ClientConnection
+from backend.presentation.websockets.manager import WebSocketManager
+from backend.presentation.websockets.protocol import PROTOCOL_V2
+from backend.presentation.websockets.server import WebSocketServer
+
+
+def make_websocket(manager, query=None):
+    """WebSocket factice : se déconnecte une fois sa file d'envoi vidée"""
+    websocket = Mock()
+    websocket.query_params = query or {}
+    websocket.scope = {}
+    websocket.accept = AsyncMock()
+    websocket.close = AsyncMock()
+    websocket.send_text = AsyncMock()
+
+    async def receive_text():
+        await manager.drain()
+        raise WebSocketDisconnect()
+
+    websocket.receive_text = receive_text
+    return websocket
+
+
+def received(websocket):
+    return [json.loads(call.args[0]) for call in websocket.send_text.await_args_list]
+
+
+def volume_event(volume):
+    return {"category": "volume", "type": "volume_changed", "data": {"volume": volume}}
+
+
+@pytest.fixture
+async def manager():
+    manager = WebSocketManager()
+    yield manager
+    await manager.close_all()
+
+
+@pytest.fixture
+def state_machine():
+    state_machine = Mock()
+    state_machine.system_state.active_source = AudioSource.LIBRESPOT
+    state_machine.versioned_state.seq = 3
+    state_machine.state_changed_since_broadcast = False
+    state_machine.get_state_snapshot = AsyncMock(return_value=(3, {"active_source": "librespot", "metadata": {}}))
+    plugin = Mock()
+    plugin._refresh_metadata = AsyncMock()
+    plugin.get_initial_state = AsyncMock(return_value={"metadata": {"title": "T"}})
+    state_machine.plugins = {AudioSource.LIBRESPOT: plugin}
+    return state_machine
+
+
+class TestReplayLog:
+    """Journal des événements diffusés et rejeu"""
+
+    @pytest.mark.asyncio
+    async def test_resume_replays_only_missed_events(self, manager):
+        for volume in range(5):
+            await manager.broadcast_dict(volume_event(volume))  # Aucun client connecté : journalisés quand même
+
+        websocket = make_websocket(manager)
+        assert await manager.connect(websocket, resume_from=2)
+        await manager.broadcast_dict(volume_event(99))
+        await manager.drain()
+
+        messages = received(websocket)
+        assert messages[0]["type"] == "session"
+        assert messages[0]["data"] == {"session": manager.session_id, "event_seq": 5, "resumed": True, "replayed": 3}
+        assert [(m["event_seq"], m["data"]["volume"]) for m in messages[1:]] == [(3, 2), (4, 3), (5, 4), (6, 99)]
+
+    @pytest.mark.asyncio
+    async def test_gap_beyond_log_starts_fresh(self, manager):
+        manager.replay_log = deque(maxlen=3)
+        for volume in range(10):
+            await manager.broadcast_dict(volume_event(volume))
+
+        websocket = make_websocket(manager)
+        assert not await manager.connect(websocket, resume_from=6)  # Événement 7 sorti du journal
+        assert await manager.connect(make_websocket(manager), resume_from=7)
+        await manager.drain()
+
+        assert [m["data"] for m in received(websocket)] == [
+            {"session": manager.session_id, "event_seq": 10, "resumed": False, "replayed": 0}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_replay_overflow_starts_fresh(self, manager, monkeypatch):
+        monkeypatch.setattr(ClientConnection, "MAX_PENDING", 4)
+        for i in range(10):
+            await manager.broadcast_dict({"category": "radio", "type": "favorite_added", "data": {"id": i}})
+
+        websocket = make_websocket(manager)
+        assert not await manager.connect(websocket, resume_from=0)
+        await manager.drain()
+        assert [m["type"] for m in received(websocket)] == ["session"]
+
+    @pytest.mark.asyncio
+    async def test_replay_respects_protocol_and_subscriptions(self, manager):
+        patch = [{"op": "replace", "path": "/metadata/title", "value": "B"}]
+        await manager.broadcast_dict(volume_event(1))
+        await manager.broadcast_dict({"category": "plugin", "type": "state_changed", "source": "radio",
+                                      "data": {"full_state": {"x": 1}}, "state_seq": 4, "state_patch": patch})
+
+        websocket = make_websocket(manager)
+        assert await manager.connect(websocket, PROTOCOL_V2, ["volume.volume_changed"], resume_from=0)
+        await manager.drain()
+
+        messages = received(websocket)
+        assert [m["type"] for m in messages] == ["session", "volume_changed", "state_sync"]
+        assert messages[2]["state_patch"] == patch and messages[2]["event_seq"] == 2
+
+
+class TestResumableSessions:
+    """Reprise via /ws?resume=<session>:<seq> sans appel amont"""
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_initial_state(self, manager, state_machine):
+        server = WebSocketServer(manager, state_machine)
+        await manager.broadcast_dict(volume_event(1))
+
+        websocket = make_websocket(manager, {"v": "2", "resume": f"{manager.session_id}:0"})
+        await server.websocket_endpoint(websocket)
+
+        assert [m["type"] for m in received(websocket)] == ["session", "volume_changed"]
+        state_machine.get_state_snapshot.assert_not_awaited()
+        state_machine.plugins[AudioSource.LIBRESPOT]._refresh_metadata.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_unknown_session_gets_snapshot(self, manager, state_machine):
+        server = WebSocketServer(manager, state_machine)
+
+        websocket = make_websocket(manager, {"v": "2", "resume": "oldsession:12"})
+        await server.websocket_endpoint(websocket)
+
+        messages = received(websocket)
+        assert messages[0]["type"] == "session" and messages[0]["data"]["resumed"] is False
+        assert messages[1]["snapshot"] is True and messages[1]["data"]["full_state"]["metadata"] == {"title": "T"}
+        state_machine.plugins[AudioSource.LIBRESPOT]._refresh_metadata.assert_awaited_once()
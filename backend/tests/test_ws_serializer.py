@@ -0,0 +1,138 @@
+# backend/tests/test_ws_serializer.py
+"""
+Tests unitaires pour la sérialisation des messages WebSocket
+"""
+import json
+import time
+import pytest
+from unittest.mock import Mock, AsyncMock
+from backend.domain.audio_state import AudioSource, PluginState
+from backend.presentation.websockets.manager import WebSocketManager
+from backend.presentation.websockets.protocol import PROTOCOL_V1, PROTOCOL_V2
+from backend.presentation.websockets.serializer import JSON_WIRE, JsonSerializer, available_backends
+
+
+def full_state_event():
+    return {
+        "category": "plugin",
+        "type": "state_changed",
+        "source": "radio",
+        "data": {
+            "source": AudioSource.RADIO,
+            "state": PluginState.CONNECTED,
+            "full_state": {
+                "active_source": "radio",
+                "plugin_state": "connected",
+                "transitioning": False,
+                "target_source": None,
+                "metadata": {"station_name": "FIP — Électro", "favicon": "http://x/" + "f" * 200,
+                             "title": "Déjà vu", "is_playing": True, "position": 12.5},
+                "error": None,
+                "multiroom_enabled": False,
+                "equalizer_enabled": False
+            }
+        },
+        "state_seq": 42,
+        "state_patch": [{"op": "replace", "path": "/metadata/position", "value": 12.5}],
+        "timestamp": 1760000000.123
+    }
+
+
+def clients_event(count=10):
+    clients = [{"id": f"sat{i}", "host": f"milo-sat-{i}.local", "volume": 40 + i, "muted": False,
+                "connected": True, "ip": f"192.168.1.{10 + i}"} for i in range(count)]
+    return {"category": "snapcast", "type": "clients_updated", "source": "snapcast",
+            "data": {"clients": clients}, "timestamp": 1760000000.123}
+
+
+PING = {"type": "ping", "timestamp": 1760000000.123}
+
+
+class TestJsonSerializer:
+    """Tests des encodeurs disponibles"""
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_roundtrip(self, backend):
+        serializer = JsonSerializer(backend)
+        event = full_state_event()
+
+        text = serializer.encode_text(event)
+        assert isinstance(text, str) and "Électro" in text  # UTF-8 brut, pas d'échappement \u
+        assert serializer.encode(event) == text.encode("utf-8")
+
+        decoded = json.loads(text)
+        assert decoded["data"]["source"] == "radio"
+        assert decoded["data"]["state"] == "connected"
+        assert serializer.decode(text) == decoded
+        assert serializer.decode(text.encode("utf-8")) == decoded
+
+    def test_default_prefers_fastest_backend(self):
+        assert JsonSerializer().name == available_backends()[0]
+        assert available_backends()[-1] == "json"
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            JsonSerializer("simdjson")
+
+
+class TestBroadcastEncoding:
+    """Un seul encodage par broadcast, partagé par toutes les connexions"""
+
+    @pytest.mark.asyncio
+    async def test_encoded_once_per_protocol(self, monkeypatch):
+        calls = []
+        real_encode = JSON_WIRE.encode
+
+        def counting_encode(obj):
+            if obj.get("type") != "session":
+                calls.append(obj)
+            return real_encode(obj)
+
+        monkeypatch.setattr(JSON_WIRE, "encode", counting_encode)
+
+        manager = WebSocketManager()
+        connections = []
+        for version in (PROTOCOL_V1, PROTOCOL_V1, PROTOCOL_V2, PROTOCOL_V2, PROTOCOL_V2):
+            ws = Mock()
+            ws.accept = AsyncMock()
+            ws.send_text = AsyncMock()
+            await manager.connect(ws, version)
+            connections.append((version, ws))
+
+        await manager.broadcast_dict(full_state_event())
+        await manager.drain()
+
+        assert len(calls) == 2
+        for version in (PROTOCOL_V1, PROTOCOL_V2):
+            sent = [ws.send_text.await_args.args[0] for v, ws in connections if v == version]
+            assert all(message is sent[0] for message in sent)  # Même objet str, pas de ré-encodage
+
+
+@pytest.mark.slow
+class TestSerializerBenchmark:
+    """Benchmark : débit des encodeurs sur des événements typiques"""
+
+    ROUNDS = 2000
+
+    def test_backend_throughput(self):
+        shapes = {
+            "full_state": full_state_event(),
+            "patch": {k: v for k, v in full_state_event().items() if k != "data"},
+            "ping": PING,
+            "clients": clients_event()
+        }
+        results = {}
+        for backend in available_backends():
+            serializer = JsonSerializer(backend)
+            for shape, event in shapes.items():
+                start = time.perf_counter()
+                for _ in range(self.ROUNDS):
+                    serializer.encode_text(event)
+                results[(backend, shape)] = self.ROUNDS / (time.perf_counter() - start)
+
+        print("\n" + "\n".join(
+            f"{backend:8} {shape:10} {rate / 1e3:8.1f}k msg/s" for (backend, shape), rate in results.items()
+        ))
+
+        if "orjson" in available_backends():
+            assert results[("orjson", "full_state")] > results[("json", "full_state")]
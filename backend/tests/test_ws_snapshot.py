@@ -0,0 +1,99 @@
+# backend/tests/test_ws_snapshot.py
+"""
+Tests unitaires pour le snapshot d'état initial partagé des connexions WebSocket
+"""
+import asyncio
+import json
+import pytest
+from backend.domain.audio_state import AudioSource, PluginState
+from backend.infrastructure.state.state_machine import UnifiedAudioStateMachine
+from backend.presentation.websockets.protocol import PROTOCOL_V1, PROTOCOL_V2
+from backend.presentation.websockets.snapshot import StateSnapshotService
+
+
+class FakePlugin:
+    """Plugin dont le refresh des métadonnées simule un appel HTTP amont"""
+
+    def __init__(self, fail: bool = False):
+        self.refreshes = 0
+        self.fail = fail
+
+    async def _refresh_metadata(self):
+        self.refreshes += 1
+        await asyncio.sleep(0.05)
+        if self.fail:
+            raise ConnectionError("go-librespot unreachable")
+
+    async def get_initial_state(self):
+        return {"metadata": {"title": "Fresh", "position": 42}, "device_connected": True, "is_playing": True}
+
+
+@pytest.fixture
+def state_machine(mock_websocket_handler, mock_routing_service):
+    state_machine = UnifiedAudioStateMachine(routing_service=mock_routing_service, websocket_handler=mock_websocket_handler)
+    state_machine.system_state.active_source = AudioSource.LIBRESPOT
+    state_machine.plugins[AudioSource.LIBRESPOT] = FakePlugin()
+    return state_machine
+
+
+class TestStateSnapshotService:
+    """Tests du cache, de l'invalidation et du single-flight"""
+
+    @pytest.mark.asyncio
+    async def test_connect_storm_single_refresh(self, state_machine):
+        snapshots = StateSnapshotService(state_machine)
+
+        results = await asyncio.gather(*[snapshots.get(PROTOCOL_V2) for _ in range(10)])
+
+        plugin = state_machine.plugins[AudioSource.LIBRESPOT]
+        assert plugin.refreshes == 1 and snapshots.builds == 1
+        assert all(text is results[0][1] for _, text in results)  # Même texte pré-encodé
+        event = json.loads(results[0][1])
+        assert event["snapshot"] is True
+        assert event["data"]["full_state"]["metadata"] == {"title": "Fresh", "position": 42}
+        assert event["data"]["full_state"]["device_connected"] is True
+
+        await snapshots.get(PROTOCOL_V2)
+        assert snapshots.hits == 1 and snapshots.builds == 1
+
+    @pytest.mark.asyncio
+    async def test_state_change_rebuilds_without_upstream_call(self, state_machine):
+        snapshots = StateSnapshotService(state_machine)
+        _, first = await snapshots.get(PROTOCOL_V2)
+
+        await state_machine.update_plugin_state(AudioSource.LIBRESPOT, PluginState.CONNECTED, {"title": "Next"})
+        event, text = await snapshots.get(PROTOCOL_V2)
+
+        assert text is not first and snapshots.builds == 2
+        assert state_machine.plugins[AudioSource.LIBRESPOT].refreshes == 1
+        assert event["state_seq"] == state_machine.versioned_state.seq
+
+    @pytest.mark.asyncio
+    async def test_refresh_interval_and_source_change(self, state_machine, monkeypatch):
+        monkeypatch.setattr(StateSnapshotService, "REFRESH_INTERVAL", 0.1)
+        snapshots = StateSnapshotService(state_machine)
+        plugin = state_machine.plugins[AudioSource.LIBRESPOT]
+
+        await snapshots.get(PROTOCOL_V1)
+        await snapshots.get(PROTOCOL_V1)
+        assert plugin.refreshes == 1
+
+        await asyncio.sleep(0.1)
+        await snapshots.get(PROTOCOL_V1)
+        assert plugin.refreshes == 2
+
+        state_machine.system_state.active_source = AudioSource.NONE
+        state_machine._state_cache = None  # Comme après une transition
+        event, _ = await snapshots.get(PROTOCOL_V1)
+        assert plugin.refreshes == 2 and snapshots.refreshes == 2
+        assert event["data"]["full_state"]["active_source"] == "none"
+        assert "device_connected" not in event["data"]["full_state"]
+
+    @pytest.mark.asyncio
+    async def test_refresh_failure_still_serves_state(self, state_machine):
+        state_machine.plugins[AudioSource.LIBRESPOT] = FakePlugin(fail=True)
+        snapshots = StateSnapshotService(state_machine)
+
+        event, _ = await snapshots.get(PROTOCOL_V1)
+
+        assert event["type"] == "state_changed" and event["data"]["full_state"]["active_source"] == "librespot"
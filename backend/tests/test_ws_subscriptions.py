@@ -0,0 +1,116 @@
+# backend/tests/test_ws_subscriptions.py
+"""
+Tests unitaires pour les abonnements aux sujets WebSocket
+"""
+import json
+import pytest
+from unittest.mock import Mock, AsyncMock
+from backend.presentation.websockets.manager import WebSocketManager
+from backend.presentation.websockets.protocol import PROTOCOL_V1, PROTOCOL_V2, parse_topics
+from backend.presentation.websockets.server import WebSocketServer
+
+
+def make_websocket():
+    websocket = Mock()
+    websocket.accept = AsyncMock()
+    websocket.close = AsyncMock()
+    websocket.send_text = AsyncMock()
+    return websocket
+
+
+def received(websocket):
+    messages = [json.loads(call.args[0]) for call in websocket.send_text.await_args_list]
+    return [m for m in messages if m["type"] != "session"]
+
+
+EVENTS = [
+    {"category": "volume", "type": "volume_changed", "data": {"volume": 40}},
+    {"category": "snapcast", "type": "clients_updated", "data": {"clients": []}},
+    {"category": "dependencies", "type": "update_progress", "data": {"progress": 50}},
+    {"category": "system", "type": "transition_complete", "data": {}},
+]
+
+
+@pytest.fixture
+async def manager():
+    manager = WebSocketManager()
+    yield manager
+    await manager.close_all()
+
+
+class TestTopicFiltering:
+    """Filtrage côté serveur selon l'abonnement de chaque connexion"""
+
+    @pytest.mark.asyncio
+    async def test_filters_per_connection(self, manager):
+        everything, kiosk, settings = make_websocket(), make_websocket(), make_websocket()
+        await manager.connect(everything)
+        await manager.connect(kiosk, PROTOCOL_V1, ["volume"])
+        await manager.connect(settings)
+        manager.subscribe(settings, ["dependencies.update_progress", "snapcast"])
+        manager.unsubscribe(settings, ["snapcast"])
+
+        for event in EVENTS:
+            await manager.broadcast_dict(event)
+        await manager.drain()
+
+        assert [m["category"] for m in received(everything)] == ["volume", "snapcast", "dependencies", "system"]
+        assert [m["category"] for m in received(kiosk)] == ["volume", "system"]  # system toujours livré
+        assert [m["category"] for m in received(settings)] == ["dependencies", "system"]
+        assert manager.subscriptions(settings) == {"topics": ["dependencies.update_progress"], "excluded": ["snapcast"]}
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_from_all(self, manager):
+        websocket = make_websocket()
+        await manager.connect(websocket)
+        manager.unsubscribe(websocket, ["snapcast"])
+
+        for event in EVENTS:
+            await manager.broadcast_dict(event)
+        await manager.drain()
+
+        assert "snapcast" not in [m["category"] for m in received(websocket)]
+        assert len(received(websocket)) == 3
+
+    @pytest.mark.asyncio
+    async def test_unsubscribed_v2_client_keeps_state_sequence(self, manager):
+        websocket = make_websocket()
+        await manager.connect(websocket, PROTOCOL_V2, ["volume"])
+
+        event = {"category": "plugin", "type": "state_changed", "source": "radio", "data": {"full_state": {}},
+                 "state_seq": 7, "state_patch": [{"op": "replace", "path": "/metadata/title", "value": "B"}]}
+        await manager.broadcast_dict(event)
+        # Sans delta, un événement non abonné n'est pas transmis du tout
+        await manager.broadcast_dict({"category": "plugin", "type": "metadata", "data": {}, "state_seq": 7})
+        await manager.drain()
+
+        messages = received(websocket)
+        assert len(messages) == 1
+        assert messages[0]["category"] == "system" and messages[0]["type"] == "state_sync"
+        assert messages[0]["state_seq"] == 7 and messages[0]["state_patch"] == event["state_patch"]
+
+    def test_parse_topics(self):
+        assert parse_topics("plugin,volume") == ["plugin", "volume"]
+        assert parse_topics(["snapcast.clients_updated"]) == ["snapcast.clients_updated"]
+        assert parse_topics([1]) is None
+        assert parse_topics(["x"] * 100) is None
+
+
+class TestSubscriptionMessages:
+    """Messages subscribe/unsubscribe sur /ws"""
+
+    @pytest.mark.asyncio
+    async def test_subscribe_over_websocket(self, manager):
+        server = WebSocketServer(manager, Mock())
+        websocket = make_websocket()
+        await manager.connect(websocket)
+
+        await server._handle_client_message(websocket, json.dumps({"type": "subscribe", "topics": ["volume"]}))
+        await server._handle_client_message(websocket, json.dumps({"type": "subscribe", "topics": 5}))  # Ignoré
+        await manager.broadcast_dict(EVENTS[1])
+        await manager.broadcast_dict(EVENTS[0])
+        await manager.drain()
+
+        messages = received(websocket)
+        assert messages[0]["type"] == "subscriptions" and messages[0]["data"]["topics"] == ["volume"]
+        assert [m["category"] for m in messages[1:]] == ["volume"]
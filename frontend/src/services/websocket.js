@@ -17,6 +17,20 @@ class WebSocketSingleton {
     this.reconnectCallbacks = new Set();
     this.reconnectAttempts = 0;
     this.maxReconnectDelay = 30000; // 30 secondes max
+
+    // Protocole v2 : état complet reconstruit à partir du snapshot et des deltas séquencés
+    this.state = null;
+    this.stateSeq = 0;
+    this.resyncPending = false;
+
+    // Abonnements serveur dérivés des catégories écoutées (system toujours reçu)
+    this.serverTopics = null;
+    this.topicsSyncScheduled = false;
+
+    // Reprise de session : le serveur rejoue les événements manqués depuis lastEventSeq
+    this.sessionId = null;
+    this.lastEventSeq = 0;
+    this.reconnecting = false;
   }
 
   addSubscriber(subscriberId) {
@@ -47,32 +61,35 @@ class WebSocketSingleton {
     let wsUrl;
     // En mode DEV, se connecter directement au backend sur le port 8000
     if (import.meta.env.DEV && (host === 'localhost' || host === '127.0.0.1')) {
-      wsUrl = `${protocol}//${host}:8000/ws`;
+      wsUrl = `${protocol}//${host}:8000/ws?v=2`;
     } else if (host === 'milo.local' || host.endsWith('.local')) {
-      wsUrl = `${protocol}//${host}/ws`;
+      wsUrl = `${protocol}//${host}/ws?v=2`;
     } else {
       const port = window.location.port || (window.location.protocol === 'https:' ? 443 : 80);
-      wsUrl = `${protocol}//${host}:${port}/ws`;
+      wsUrl = `${protocol}//${host}:${port}/ws?v=2`;
+    }
+
+    // Abonnement initial et reprise (état local cohérent uniquement)
+    const topics = this.listenedTopics();
+    wsUrl += `&topics=${encodeURIComponent([...topics].join(','))}`;
+    if (this.sessionId && this.state !== null && !this.resyncPending) {
+      wsUrl += `&resume=${this.sessionId}:${this.lastEventSeq}`;
     }
 
     console.log(`WebSocket connecting to: ${wsUrl}`);
     this.socket = new WebSocket(wsUrl);
     
     this.socket.onopen = () => {
-      const wasReconnecting = this.isConnected.value === false;
+      // L'état local est conservé jusqu'au message session : rejeu ou nouveau snapshot
+      this.resyncPending = false;
+      this.serverTopics = topics;
+      this.syncTopics();
+      this.reconnecting = this.isConnected.value === false;
       this.isConnected.value = true;
       this.lastPingTime = Date.now();
       this.reconnectAttempts = 0; // Reset backoff counter on successful connection
       this.setupVisibilityListener();
       this.startPingCheck();
-
-      if (wasReconnecting) {
-        console.log('WebSocket reconnected - full state sync incoming');
-        // Notifier les subscribers qu'une reconnexion a eu lieu
-        this.notifyReconnect();
-      } else {
-        console.log('WebSocket connected successfully');
-      }
     };
     
     this.socket.onmessage = (event) => {
@@ -210,6 +227,19 @@ class WebSocketSingleton {
       return; // Ne pas propager les pings aux handlers
     }
 
+    if (message.category === 'system' && message.type === 'session') {
+      this.handleSession(message.data);
+      return;
+    }
+
+    if (message.event_seq !== undefined) {
+      this.lastEventSeq = message.event_seq;
+    }
+
+    if (message.state_seq !== undefined) {
+      this.syncState(message);
+    }
+
     if (message.category === 'system' && message.type === 'state_changed' && message.data?.full_state) {
       this.lastSystemState = message.data.full_state;
     }
@@ -228,6 +258,107 @@ class WebSocketSingleton {
     }
   }
 
+  handleSession({ session, event_seq, resumed, replayed }) {
+    this.sessionId = session;
+    if (resumed) {
+      console.log(`WebSocket session resumed - ${replayed} missed event(s) replayed`);
+      return;
+    }
+
+    // Nouvelle session : on attend le snapshot avant d'appliquer des deltas
+    this.state = null;
+    this.lastEventSeq = event_seq;
+    if (this.reconnecting) {
+      console.log('WebSocket reconnected - full state sync incoming');
+      // Notifier les subscribers qu'une reconnexion a eu lieu
+      this.notifyReconnect();
+    } else {
+      console.log('WebSocket connected successfully');
+    }
+  }
+
+  syncState(message) {
+    if (message.snapshot) {
+      this.state = message.data.full_state;
+      this.stateSeq = message.state_seq;
+      this.resyncPending = false;
+      return;
+    }
+
+    if (this.state === null) {
+      return; // Snapshot pas encore reçu (il inclura ce changement)
+    }
+
+    if (message.state_patch) {
+      // Deltas fusionnés par la file d'envoi du serveur : base explicite (state_base_seq)
+      const base = message.state_base_seq ?? message.state_seq - 1;
+      if (base === this.stateSeq) {
+        this.state = applyPatch(this.state, message.state_patch);
+        this.stateSeq = message.state_seq;
+      } else if (base > this.stateSeq) {
+        this.requestResync();
+      }
+    } else if (message.state_seq > this.stateSeq) {
+      this.requestResync(); // Changement manqué
+    }
+
+    // Les handlers existants reçoivent toujours full_state
+    message.data = { ...(message.data || {}), full_state: this.state };
+  }
+
+  listenedTopics() {
+    const topics = new Set();
+    for (const eventKey of this.eventHandlers.keys()) {
+      const category = eventKey.split('.')[0];
+      if (category !== 'system') {
+        topics.add(category);
+      }
+    }
+    return topics;
+  }
+
+  scheduleTopicsSync() {
+    // Regroupe les on()/cleanup d'un même montage de composant en un seul message
+    if (this.topicsSyncScheduled) return;
+    this.topicsSyncScheduled = true;
+    queueMicrotask(() => {
+      this.topicsSyncScheduled = false;
+      this.syncTopics();
+    });
+  }
+
+  syncTopics() {
+    if (!this.socket || this.socket.readyState !== WebSocket.OPEN) {
+      return; // Synchronisé à l'ouverture
+    }
+
+    const topics = this.listenedTopics();
+    if (this.serverTopics === null) {
+      // Nouvelle connexion : le serveur envoie tout jusqu'au premier subscribe
+      this.socket.send(JSON.stringify({ type: 'subscribe', topics: [...topics] }));
+      this.serverTopics = topics;
+      return;
+    }
+
+    const added = [...topics].filter(topic => !this.serverTopics.has(topic));
+    const removed = [...this.serverTopics].filter(topic => !topics.has(topic));
+    if (added.length) {
+      this.socket.send(JSON.stringify({ type: 'subscribe', topics: added }));
+    }
+    if (removed.length) {
+      this.socket.send(JSON.stringify({ type: 'unsubscribe', topics: removed }));
+    }
+    this.serverTopics = topics;
+  }
+
+  requestResync() {
+    if (this.resyncPending || !this.socket || this.socket.readyState !== WebSocket.OPEN) {
+      return;
+    }
+    this.resyncPending = true;
+    this.socket.send(JSON.stringify({ type: 'resync' }));
+  }
+
   on(category, type, callback) {
     const eventKey = `${category}.${type}`;
     
@@ -236,6 +367,7 @@ class WebSocketSingleton {
     }
     
     this.eventHandlers.get(eventKey).add(callback);
+    this.scheduleTopicsSync();
     
     return () => {
       const handlers = this.eventHandlers.get(eventKey);
@@ -243,12 +375,36 @@ class WebSocketSingleton {
         handlers.delete(callback);
         if (handlers.size === 0) {
           this.eventHandlers.delete(eventKey);
+          this.scheduleTopicsSync();
         }
       }
     };
   }
 }
 
+/**
+ * Applique des opérations JSON Patch (add/remove/replace) sans muter l'état :
+ * seuls les objets traversés sont copiés, la réactivité Vue voit un nouvel objet
+ */
+function applyPatch(document, ops) {
+  const result = { ...document };
+  for (const op of ops) {
+    const segments = op.path.split('/').slice(1).map(s => s.replace(/~1/g, '/').replace(/~0/g, '~'));
+    let parent = result;
+    for (const segment of segments.slice(0, -1)) {
+      parent[segment] = { ...parent[segment] };
+      parent = parent[segment];
+    }
+    const last = segments[segments.length - 1];
+    if (op.op === 'remove') {
+      delete parent[last];
+    } else {
+      parent[last] = op.value;
+    }
+  }
+  return result;
+}
+
 // Instance singleton globale
 const wsInstance = new WebSocketSingleton();
 
@@ -296,6 +452,10 @@ if (import.meta.env.DEV) {
       connected: wsInstance.isConnected.value,
       eventTypes: Array.from(wsInstance.eventHandlers.keys()),
       hasCachedState: !!wsInstance.lastSystemState,
+      stateSeq: wsInstance.stateSeq,
+      session: wsInstance.sessionId,
+      lastEventSeq: wsInstance.lastEventSeq,
+      topics: wsInstance.serverTopics ? Array.from(wsInstance.serverTopics) : 'all',
       url: wsInstance.socket?.url,
       tabHidden: document.hidden
     });
@@ -271,6 +271,18 @@ export const useSnapcastStore = defineStore('snapcast', () => {
     }
   }
 
+  function handleClientsVolumeChanged(event) {
+    const { client_ids, volumes, muted } = event.data;
+    const byId = new Map(clients.value.map(c => [c.id, c]));
+    client_ids.forEach((clientId, i) => {
+      const client = byId.get(clientId);
+      if (client) {
+        client.volume = volumes[i];
+        if (muted) client.muted = muted[i];
+      }
+    });
+  }
+
   function handleClientNameChanged(event) {
     const { client_id, name } = event.data;
     const client = clients.value.find(c => c.id === client_id);
@@ -280,6 +292,20 @@ export const useSnapcastStore = defineStore('snapcast', () => {
     }
   }
 
+  function handleClientsUpdated(event) {
+    const byId = new Map(clients.value.map(c => [c.id, c]));
+    let resort = false;
+    event.data.clients.forEach(({ client_id, fields }) => {
+      const client = byId.get(client_id);
+      if (client) {
+        Object.assign(client, fields);
+        resort = resort || 'name' in fields || 'host' in fields;
+      }
+    });
+    if (resort) clients.value = sortClients(clients.value);
+    saveCache(clients.value);
+  }
+
   function handleClientMuteChanged(event) {
     const { client_id, muted, volume } = event.data;
     const client = clients.value.find(c => c.id === client_id);
@@ -330,7 +356,9 @@ export const useSnapcastStore = defineStore('snapcast', () => {
     handleClientConnected,
     handleClientDisconnected,
     handleClientVolumeChanged,
+    handleClientsVolumeChanged,
     handleClientNameChanged,
+    handleClientsUpdated,
     handleClientMuteChanged
   };
 });
@@ -5,6 +5,8 @@ Version: 1.1 - Hybrid approach (GitHub .deb + APT dependency resolution)
 """
 
 import asyncio
+import base64
+import hashlib
 import aiohttp
 import aiofiles
 import re
@@ -17,15 +19,20 @@ import time
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
 import uvicorn
 
 # Configuration de base
 SNAPCLIENT_VERSION_REGEX = r"v(\d+\.\d+\.\d+)"
 GITHUB_REPO = "badaix/snapcast"
 API_PORT = 8001
+MILO_ARTIFACTS_URL = os.environ.get("MILO_ARTIFACTS_URL")  # Sinon déduite de l'adresse de Milo
+MILO_API_PORT = int(os.environ.get("MILO_API_PORT", "8000"))
+DOWNLOAD_ATTEMPTS = 3
 UPDATE_IN_PROGRESS = False
+LAST_UPDATE_RESULT: Optional[Dict[str, Any]] = None
 
 # Configuration du logging
 logging.basicConfig(
@@ -34,6 +41,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def milo_artifacts_url(milo_host: Optional[str] = None) -> str:
+    """Cache d'artefacts de Milo : URL configurée, sinon adresse d'où Milo a contacté le satellite"""
+    if MILO_ARTIFACTS_URL:
+        return MILO_ARTIFACTS_URL.rstrip("/")
+    host = milo_host or "milo.local"
+    host = f"[{host}]" if ":" in host else host
+    return f"http://{host}:{MILO_API_PORT}/api/dependencies/artifacts"
+
 # FastAPI app
 app = FastAPI(
     title="Milo Sat API",
@@ -46,6 +61,7 @@ class SnapclientManager:
     
     def __init__(self):
         self.logger = logging.getLogger(f"{__name__}.SnapclientManager")
+        self._debian_codename: Optional[str] = None
     
     async def get_installed_version(self) -> Optional[str]:
         """Récupère la version installée de snapclient"""
@@ -95,6 +111,8 @@ class SnapclientManager:
 
     async def _get_debian_codename(self) -> str:
         """Détecte la version Debian du système (bookworm, trixie, etc.)"""
+        if self._debian_codename:
+            return self._debian_codename
         try:
             proc = await asyncio.create_subprocess_exec(
                 "bash", "-c", "source /etc/os-release && echo $VERSION_CODENAME",
@@ -107,6 +125,7 @@ class SnapclientManager:
 
             if codename:
                 self.logger.info(f"Detected Debian codename: {codename}")
+                self._debian_codename = codename
                 return codename
             else:
                 self.logger.warning("Could not detect Debian codename, using 'bookworm' as fallback")
@@ -132,8 +151,9 @@ class SnapclientManager:
             self.logger.error(f"Error checking service status: {e}")
             return False
     
-    async def update_snapclient(self, target_version: str) -> Dict[str, Any]:
-        """Met à jour snapclient depuis GitHub avec résolution APT des dépendances"""
+    async def update_snapclient(self, target_version: str, deb_url: Optional[str] = None,
+                                sha256: Optional[str] = None, milo_host: Optional[str] = None) -> Dict[str, Any]:
+        """Met à jour snapclient (GitHub ou paquet servi par Milo) avec résolution APT des dépendances"""
         global UPDATE_IN_PROGRESS
 
         if UPDATE_IN_PROGRESS:
@@ -146,8 +166,8 @@ class SnapclientManager:
             # Récupérer la version actuelle avant mise à jour
             old_version = await self.get_installed_version()
 
-            # 1. Télécharger le .deb depuis GitHub
-            download_result = await self._download_snapclient_deb(target_version)
+            # 1. Télécharger le .deb (depuis Milo en LAN si fourni, sinon GitHub)
+            download_result = await self._download_snapclient_deb(target_version, deb_url, sha256, milo_host)
             if not download_result["success"]:
                 return download_result
 
@@ -194,41 +214,79 @@ class SnapclientManager:
             if 'download_result' in locals() and download_result.get("temp_dir"):
                 shutil.rmtree(download_result["temp_dir"], ignore_errors=True)
 
-    async def _download_snapclient_deb(self, version: str) -> Dict[str, Any]:
-        """Télécharge le package .deb snapclient depuis GitHub avec détection auto de Debian"""
+    async def _download_snapclient_deb(self, version: str, deb_url: Optional[str] = None,
+                                       sha256: Optional[str] = None, milo_host: Optional[str] = None) -> Dict[str, Any]:
+        """Télécharge le .deb snapclient : URL fournie, sinon cache LAN de Milo, sinon GitHub"""
         try:
             # Détecter la version Debian
             debian_codename = await self._get_debian_codename()
 
             temp_dir = tempfile.mkdtemp()
             package_name = f"snapclient_{version}-1_arm64_{debian_codename}.deb"
-            url = f"https://github.com/{GITHUB_REPO}/releases/download/v{version}/{package_name}"
-
             deb_path = Path(temp_dir) / package_name
 
-            self.logger.info(f"Downloading {package_name} from GitHub (Debian {debian_codename})...")
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        return {
-                            "success": False,
-                            "error": f"Download failed: HTTP {response.status}"
-                        }
-
-                    async with aiofiles.open(deb_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            await f.write(chunk)
+            sources = [deb_url] if deb_url else [
+                f"{milo_artifacts_url(milo_host)}/snapcast/v{version}/{package_name}",
+                f"https://github.com/{GITHUB_REPO}/releases/download/v{version}/{package_name}"
+            ]
+
+            errors = []
+            for url in sources:
+                self.logger.info(f"Downloading {package_name} from {url} (Debian {debian_codename})...")
+                result = await self._download_resumable(url, deb_path, sha256)
+                if result["success"]:
+                    return {
+                        "success": True,
+                        "deb_path": str(deb_path),
+                        "temp_dir": temp_dir
+                    }
+                errors.append(result["error"])
+                deb_path.unlink(missing_ok=True)
 
             return {
-                "success": True,
-                "deb_path": str(deb_path),
+                "success": False,
+                "error": f"Download failed: {'; '.join(errors)}",
                 "temp_dir": temp_dir
             }
 
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    async def _download_resumable(self, url: str, path: Path, sha256: Optional[str] = None) -> Dict[str, Any]:
+        """Téléchargement reprenable (Range) avec vérification du sha256 (fourni ou annoncé par Milo)"""
+        expected = sha256.lower() if sha256 else None
+        timeout = aiohttp.ClientTimeout(total=600, sock_read=30)
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+                offset = path.stat().st_size if path.exists() else 0
+                headers = {"Range": f"bytes={offset}-"} if offset else {}
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        if response.status not in (200, 206):
+                            return {"success": False, "error": f"HTTP {response.status} from {url}"}
+
+                        expected = expected or response.headers.get("X-Checksum-Sha256")
+                        # 200 : Range ignoré, le fichier est renvoyé en entier
+                        async with aiofiles.open(path, 'ab' if response.status == 206 else 'wb') as f:
+                            async for chunk in response.content.iter_chunked(65536):
+                                await f.write(chunk)
+                    break
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt == DOWNLOAD_ATTEMPTS:
+                        return {"success": False, "error": f"{url}: {e}"}
+                    self.logger.warning(f"Download interrupted ({e}), resuming at byte {path.stat().st_size if path.exists() else 0}")
+
+        if expected:
+            digest = hashlib.sha256()
+            async with aiofiles.open(path, 'rb') as f:
+                while chunk := await f.read(65536):
+                    digest.update(chunk)
+            if digest.hexdigest() != expected:
+                return {"success": False, "error": f"Checksum mismatch for {path.name}"}
+
+        return {"success": True}
+
     async def _install_deb_with_apt(self, deb_path: str) -> Dict[str, Any]:
         """Installe un package .deb avec apt install (résout automatiquement les dépendances)"""
         try:
@@ -251,7 +309,7 @@ class SnapclientManager:
             # Étape 2 : Installer le .deb avec apt install (résout automatiquement les dépendances)
             self.logger.info(f"Installing {Path(deb_path).name} with automatic dependency resolution...")
             proc = await asyncio.create_subprocess_exec(
-                "sudo", "-E", "apt", "install", "-y", deb_path,
+                "sudo", "-E", "apt", "install", "-y", "--allow-downgrades", deb_path,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 env={**os.environ, **env}
@@ -312,8 +370,106 @@ class SnapclientManager:
             self.logger.error(f"Failed to start snapclient service: {e}")
             return False
 
+class CalibrationManager:
+    """Capture horodatée pour la calibration de latence (ou retard de sortie ALSA sans micro)"""
+
+    CHUNK_FRAMES = 480  # 10 ms à 48 kHz
+
+    def __init__(self):
+        self.logger = logging.getLogger(f"{__name__}.CalibrationManager")
+        self.lock = asyncio.Lock()
+
+    async def has_capture_device(self) -> bool:
+        """Vérifie qu'un périphérique de capture ALSA est présent"""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "arecord", "-l",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await proc.communicate()
+            return "card" in stdout.decode()
+        except FileNotFoundError:
+            return False
+
+    def get_output_delay_ms(self) -> Optional[float]:
+        """Retard de sortie estimé depuis le buffer ALSA du flux de lecture actif (hw_params)"""
+        for hw_params in Path("/proc/asound").glob("card*/pcm*p/sub*/hw_params"):
+            try:
+                params = dict(
+                    line.split(":", 1) for line in hw_params.read_text().splitlines() if ":" in line
+                )
+                rate = int(params["rate"].split()[0])
+                buffer_size = int(params["buffer_size"].strip())
+                return round(buffer_size / rate * 1000, 2)
+            except (KeyError, ValueError, OSError):
+                continue  # "closed" ou illisible
+        return None
+
+    async def capture(self, start_at: float, duration_ms: int, sample_rate: int) -> Dict[str, Any]:
+        """Enregistre à partir de start_at (horloge système) et horodate le premier échantillon"""
+        if not await self.has_capture_device():
+            return {"available": False, "output_delay_ms": self.get_output_delay_ms()}
+
+        async with self.lock:
+            await asyncio.sleep(max(0.0, start_at - time.time()))
+
+            bytes_per_chunk = self.CHUNK_FRAMES * 2  # S16_LE mono
+            total_bytes = int(sample_rate * duration_ms / 1000) * 2
+            proc = await asyncio.create_subprocess_exec(
+                "arecord", "-q", "-t", "raw", "-f", "S16_LE", "-r", str(sample_rate), "-c", "1",
+                "--period-size", str(self.CHUNK_FRAMES),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+
+            pcm = bytearray()
+            started_at = None
+            try:
+                while len(pcm) < total_bytes:
+                    chunk = await proc.stdout.read(bytes_per_chunk)
+                    if not chunk:
+                        break
+                    if started_at is None:
+                        # Instant du premier échantillon = arrivée du premier bloc - sa durée
+                        started_at = time.time() - len(chunk) / 2 / sample_rate
+                    pcm.extend(chunk)
+            finally:
+                if proc.returncode is None:
+                    proc.terminate()
+                await proc.wait()
+
+            if started_at is None:
+                return {"available": False, "error": "Capture failed", "output_delay_ms": self.get_output_delay_ms()}
+
+            self.logger.info(f"Calibration capture: {len(pcm) // 2} samples from {started_at:.3f}")
+            return {
+                "available": True,
+                "started_at": started_at,
+                "sample_rate": sample_rate,
+                "pcm": base64.b64encode(bytes(pcm[:total_bytes])).decode(),
+                # Permet à Milo de mesurer l'écart entre capture et retard déclaré (satellites sans micro)
+                "output_delay_ms": self.get_output_delay_ms()
+            }
+
+
+class UpdateRequest(BaseModel):
+    """Cible de mise à jour imposée par Milo (mise à jour de flotte ou rollback)"""
+    version: Optional[str] = None
+    deb_url: Optional[str] = None
+    sha256: Optional[str] = None
+
+
+class CalibrationCaptureRequest(BaseModel):
+    """Fenêtre de capture demandée par Milo"""
+    start_at: float
+    duration_ms: int = Field(ge=100, le=10000)
+    sample_rate: int = 48000
+
+
 # Instance globale du gestionnaire
 snapclient_manager = SnapclientManager()
+calibration_manager = CalibrationManager()
 
 def get_system_uptime() -> int:
     """Récupère l'uptime du système en secondes"""
@@ -351,6 +507,7 @@ async def get_status():
         return {
             "hostname": hostname,
             "uptime": uptime,
+            "debian_codename": await snapclient_manager._get_debian_codename(),
             "snapclient": {
                 "version": snapclient_version,
                 "running": snapclient_running,
@@ -387,21 +544,43 @@ async def get_version():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/update")
-async def update_snapclient(background_tasks: BackgroundTasks):
-    """Lance la mise à jour de snapclient depuis GitHub"""
-    global UPDATE_IN_PROGRESS
+async def update_snapclient(background_tasks: BackgroundTasks, http_request: Request,
+                            request: Optional[UpdateRequest] = None):
+    """Lance la mise à jour de snapclient (dernière version GitHub, ou version et paquet fournis par Milo)"""
+    global UPDATE_IN_PROGRESS, LAST_UPDATE_RESULT
 
     if UPDATE_IN_PROGRESS:
         raise HTTPException(status_code=409, detail="Update already in progress")
 
+    request = request or UpdateRequest()
+
     try:
-        # Récupérer la dernière version disponible sur GitHub
-        latest_version = await snapclient_manager.get_latest_github_version()
+        # Version imposée (rollback possible) ou dernière version disponible sur GitHub
+        latest_version = request.version or await snapclient_manager.get_latest_github_version()
         if not latest_version:
             raise HTTPException(status_code=500, detail="Could not determine latest version")
 
         # Vérifier si une mise à jour est nécessaire
         current_version = await snapclient_manager.get_installed_version()
+        if current_version == latest_version and request.version and not await snapclient_manager.is_service_running():
+            # Rollback vers la version installée, snapclient arrêté : simple redémarrage du service
+            if not await snapclient_manager._start_snapclient_service():
+                return {"success": False, "message": "Failed to start snapclient service"}
+
+            LAST_UPDATE_RESULT = {
+                "success": True,
+                "message": "Snapclient restarted",
+                "old_version": current_version,
+                "new_version": current_version,
+                "timestamp": int(time.time())
+            }
+            return {
+                "success": True,
+                "message": "Snapclient restarted",
+                "current_version": current_version,
+                "target_version": latest_version
+            }
+
         if current_version == latest_version:
             return {
                 "success": False,
@@ -410,9 +589,16 @@ async def update_snapclient(background_tasks: BackgroundTasks):
                 "latest_version": latest_version
             }
 
-        # Lancer la mise à jour en arrière-plan
+        # Lancer la mise à jour en arrière-plan (le résultat précédent n'est plus valable)
+        LAST_UPDATE_RESULT = None
+
         async def do_update():
-            result = await snapclient_manager.update_snapclient(latest_version)
+            global LAST_UPDATE_RESULT
+            milo_host = http_request.client.host if http_request.client else None
+            result = await snapclient_manager.update_snapclient(
+                latest_version, request.deb_url, request.sha256, milo_host
+            )
+            LAST_UPDATE_RESULT = {**result, "timestamp": int(time.time())}
             logger.info(f"Update completed: {result}")
 
         background_tasks.add_task(do_update)
@@ -435,9 +621,27 @@ async def get_update_status():
     """Récupère le statut de la mise à jour en cours"""
     return {
         "update_in_progress": UPDATE_IN_PROGRESS,
+        "last_result": LAST_UPDATE_RESULT,
         "timestamp": int(time.time())
     }
 
+@app.get("/calibration/clock")
+async def calibration_clock():
+    """Horloge système du satellite (décalage avec Milo estimé avant chaque capture)"""
+    return {"time": time.time()}
+
+@app.post("/calibration/capture")
+async def calibration_capture(request: CalibrationCaptureRequest):
+    """Capture le motif de calibration diffusé par Milo (ou retourne le retard de sortie sans micro)"""
+    if calibration_manager.lock.locked():
+        raise HTTPException(status_code=409, detail="Capture already in progress")
+
+    try:
+        return await calibration_manager.capture(request.start_at, request.duration_ms, request.sample_rate)
+    except Exception as e:
+        logger.error(f"Calibration capture failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Point d'entrée principal
 if __name__ == "__main__":
     logger.info(f"Starting Milo Sat API on port {API_PORT}")